@@ -0,0 +1,238 @@
+-- Create the item change outbox
+--
+-- With notify_items_delivery 'outbox' or 'both', notify_items_change_func
+-- writes one row per changed item here. Unlike NOTIFY, rows outlive consumer
+-- restarts, and writers do not queue behind the notification lock at commit.
+--
+-- Consumers read in (txid, seq) order from a cursor with
+-- pgstac_items_outbox_read, keep the txid and seq of the last row, and pass
+-- them back for the next batch. Only rows of transactions older than every
+-- running transaction are returned, so a transaction that commits late can
+-- never appear behind a cursor.
+--
+-- The table is partitioned by day. pgstac_items_outbox_maintain creates the
+-- next days' partitions and drops those past the retention period; rows land
+-- in the default partition only if it has not run for days_ahead days, and
+-- stay there until the retention period has passed.
+CREATE SEQUENCE IF NOT EXISTS pgstac_items_outbox_seq;
+
+CREATE TABLE IF NOT EXISTS pgstac_items_outbox (
+    seq bigint NOT NULL DEFAULT nextval('pgstac_items_outbox_seq'),
+    txid bigint NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+    ts timestamptz NOT NULL DEFAULT now(),
+    operation text NOT NULL,
+    collection text NOT NULL,
+    id text NOT NULL
+) PARTITION BY RANGE (ts);
+
+CREATE TABLE IF NOT EXISTS pgstac_items_outbox_default
+    PARTITION OF pgstac_items_outbox DEFAULT;
+
+CREATE INDEX IF NOT EXISTS pgstac_items_outbox_cursor_idx
+    ON pgstac_items_outbox (txid, seq);
+
+GRANT INSERT ON pgstac_items_outbox TO pgstac_ingest;
+GRANT USAGE ON SEQUENCE pgstac_items_outbox_seq TO pgstac_ingest;
+GRANT SELECT ON pgstac_items_outbox TO pgstac_read;
+
+-- Read the next changes after a cursor
+CREATE OR REPLACE FUNCTION pgstac_items_outbox_read(
+    after_txid bigint DEFAULT 0,
+    after_seq bigint DEFAULT 0,
+    max_rows int DEFAULT 1000
+)
+RETURNS SETOF pgstac_items_outbox AS $$
+    SELECT *
+    FROM pgstac_items_outbox
+    WHERE (txid, seq) > (after_txid, after_seq)
+        AND txid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint
+    ORDER BY txid, seq
+    LIMIT max_rows;
+$$ LANGUAGE sql STABLE;
+
+-- Create upcoming daily partitions and drop expired ones
+--
+-- Only days that have not begun get a partition, so no row of their range
+-- can be in the default partition yet. Attaching a partition for the current
+-- day would race writers: a row routed to the default partition while it is
+-- being attached fails its insert once the attach commits. Writers are kept
+-- out of the default partition from the first new partition to the end of
+-- the transaction, so a clock that went backwards fails ATTACH cleanly.
+CREATE OR REPLACE FUNCTION pgstac_items_outbox_maintain(
+    retention interval DEFAULT '7 days',
+    days_ahead int DEFAULT 2
+)
+RETURNS void AS $$
+DECLARE
+    partition_day date;
+    partition_name text;
+    locked boolean := false;
+BEGIN
+    IF days_ahead < 1 THEN
+        RAISE EXCEPTION 'days_ahead must be at least 1: %', days_ahead;
+    END IF;
+
+    FOR partition_day IN
+        SELECT current_date + offset_days
+        FROM generate_series(1, days_ahead) AS offset_days
+    LOOP
+        partition_name := format('pgstac_items_outbox_%s', to_char(partition_day, 'YYYYMMDD'));
+        CONTINUE WHEN to_regclass(partition_name) IS NOT NULL;
+        IF NOT locked THEN
+            -- Blocks inserts into the default partition but not reads
+            LOCK TABLE pgstac_items_outbox_default IN SHARE ROW EXCLUSIVE MODE;
+            locked := true;
+        END IF;
+        -- ATTACH only locks the parent against schema changes, so writers
+        -- to the other partitions carry on
+        EXECUTE format(
+            'CREATE TABLE %I (LIKE pgstac_items_outbox INCLUDING DEFAULTS)',
+            partition_name
+        );
+        EXECUTE format(
+            'ALTER TABLE pgstac_items_outbox ATTACH PARTITION %I '
+            'FOR VALUES FROM (%L) TO (%L)',
+            partition_name, partition_day, partition_day + 1
+        );
+    END LOOP;
+
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = 'pgstac_items_outbox'::regclass
+            AND child.relname ~ '^pgstac_items_outbox_[0-9]{8}$'
+            AND to_date(right(child.relname, 8), 'YYYYMMDD') + 1
+                <= (now() - retention)::date
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+    END LOOP;
+
+    DELETE FROM pgstac_items_outbox_default WHERE ts < now() - retention;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Cursor of each consumer that keeps its position in the database
+CREATE TABLE IF NOT EXISTS pgstac_items_outbox_cursors (
+    consumer text PRIMARY KEY,
+    txid bigint NOT NULL DEFAULT 0,
+    seq bigint NOT NULL DEFAULT 0
+);
+
+-- Send the changes since the consumer's cursor as coalesced notifications
+--
+-- Repeated changes to an item (e.g. an href rewrite, then an extent update)
+-- collapse into one entry with the last operation. Entries are sent on
+-- pgstac_items_change in the trigger payload format, split by operation into
+-- the numbered notifications of one batch. The cursor moves in the same
+-- transaction, so notifications go out exactly when it is committed.
+CREATE OR REPLACE FUNCTION pgstac_items_outbox_coalesce(
+    consumer_name text DEFAULT 'notifier',
+    max_rows int DEFAULT 10000
+)
+RETURNS int AS $$
+DECLARE
+    max_bytes int := least(
+        coalesce(pgstac.get_setting('notify_items_max_bytes')::int, 7900), 7999
+    );
+    -- Room for the operation, key and batch around the entries
+    envelope_bytes constant int := 200;
+    batch_id text := gen_random_uuid()::text;
+    from_txid bigint;
+    from_seq bigint;
+    to_txid bigint;
+    to_seq bigint;
+    chunk record;
+    sent int := 0;
+BEGIN
+    INSERT INTO pgstac_items_outbox_cursors (consumer)
+    VALUES (consumer_name)
+    ON CONFLICT DO NOTHING;
+
+    SELECT txid, seq INTO from_txid, from_seq
+    FROM pgstac_items_outbox_cursors
+    WHERE consumer = consumer_name
+    FOR UPDATE;
+
+    SELECT txid, seq INTO to_txid, to_seq
+    FROM pgstac_items_outbox_read(from_txid, from_seq, max_rows)
+    ORDER BY txid DESC, seq DESC
+    LIMIT 1;
+
+    IF to_txid IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    -- Every transaction up to the new cursor has ended, so this range no
+    -- longer changes between statements
+    FOR chunk IN
+        WITH latest AS (
+            SELECT DISTINCT ON (collection, id)
+                operation,
+                collection,
+                id,
+                jsonb_build_object('collection', collection, 'id', id) AS entry
+            FROM pgstac_items_outbox
+            WHERE (txid, seq) > (from_txid, from_seq)
+                AND (txid, seq) <= (to_txid, to_seq)
+            ORDER BY collection, id, txid DESC, seq DESC
+        ), sized AS (
+            SELECT
+                operation,
+                collection,
+                id,
+                entry,
+                sum(octet_length(entry::text) + 2) OVER (
+                    PARTITION BY operation
+                    ORDER BY collection, id ROWS UNBOUNDED PRECEDING
+                ) AS running,
+                max(octet_length(entry::text) + 2) OVER () AS largest
+            FROM latest
+        ), numbered AS (
+            -- Same budget as notify_items_change_func
+            SELECT
+                operation,
+                collection,
+                id,
+                entry,
+                (running - 1)
+                    / greatest(max_bytes - envelope_bytes - largest, largest)
+                    AS n
+            FROM sized
+        ), chunks AS (
+            SELECT
+                operation,
+                n,
+                jsonb_agg(entry ORDER BY collection, id) AS entries
+            FROM numbered
+            GROUP BY operation, n
+        )
+        SELECT
+            operation,
+            row_number() OVER (ORDER BY operation, n) AS seq,
+            count(*) OVER () AS total,
+            entries
+        FROM chunks
+        ORDER BY operation, n
+    LOOP
+        PERFORM pg_notify('pgstac_items_change'::text, json_build_object(
+                'operation', chunk.operation,
+                'items', chunk.entries,
+                'batch', json_build_object(
+                    'id', batch_id,
+                    'seq', chunk.seq,
+                    'total', chunk.total
+                )
+            )::text
+        );
+        sent := sent + 1;
+    END LOOP;
+
+    UPDATE pgstac_items_outbox_cursors
+    SET txid = to_txid, seq = to_seq
+    WHERE consumer = consumer_name;
+    RETURN sent;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT pgstac_items_outbox_maintain();
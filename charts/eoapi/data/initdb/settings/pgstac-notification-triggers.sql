@@ -1,21 +1,122 @@
 -- Create the notification function
+--
+-- NOTIFY payloads must be shorter than 8000 bytes, so the rows changed by a
+-- statement are split across as many notifications as needed. Every
+-- notification of a statement carries the same batch id, its sequence number
+-- and the number of notifications in the batch.
+--
+-- Settings, read with pgstac.get_setting (pgstac_settings table, or
+-- `SET pgstac.<name>` for one session, e.g. before a bulk load):
+--   notify_items_mode: 'items' sends the collection and id of every item;
+--     'summary' sends one entry per collection with the count of items and
+--     the first and last id, so a bulk load sends a single notification
+--   notify_items_max_bytes: upper bound for each payload (at most 7999)
+--   notify_items_delivery: 'notify' sends notifications, 'outbox' writes one
+--     row per item to pgstac_items_outbox instead, 'both' does both
 CREATE OR REPLACE FUNCTION notify_items_change_func()
 RETURNS TRIGGER AS $$
 DECLARE
-
+    delivery text := coalesce(pgstac.get_setting('notify_items_delivery'), 'notify');
+    notify_mode text := coalesce(pgstac.get_setting('notify_items_mode'), 'items');
+    max_bytes int := least(
+        coalesce(pgstac.get_setting('notify_items_max_bytes')::int, 7900), 7999
+    );
+    -- Room for the operation, key and batch around the entries
+    envelope_bytes constant int := 200;
+    batch_id text := gen_random_uuid()::text;
+    chunk record;
 BEGIN
-    PERFORM pg_notify('pgstac_items_change'::text, json_build_object(
-            'operation', TG_OP,
-            'items', jsonb_agg(
+    IF delivery NOT IN ('notify', 'outbox', 'both') THEN
+        RAISE WARNING 'Unknown notify_items_delivery %, sending notifications', delivery;
+        delivery := 'notify';
+    END IF;
+
+    IF delivery IN ('outbox', 'both') THEN
+        INSERT INTO pgstac_items_outbox (operation, collection, id)
+        SELECT TG_OP, data.collection, data.id
+        FROM data
+        ORDER BY data.collection, data.id;
+    END IF;
+
+    IF delivery = 'outbox' THEN
+        RETURN NULL;
+    END IF;
+
+    IF notify_mode NOT IN ('items', 'summary') THEN
+        RAISE WARNING 'Unknown notify_items_mode %, sending items', notify_mode;
+        notify_mode := 'items';
+    END IF;
+
+    FOR chunk IN
+        WITH changed AS (
+            SELECT
                 jsonb_build_object(
                     'collection', data.collection,
                     'id', data.id
-                )
-            )
-        )::text
+                ) AS entry,
+                data.collection AS collection,
+                data.id AS id
+            FROM data
+            WHERE notify_mode = 'items'
+            UNION ALL
+            SELECT
+                jsonb_build_object(
+                    'collection', data.collection,
+                    'count', count(*),
+                    'first_id', min(data.id),
+                    'last_id', max(data.id)
+                ),
+                data.collection,
+                ''
+            FROM data
+            WHERE notify_mode = 'summary'
+            GROUP BY data.collection
+        ), sized AS (
+            SELECT
+                entry,
+                collection,
+                id,
+                -- Entry plus its ", " separator in the array
+                sum(octet_length(entry::text) + 2)
+                    OVER (ORDER BY collection, id ROWS UNBOUNDED PRECEDING)
+                    AS running,
+                max(octet_length(entry::text) + 2) OVER () AS largest
+            FROM changed
+        ), numbered AS (
+            -- A chunk ends below a multiple of the budget, and its first entry
+            -- may start up to one entry before it: keep that much in reserve
+            SELECT
+                entry,
+                collection,
+                id,
+                (running - 1)
+                    / greatest(max_bytes - envelope_bytes - largest, largest)
+                    AS n
+            FROM sized
+        ), chunks AS (
+            SELECT n, jsonb_agg(entry ORDER BY collection, id) AS entries
+            FROM numbered
+            GROUP BY n
         )
-        FROM data
-    ;
+        SELECT
+            row_number() OVER (ORDER BY n) AS seq,
+            count(*) OVER () AS total,
+            entries
+        FROM chunks
+        ORDER BY n
+    LOOP
+        PERFORM pg_notify('pgstac_items_change'::text, json_build_object(
+                'operation', TG_OP,
+                CASE WHEN notify_mode = 'summary' THEN 'collections' ELSE 'items' END,
+                chunk.entries,
+                'batch', json_build_object(
+                    'id', batch_id,
+                    'seq', chunk.seq,
+                    'total', chunk.total
+                )
+            )::text
+        );
+    END LOOP;
     RETURN NULL;
 END;
 $$ LANGUAGE plpgsql;
@@ -24,3 +24,13 @@ INSERT INTO pgstac.pgstac_settings (name, value) VALUES ('context_estimated_cost
 
 DELETE FROM pgstac.pgstac_settings WHERE name = 'context_stats_ttl';
 INSERT INTO pgstac.pgstac_settings (name, value) VALUES ('context_stats_ttl', '{{ .Values.pgstacBootstrap.settings.pgstacSettings.context_stats_ttl }}');
+
+-- Item change notification settings (read by notify_items_change_func)
+DELETE FROM pgstac.pgstac_settings WHERE name = 'notify_items_mode';
+INSERT INTO pgstac.pgstac_settings (name, value) VALUES ('notify_items_mode', '{{ .Values.pgstacBootstrap.settings.pgstacSettings.notify_items_mode }}');
+
+DELETE FROM pgstac.pgstac_settings WHERE name = 'notify_items_max_bytes';
+INSERT INTO pgstac.pgstac_settings (name, value) VALUES ('notify_items_max_bytes', '{{ .Values.pgstacBootstrap.settings.pgstacSettings.notify_items_max_bytes }}');
+
+DELETE FROM pgstac.pgstac_settings WHERE name = 'notify_items_delivery';
+INSERT INTO pgstac.pgstac_settings (name, value) VALUES ('notify_items_delivery', '{{ .Values.pgstacBootstrap.settings.pgstacSettings.notify_items_delivery }}');
@@ -36,6 +36,19 @@ Validated at render time by eoapi.validateHpaAdapterMetricAlignment.
 {{- printf "nginx_ingress_controller_requests_rate_%s_eoapi" .service -}}
 {{- end -}}
 
+{{/*
+Return prometheus-adapter custom metric names for latency HPA per service:
+p95 request duration (seconds) and requests in flight.
+Validated at render time by eoapi.validateHpaAdapterMetricAlignment.
+*/}}
+{{- define "eoapi.hpaLatencyMetricName" -}}
+{{- printf "nginx_ingress_controller_request_duration_p95_%s_eoapi" .service -}}
+{{- end -}}
+
+{{- define "eoapi.hpaInFlightMetricName" -}}
+{{- printf "nginx_ingress_controller_requests_in_flight_%s_eoapi" .service -}}
+{{- end -}}
+
 {{/*
 Helper function for common init containers to wait for pgstac jobs
 */}}
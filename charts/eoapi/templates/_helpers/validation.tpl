@@ -24,11 +24,21 @@ so we use this helper function to check autoscaling rules
 {{- if $bothEnabled }}
 {{- fail "When using an 'ingress.className' other than 'nginx' you cannot enable autoscaling by 'both' at this time b/c 'requestRate' is solely an nginx metric" }}
 {{- end }}
+{{/* "latency" cannot be enabled for any service if not "nginx" so give feedback and fail */}}
+{{- $latencyEnabled := false }}
+{{- range .Values.apiServices }}
+{{- if and (index $.Values . "autoscaling" "enabled") (eq (index $.Values . "autoscaling" "type") "latency") }}
+{{- $latencyEnabled = true }}
+{{- end }}
+{{- end }}
+{{- if $latencyEnabled }}
+{{- fail "When using an 'ingress.className' other than 'nginx' you cannot enable autoscaling by 'latency' at this time b/c request duration is solely an nginx metric" }}
+{{- end }}
 {{- end }}
 {{- end -}}
 
 {{/*
-Ensure prometheus-adapter custom metric names match HPA request-rate metrics.
+Ensure prometheus-adapter custom metric names match HPA request-rate and latency metrics.
 */}}
 {{- define "eoapi.validateHpaAdapterMetricAlignment" -}}
 {{- if .Values.monitoring.prometheusAdapter.enabled }}
@@ -40,16 +50,56 @@ Ensure prometheus-adapter custom metric names match HPA request-rate metrics.
 {{- range .Values.apiServices }}
 {{- $service := . }}
 {{- $autoscaling := index $.Values $service "autoscaling" | default dict }}
+{{- $targets := $autoscaling.targets | default dict }}
+{{- $expected := dict }}
 {{- if and $autoscaling.enabled (or (eq $autoscaling.type "requestRate") (eq $autoscaling.type "both")) }}
-{{- $expected := include "eoapi.hpaRequestRateMetricName" (dict "service" $service) | trim }}
+{{- $_ := set $expected "request-rate" "eoapi.hpaRequestRateMetricName" }}
+{{- end }}
+{{- if and $autoscaling.enabled (eq $autoscaling.type "latency") }}
+{{- if $targets.latency }}
+{{- $_ := set $expected "latency" "eoapi.hpaLatencyMetricName" }}
+{{- end }}
+{{- if $targets.inFlight }}
+{{- $_ := set $expected "in-flight" "eoapi.hpaInFlightMetricName" }}
+{{- end }}
+{{- end }}
+{{- range $kind, $helper := $expected }}
+{{- $name := include $helper (dict "service" $service) | trim }}
 {{- $found := false }}
 {{- range $rules }}
-{{- if and .name .name.as (eq .name.as $expected) }}
+{{- if and .name .name.as (eq .name.as $name) }}
 {{- $found = true }}
 {{- end }}
 {{- end }}
 {{- if not $found }}
-{{- fail (printf "prometheus-adapter.rules.custom must define name.as %q for request-rate HPA (service %q). See eoapi.hpaRequestRateMetricName in _helpers/services.tpl" $expected $service) }}
+{{- fail (printf "prometheus-adapter.rules.custom must define name.as %q for %s HPA (service %q). See %s in _helpers/services.tpl" $name $kind $service $helper) }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{- end }}
+{{- end -}}
+
+{{/*
+Ensure every enabled HPA has the targets its type scales on, whether or not
+the prometheus adapter is managed by this chart: a type without targets
+renders an HPA with no metrics
+*/}}
+{{- define "eoapi.validateHpaTargets" -}}
+{{- range .Values.apiServices }}
+{{- $service := . }}
+{{- $autoscaling := index $.Values $service "autoscaling" | default dict }}
+{{- if $autoscaling.enabled }}
+{{- $targets := $autoscaling.targets | default dict }}
+{{- if eq $autoscaling.type "latency" }}
+{{- if not (or $targets.latency $targets.inFlight) }}
+{{- fail (printf "%s.autoscaling.targets must set latency and/or inFlight when autoscaling.type is \"latency\"" $service) }}
+{{- end }}
+{{- else }}
+{{- if and (has $autoscaling.type (list "cpu" "both")) (not $targets.cpu) }}
+{{- fail (printf "%s.autoscaling.targets.cpu must be set when autoscaling.type is %q" $service $autoscaling.type) }}
+{{- end }}
+{{- if and (has $autoscaling.type (list "requestRate" "both")) (not $targets.requestRate) }}
+{{- fail (printf "%s.autoscaling.targets.requestRate must be set when autoscaling.type is %q" $service $autoscaling.type) }}
 {{- end }}
 {{- end }}
 {{- end }}
@@ -71,3 +121,19 @@ Ensures stac-auth-proxy cannot be enabled when stac is disabled
 {{- end }}
 {{- end }}
 {{- end -}}
+
+{{/*
+Validate notification coalescing
+The coalescer reads the items outbox, so the triggers must write to it and
+must not also notify, or every change would reach the notifier twice
+*/}}
+{{- define "eoapi.validateNotifierCoalesce" -}}
+{{- $notifier := index .Values "eoapi-notifier" }}
+{{- if and $notifier.enabled $notifier.coalesce $notifier.coalesce.enabled }}
+{{- $settings := .Values.pgstacBootstrap.settings.pgstacSettings | default dict }}
+{{- $delivery := default "notify" $settings.notify_items_delivery }}
+{{- if ne $delivery "outbox" }}
+{{- fail (printf "eoapi-notifier.coalesce.enabled requires pgstacBootstrap.settings.pgstacSettings.notify_items_delivery \"outbox\" (got %q): the coalescer sends the notifications from the items outbox" $delivery) }}
+{{- end }}
+{{- end }}
+{{- end -}}
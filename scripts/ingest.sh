@@ -8,6 +8,70 @@ source "$SCRIPT_DIR/lib/common.sh"
 DEFAULT_COLLECTIONS_FILE="./collections.json"
 DEFAULT_ITEMS_FILE="./items.json"
 
+# Stream large item files from local disk with parallel COPY loaders. Without
+# --dsn or PGSTAC_DSN, the database is reached through a port-forward as the
+# user the services connect as (BULK_INGEST_DB_USER, default eoapi), so the
+# partitions the load creates have the same owner as the rest of pgstac.
+bulk_ingest() {
+    local loader="$SCRIPT_DIR/lib/bulk_ingest.py"
+    local pf_pid=""
+
+    if ! command_exists python3; then
+        log_error "python3 is required for bulk ingestion"
+        return 1
+    fi
+    if ! python3 -c "import psycopg" >/dev/null 2>&1; then
+        log_error "psycopg is required for bulk ingestion: pip install 'psycopg[binary]'"
+        log_error "GeoParquet input also needs: pip install pyarrow stac-geoparquet"
+        return 1
+    fi
+
+    if [[ -z "${PGSTAC_DSN:-}" && " $* " != *" --dsn"* ]]; then
+        local namespace release secret uri host port local_port
+        namespace=$(detect_namespace)
+        release=$(detect_release_name "$namespace")
+        secret="${release}-pguser-${BULK_INGEST_DB_USER:-eoapi}"
+        local_port="${BULK_INGEST_LOCAL_PORT:-15432}"
+
+        uri=$(kubectl get secret "$secret" -n "$namespace" -o jsonpath='{.data.uri}' 2>/dev/null | base64 -d)
+        host=$(kubectl get secret "$secret" -n "$namespace" -o jsonpath='{.data.host}' 2>/dev/null | base64 -d)
+        port=$(kubectl get secret "$secret" -n "$namespace" -o jsonpath='{.data.port}' 2>/dev/null | base64 -d)
+        if [[ -z "$uri" || -z "$host" ]]; then
+            log_error "Could not read database credentials from secret $namespace/$secret"
+            log_error "Pass --dsn or set PGSTAC_DSN instead"
+            return 1
+        fi
+
+        log_info "Forwarding localhost:$local_port to svc/${host%%.*}:${port:-5432} in $namespace"
+        kubectl port-forward -n "$namespace" "svc/${host%%.*}" "$local_port:${port:-5432}" >/dev/null 2>&1 &
+        pf_pid=$!
+        trap 'kill "$pf_pid" 2>/dev/null || true' EXIT
+
+        local attempt
+        for attempt in $(seq 1 30); do
+            if python3 -c "import socket; socket.create_connection(('localhost', $local_port), 1)" 2>/dev/null; then
+                break
+            fi
+            if [[ "$attempt" -eq 30 ]] || ! kill -0 "$pf_pid" 2>/dev/null; then
+                log_error "Port-forward to the database failed"
+                return 1
+            fi
+            sleep 1
+        done
+
+        PGSTAC_DSN=$(echo "$uri" | sed -E "s#@[^/]+/#@localhost:${local_port}/#")
+        export PGSTAC_DSN
+    fi
+
+    python3 "$loader" "$@"
+}
+
+if [[ "${1:-}" == "bulk" ]]; then
+    shift
+    bulk_ingest "$@"
+    exit $?
+fi
+
 if [ "$#" -eq 2 ]; then
     EOAPI_COLLECTIONS_FILE="$1"
     EOAPI_ITEMS_FILE="$2"
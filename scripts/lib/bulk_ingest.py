@@ -0,0 +1,648 @@
+#!/usr/bin/env python3
+"""
+Bulk Item Ingestion
+
+Streams STAC items from local NDJSON or GeoParquet files into pgstac with
+parallel COPY loaders, for loads too large for a single `pypgstac load`.
+
+Items are binned by pgstac partition (collection, truncated by the
+collection's partition_trunc) and COPYed into pgstac's staging tables in
+chunks, so pgstac still dehydrates them and creates partitions. Each
+partition always goes to the same loader, which keeps loaders from
+contending on partition creation while different partitions load in
+parallel.
+
+Input is read in segments of rows. Once every chunk of a segment, and of all
+segments before it, is committed, the checkpoint file records the position
+after it; a rerun resumes from there. Rows of segments that were in flight
+are loaded again, which insert_ignore and upsert absorb; plain insert would
+fail on them, so it only runs without a checkpoint.
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import psycopg
+
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from stac_geoparquet.arrow import stac_table_to_items
+
+    GEOPARQUET_AVAILABLE = True
+except ImportError:
+    GEOPARQUET_AVAILABLE = False
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Staging table pgstac moves rows from, by load method
+METHODS = {
+    "insert": "items_staging",
+    "insert_ignore": "items_staging_ignore",
+    "upsert": "items_staging_upsert",
+}
+PARQUET_SUFFIXES = (".parquet", ".geoparquet")
+
+DEFAULT_METHOD = "insert_ignore"
+DEFAULT_WORKERS = 4
+DEFAULT_CHUNK_ROWS = 10_000
+DEFAULT_SEGMENT_ROWS = 100_000
+DEFAULT_CHECKPOINT = "bulk-ingest.checkpoint.json"
+DEFAULT_REPORT_INTERVAL = 10.0
+# Chunks a loader may have queued before the reader waits for it
+QUEUED_CHUNKS = 2
+
+# (collection, truncated datetime)
+PartitionKey = Tuple[str, str]
+
+
+def partition_key(
+    item: Dict[str, Any], truncs: Dict[str, Optional[str]]
+) -> PartitionKey:
+    """
+    pgstac partition an item is stored in
+
+    Args:
+        item: STAC item
+        truncs: partition_trunc of each collection (None, "year" or "month")
+
+    Returns:
+        Collection id and the item's datetime cut to the partition
+        ("" for collections without time partitions)
+
+    Raises:
+        ValueError: If the item's collection is not in truncs
+    """
+    collection = item.get("collection")
+    if collection not in truncs:
+        raise ValueError(
+            f"Item {item.get('id')!r} belongs to unknown collection {collection!r}; "
+            "load its collection first (--collections)"
+        )
+    trunc = truncs[collection]
+    if not trunc:
+        return collection, ""
+    properties = item.get("properties") or {}
+    timestamp = properties.get("datetime") or properties.get("start_datetime") or ""
+    return collection, timestamp[: 4 if trunc == "year" else 7]
+
+
+def read_ndjson(
+    path: str, offset: int = 0
+) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """
+    Stream items from a newline-delimited JSON file
+
+    Args:
+        path: NDJSON file, one item per line
+        offset: Byte offset to start reading at
+
+    Yields:
+        Byte offset after the item, its JSON text and the parsed item
+    """
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            text = line.decode("utf-8").strip()
+            if text:
+                yield offset, text, json.loads(text)
+
+
+def read_geoparquet(
+    path: str, offset: int = 0, batch_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """
+    Stream items from a stac-geoparquet file, one row batch at a time
+
+    Args:
+        path: GeoParquet file written by stac-geoparquet
+        offset: Rows to skip
+        batch_rows: Rows read per batch
+
+    Yields:
+        Row count after the item, its JSON text and the item
+
+    Raises:
+        ImportError: If pyarrow or stac-geoparquet is not installed
+    """
+    if not GEOPARQUET_AVAILABLE:
+        raise ImportError("GeoParquet input needs pyarrow and stac-geoparquet")
+    rows = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+        if rows + batch.num_rows <= offset:
+            rows += batch.num_rows
+            continue
+        for item in stac_table_to_items(pa.Table.from_batches([batch])):
+            rows += 1
+            if rows > offset:
+                yield rows, json.dumps(item, separators=(",", ":")), item
+
+
+def read_items(path: str, offset: int = 0) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """
+    Stream items from NDJSON or, by file suffix, GeoParquet
+
+    Args:
+        path: Input file
+        offset: Position to resume at, as returned with an earlier item
+
+    Yields:
+        Position after the item, its JSON text and the item
+    """
+    if path.lower().endswith(PARQUET_SUFFIXES):
+        return read_geoparquet(path, offset)
+    return read_ndjson(path, offset)
+
+
+class Checkpoint:
+    """Per-file resume positions, saved atomically as JSON"""
+
+    def __init__(self, path: Optional[str] = None, restart: bool = False):
+        """
+        Load a checkpoint file
+
+        Args:
+            path: Checkpoint file, created on the first save (None keeps
+                positions in memory only)
+            restart: Ignore positions saved by an earlier run
+        """
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if path and not restart and os.path.exists(path):
+            with open(path) as f:
+                self.files = json.load(f).get("files", {})
+
+    def _entry(self, file: str) -> Dict[str, Any]:
+        return self.files.setdefault(
+            os.path.abspath(file), {"position": 0, "rows": 0, "done": False}
+        )
+
+    def position(self, file: str) -> int:
+        """Position to resume a file at"""
+        return self._entry(file)["position"]
+
+    def done(self, file: str) -> bool:
+        """Whether a file was fully loaded"""
+        return self._entry(file)["done"]
+
+    def advance(self, file: str, position: int, rows: int, done: bool = False) -> None:
+        """
+        Record loaded rows of a file and save
+
+        Args:
+            file: Input file
+            position: Position after the last loaded row
+            rows: Rows loaded since the last advance
+            done: Whether the file is complete
+        """
+        entry = self._entry(file)
+        entry["position"] = position
+        entry["rows"] += rows
+        entry["done"] = done
+        if not self.path:
+            return
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"files": self.files}, f, indent=2)
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class Segment:
+    """Rows of one input file read between two checkpoint positions"""
+
+    file: str
+    end: int = 0
+    rows: int = 0
+    pending: int = 0
+    sealed: bool = False
+    last: bool = False
+
+    @property
+    def complete(self) -> bool:
+        return self.sealed and self.pending == 0
+
+
+@dataclass
+class Chunk:
+    """Rows of one partition COPYed in one transaction"""
+
+    key: PartitionKey
+    rows: List[str]
+    segment: Segment
+
+
+class SegmentTracker:
+    """Move the checkpoint past segments once they and all before are loaded"""
+
+    def __init__(self, checkpoint: Checkpoint):
+        self.checkpoint = checkpoint
+        self._segments: Deque[Segment] = deque()
+        self._lock = threading.Lock()
+
+    def open(self, file: str) -> Segment:
+        """Start a segment of a file"""
+        segment = Segment(file)
+        with self._lock:
+            self._segments.append(segment)
+        return segment
+
+    def dispatched(self, segment: Segment) -> None:
+        """Count a chunk of a segment handed to a loader"""
+        with self._lock:
+            segment.pending += 1
+
+    def seal(self, segment: Segment, end: int, last: bool = False) -> None:
+        """
+        Close a segment once all its chunks were dispatched
+
+        Args:
+            segment: Segment to close
+            end: Position after its last row
+            last: Whether it ends its file
+        """
+        with self._lock:
+            segment.end, segment.sealed, segment.last = end, True, last
+        self._advance()
+
+    def loaded(self, segment: Segment) -> None:
+        """Count a chunk of a segment as committed"""
+        with self._lock:
+            segment.pending -= 1
+        self._advance()
+
+    def _advance(self) -> None:
+        with self._lock:
+            while self._segments and self._segments[0].complete:
+                segment = self._segments.popleft()
+                self.checkpoint.advance(
+                    segment.file, segment.end, segment.rows, done=segment.last
+                )
+
+
+@dataclass
+class IngestStats:
+    """Rows committed so far, for progress reports"""
+
+    started: float = field(default_factory=time.time)
+    rows: int = 0
+    chunks: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, rows: int) -> None:
+        """Count a committed chunk"""
+        with self._lock:
+            self.rows += rows
+            self.chunks += 1
+
+    def summary(self) -> Dict[str, float]:
+        elapsed = time.time() - self.started
+        return {
+            "rows": self.rows,
+            "chunks": self.chunks,
+            "seconds": elapsed,
+            "rows_per_s": self.rows / elapsed if elapsed else 0.0,
+        }
+
+
+class BulkIngester:
+    """Stream item files into pgstac with parallel COPY loaders"""
+
+    def __init__(
+        self,
+        dsn: str,
+        method: str = DEFAULT_METHOD,
+        workers: int = DEFAULT_WORKERS,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        segment_rows: int = DEFAULT_SEGMENT_ROWS,
+        checkpoint: Optional[Checkpoint] = None,
+        report_interval: float = DEFAULT_REPORT_INTERVAL,
+    ):
+        """
+        Initialize the ingester
+
+        Args:
+            dsn: PostgreSQL connection string ("" uses the PG* variables)
+            method: insert, insert_ignore or upsert
+            workers: Parallel loaders, each with its own connection
+            chunk_rows: Rows of one partition per COPY
+            segment_rows: Rows read between checkpoint positions
+            checkpoint: Resume positions (default: none kept)
+            report_interval: Seconds between progress reports
+
+        Raises:
+            ImportError: If psycopg is not installed
+            ValueError: If the method or a size is invalid, or insert is
+                combined with a checkpoint file
+        """
+        if not PSYCOPG_AVAILABLE:
+            raise ImportError("Bulk ingestion needs psycopg>=3")
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {', '.join(METHODS)}: {method}")
+        if min(workers, chunk_rows, segment_rows) < 1:
+            raise ValueError("workers, chunk_rows and segment_rows must be positive")
+        if method == "insert" and checkpoint is not None and checkpoint.path:
+            raise ValueError(
+                "insert cannot resume: rows of segments in flight would be "
+                "loaded twice; use insert_ignore or upsert, or no checkpoint"
+            )
+        self.dsn = dsn
+        self.table = f"pgstac.{METHODS[method]}"
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.segment_rows = segment_rows
+        self.checkpoint = checkpoint or Checkpoint()
+        self.report_interval = report_interval
+        self.stats = IngestStats()
+        self._error: Optional[BaseException] = None
+        self._stop = threading.Event()
+
+    def load_collections(self, path: str) -> int:
+        """
+        Create collections that do not exist yet
+
+        Args:
+            path: JSON file with a collection or a list of them, or NDJSON
+
+        Returns:
+            Number of collections created
+        """
+        with open(path) as f:
+            text = f.read().strip()
+        try:
+            data = json.loads(text)
+            collections = data if isinstance(data, list) else [data]
+        except ValueError:
+            collections = [json.loads(line) for line in text.splitlines() if line]
+
+        created = 0
+        with psycopg.connect(self.dsn) as conn:
+            for collection in collections:
+                exists = conn.execute(
+                    "SELECT 1 FROM pgstac.collections WHERE id = %s",
+                    [collection["id"]],
+                ).fetchone()
+                if not exists:
+                    conn.execute(
+                        "SELECT pgstac.create_collection(%s::jsonb)",
+                        [json.dumps(collection)],
+                    )
+                    created += 1
+        return created
+
+    def partition_truncs(self) -> Dict[str, Optional[str]]:
+        """partition_trunc of every collection in the database"""
+        with psycopg.connect(self.dsn) as conn:
+            return dict(
+                conn.execute(
+                    "SELECT id, partition_trunc FROM pgstac.collections"
+                ).fetchall()
+            )
+
+    def _load(
+        self, chunks: "queue.Queue[Optional[Chunk]]", tracker: SegmentTracker
+    ) -> None:
+        try:
+            with psycopg.connect(self.dsn) as conn:
+                while not self._stop.is_set():
+                    try:
+                        chunk = chunks.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    if chunk is None:
+                        return
+                    with conn.cursor() as cur:
+                        with cur.copy(
+                            f"COPY {self.table} (content) FROM STDIN"
+                        ) as copy:
+                            for row in chunk.rows:
+                                copy.write_row((row,))
+                    conn.commit()
+                    self.stats.add(len(chunk.rows))
+                    tracker.loaded(chunk.segment)
+        except BaseException as e:
+            self._error = e
+            self._stop.set()
+            # Keep the reader from blocking on this loader's full queue
+            while not chunks.empty():
+                chunks.get_nowait()
+
+    def _report(self) -> None:
+        while not self._stop.wait(self.report_interval):
+            stats = self.stats.summary()
+            logger.info(
+                f"Loaded {stats['rows']:,} rows in {stats['seconds']:.0f}s "
+                f"({stats['rows_per_s']:,.0f} rows/s)"
+            )
+
+    def _put(self, chunks: "queue.Queue[Optional[Chunk]]", chunk: Chunk) -> None:
+        while not self._stop.is_set():
+            try:
+                chunks.put(chunk, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+        raise RuntimeError("A loader failed") from self._error
+
+    def run(self, paths: List[str]) -> Dict[str, float]:
+        """
+        Load every item of the input files
+
+        Args:
+            paths: NDJSON or GeoParquet files
+
+        Returns:
+            Rows and chunks loaded, seconds taken and rows/s
+
+        Raises:
+            RuntimeError: If a loader failed; loaded segments stay checkpointed
+            ValueError: If an item's collection does not exist
+        """
+        truncs = self.partition_truncs()
+        tracker = SegmentTracker(self.checkpoint)
+        queues: List["queue.Queue[Optional[Chunk]]"] = [
+            queue.Queue(maxsize=QUEUED_CHUNKS) for _ in range(self.workers)
+        ]
+        loaders = [
+            threading.Thread(target=self._load, args=(q, tracker), daemon=True)
+            for q in queues
+        ]
+        for loader in loaders:
+            loader.start()
+        reporter = threading.Thread(target=self._report, daemon=True)
+        reporter.start()
+
+        def dispatch(key: PartitionKey, rows: List[str], segment: Segment) -> None:
+            tracker.dispatched(segment)
+            worker = zlib.crc32("\0".join(key).encode()) % self.workers
+            self._put(queues[worker], Chunk(key, rows, segment))
+
+        try:
+            for path in paths:
+                if self.checkpoint.done(path):
+                    logger.info(f"Skipping {path}: already loaded")
+                    continue
+                position = self.checkpoint.position(path)
+                if position:
+                    logger.info(f"Resuming {path} at position {position}")
+
+                segment = tracker.open(path)
+                bins: Dict[PartitionKey, List[str]] = {}
+                for position, text, item in read_items(path, position):
+                    key = partition_key(item, truncs)
+                    rows = bins.setdefault(key, [])
+                    rows.append(text)
+                    segment.rows += 1
+                    if len(rows) >= self.chunk_rows:
+                        dispatch(key, bins.pop(key), segment)
+                    if segment.rows >= self.segment_rows:
+                        for key, rows in bins.items():
+                            dispatch(key, rows, segment)
+                        bins = {}
+                        tracker.seal(segment, position)
+                        segment = tracker.open(path)
+
+                for key, rows in bins.items():
+                    dispatch(key, rows, segment)
+                tracker.seal(segment, position, last=True)
+        finally:
+            for q in queues:
+                if not self._stop.is_set():
+                    q.put(None)
+            for loader in loaders:
+                loader.join()
+            self._stop.set()
+            reporter.join()
+
+        if self._error:
+            raise RuntimeError("A loader failed") from self._error
+        return self.stats.summary()
+
+
+def main() -> int:
+    """Entry point for `eoapi-cli ingest bulk`"""
+    parser = argparse.ArgumentParser(
+        prog="eoapi-cli ingest bulk",
+        description="Stream STAC items into pgstac with parallel COPY loaders",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        metavar="FILE",
+        help="NDJSON item files, or GeoParquet (.parquet, .geoparquet) files",
+    )
+    parser.add_argument(
+        "--dsn",
+        default=os.getenv("PGSTAC_DSN", ""),
+        help="pgstac database (default: PGSTAC_DSN env or the PG* variables)",
+    )
+    parser.add_argument(
+        "--collections",
+        metavar="FILE",
+        help="Collections to create first if missing (JSON or NDJSON)",
+    )
+    parser.add_argument(
+        "--method",
+        choices=list(METHODS),
+        default=DEFAULT_METHOD,
+        help=f"How existing items are handled (default: {DEFAULT_METHOD})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Parallel loaders, one connection each (default: {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"Rows of one partition per COPY (default: {DEFAULT_CHUNK_ROWS})",
+    )
+    parser.add_argument(
+        "--segment-rows",
+        type=int,
+        default=DEFAULT_SEGMENT_ROWS,
+        help=f"Rows between checkpoint positions (default: {DEFAULT_SEGMENT_ROWS})",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=DEFAULT_CHECKPOINT,
+        help=f"Resume positions file (default: {DEFAULT_CHECKPOINT})",
+    )
+    parser.add_argument(
+        "--no-checkpoint",
+        action="store_true",
+        help="Keep no resume positions (required with --method insert)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint and load every file from the start",
+    )
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=DEFAULT_REPORT_INTERVAL,
+        help=f"Seconds between progress reports (default: {DEFAULT_REPORT_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--report-json", metavar="FILE", help="Write the final rows/s summary here"
+    )
+    args = parser.parse_args()
+
+    try:
+        ingester = BulkIngester(
+            dsn=args.dsn,
+            method=args.method,
+            workers=args.workers,
+            chunk_rows=args.chunk_rows,
+            segment_rows=args.segment_rows,
+            checkpoint=Checkpoint(
+                None if args.no_checkpoint else args.checkpoint,
+                restart=args.restart,
+            ),
+            report_interval=args.report_interval,
+        )
+        if args.collections:
+            created = ingester.load_collections(args.collections)
+            logger.info(f"Created {created} collections")
+        summary = ingester.run(args.inputs)
+    except (ImportError, ValueError, RuntimeError, OSError) as e:
+        logger.error(f"Bulk ingestion failed: {e}")
+        if e.__cause__:
+            logger.error(f"Caused by: {e.__cause__}")
+        return 1
+
+    logger.info(
+        f"Loaded {summary['rows']:,} rows in {summary['seconds']:.1f}s "
+        f"({summary['rows_per_s']:,.0f} rows/s)"
+    )
+    if args.report_json:
+        with open(args.report_json, "w") as f:
+            json.dump(summary, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
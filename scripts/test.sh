@@ -29,6 +29,7 @@ COMMANDS:
     gitsha          Test gitSha injection script
     integration     Run integration tests with pytest
     notification    Run notification tests with database access
+    outbox          Smoke test the items outbox and coalescer against a pgstac database
     all             Run all tests
 
 OPTIONS:
@@ -154,6 +155,12 @@ test_notification() {
     "${SCRIPT_DIR}/test/notification.sh" "$pytest_args"
 }
 
+test_outbox() {
+    log_info "Testing items outbox and coalescer..."
+
+    "${SCRIPT_DIR}/test/outbox.sh"
+}
+
 test_all() {
     local failed=0
 
@@ -208,7 +215,7 @@ main() {
                 pytest_args="$2"
                 shift 2
                 ;;
-            schema|lint|unit|images|gitsha|notification|integration|all)
+            schema|lint|unit|images|gitsha|notification|outbox|integration|all)
                 command="$1"
                 shift
                 ;;
@@ -244,6 +251,9 @@ main() {
         notification)
             test_notification "$pytest_args"
             ;;
+        outbox)
+            test_outbox
+            ;;
         all)
             test_all
             ;;
@@ -0,0 +1,243 @@
+#!/usr/bin/env bash
+
+# Smoke test the items outbox SQL against a pgstac database.
+#
+# Connects with the libpq environment (PGHOST, PGUSER, PGPASSWORD,
+# PGDATABASE, ...) to a throwaway database that `pypgstac migrate` has set
+# up, installs the chart's outbox and notification trigger SQL and checks
+# partition maintenance and coalescing. With helm, the coalescer runs the
+# command its Deployment renders.
+
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+PROJECT_ROOT="$(cd "${SCRIPT_DIR}/../.." && pwd)"
+
+source "${SCRIPT_DIR}/../lib/common.sh"
+
+CHART_PATH="${PROJECT_ROOT}/charts/eoapi"
+SETTINGS_DIR="${CHART_PATH}/data/initdb/settings"
+COLLECTION="outbox-smoke"
+WATCH_SECONDS=4
+
+# Same search path as the pgstac bootstrap job's sessions; item changes go
+# to the outbox only, as coalescing requires
+export PGOPTIONS="${PGOPTIONS:-} -c search_path=pgstac,public -c pgstac.notify_items_delivery=outbox -c pgstac.notify_items_mode=items"
+
+tmpdir=$(mktemp -d)
+trap 'rm -rf "$tmpdir"' EXIT
+
+failures=0
+
+sql() {
+    psql -v ON_ERROR_STOP=1 -qAt -c "$1"
+}
+
+expect() {
+    local name="$1" actual="$2" expected="$3"
+    if [[ "$actual" == "$expected" ]]; then
+        log_success "$name"
+    else
+        log_error "$name: expected '${expected}', got '${actual}'"
+        failures=$((failures + 1))
+    fi
+}
+
+partition_exists() {
+    sql "SELECT count(*) FROM pg_inherits
+         WHERE inhparent = 'pgstac_items_outbox'::regclass
+           AND inhrelid::regclass::text = 'pgstac_items_outbox_' || to_char(current_date + $1, 'YYYYMMDD')"
+}
+
+install_sql() {
+    log_info "Installing outbox and notification triggers (twice, as upgrades do)..."
+    local attempt
+    for attempt in 1 2; do
+        psql -v ON_ERROR_STOP=1 -q \
+            -f "${SETTINGS_DIR}/pgstac-items-outbox.sql" \
+            -f "${SETTINGS_DIR}/pgstac-notification-triggers.sql"
+    done
+}
+
+test_maintain() {
+    log_info "Testing partition maintenance..."
+
+    expect "today's rows stay in the default partition" "$(partition_exists 0)" "0"
+    expect "tomorrow's partition is created ahead" "$(partition_exists 1)" "1"
+    expect "the day after's partition is created ahead" "$(partition_exists 2)" "1"
+    expect "days_ahead below 1 is refused" \
+        "$(sql "SELECT pgstac_items_outbox_maintain(days_ahead => 0)" 2>/dev/null || echo refused)" "refused"
+
+    # A writer arriving while maintenance creates partitions waits for it and
+    # then commits; it must not fail on a partition attached under it
+    sql "BEGIN;
+         SELECT pgstac_items_outbox_maintain(days_ahead => 4);
+         SELECT pg_sleep(2);
+         COMMIT;" >/dev/null &
+    local maintain_pid=$!
+    sleep 0.5
+    local writer=ok
+    sql "INSERT INTO pgstac_items_outbox (operation, collection, id)
+         VALUES ('INSERT', 'outbox-smoke', 'during-maintenance')" || writer=failed
+    local maintain=ok
+    wait "$maintain_pid" || maintain=failed
+
+    expect "maintenance succeeds with a concurrent writer" "$maintain" "ok"
+    expect "a concurrent writer succeeds" "$writer" "ok"
+    expect "partitions are created up to days_ahead" "$(partition_exists 4)" "1"
+    expect "the concurrent row is kept" \
+        "$(sql "SELECT count(*) FROM pgstac_items_outbox WHERE id = 'during-maintenance'")" "1"
+
+    sql "SELECT pgstac_items_outbox_maintain(retention => '0 days');" >/dev/null
+    expect "expired rows leave the default partition" \
+        "$(sql "SELECT count(*) FROM pgstac_items_outbox_default WHERE id = 'during-maintenance'")" "0"
+}
+
+# Item changes fire the triggers the way the notification benchmark makes
+# them: pgstac's update_item would delete and insert instead
+insert_item() {
+    sql "SELECT create_item('{\"type\": \"Feature\", \"stac_version\": \"1.0.0\",
+         \"id\": \"$1\", \"collection\": \"${COLLECTION}\",
+         \"geometry\": {\"type\": \"Point\", \"coordinates\": [0, 0]}, \"bbox\": [0, 0, 0, 0],
+         \"properties\": {\"datetime\": \"2024-01-01T00:00:00Z\"}, \"assets\": {}, \"links\": []}'::jsonb)" >/dev/null
+}
+
+update_item() {
+    sql "UPDATE items SET content = jsonb_set(content, '{properties,title}', to_jsonb('$2'::text))
+         WHERE collection = '${COLLECTION}' AND id = '$1'" >/dev/null
+}
+
+delete_item() {
+    sql "DELETE FROM items WHERE collection = '${COLLECTION}' AND id = '$1'" >/dev/null
+}
+
+cursor_at_end() {
+    sql "SELECT (c.txid, c.seq) = (o.txid, o.seq)
+         FROM pgstac_items_outbox_cursors c,
+              (SELECT txid, seq FROM pgstac_items_outbox ORDER BY txid DESC, seq DESC LIMIT 1) o
+         WHERE c.consumer = '$1'"
+}
+
+test_coalesce() {
+    log_info "Testing outbox coalescing..."
+
+    sql "SELECT upsert_collection('{\"type\": \"Collection\", \"stac_version\": \"1.0.0\",
+         \"id\": \"${COLLECTION}\", \"description\": \"Outbox smoke test\", \"license\": \"proprietary\",
+         \"extent\": {\"spatial\": {\"bbox\": [[-180, -90, 180, 90]]},
+         \"temporal\": {\"interval\": [[null, null]]}}, \"links\": []}'::jsonb)" >/dev/null
+    # Start after earlier changes
+    sql "SELECT pgstac_items_outbox_coalesce('smoke')" >/dev/null
+
+    # Separate transactions, as separate ingest steps would be
+    insert_item a
+    insert_item b
+    update_item a href-rewrite
+    update_item a extent-update
+    delete_item b
+    expect "each change writes an outbox row" \
+        "$(sql "SELECT count(*) FROM pgstac_items_outbox WHERE collection = '${COLLECTION}'")" "5"
+
+    # Rolled back: neither the notifications nor the cursor move
+    local before
+    before=$(sql "SELECT txid || '/' || seq FROM pgstac_items_outbox_cursors WHERE consumer = 'smoke'")
+    psql -v ON_ERROR_STOP=1 -qAt >"${tmpdir}/rollback.out" <<'SQL'
+LISTEN pgstac_items_change;
+BEGIN;
+SELECT pgstac_items_outbox_coalesce('smoke');
+ROLLBACK;
+SELECT 'done';
+SQL
+    expect "a rolled back run sends nothing" \
+        "$(grep -c 'Asynchronous notification' "${tmpdir}/rollback.out" || true)" "0"
+    expect "a rolled back run keeps the cursor" \
+        "$(sql "SELECT txid || '/' || seq FROM pgstac_items_outbox_cursors WHERE consumer = 'smoke'")" "$before"
+
+    # Committed: one entry per item with its last operation, and the cursor
+    # moves with the notifications
+    psql -v ON_ERROR_STOP=1 -qAt >"${tmpdir}/commit.out" <<'SQL'
+LISTEN pgstac_items_change;
+SELECT pgstac_items_outbox_coalesce('smoke');
+SELECT 'done';
+SQL
+    expect "a run sends one notification per operation" "$(head -1 "${tmpdir}/commit.out")" "2"
+    expect "repeated updates coalesce into one entry" \
+        "$(grep 'Asynchronous notification' "${tmpdir}/commit.out" | grep '"UPDATE"' | grep -o '"id": "a"' | wc -l | tr -d ' ')" "1"
+    expect "insert then delete leaves the delete" \
+        "$(grep 'Asynchronous notification' "${tmpdir}/commit.out" | grep '"DELETE"' | grep -c '"id": "b"' || true)" "1"
+    expect "the cursor moves to the last change" "$(cursor_at_end smoke)" "t"
+    expect "a second run sends nothing" "$(sql "SELECT pgstac_items_outbox_coalesce('smoke')")" "0"
+}
+
+coalescer_command() {
+    if command_exists helm && command_exists yq; then
+        ensure_chart_dependencies "$CHART_PATH" || true
+        helm template outbox-smoke "$CHART_PATH" \
+            --set eoapi-notifier.enabled=true \
+            --set eoapi-notifier.coalesce.enabled=true \
+            --set eoapi-notifier.coalesce.windowMs=200 \
+            --set pgstacBootstrap.settings.pgstacSettings.notify_items_delivery=outbox \
+            --show-only templates/database/pgstacbootstrap/notification-coalescer.yaml |
+            yq '.spec.template.spec.containers[0].command[2]'
+    else
+        log_warn "helm or yq not found; running the coalescer loop without rendering the chart"
+        printf '%s\n' "printf '%s\\n' \"SELECT pgstac_items_outbox_coalesce('notifier', 10000) \\watch 0.2\" | psql -v ON_ERROR_STOP=1 -qAt"
+    fi
+}
+
+test_coalescer_deployment() {
+    log_info "Testing the coalescer Deployment's psql loop..."
+
+    local command
+    command=$(coalescer_command)
+    if [[ "$command" != *"\\watch"* ]]; then
+        log_error "Could not render the coalescer command: ${command}"
+        failures=$((failures + 1))
+        return
+    fi
+    log_debug "Coalescer command: ${command}"
+
+    # The listener prints what arrived once its sleep ends
+    printf 'LISTEN pgstac_items_change;\nSELECT pg_sleep(%s);\n' "$((WATCH_SECONDS + 1))" |
+        psql -v ON_ERROR_STOP=1 -qAt >"${tmpdir}/listener.out" &
+    local listener_pid=$!
+    sleep 0.5
+
+    local status=0
+    timeout "$WATCH_SECONDS" sh -c "$command" >/dev/null &
+    local loop_pid=$!
+    sleep 1
+    insert_item watched
+    update_item watched retitled
+    wait "$loop_pid" || status=$?
+    wait "$listener_pid" || true
+
+    # timeout ends the loop with 124; anything else means psql stopped on its own
+    expect "the watch loop runs until stopped" "$status" "124"
+    expect "the watch loop commits the cursor" "$(cursor_at_end notifier)" "t"
+    # The insert and update may fall in one window or two
+    local delivered=no
+    grep 'Asynchronous notification' "${tmpdir}/listener.out" | grep -q '"id": "watched"' && delivered=yes
+    expect "the watch loop sends changes made while it runs" "$delivered" "yes"
+}
+
+main() {
+    check_requirements psql || exit 1
+
+    if ! sql "SELECT pgstac.get_version()" >/dev/null; then
+        log_error "No pgstac database reachable with the libpq environment (PGHOST, PGUSER, ...)"
+        exit 1
+    fi
+
+    install_sql
+    test_maintain
+    test_coalesce
+    test_coalescer_deployment
+
+    if [[ $failures -gt 0 ]]; then
+        log_error "$failures outbox checks failed"
+        exit 1
+    fi
+    log_success "Outbox smoke tests passed"
+}
+
+main "$@"
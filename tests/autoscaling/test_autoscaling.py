@@ -1,11 +1,14 @@
 """Test autoscaling behavior and HPA functionality."""
 
+import asyncio
 import json
+import statistics
 import subprocess
-import threading
 import time
-from typing import Any, Dict, List
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
 
+import httpx
 import pytest
 import requests
 from conftest import (
@@ -16,79 +19,134 @@ from conftest import (
     get_release_name,
     kubectl_get,
 )
+from load.hpa_timeline import HPATimeline, describe_reactions, reaction_metrics
 
 
-def generate_load(
+def _outcome(status: int) -> Tuple[str, Optional[str]]:
+    """Classify a response status as (counter, error detail)"""
+    if status in [200, 201]:
+        return "successful_requests", None
+    if status in [502, 503, 504]:
+        # These are expected during scaling
+        return "scaling_errors", f"HTTP_{status}"
+    return "failed_requests", f"HTTP_{status}"
+
+
+async def _generate_load(
     base_url: str,
-    endpoints: List[str],
-    duration: int = 60,
-    concurrent_requests: int = 5,
-    delay: float = 0.1,
+    rates: Dict[str, float],
+    duration: float,
+    max_connections: int,
+    timeout: float,
 ) -> Dict[str, Any]:
-    """Generate HTTP load against specified endpoints."""
-    end_time = time.time() + duration
-    success_count = 0
-    error_count = 0
-    scaling_errors = 0
-    error_details: dict[str, int] = {}  # Track specific error types
-
-    def worker() -> None:
-        nonlocal success_count, error_count, scaling_errors, error_details
-        while time.time() < end_time:
-            for endpoint in endpoints:
-                url = f"{base_url}{endpoint}"
-                try:
-                    response = requests.get(url, timeout=10)
-                    if response.status_code in [200, 201]:
-                        success_count += 1
-                    elif response.status_code in [502, 503, 504]:
-                        # These are expected during scaling
-                        scaling_errors += 1
-                        error_key = f"HTTP_{response.status_code}"
-                        error_details[error_key] = error_details.get(error_key, 0) + 1
-                    else:
-                        error_count += 1
-                        error_key = f"HTTP_{response.status_code}"
-                        error_details[error_key] = error_details.get(error_key, 0) + 1
-                except requests.Timeout:
-                    scaling_errors += 1
-                    error_details["Timeout"] = error_details.get("Timeout", 0) + 1
-                except requests.ConnectionError:
-                    scaling_errors += 1
-                    error_details["ConnectionError"] = (
-                        error_details.get("ConnectionError", 0) + 1
-                    )
-                except requests.RequestException as e:
-                    scaling_errors += 1
-                    error_key = type(e).__name__
-                    error_details[error_key] = error_details.get(error_key, 0) + 1
-                time.sleep(delay)
-
-    # Start concurrent workers
-    threads = []
-    for _ in range(concurrent_requests):
-        thread = threading.Thread(target=worker)
-        thread.start()
-        threads.append(thread)
-
-    # Wait for all threads to complete
-    for thread in threads:
-        thread.join()
-
-    total = success_count + error_count + scaling_errors
+    """Send each endpoint open-loop at its rate over one pooled client."""
+    # Everything runs on one event loop, so plain counters cannot lose updates
+    counts: Dict[str, Counter] = {endpoint: Counter() for endpoint in rates}
+    error_details: Counter = Counter()
+    latencies: List[float] = []
+    # Seconds each endpoint took to send its schedule; above duration when
+    # the generator could not keep up
+    send_time: Dict[str, float] = {}
+    limits = httpx.Limits(
+        max_connections=max_connections, max_keepalive_connections=max_connections
+    )
+
+    async with httpx.AsyncClient(
+        limits=limits, timeout=httpx.Timeout(timeout, pool=None)
+    ) as client:
+        start = time.perf_counter()
+
+        async def send(endpoint: str, scheduled_at: float) -> None:
+            detail: Optional[str]
+            try:
+                response = await client.get(f"{base_url}{endpoint}")
+                counter, detail = _outcome(response.status_code)
+            except httpx.TimeoutException:
+                counter, detail = "scaling_errors", "Timeout"
+            except httpx.TransportError:
+                counter, detail = "scaling_errors", "ConnectionError"
+            except httpx.HTTPError as e:
+                counter, detail = "scaling_errors", type(e).__name__
+            # Measured from the intended send time, so queueing shows as latency
+            latencies.append((time.perf_counter() - scheduled_at) * 1000)
+            counts[endpoint][counter] += 1
+            if detail:
+                error_details[detail] += 1
+
+        async def schedule(endpoint: str, rate: float) -> None:
+            in_flight: Set[asyncio.Task] = set()
+            for i in range(int(duration * rate)):
+                scheduled_at = start + i / rate
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(send(endpoint, scheduled_at))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            send_time[endpoint] = max(duration, time.perf_counter() - start)
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+        await asyncio.gather(*(schedule(e, rate) for e, rate in rates.items()))
+
+    totals: Counter = sum(counts.values(), Counter())
+    total = sum(totals.values())
     # Calculate success rate treating scaling errors as partial failures (50% weight)
-    effective_success = success_count + (scaling_errors * 0.5)
+    effective_success = totals["successful_requests"] + totals["scaling_errors"] * 0.5
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
 
     return {
         "total_requests": total,
-        "successful_requests": success_count,
-        "failed_requests": error_count,
-        "scaling_errors": scaling_errors,
-        "error_details": error_details,
+        "successful_requests": totals["successful_requests"],
+        "failed_requests": totals["failed_requests"],
+        "scaling_errors": totals["scaling_errors"],
+        "error_details": dict(error_details),
         "success_rate": effective_success / total if total > 0 else 0,
+        "target_rate": sum(rates.values()),
+        "achieved_rate": total / max(send_time.values(), default=duration),
+        "latency_p50_ms": quantiles[49] if quantiles else None,
+        "latency_p95_ms": quantiles[94] if quantiles else None,
+        "endpoints": {
+            endpoint: {
+                "target_rate": rates[endpoint],
+                "achieved_rate": sum(counts[endpoint].values()) / send_time[endpoint],
+                **counts[endpoint],
+            }
+            for endpoint in rates
+        },
     }
 
 
+def generate_load(
+    base_url: str,
+    rates: Dict[str, float],
+    duration: int = 60,
+    max_connections: int = 100,
+    timeout: float = 10,
+) -> Dict[str, Any]:
+    """Generate HTTP load holding a fixed request rate against each endpoint.
+
+    Requests are sent on a schedule whether or not earlier ones have
+    completed, over one pooled keep-alive client, so the offered load stays
+    at the stated req/s while pods scale and responses slow down.
+
+    Args:
+        base_url: Base URL of the eoAPI ingress
+        rates: Endpoint -> requests per second
+        duration: Seconds to send for
+        max_connections: Connection pool size shared by all endpoints
+        timeout: Request timeout in seconds
+
+    Returns:
+        Dict with request counts, error breakdown, effective success rate,
+        target and achieved send rates overall and per endpoint, and p50/p95
+        latency in milliseconds
+    """
+    return asyncio.run(
+        _generate_load(base_url, rates, duration, max_connections, timeout)
+    )
+
+
 class TestHPAConfiguration:
     def test_hpa_resources_properly_configured(self) -> None:
         namespace = get_namespace()
@@ -314,13 +372,15 @@ class TestScalingBehavior:
         base_url = get_base_url()
 
         # Test endpoints that should generate CPU load
-        # Use simple GET endpoints that are guaranteed to work
-        load_endpoints = [
-            "/stac/collections",
-            "/stac",
-            "/raster/",
-            "/vector/collections",
-        ]
+        # Use simple GET endpoints that are guaranteed to work. Each service
+        # gets 120 req/s, above the default requestRate target of 100000m
+        # (100 req/s per pod), so a single pod has to scale out.
+        load_rates = {
+            "/stac/collections": 60.0,
+            "/stac": 60.0,
+            "/raster/": 120.0,
+            "/vector/collections": 120.0,
+        }
 
         # Check initial state
         initial_pod_counts: Dict[str, int] = {}
@@ -339,22 +399,24 @@ class TestScalingBehavior:
         except requests.RequestException:
             pytest.skip("API endpoints not accessible for load testing")
 
-        # Generate moderate load for limited time (suitable for CI)
+        # Generate load for limited time (suitable for CI)
         load_duration = 90  # 1.5 minutes
-        concurrent_requests = 8
 
         print(
-            f"Generating load: {concurrent_requests} concurrent requests for {load_duration}s"
+            f"Generating load: {sum(load_rates.values()):g} req/s for {load_duration}s"
         )
 
+        # Record HPA, Deployment and pod changes while the load runs
+        timeline = HPATimeline(namespace).start()
+        load_start = time.time()
+
         # Start load generation
         load_stats = generate_load(
             base_url=base_url,
-            endpoints=load_endpoints,
+            rates=load_rates,
             duration=load_duration,
-            concurrent_requests=concurrent_requests,
-            delay=0.05,  # 20 requests/second per worker
         )
+        load_end = time.time()
 
         print(f"Load test completed: {load_stats}")
         if load_stats.get("scaling_errors", 0) > 0:
@@ -375,6 +437,14 @@ class TestScalingBehavior:
 
         print(f"Final pod counts: {final_pod_counts}")
 
+        events = timeline.stop()
+        reactions: Dict[str, Dict] = {}
+        if any(event["kind"] == "hpa" for event in events):
+            reactions = reaction_metrics(events, load_start, load_end)
+            print("HPA reaction:")
+            for line in describe_reactions(reactions):
+                print(f"  {line}")
+
         # Check HPA metrics after load
         result = kubectl_get("hpa", namespace=namespace)
         if result.returncode == 0:
@@ -406,6 +476,17 @@ class TestScalingBehavior:
         assert (
             load_stats["total_requests"] > 100
         ), "Load test generated insufficient requests"
+        # Slow responses must not throttle the offered load
+        assert load_stats["achieved_rate"] > 0.8 * load_stats["target_rate"], (
+            f"Load generator fell behind: {load_stats['achieved_rate']:.0f} of "
+            f"{load_stats['target_rate']:.0f} req/s"
+        )
+
+        # Scaling back down inside the scaleDown stabilization window means the
+        # HPA behavior is not being applied
+        for hpa_name, reaction in reactions.items():
+            early = [n for n in reaction["notes"] if "scaleDown stabilization" in n]
+            assert not early, f"HPA {hpa_name} {early[0]}"
 
         # Note: In CI environments with limited resources, actual scaling may not occur
         # The important thing is that the system handled the load successfully
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Unit tests for bulk ingestion streaming, binning and checkpoints
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "lib")
+)
+
+import bulk_ingest  # noqa: E402
+from bulk_ingest import (  # noqa: E402
+    BulkIngester,
+    Checkpoint,
+    SegmentTracker,
+    partition_key,
+    read_items,
+)
+
+
+def make_item(item_id, collection="c1", datetime="2024-03-05T10:00:00Z"):
+    return {
+        "type": "Feature",
+        "id": item_id,
+        "collection": collection,
+        "properties": {"datetime": datetime},
+    }
+
+
+@pytest.fixture
+def ndjson(tmp_path):
+    path = tmp_path / "items.ndjson"
+    lines = [json.dumps(make_item(f"item-{i}")) for i in range(5)]
+    path.write_text("\n".join(lines[:3]) + "\n\n" + "\n".join(lines[3:]) + "\n")
+    return str(path)
+
+
+class TestPartitionKey:
+    """Items bin by collection and the collection's partition_trunc"""
+
+    def test_truncation(self):
+        truncs = {"none": None, "yearly": "year", "monthly": "month"}
+        assert partition_key(make_item("a", "none"), truncs) == ("none", "")
+        assert partition_key(make_item("a", "yearly"), truncs) == ("yearly", "2024")
+        assert partition_key(make_item("a", "monthly"), truncs) == (
+            "monthly",
+            "2024-03",
+        )
+
+    def test_start_datetime(self):
+        item = make_item("a", "monthly", datetime=None)
+        item["properties"]["start_datetime"] = "2023-12-31T00:00:00Z"
+        assert partition_key(item, {"monthly": "month"}) == ("monthly", "2023-12")
+
+    def test_unknown_collection(self):
+        with pytest.raises(ValueError, match="unknown collection"):
+            partition_key(make_item("a", "missing"), {"c1": None})
+
+
+class TestReadItems:
+    """NDJSON streams with byte positions that resume mid-file"""
+
+    def test_stream_and_resume(self, ndjson):
+        rows = list(read_items(ndjson))
+        assert [item["id"] for _, _, item in rows] == [f"item-{i}" for i in range(5)]
+        assert json.loads(rows[0][1]) == rows[0][2]
+        assert rows[-1][0] == os.path.getsize(ndjson)
+
+        resumed = list(read_items(ndjson, rows[2][0]))
+        assert [item["id"] for _, _, item in resumed] == ["item-3", "item-4"]
+
+
+class TestCheckpoint:
+    """Positions persist across runs unless restarted"""
+
+    def test_save_and_load(self, tmp_path, ndjson):
+        path = str(tmp_path / "checkpoint.json")
+        checkpoint = Checkpoint(path)
+        checkpoint.advance(ndjson, 120, rows=3)
+        checkpoint.advance(ndjson, 200, rows=2, done=True)
+        assert not os.path.exists(f"{path}.tmp")
+
+        loaded = Checkpoint(path)
+        assert loaded.position(ndjson) == 200
+        assert loaded.done(ndjson)
+        assert loaded.files[os.path.abspath(ndjson)]["rows"] == 5
+        assert Checkpoint(path, restart=True).position(ndjson) == 0
+
+
+class TestSegmentTracker:
+    """The checkpoint only passes segments loaded in order"""
+
+    def test_out_of_order_completion(self):
+        checkpoint = Checkpoint()
+        tracker = SegmentTracker(checkpoint)
+        first, second = tracker.open("a"), tracker.open("a")
+        for segment, end in ((first, 100), (second, 200)):
+            segment.rows = 10
+            tracker.dispatched(segment)
+            tracker.seal(segment, end, last=segment is second)
+
+        tracker.loaded(second)
+        assert checkpoint.position("a") == 0
+
+        tracker.loaded(first)
+        assert checkpoint.position("a") == 200
+        assert checkpoint.done("a")
+        assert checkpoint.files[os.path.abspath("a")]["rows"] == 20
+
+    def test_unsealed_segment_holds_position(self):
+        checkpoint = Checkpoint()
+        tracker = SegmentTracker(checkpoint)
+        segment = tracker.open("a")
+        tracker.dispatched(segment)
+        tracker.loaded(segment)
+        assert checkpoint.position("a") == 0
+
+        tracker.seal(segment, 50)
+        assert checkpoint.position("a") == 50
+        assert not checkpoint.done("a")
+
+
+class FakeDatabase:
+    """Stands in for pgstac: commits COPYed rows, fails on a poisoned item"""
+
+    def __init__(self, poison=None, delay=0.0):
+        self.poison = poison
+        self.delay = delay
+        self.committed = []
+        self.connections = 0
+        self.closed = 0
+        self._lock = threading.Lock()
+
+    def connect(self, dsn):
+        with self._lock:
+            self.connections += 1
+        return FakeConnection(self)
+
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+        self.pending = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # Uncommitted rows roll back with the connection
+        self.pending = []
+        with self.db._lock:
+            self.db.closed += 1
+
+    def execute(self, query, params=None):
+        return SimpleNamespace(fetchall=lambda: [("c1", None), ("c2", None)])
+
+    @contextmanager
+    def cursor(self):
+        yield self
+
+    @contextmanager
+    def copy(self, statement):
+        rows = []
+        yield SimpleNamespace(write_row=lambda row: rows.append(row[0]))
+        time.sleep(self.db.delay)
+        ids = [json.loads(row)["id"] for row in rows]
+        if self.db.poison in ids:
+            raise RuntimeError(f"cannot load {self.db.poison}")
+        self.pending.extend(ids)
+
+    def commit(self):
+        with self.db._lock:
+            self.db.committed.extend(self.pending)
+        self.pending = []
+
+
+@pytest.fixture
+def items(tmp_path):
+    """NDJSON file alternating between two collections (two loaders)"""
+    path = tmp_path / "items.ndjson"
+    with open(path, "w") as f:
+        for i in range(400):
+            f.write(json.dumps(make_item(f"item-{i}", "c1" if i % 2 else "c2")) + "\n")
+    return str(path)
+
+
+def line_end(path, lines):
+    """Byte offset after the first lines of a file"""
+    with open(path, "rb") as f:
+        return sum(len(f.readline()) for _ in range(lines))
+
+
+def ingester(monkeypatch, db, checkpoint, **kwargs):
+    monkeypatch.setattr(bulk_ingest, "psycopg", db, raising=False)
+    monkeypatch.setattr(bulk_ingest, "PSYCOPG_AVAILABLE", True)
+    options = {"workers": 2, "chunk_rows": 5, "segment_rows": 10}
+    return BulkIngester("", checkpoint=checkpoint, **{**options, **kwargs})
+
+
+class TestRun:
+    """Loaders commit chunks in parallel; the checkpoint only covers commits"""
+
+    def test_loads_every_item_once(self, monkeypatch, tmp_path, items):
+        db = FakeDatabase()
+        path = str(tmp_path / "checkpoint.json")
+        summary = ingester(monkeypatch, db, Checkpoint(path)).run([items])
+
+        assert summary["rows"] == 400
+        assert sorted(db.committed) == sorted(f"item-{i}" for i in range(400))
+        assert db.connections == 3  # partition lookup and two loaders
+        loaded = Checkpoint(path)
+        assert loaded.done(items)
+        assert loaded.position(items) == os.path.getsize(items)
+
+        rerun = FakeDatabase()
+        assert ingester(monkeypatch, rerun, Checkpoint(path)).run([items])["rows"] == 0
+        assert rerun.committed == []
+
+    def test_resumes_at_checkpoint(self, monkeypatch, tmp_path, items):
+        path = str(tmp_path / "checkpoint.json")
+        Checkpoint(path).advance(items, line_end(items, 300), rows=300)
+
+        db = FakeDatabase()
+        ingester(monkeypatch, db, Checkpoint(path)).run([items])
+        assert sorted(db.committed) == sorted(f"item-{i}" for i in range(300, 400))
+
+    def test_failed_loader_stops_the_run(self, monkeypatch, tmp_path, items):
+        # item-25 is in the third segment (items 20-29) and fails its chunk
+        db = FakeDatabase(poison="item-25", delay=0.01)
+        path = str(tmp_path / "checkpoint.json")
+        with pytest.raises(RuntimeError, match="A loader failed") as failure:
+            ingester(monkeypatch, db, Checkpoint(path)).run([items])
+
+        assert "cannot load item-25" in str(failure.value.__cause__)
+        # Both loaders ended and the reader stopped long before the end
+        assert db.closed == db.connections
+        assert "item-25" not in db.committed
+        assert len(db.committed) < 200
+
+        saved = Checkpoint(path)
+        position = saved.position(items)
+        assert not saved.done(items)
+        assert position <= line_end(items, 20)
+        # Everything before the checkpoint was committed
+        before = [i for i in range(400) if line_end(items, i + 1) <= position]
+        assert set(f"item-{i}" for i in before) <= set(db.committed)
+
+    def test_insert_cannot_resume(self, monkeypatch, tmp_path):
+        checkpoint = Checkpoint(str(tmp_path / "checkpoint.json"))
+        with pytest.raises(ValueError, match="insert cannot resume"):
+            ingester(monkeypatch, FakeDatabase(), checkpoint, method="insert")
+        ingester(monkeypatch, FakeDatabase(), Checkpoint(), method="insert")
@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Asyncio Load Engine
+
+Optional httpx-based engine for LoadTester. Keeps thousands of requests in
+flight from a single process by multiplexing them over a bounded pool of
+HTTP/2 connections instead of one blocking thread per request.
+"""
+
+import asyncio
+import logging
+import math
+import ssl
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from .histogram import DEFAULT_SIGNIFICANT_DIGITS
+from .recorder import NO_RESPONSE, RequestRecorder
+from .search import LevelDeadline
+
+logger = logging.getLogger(__name__)
+# httpx logs every request at INFO, which floods output and costs throughput
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+# httpcore scans every pooled connection on each request assignment, so one
+# large pool becomes CPU-bound well before the network does. Sharding the
+# pool across several small clients keeps that scan short.
+CONNECTIONS_PER_CLIENT = 4
+# Concurrent streams allowed per HTTP/2 connection before requests queue
+# client-side (servers commonly advertise 100-128)
+H2_STREAMS_PER_CONNECTION = 100
+
+
+@dataclass
+class ClientShard:
+    """One small client plus a gate that keeps its pool queue short"""
+
+    client: httpx.AsyncClient
+    slots: asyncio.Semaphore
+
+
+def status_of(response: Optional[httpx.Response]) -> int:
+    """Status to record for a request() response, NO_RESPONSE if it failed"""
+    return response.status_code if response is not None else NO_RESPONSE
+
+
+class AsyncLoadEngine:
+    """Asyncio request engine backed by sharded, pooled httpx.AsyncClients"""
+
+    def __init__(
+        self,
+        timeout: int,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        http2: bool = True,
+        histogram_digits: int = DEFAULT_SIGNIFICANT_DIGITS,
+    ):
+        """
+        Initialize the async engine
+
+        Args:
+            timeout: Request timeout in seconds
+            max_connections: Upper bound on open connections in the pool
+            http2: Negotiate HTTP/2 when the server supports it
+            histogram_digits: Significant digits kept by latency histograms
+
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        if not isinstance(max_connections, int) or max_connections <= 0:
+            raise ValueError(
+                f"max_connections must be a positive integer: {max_connections}"
+            )
+
+        if http2 and not HTTP2_AVAILABLE:
+            logger.warning("h2 package not installed, falling back to HTTP/1.1")
+            http2 = False
+
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.http2 = http2
+        self.histogram_digits = histogram_digits
+
+    def _create_client(
+        self, max_connections: int, ssl_context: ssl.SSLContext
+    ) -> httpx.AsyncClient:
+        """Create an AsyncClient with a bounded connection pool"""
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(
+            http2=self.http2,
+            limits=limits,
+            timeout=httpx.Timeout(self.timeout, pool=None),
+            verify=ssl_context,
+        )
+
+    async def open_shards(self, stack: AsyncExitStack, url: str) -> List[ClientShard]:
+        """Open enough small clients to cover max_connections in total"""
+        shards = math.ceil(self.max_connections / CONNECTIONS_PER_CLIENT)
+        per_client = math.ceil(self.max_connections / shards)
+
+        # Plain http:// is always HTTP/1.1 (no h2c), so one request per connection
+        multiplexed = self.http2 and url.startswith("https://")
+        slots = per_client * (H2_STREAMS_PER_CONNECTION if multiplexed else 1)
+
+        # Loading the CA bundle is slow, so every shard shares one context
+        ssl_context = httpx.create_ssl_context(http2=self.http2)
+        return [
+            ClientShard(
+                client=await stack.enter_async_context(
+                    self._create_client(per_client, ssl_context)
+                ),
+                slots=asyncio.Semaphore(slots),
+            )
+            for _ in range(shards)
+        ]
+
+    async def _send(
+        self, shard: ClientShard, url: str, scheduled_at: Optional[float] = None
+    ) -> Tuple[int, float]:
+        """Wait for a free slot on shard, then make the request"""
+        async with shard.slots:
+            return await self.fetch(shard.client, url, scheduled_at)
+
+    async def request(
+        self,
+        shard: ClientShard,
+        method: str,
+        url: str,
+        json: Any = None,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        content: Optional[str] = None,
+        scheduled_at: Optional[float] = None,
+    ) -> Tuple[Optional[httpx.Response], float]:
+        """
+        Send an arbitrary request through a shard and return the response
+
+        Args:
+            shard: Client shard to send through
+            method: HTTP method
+            url: URL to request
+            json: Optional JSON body
+            params: Optional query parameters
+            headers: Optional request headers
+            content: Optional raw body, used instead of json
+            scheduled_at: Optional time.perf_counter() the request was
+                scheduled for; latency is measured from it when given
+
+        Returns:
+            Tuple of (response, latency_ms); response is None if the request
+            failed before a response arrived
+        """
+        async with shard.slots:
+            start_time = (
+                scheduled_at if scheduled_at is not None else time.perf_counter()
+            )
+            try:
+                response = await shard.client.request(
+                    method,
+                    url,
+                    json=json,
+                    params=params,
+                    headers=headers,
+                    content=content,
+                )
+                return response, (time.perf_counter() - start_time) * 1000
+            except httpx.TimeoutException:
+                logger.debug(f"{method} {url} timed out after {self.timeout}s")
+            except httpx.TransportError as e:
+                logger.debug(f"Connection error for {method} {url}: {e}")
+            except Exception as e:
+                logger.error(f"Unexpected error in request for {method} {url}: {e}")
+            return None, (time.perf_counter() - start_time) * 1000
+
+    async def make_request(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        scheduled_at: Optional[float] = None,
+    ) -> Tuple[bool, float]:
+        """
+        Make a single request and return success status with latency
+
+        Args:
+            client: Shared AsyncClient
+            url: URL to request
+            scheduled_at: Optional time.perf_counter() the request was
+                scheduled for; latency is measured from it when given
+
+        Returns:
+            Tuple of (success, latency_ms) where success is True if 200 status
+        """
+        status, latency_ms = await self.fetch(client, url, scheduled_at)
+        return status == 200, latency_ms
+
+    async def fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        scheduled_at: Optional[float] = None,
+    ) -> Tuple[int, float]:
+        """
+        Make a single GET request and return its status with latency
+
+        Args:
+            client: Shared AsyncClient
+            url: URL to request
+            scheduled_at: Optional time.perf_counter() the request was
+                scheduled for; latency is measured from it when given
+
+        Returns:
+            Tuple of (status, latency_ms); status is NO_RESPONSE if the
+            request failed without a response
+        """
+        start_time = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            response = await client.get(url)
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            if response.status_code != 200:
+                logger.debug(f"Request to {url} returned status {response.status_code}")
+            return response.status_code, latency_ms
+        except httpx.TimeoutException:
+            logger.debug(f"Request to {url} timed out after {self.timeout}s")
+        except httpx.TransportError as e:
+            logger.debug(f"Connection error for {url}: {e}")
+        except Exception as e:
+            logger.error(f"Unexpected error in make_request for {url}: {e}")
+        return NO_RESPONSE, (time.perf_counter() - start_time) * 1000
+
+    async def _run_concurrency_level(
+        self, url: str, workers: int, deadline: LevelDeadline
+    ) -> RequestRecorder:
+        """Run `workers` request loops against url until the deadline"""
+        recorder = RequestRecorder(self.histogram_digits)
+
+        async with AsyncExitStack() as stack:
+            shards = await self.open_shards(stack, url)
+            start_time = time.perf_counter()
+            deadline.start(start_time)
+
+            async def worker(shard: ClientShard) -> None:
+                while not deadline.reached(time.perf_counter(), recorder):
+                    status, latency_ms = await self._send(shard, url)
+                    recorder.record(status == 200, latency_ms, status=status)
+
+            await asyncio.gather(
+                *(worker(shards[i % len(shards)]) for i in range(workers))
+            )
+
+        recorder.duration = time.perf_counter() - start_time
+        return recorder
+
+    def run_concurrency_level(
+        self,
+        url: str,
+        workers: int,
+        duration: float,
+        deadline: Optional[LevelDeadline] = None,
+    ) -> RequestRecorder:
+        """
+        Keep `workers` requests in flight against url for duration seconds
+
+        Args:
+            url: URL to test
+            workers: Number of concurrent in-flight requests
+            duration: Test duration in seconds
+            deadline: Optional deadline that extends the level past duration
+                on the same clients
+
+        Returns:
+            RequestRecorder with counters, latency histogram and duration
+        """
+        return asyncio.run(
+            self._run_concurrency_level(
+                url, workers, deadline or LevelDeadline(duration)
+            )
+        )
+
+    async def _run_constant_rate(
+        self, url: str, rate: float, deadline: LevelDeadline
+    ) -> RequestRecorder:
+        """Fire requests on a fixed schedule regardless of response times"""
+        recorder = RequestRecorder(self.histogram_digits)
+        interval = 1.0 / rate
+
+        async with AsyncExitStack() as stack:
+            shards = await self.open_shards(stack, url)
+            in_flight: Set[asyncio.Task] = set()
+            start_time = time.perf_counter()
+            deadline.start(start_time)
+
+            async def fire(shard: ClientShard, scheduled_at: float) -> None:
+                status, latency_ms = await self._send(shard, url, scheduled_at)
+                recorder.record(status == 200, latency_ms, status=status)
+
+            i = 0
+            while not deadline.reached(start_time + i * interval, recorder):
+                scheduled_at = start_time + i * interval
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Requests that fall behind schedule are sent immediately but
+                # keep their intended send time, so queueing shows as latency
+                task = asyncio.create_task(fire(shards[i % len(shards)], scheduled_at))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                i += 1
+
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+        recorder.duration = time.perf_counter() - start_time
+        return recorder
+
+    def run_constant_rate(
+        self,
+        url: str,
+        rate: float,
+        duration: float,
+        deadline: Optional[LevelDeadline] = None,
+    ) -> RequestRecorder:
+        """
+        Send requests open-loop at a fixed arrival rate for duration seconds
+
+        Args:
+            url: URL to test
+            rate: Target arrival rate in requests per second
+            duration: Test duration in seconds
+            deadline: Optional deadline that extends the level past duration
+                on the same schedule
+
+        Returns:
+            RequestRecorder with counters, latency histogram and duration
+        """
+        return asyncio.run(
+            self._run_constant_rate(url, rate, deadline or LevelDeadline(duration))
+        )
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+Capacity Model and Replica Planner
+
+Fits the Universal Scalability Law (USL) to the throughput stress tests
+sustained within a p95 SLO at several replica counts of one service, and
+turns the fit into chart settings: the minReplicas/maxReplicas that carry a
+base and a peak request rate, a WEB_CONCURRENCY of one async worker per CPU
+of a pod, and the DB_MAX_CONN_SIZE that covers the requests holding a
+database connection at once (Little's law, in-flight requests × the share of
+their time spent in the database) spread over those workers, without the
+service's ceiling, maxReplicas × WEB_CONCURRENCY × pools × DB_MAX_CONN_SIZE,
+exceeding its connection budget (see docs/autoscaling.md).
+"""
+
+import itertools
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import yaml
+
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+from .hpa_timeline import parse_quantity
+from .results_store import DEFAULT_CHART_DIR, load_values
+
+SERVICES = ("raster", "stac", "vector", "multidim")
+DEFAULT_HEADROOM = 0.2
+DEFAULT_SUCCESS_THRESHOLD = 95.0
+# Connections the planned service may open: 80% of a default PostgreSQL's
+# max_connections = 100, never budget to 100%
+DEFAULT_DB_CONNECTIONS = 80
+MAX_PLANNED_REPLICAS = 50
+MAX_WEB_CONCURRENCY = 16
+# Share of a request's latency spent holding a database connection
+DEFAULT_DB_TIME_FRACTION = 0.5
+
+
+@dataclass(frozen=True)
+class CurvePoint:
+    """One stress level: offered load and what it achieved"""
+
+    level: float
+    throughput: float
+    latency_p95: float
+    latency_avg: float
+    success_rate: float
+
+
+@dataclass(frozen=True)
+class USLModel:
+    """
+    Universal Scalability Law: X(N) = λN / (1 + σ(N - 1) + κN(N - 1))
+
+    λ is the throughput of one unit, σ the contention (serialized share)
+    and κ the coherency cost that makes throughput fall past a peak.
+    """
+
+    lam: float
+    sigma: float = 0.0
+    kappa: float = 0.0
+
+    def throughput(self, n: float) -> float:
+        return self.lam * n / (1 + self.sigma * (n - 1) + self.kappa * n * (n - 1))
+
+    @property
+    def peak(self) -> float:
+        """Unit count of the highest throughput (inf without coherency cost)"""
+        if self.kappa <= 0:
+            return math.inf
+        return math.sqrt(max(1 - self.sigma, 0.0) / self.kappa)
+
+
+def fit_usl(units: Sequence[float], throughput: Sequence[float]) -> USLModel:
+    """
+    Least-squares USL fit with non-negative σ and κ
+
+    Uses the linear form N/X = 1/λ + (σ/λ)(N - 1) + (κ/λ)N(N - 1). Only as
+    many parameters as there are distinct unit counts are fitted: one count
+    gives linear scaling, two add contention (Amdahl's law), three or more
+    add coherency.
+
+    Args:
+        units: Unit counts, e.g. replicas
+        throughput: Throughput at each count
+
+    Returns:
+        USLModel
+
+    Raises:
+        ValueError: Without a positive throughput sample
+    """
+    n = np.asarray(units, dtype=float)
+    x = np.asarray(throughput, dtype=float)
+    keep = (n > 0) & (x > 0)
+    n, x = n[keep], x[keep]
+    if not len(n):
+        raise ValueError("USL fit needs at least one positive throughput sample")
+
+    y = n / x
+    columns = {"sigma": n - 1, "kappa": n * (n - 1)}
+    distinct = len(np.unique(n))
+    best: Optional[Tuple[float, Dict[str, float]]] = None
+    # Every subset of the shape parameters the data supports, keeping the
+    # best fit whose coefficients are all non-negative
+    for size in range(min(distinct - 1, 2) + 1):
+        for names in itertools.combinations(columns, size):
+            design = np.column_stack([np.ones_like(n)] + [columns[k] for k in names])
+            coef, *_ = np.linalg.lstsq(design, y, rcond=None)
+            if coef[0] <= 0 or (coef[1:] < 0).any():
+                continue
+            residual = float(((design @ coef - y) ** 2).sum())
+            if best is None or residual < best[0] - 1e-12:
+                best = (residual, {"a": coef[0], **dict(zip(names, coef[1:]))})
+    if best is None:
+        # Throughput fell with every added unit; treat the best as the limit
+        return USLModel(lam=float(x.max()))
+    params = best[1]
+    lam = 1 / params["a"]
+    return USLModel(
+        lam=float(lam),
+        sigma=float(params.get("sigma", 0.0) * lam),
+        kappa=float(params.get("kappa", 0.0) * lam),
+    )
+
+
+def stress_curve(report: Dict) -> List[CurvePoint]:
+    """
+    Levels of a stress report ordered by offered load
+
+    Args:
+        report: Stress report as exported with --report-json
+
+    Returns:
+        One CurvePoint per level with throughput
+    """
+    points = []
+    for level, metrics in (report.get("metrics") or {}).items():
+        if not isinstance(metrics, dict) or "throughput" not in metrics:
+            continue
+        points.append(
+            CurvePoint(
+                level=float(level),
+                throughput=float(metrics["throughput"]),
+                latency_p95=float(metrics.get("latency_p95", 0.0)),
+                latency_avg=float(metrics.get("latency_avg", 0.0)),
+                success_rate=float(metrics.get("success_rate", 0.0)),
+            )
+        )
+    return sorted(points, key=lambda point: point.level)
+
+
+def sustained_point(
+    points: List[CurvePoint],
+    p95_slo: float,
+    success_threshold: float = DEFAULT_SUCCESS_THRESHOLD,
+) -> Optional[CurvePoint]:
+    """Highest-throughput level that met the p95 SLO and success threshold"""
+    within = [
+        point
+        for point in points
+        if point.latency_p95 <= p95_slo and point.success_rate >= success_threshold
+    ]
+    return max(within, key=lambda point: point.throughput, default=None)
+
+
+def load_stress_runs(specs: List[str]) -> Dict[int, Dict]:
+    """
+    Read stress reports keyed by the replica count they ran at
+
+    Args:
+        specs: "REPLICAS=FILE", or FILE for reports of `stress --replicas`
+
+    Returns:
+        Dict of replicas -> report
+
+    Raises:
+        ValueError: If a replica count is missing or given twice
+    """
+    runs: Dict[int, Dict] = {}
+    for spec in specs:
+        count, sep, path = spec.partition("=")
+        if not sep:
+            count, path = "", spec
+        report = json.loads(Path(path).read_text())
+        replicas = int(count) if count else report.get("replicas")
+        if not replicas or int(replicas) < 1:
+            raise ValueError(
+                f"{path}: replica count unknown; pass it as REPLICAS={path} or "
+                "run stress with --replicas"
+            )
+        if int(replicas) in runs:
+            raise ValueError(f"Two stress reports for {replicas} replicas")
+        runs[int(replicas)] = report
+    return runs
+
+
+def service_of(endpoint: str) -> Optional[str]:
+    """Chart service an endpoint is routed to, e.g. /raster/... -> raster"""
+    first = endpoint.strip("/").split("/", 1)[0]
+    return first if first in SERVICES else None
+
+
+@dataclass(frozen=True)
+class ServiceSettings:
+    """A service's current autoscaling and worker settings in values.yaml"""
+
+    min_replicas: Optional[int] = None
+    max_replicas: Optional[int] = None
+    web_concurrency: Optional[int] = None
+    db_max_conn_size: Optional[int] = None
+    pools: int = 1
+    cpu: Optional[float] = None
+
+    @classmethod
+    def from_values(cls, values: Dict, service: str) -> "ServiceSettings":
+        """
+        Read a service's settings from chart values
+
+        Args:
+            values: Merged chart values
+            service: Service key, e.g. raster
+
+        Returns:
+            ServiceSettings (fields None where unset)
+        """
+        section = values.get(service) or {}
+        autoscaling = section.get("autoscaling") or {}
+        settings = section.get("settings") or {}
+        env = settings.get("envVars") or {}
+        resources = settings.get("resources") or {}
+
+        def number(value) -> Optional[int]:
+            return int(value) if value is not None and str(value).isdigit() else None
+
+        def cores(value) -> Optional[float]:
+            try:
+                return parse_quantity(value) if value is not None else None
+            except ValueError:
+                return None
+
+        # Workers are sized to the CPU a pod is guaranteed, else its limit
+        cpu = cores((resources.get("requests") or {}).get("cpu")) or cores(
+            (resources.get("limits") or {}).get("cpu")
+        )
+
+        # stac-fastapi-pgstac opens separate read and write pools with
+        # transactions enabled
+        transactions = str(env.get("ENABLE_TRANSACTIONS_EXTENSIONS", "")).lower()
+        return cls(
+            min_replicas=number(autoscaling.get("minReplicas")),
+            max_replicas=number(autoscaling.get("maxReplicas")),
+            web_concurrency=number(env.get("WEB_CONCURRENCY")),
+            db_max_conn_size=number(env.get("DB_MAX_CONN_SIZE")),
+            pools=2 if service == "stac" and transactions == "true" else 1,
+            cpu=cpu,
+        )
+
+    @classmethod
+    def from_chart(
+        cls,
+        service: str,
+        chart_dir: Path = DEFAULT_CHART_DIR,
+        values_files: Optional[List[str]] = None,
+    ) -> "ServiceSettings":
+        """Read a service's settings from a chart and its values overrides"""
+        return cls.from_values(load_values(chart_dir, values_files), service)
+
+
+@dataclass
+class CapacityPlan:
+    """Recommended settings for one service and the model behind them"""
+
+    service: str
+    target_rps: float
+    p95_slo: float
+    model: USLModel
+    sustained: Dict[int, float]
+    min_replicas: int
+    max_replicas: int
+    web_concurrency: int
+    db_max_conn_size: int
+    pools: int
+    in_flight_per_pod: float
+    db_in_flight_per_pod: float
+    current: ServiceSettings = field(default_factory=ServiceSettings)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def capacity(self) -> float:
+        """Modelled req/s within the SLO at maxReplicas"""
+        return self.model.throughput(self.max_replicas)
+
+    @property
+    def connections(self) -> int:
+        """Worst-case database connections at maxReplicas"""
+        return (
+            self.max_replicas
+            * self.web_concurrency
+            * self.pools
+            * self.db_max_conn_size
+        )
+
+    def values(self) -> Dict:
+        """The recommendation as a values.yaml override"""
+        return {
+            self.service: {
+                "autoscaling": {
+                    "minReplicas": self.min_replicas,
+                    "maxReplicas": self.max_replicas,
+                },
+                "settings": {
+                    "envVars": {
+                        "WEB_CONCURRENCY": str(self.web_concurrency),
+                        "DB_MAX_CONN_SIZE": str(self.db_max_conn_size),
+                    }
+                },
+            }
+        }
+
+    def values_yaml(self) -> str:
+        """values() for `helm -f` (JSON, which Helm also reads, without PyYAML)"""
+        if YAML_AVAILABLE:
+            return yaml.safe_dump(self.values(), sort_keys=False)
+        return json.dumps(self.values(), indent=2)
+
+
+def _replicas_for(model: USLModel, rate: float) -> Optional[int]:
+    """Fewest replicas the model says carry rate, None if none do"""
+    for replicas in range(1, MAX_PLANNED_REPLICAS + 1):
+        if model.throughput(replicas) >= rate:
+            return replicas
+    return None
+
+
+def plan_capacity(
+    runs: Dict[int, Dict],
+    target_rps: float,
+    p95_slo: float,
+    service: str,
+    base_rps: Optional[float] = None,
+    headroom: float = DEFAULT_HEADROOM,
+    success_threshold: float = DEFAULT_SUCCESS_THRESHOLD,
+    db_connections: int = DEFAULT_DB_CONNECTIONS,
+    current: Optional[ServiceSettings] = None,
+    cpu_per_pod: Optional[float] = None,
+    db_time_fraction: float = DEFAULT_DB_TIME_FRACTION,
+) -> CapacityPlan:
+    """
+    Recommend replicas, workers and pool size for a target load
+
+    Args:
+        runs: Stress reports keyed by the replica count they ran at
+        target_rps: Peak request rate the service must carry
+        p95_slo: p95 latency (ms) each level must stay within
+        service: Chart service the runs exercised
+        base_rps: Steady request rate minReplicas must carry (default: half
+            of target_rps)
+        headroom: Spare capacity on top of each rate, e.g. 0.2 for 20%
+        success_threshold: Minimum success rate (%) of a level
+        db_connections: Connections this service may open at maxReplicas
+        current: Current settings (pools and CPU come from here)
+        cpu_per_pod: CPUs of a pod (default: the current CPU request or
+            limit, else 1)
+        db_time_fraction: Share of a request's latency spent holding a
+            database connection
+
+    Returns:
+        CapacityPlan
+
+    Raises:
+        ValueError: If the inputs are invalid or no level met the SLO
+    """
+    if target_rps <= 0 or p95_slo <= 0:
+        raise ValueError("target rate and p95 SLO must be positive")
+    if base_rps is not None and not 0 < base_rps <= target_rps:
+        raise ValueError("base rate must be positive and at most the target rate")
+    if headroom < 0:
+        raise ValueError(f"headroom must not be negative: {headroom}")
+    if db_connections < 1:
+        raise ValueError(f"db_connections must be positive: {db_connections}")
+    if not 0 < db_time_fraction <= 1:
+        raise ValueError(f"db_time_fraction must be in (0, 1]: {db_time_fraction}")
+    if cpu_per_pod is not None and cpu_per_pod <= 0:
+        raise ValueError(f"cpu_per_pod must be positive: {cpu_per_pod}")
+    current = current or ServiceSettings()
+    notes: List[str] = []
+
+    sustained: Dict[int, CurvePoint] = {}
+    for replicas, report in sorted(runs.items()):
+        point = sustained_point(stress_curve(report), p95_slo, success_threshold)
+        if point is None:
+            notes.append(f"No level at {replicas} replicas met the SLO")
+        else:
+            sustained[replicas] = point
+    if not sustained:
+        raise ValueError(f"No stress level met a {p95_slo:g}ms p95 SLO")
+    if len(sustained) < 3:
+        notes.append(
+            f"Only {len(sustained)} replica count(s) within the SLO; stress "
+            "three or more for a full USL fit"
+        )
+
+    model = fit_usl(list(sustained), [point.throughput for point in sustained.values()])
+
+    peak_rate = target_rps * (1 + headroom)
+    max_replicas = _replicas_for(model, peak_rate)
+    if max_replicas is None:
+        best = max(
+            range(1, MAX_PLANNED_REPLICAS + 1), key=lambda r: model.throughput(r)
+        )
+        notes.append(
+            f"Target not reachable: throughput peaks at "
+            f"{model.throughput(best):.1f} req/s with {best} replicas; "
+            "scale the database or reduce per-request cost"
+        )
+        max_replicas = best
+    min_replicas = min(
+        _replicas_for(model, (base_rps or target_rps / 2) * (1 + headroom))
+        or max_replicas,
+        max_replicas,
+    )
+
+    # Little's law at the planned peak, with the mean latency measured
+    # nearest that replica count
+    nearest = min(sustained, key=lambda replicas: abs(replicas - max_replicas))
+    per_pod_rate = min(peak_rate, model.throughput(max_replicas)) / max_replicas
+    in_flight = per_pod_rate * sustained[nearest].latency_avg / 1000
+    db_in_flight = in_flight * db_time_fraction
+
+    # Async workers each serve many requests; one per CPU keeps them busy
+    cpu = cpu_per_pod or current.cpu
+    if cpu is None:
+        cpu = 1.0
+        notes.append(
+            f"No CPU request or limit set for {service}; planned for 1 CPU per pod"
+        )
+    web_concurrency = min(max(math.floor(cpu), 1), MAX_WEB_CONCURRENCY)
+
+    # Each worker's pool covers its share of the requests in the database
+    db_max_conn_size = max(math.ceil(db_in_flight / web_concurrency), 1)
+    per_pool = max_replicas * current.pools
+    budget_pool = db_connections // (per_pool * web_concurrency)
+    if budget_pool < db_max_conn_size:
+        if budget_pool >= 1:
+            notes.append(
+                f"DB_MAX_CONN_SIZE capped at {budget_pool} (needs "
+                f"{db_max_conn_size}) by the {db_connections}-connection budget; "
+                "requests will wait for connections at peak"
+            )
+            db_max_conn_size = budget_pool
+        else:
+            db_max_conn_size = 1
+            web_concurrency = max(db_connections // per_pool, 1)
+            notes.append(
+                f"WEB_CONCURRENCY capped at {web_concurrency} by the "
+                f"{db_connections}-connection budget"
+            )
+    if per_pool * web_concurrency * db_max_conn_size > db_connections:
+        notes.append(
+            f"{max_replicas} replicas exceed the {db_connections}-connection "
+            "budget even with one worker and one connection; front the "
+            "database with PgBouncer or raise max_connections"
+        )
+
+    return CapacityPlan(
+        service=service,
+        target_rps=target_rps,
+        p95_slo=p95_slo,
+        model=model,
+        sustained={r: point.throughput for r, point in sustained.items()},
+        min_replicas=min_replicas,
+        max_replicas=max_replicas,
+        web_concurrency=web_concurrency,
+        db_max_conn_size=db_max_conn_size,
+        pools=current.pools,
+        in_flight_per_pod=in_flight,
+        db_in_flight_per_pod=db_in_flight,
+        current=current,
+        notes=notes,
+    )
+
+
+def describe_plan(plan: CapacityPlan) -> List[str]:
+    """
+    Readable lines for a plan, recommendations next to current values
+
+    Args:
+        plan: Result of plan_capacity
+
+    Returns:
+        Lines for display
+    """
+    model = plan.model
+    peak = "none" if math.isinf(model.peak) else f"{model.peak:.1f} replicas"
+    lines = [
+        "Sustained req/s within SLO by replicas: "
+        + ", ".join(f"{r}: {x:.1f}" for r, x in plan.sustained.items()),
+        f"USL fit: λ={model.lam:.1f} req/s per replica, σ={model.sigma:.3f}, "
+        f"κ={model.kappa:.4f}, peak at {peak}",
+        f"Capacity at maxReplicas: {plan.capacity:.1f} req/s for a "
+        f"{plan.target_rps:g} req/s target",
+        f"In-flight requests per pod at peak: {plan.in_flight_per_pod:.1f} "
+        f"({plan.db_in_flight_per_pod:.1f} in the database)",
+    ]
+    rows = [
+        ("minReplicas", plan.min_replicas, plan.current.min_replicas),
+        ("maxReplicas", plan.max_replicas, plan.current.max_replicas),
+        ("WEB_CONCURRENCY", plan.web_concurrency, plan.current.web_concurrency),
+        ("DB_MAX_CONN_SIZE", plan.db_max_conn_size, plan.current.db_max_conn_size),
+    ]
+    for name, value, was in rows:
+        change = "" if was is None or was == value else f" (currently {was})"
+        lines.append(f"{plan.service}.{name}: {value}{change}")
+    lines.append(
+        f"Worst-case connections: {plan.max_replicas} × {plan.web_concurrency} × "
+        f"{plan.pools} × {plan.db_max_conn_size} = {plan.connections}"
+    )
+    return lines + [f"Note: {note}" for note in plan.notes]
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Multi-Process Load Generation
+
+Forks several generator processes on one machine so a run is not capped by a
+single interpreter's GIL. Each process runs its share of the load with its own
+session or event loop and sends its RequestRecorder back to the parent, where
+counters, per-second buckets and latency histograms are merged exactly.
+"""
+
+import logging
+import multiprocessing
+import traceback
+from multiprocessing.connection import Connection
+from typing import Any, Callable, List, Protocol, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a generator to report back after the run should have ended
+RESULT_GRACE_PERIOD = 120
+
+
+class Mergeable(Protocol):
+    """Generator result that can absorb another, e.g. RequestRecorder"""
+
+    def merge(self, other: Any) -> Any: ...
+
+
+Result = TypeVar("Result", bound=Mergeable)
+
+
+def split_evenly(total: float, parts: int) -> List[Any]:
+    """
+    Split a load level across generator processes
+
+    Integers are split into whole shares that differ by at most one; floats
+    (arrival rates) are split into equal fractions.
+
+    Args:
+        total: Workers (int) or arrival rate (float) to split
+        parts: Number of shares
+
+    Returns:
+        List of shares summing to total
+
+    Raises:
+        ValueError: If parts is not positive
+    """
+    if parts <= 0:
+        raise ValueError(f"parts must be positive: {parts}")
+    if isinstance(total, int):
+        base, remainder = divmod(total, parts)
+        return [base + (1 if i < remainder else 0) for i in range(parts)]
+    return [total / parts] * parts
+
+
+def _generator_main(
+    job: Callable[[], Any],
+    barrier: Any,
+    conn: Connection,
+) -> None:
+    """Child process entry point: wait for siblings, run job, send result"""
+    try:
+        # Start all generators together so their per-second buckets line up
+        barrier.wait()
+        conn.send(("ok", job()))
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
+
+
+def run_forked(jobs: List[Callable[[], Result]], duration: float) -> Result:
+    """
+    Run each job in its own forked process and merge their results
+
+    Results are usually RequestRecorders but may be anything with a
+    merge(other) method returning the merged result.
+
+    Jobs are closures and are inherited through fork rather than pickled, so
+    this requires a platform with the fork start method (Linux).
+
+    Args:
+        jobs: Zero-argument callables that each run one generator's share
+        duration: Expected run duration in seconds, used for the result timeout
+
+    Returns:
+        Merged result
+
+    Raises:
+        RuntimeError: If a generator process fails or does not report back
+    """
+    ctx = multiprocessing.get_context("fork")
+    barrier = ctx.Barrier(len(jobs))
+    generators = []
+
+    logger.info(f"Starting {len(jobs)} generator processes")
+    for job in jobs:
+        receiver, sender = ctx.Pipe(duplex=False)
+        process = ctx.Process(
+            target=_generator_main, args=(job, barrier, sender), daemon=True
+        )
+        process.start()
+        sender.close()
+        generators.append((process, receiver))
+
+    merged = None
+    errors = []
+    try:
+        for index, (process, receiver) in enumerate(generators):
+            if not receiver.poll(duration + RESULT_GRACE_PERIOD):
+                errors.append(f"generator {index} did not report back")
+                continue
+            try:
+                status, payload = receiver.recv()
+            except EOFError:
+                errors.append(f"generator {index} exited without a result")
+                continue
+            if status != "ok":
+                errors.append(f"generator {index} failed:\n{payload}")
+                continue
+            merged = payload if merged is None else merged.merge(payload)
+    finally:
+        for process, receiver in generators:
+            receiver.close()
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    if errors or merged is None:
+        raise RuntimeError("; ".join(errors) or "no generator results")
+    return merged
@@ -0,0 +1,501 @@
+#!/usr/bin/env python3
+"""
+Fake Prometheus Server
+
+A local stand-in for the parts of the Prometheus HTTP API the load tests
+use: /api/v1/status/config, /api/v1/query and /api/v1/query_range. Queries
+are answered from recorded fixtures (the "infrastructure" section of a
+--report-json report, or a {query: range result} JSON file) or from
+synthetic per-series generators, so metrics collection, summaries and
+saturation analysis can be tested and benchmarked without a cluster.
+
+    python -m tests.load.fake_prometheus --port 9090 --pods 6
+    python -m tests.load.load_tester normal --collect-infra-metrics \\
+        --prometheus-url http://127.0.0.1:9090 --prometheus-cache ""
+"""
+
+import argparse
+import json
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .prometheus_utils import METRIC_GROUPS
+
+logger = logging.getLogger(__name__)
+
+# Prometheus refuses range queries with more points per series than this
+MAX_POINTS = 11000
+DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)")
+DURATION_SECONDS = {
+    "ms": 0.001,
+    "s": 1,
+    "m": 60,
+    "h": 3600,
+    "d": 86400,
+    "w": 604800,
+    "y": 31536000,
+}
+
+
+@dataclass(frozen=True)
+class SyntheticSeries:
+    """One generated series: labels and a value for each offset in seconds"""
+
+    labels: Dict[str, str]
+    # Seconds since the server's origin -> value, or None for no sample
+    value: Callable[[float], Optional[float]]
+
+
+def parse_duration(value: str) -> float:
+    """
+    Parse a Prometheus duration ("15s", "1m30s") or float seconds
+
+    Args:
+        value: Duration string
+
+    Returns:
+        Seconds
+
+    Raises:
+        ValueError: If value is not a positive duration
+    """
+    try:
+        seconds = float(value)
+    except ValueError:
+        parts = DURATION.findall(value)
+        if not parts or "".join(n + u for n, u in parts) != value:
+            raise ValueError(f"invalid duration {value!r}")
+        seconds = sum(float(n) * DURATION_SECONDS[u] for n, u in parts)
+    if seconds <= 0:
+        raise ValueError(f"duration must be positive: {value!r}")
+    return seconds
+
+
+def _number(value: float) -> Any:
+    """Timestamp as Prometheus prints it: integral seconds without a fraction"""
+    return int(value) if float(value).is_integer() else round(value, 3)
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def load_fixtures(path: str, namespace: str = "eoapi") -> Dict[str, Dict]:
+    """
+    Read recorded range results keyed by PromQL query
+
+    Args:
+        path: A report exported with --report-json (its first
+            "infrastructure" section is used, with queries rebuilt from
+            METRIC_GROUPS for the namespace), or a JSON object of query ->
+            range result
+        namespace: Namespace the report's queries were built for
+
+    Returns:
+        Dict of query -> range result data
+
+    Raises:
+        ValueError: If the file holds no usable fixtures
+    """
+    data = json.loads(Path(path).read_text())
+
+    def find_infrastructure(node: Any) -> Optional[Dict]:
+        if isinstance(node, dict):
+            if isinstance(node.get("infrastructure"), dict):
+                return node["infrastructure"]
+            for value in node.values():
+                found = find_infrastructure(value)
+                if found:
+                    return found
+        return None
+
+    infrastructure = find_infrastructure(data)
+    if infrastructure is None:
+        fixtures = {
+            query: result
+            for query, result in data.items()
+            if isinstance(result, dict) and "result" in result
+        }
+    else:
+        fixtures = {}
+        for group, build in METRIC_GROUPS.items():
+            recorded = infrastructure.get(group) or {}
+            for name, query in build(namespace).items():
+                if recorded.get(name):
+                    fixtures[query] = recorded[name]
+    if not fixtures:
+        raise ValueError(f"No recorded Prometheus results in {path}")
+    return fixtures
+
+
+def eoapi_generators(
+    namespace: str = "eoapi",
+    pods: int = 3,
+    containers: int = 1,
+    ramp_seconds: float = 120.0,
+) -> Dict[str, List[SyntheticSeries]]:
+    """
+    Synthetic series for every query collect_test_metrics sends
+
+    Load ramps up over ramp_seconds: CPU and connections rise with it,
+    throttling and waiting pgbouncer clients appear once it passes 80%,
+    and each HPA scales from 1 to `pods` replicas.
+
+    Args:
+        namespace: Namespace the queries are built for
+        pods: Pods per service (and HPA maximum)
+        containers: Containers per pod
+        ramp_seconds: Seconds until full load
+
+    Returns:
+        Dict of query -> series
+    """
+
+    def load(offset: float) -> float:
+        return min(max(offset / ramp_seconds, 0.0), 1.0)
+
+    def saturated(offset: float) -> float:
+        return max(load(offset) - 0.8, 0.0) * 5
+
+    services = ("raster", "stac", "vector")
+    pod_names = [
+        f"eoapi-{service}-7d9f8c6b5-{i:05x}"
+        for service in services
+        for i in range(pods)
+    ]
+
+    def per_container(value: Callable[[float], float]) -> List[SyntheticSeries]:
+        return [
+            SyntheticSeries({"pod": pod, "container": f"c{c}"}, value)
+            for pod in pod_names
+            for c in range(containers)
+        ]
+
+    def connections(share: float) -> Callable[[float], float]:
+        return lambda t: round(share * (5 + 45 * load(t)))
+
+    by_name: Dict[str, List[SyntheticSeries]] = {
+        "cpu": per_container(lambda t: 0.05 + 0.9 * load(t)),
+        "cpu_throttled": per_container(lambda t: 0.5 * saturated(t)),
+        "memory": per_container(lambda t: (200 + 150 * load(t)) * 1024 * 1024),
+        "current_replicas": [
+            SyntheticSeries(
+                {"horizontalpodautoscaler": f"eoapi-{service}"},
+                lambda t: 1 + math.floor((pods - 1) * load(t - 30)),
+            )
+            for service in services
+        ],
+        "desired_replicas": [
+            SyntheticSeries(
+                {"horizontalpodautoscaler": f"eoapi-{service}"},
+                lambda t: 1 + math.floor((pods - 1) * load(t)),
+            )
+            for service in services
+        ],
+        "request_rate": [
+            SyntheticSeries({"ingress": "eoapi"}, lambda t: 5 + 195 * load(t))
+        ],
+        "request_latency_p95": [
+            SyntheticSeries({"ingress": "eoapi"}, lambda t: 0.05 + 2 * saturated(t))
+        ],
+        "db_connections": [
+            SyntheticSeries({"datname": "eoapi", "state": state}, connections(share))
+            for state, share in (("active", 0.6), ("idle", 0.4))
+        ],
+        "pgbouncer_waiting": [SyntheticSeries({}, lambda t: round(20 * saturated(t)))],
+        "db_query_duration": [
+            SyntheticSeries({"datname": "eoapi"}, lambda t: 0.002 + 0.01 * load(t))
+        ],
+    }
+    return {
+        query: by_name[name]
+        for build in METRIC_GROUPS.values()
+        for name, query in build(namespace).items()
+        if name in by_name
+    }
+
+
+class FakePrometheus:
+    """Threaded HTTP server answering Prometheus API queries locally"""
+
+    def __init__(
+        self,
+        fixtures: Optional[Dict[str, Dict]] = None,
+        generators: Optional[Dict[str, List[SyntheticSeries]]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        origin: Optional[float] = None,
+        rebase: bool = False,
+    ):
+        """
+        Create (but do not start) a fake Prometheus
+
+        Args:
+            fixtures: Query -> recorded range result data
+            generators: Query -> synthetic series
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            origin: Unix time generator offsets count from (default: the
+                start of the first range query)
+            rebase: Move fixture samples so the recording starts at the
+                start of each range query, for replaying old recordings
+        """
+        self.fixtures = fixtures or {}
+        self.generators = generators or {}
+        self.origin = origin
+        self.rebase = rebase
+        self.queries: List[Tuple[str, Dict[str, str]]] = []
+        self._lock = threading.Lock()
+        self._recording_start = min(
+            (
+                float(sample[0])
+                for data in self.fixtures.values()
+                for entry in data.get("result") or []
+                for sample in entry.get("values") or []
+            ),
+            default=0.0,
+        )
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def start(self) -> "FakePrometheus":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Fake Prometheus listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakePrometheus":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _offset(self, timestamp: float, start: Optional[float] = None) -> float:
+        with self._lock:
+            if self.origin is None:
+                self.origin = start if start is not None else timestamp
+            return timestamp - self.origin
+
+    def _fixture_samples(
+        self, query: str, start: float
+    ) -> Iterator[Tuple[Dict[str, str], List[Tuple[float, str]]]]:
+        shift = start - self._recording_start if self.rebase else 0.0
+        for entry in (self.fixtures.get(query) or {}).get("result") or []:
+            samples = [(float(t) + shift, str(v)) for t, v in entry.get("values") or []]
+            yield entry.get("metric", {}), samples
+
+    def query_range(self, query: str, start: float, end: float, step: float) -> Dict:
+        """
+        Evaluate a range query the way Prometheus aligns it
+
+        Samples fall on start + k * step up to end. Fixture series take the
+        latest recorded sample within one step before each point.
+
+        Args:
+            query: PromQL query (matched verbatim)
+            start: Unix start
+            end: Unix end
+            step: Step in seconds
+
+        Returns:
+            Range result data (matrix)
+        """
+        points = [start + k * step for k in range(int((end - start) / step) + 1)]
+        result = []
+        for series in self.generators.get(query, []):
+            values = []
+            for t in points:
+                value = series.value(self._offset(t, start))
+                if value is not None:
+                    values.append([_number(t), _format_value(value)])
+            if values:
+                result.append({"metric": dict(series.labels), "values": values})
+
+        for labels, samples in self._fixture_samples(query, start):
+            values = []
+            i = 0
+            for t in points:
+                while i < len(samples) and samples[i][0] <= t:
+                    i += 1
+                if i and t - samples[i - 1][0] < step:
+                    values.append([_number(t), samples[i - 1][1]])
+            if values:
+                result.append({"metric": dict(labels), "values": values})
+        return {"resultType": "matrix", "result": result}
+
+    def query(self, query: str, at: float) -> Dict:
+        """Evaluate an instant query: the latest sample at or before `at`"""
+        result = []
+        for series in self.generators.get(query, []):
+            value = series.value(self._offset(at))
+            if value is not None:
+                result.append(
+                    {
+                        "metric": dict(series.labels),
+                        "value": [_number(at), _format_value(value)],
+                    }
+                )
+        for labels, samples in self._fixture_samples(query, at):
+            before = [v for t, v in samples if t <= at]
+            if before:
+                result.append(
+                    {"metric": dict(labels), "value": [_number(at), before[-1]]}
+                )
+        return {"resultType": "vector", "result": result}
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, status: int, body: Dict) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _error(self, message: str) -> None:
+                self._send(
+                    400, {"status": "error", "errorType": "bad_data", "error": message}
+                )
+
+            def _params(self) -> Dict[str, str]:
+                parsed = urlparse(self.path)
+                params = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                if self.command == "POST":
+                    length = int(self.headers.get("Content-Length") or 0)
+                    body = self.rfile.read(length).decode()
+                    params.update({k: v[-1] for k, v in parse_qs(body).items()})
+                return params
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                params = self._params()
+                with fake._lock:
+                    fake.queries.append((path, params))
+
+                if path == "/api/v1/status/config":
+                    self._send(200, {"status": "success", "data": {"yaml": ""}})
+                elif path == "/api/v1/query":
+                    if "query" not in params:
+                        return self._error("missing query")
+                    try:
+                        at = float(params.get("time") or time.time())
+                    except ValueError:
+                        return self._error(f"invalid time {params['time']!r}")
+                    data = fake.query(params["query"], at)
+                    self._send(200, {"status": "success", "data": data})
+                elif path == "/api/v1/query_range":
+                    try:
+                        query = params["query"]
+                        start, end = float(params["start"]), float(params["end"])
+                        step = parse_duration(params["step"])
+                    except KeyError as e:
+                        return self._error(f"missing parameter {e}")
+                    except ValueError as e:
+                        return self._error(str(e))
+                    if end < start:
+                        return self._error(
+                            "end timestamp must not be before start time"
+                        )
+                    if (end - start) / step > MAX_POINTS:
+                        return self._error(
+                            "exceeded maximum resolution of 11,000 points per "
+                            "timeseries. Try decreasing the query resolution "
+                            "(?step=XX)"
+                        )
+                    data = fake.query_range(query, start, end, step)
+                    self._send(200, {"status": "success", "data": data})
+                else:
+                    self._send(404, {"status": "error", "error": "not found"})
+
+            do_POST = do_GET
+
+        return Handler
+
+
+def main():
+    """Run a fake Prometheus until interrupted"""
+    parser = argparse.ArgumentParser(description="Fake Prometheus for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9090)
+    parser.add_argument("--namespace", default="eoapi")
+    parser.add_argument(
+        "--fixtures",
+        metavar="FILE",
+        help="Report JSON or {query: range result} JSON to replay, moved to "
+        "each query's window (default: synthetic eoAPI series)",
+    )
+    parser.add_argument(
+        "--pods", type=int, default=3, help="Synthetic pods per service (default: 3)"
+    )
+    parser.add_argument(
+        "--containers",
+        type=int,
+        default=1,
+        help="Synthetic containers per pod (default: 1)",
+    )
+    parser.add_argument(
+        "--ramp",
+        type=float,
+        default=120.0,
+        help="Seconds until synthetic load peaks (default: 120)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.fixtures:
+        server = FakePrometheus(
+            fixtures=load_fixtures(args.fixtures, args.namespace),
+            host=args.host,
+            port=args.port,
+            rebase=True,
+        )
+    else:
+        server = FakePrometheus(
+            generators=eoapi_generators(
+                args.namespace, args.pods, args.containers, args.ramp
+            ),
+            host=args.host,
+            port=args.port,
+        )
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Streaming Latency Histogram
+
+Fixed-memory, log-bucketed latency recorder in the style of HdrHistogram.
+Values are stored as integer microseconds in an array of counters, so memory
+does not grow with run length, percentiles carry a bounded relative error
+set by the number of significant digits, and histograms with the same
+configuration merge exactly.
+"""
+
+import math
+from array import array
+from functools import lru_cache
+from typing import Dict, Optional
+
+DEFAULT_LOWEST_US = 1
+DEFAULT_HIGHEST_US = 3_600_000_000  # one hour
+DEFAULT_SIGNIFICANT_DIGITS = 3
+# Precision of per-second histograms, which are kept for every second of a run
+INTERVAL_SIGNIFICANT_DIGITS = 2
+
+# Percentiles reported by LoadTester metrics, keyed by metric suffix
+REPORTED_PERCENTILES = {
+    "p50": 50.0,
+    "p90": 90.0,
+    "p95": 95.0,
+    "p99": 99.0,
+    "p999": 99.9,
+}
+
+
+class LatencyHistogram:
+    """Mergeable HDR-style histogram of latencies recorded in milliseconds"""
+
+    def __init__(
+        self,
+        lowest_us: int = DEFAULT_LOWEST_US,
+        highest_us: int = DEFAULT_HIGHEST_US,
+        significant_digits: int = DEFAULT_SIGNIFICANT_DIGITS,
+    ):
+        """
+        Initialize an empty histogram
+
+        Args:
+            lowest_us: Smallest discernible value in microseconds
+            highest_us: Largest trackable value in microseconds; larger
+                values are clamped to it
+            significant_digits: Decimal digits of precision kept (1-5)
+
+        Raises:
+            ValueError: If parameters are invalid
+        """
+        if not isinstance(lowest_us, int) or lowest_us < 1:
+            raise ValueError(f"lowest_us must be a positive integer: {lowest_us}")
+        if not isinstance(highest_us, int) or highest_us < 2 * lowest_us:
+            raise ValueError(
+                f"highest_us must be at least twice lowest_us: {highest_us}"
+            )
+        if significant_digits not in range(1, 6):
+            raise ValueError(
+                f"significant_digits must be between 1 and 5: {significant_digits}"
+            )
+
+        self.lowest_us = lowest_us
+        self.highest_us = highest_us
+        self.significant_digits = significant_digits
+
+        single_unit_resolution = 2 * 10**significant_digits
+        sub_bucket_count_magnitude = math.ceil(math.log2(single_unit_resolution))
+        self._sub_bucket_half_count_magnitude = max(sub_bucket_count_magnitude, 1) - 1
+        self._unit_magnitude = int(math.floor(math.log2(lowest_us)))
+        self._sub_bucket_count = 1 << sub_bucket_count_magnitude
+        self._sub_bucket_half_count = self._sub_bucket_count // 2
+        self._sub_bucket_mask = (self._sub_bucket_count - 1) << self._unit_magnitude
+
+        bucket_count = 1
+        smallest_untrackable = self._sub_bucket_count << self._unit_magnitude
+        while smallest_untrackable <= highest_us:
+            smallest_untrackable <<= 1
+            bucket_count += 1
+
+        self.counts = array(
+            "q", bytes(8 * (bucket_count + 1) * self._sub_bucket_half_count)
+        )
+        self.total_count = 0
+        self.min_us: Optional[int] = None
+        self.max_us: Optional[int] = None
+        self.sum_us = 0
+
+    def _config(self) -> tuple:
+        return (self.lowest_us, self.highest_us, self.significant_digits)
+
+    def _index_for(self, value: int) -> int:
+        """Counter index for a value in microseconds"""
+        pow2_ceiling = (value | self._sub_bucket_mask).bit_length()
+        bucket_index = (
+            pow2_ceiling
+            - self._unit_magnitude
+            - (self._sub_bucket_half_count_magnitude + 1)
+        )
+        sub_bucket_index = value >> (bucket_index + self._unit_magnitude)
+        bucket_base_index = (bucket_index + 1) << self._sub_bucket_half_count_magnitude
+        return bucket_base_index + sub_bucket_index - self._sub_bucket_half_count
+
+    def _value_range_at(self, index: int) -> tuple:
+        """Lowest and highest value (microseconds) counted at index"""
+        bucket_index = (index >> self._sub_bucket_half_count_magnitude) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + (
+            self._sub_bucket_half_count
+        )
+        if bucket_index < 0:
+            sub_bucket_index -= self._sub_bucket_half_count
+            bucket_index = 0
+        shift = bucket_index + self._unit_magnitude
+        lowest = sub_bucket_index << shift
+        return lowest, lowest + (1 << shift) - 1
+
+    def record(self, latency_ms: float, count: int = 1) -> None:
+        """
+        Record a latency
+
+        Args:
+            latency_ms: Latency in milliseconds
+            count: Number of occurrences to record
+        """
+        value = min(max(int(round(latency_ms * 1000)), 0), self.highest_us)
+        self.counts[self._index_for(value)] += count
+        self.total_count += count
+        self.sum_us += value * count
+        if self.min_us is None or value < self.min_us:
+            self.min_us = value
+        if self.max_us is None or value > self.max_us:
+            self.max_us = value
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        Add all counts from another histogram into this one
+
+        Args:
+            other: Histogram with the same configuration
+
+        Returns:
+            This histogram, for chaining
+
+        Raises:
+            ValueError: If the histograms are configured differently
+        """
+        if other._config() != self._config():
+            raise ValueError(
+                f"Cannot merge histograms with different configurations: "
+                f"{self._config()} vs {other._config()}"
+            )
+        if not other.total_count:
+            return self
+
+        counts = self.counts
+        for index, count in enumerate(other.counts):
+            if count:
+                counts[index] += count
+        self.total_count += other.total_count
+        self.sum_us += other.sum_us
+        if self.min_us is None or (
+            other.min_us is not None and other.min_us < self.min_us
+        ):
+            self.min_us = other.min_us
+        if self.max_us is None or (
+            other.max_us is not None and other.max_us > self.max_us
+        ):
+            self.max_us = other.max_us
+        return self
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Latency at a percentile in milliseconds
+
+        Returns the highest value equivalent to the bucket holding the
+        requested rank, clamped to the recorded maximum.
+
+        Args:
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            Latency in milliseconds (0 for an empty histogram)
+        """
+        if not self.total_count:
+            return 0.0
+
+        percentile = min(max(percentile, 0.0), 100.0)
+        rank = max(1, math.ceil(percentile / 100 * self.total_count))
+        running = 0
+        for index, count in enumerate(self.counts):
+            if count:
+                running += count
+                if running >= rank:
+                    _, highest = self._value_range_at(index)
+                    return min(highest, self.max_us or highest) / 1000
+        return (self.max_us or 0) / 1000
+
+    @property
+    def min(self) -> float:
+        """Smallest recorded latency in milliseconds"""
+        return (self.min_us or 0) / 1000
+
+    @property
+    def max(self) -> float:
+        """Largest recorded latency in milliseconds"""
+        return (self.max_us or 0) / 1000
+
+    @property
+    def mean(self) -> float:
+        """Mean recorded latency in milliseconds"""
+        return self.sum_us / self.total_count / 1000 if self.total_count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Latency metrics in the LoadTester metrics format
+
+        Returns:
+            Dict with latency_min/max/avg and latency_<percentile> keys (ms),
+            or an empty dict if nothing was recorded
+        """
+        if not self.total_count:
+            return {}
+
+        metrics = {
+            "latency_min": self.min,
+            "latency_max": self.max,
+            "latency_avg": self.mean,
+        }
+        for name, percentile in REPORTED_PERCENTILES.items():
+            metrics[f"latency_{name}"] = self.percentile(percentile)
+        return metrics
+
+    def to_dict(self) -> Dict:
+        """
+        Serialize to a compact, JSON-safe dict with sparse counts
+
+        Returns:
+            Dict that from_dict turns back into an identical histogram
+        """
+        return {
+            "lowest_us": self.lowest_us,
+            "highest_us": self.highest_us,
+            "significant_digits": self.significant_digits,
+            "total_count": self.total_count,
+            "min_us": self.min_us,
+            "max_us": self.max_us,
+            "sum_us": self.sum_us,
+            "counts": {str(i): c for i, c in enumerate(self.counts) if c},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        """
+        Rebuild a histogram serialized with to_dict
+
+        Args:
+            data: Dict produced by to_dict
+
+        Returns:
+            LatencyHistogram with the same configuration and counts
+        """
+        histogram = cls(
+            lowest_us=data["lowest_us"],
+            highest_us=data["highest_us"],
+            significant_digits=data["significant_digits"],
+        )
+        for index, count in data["counts"].items():
+            histogram.counts[int(index)] = count
+        histogram.total_count = data["total_count"]
+        histogram.min_us = data["min_us"]
+        histogram.max_us = data["max_us"]
+        histogram.sum_us = data["sum_us"]
+        return histogram
+
+
+@lru_cache(maxsize=None)
+def _layout(significant_digits: int) -> LatencyHistogram:
+    """Shared empty histogram whose bucket layout sparse histograms reuse"""
+    return LatencyHistogram(significant_digits=significant_digits)
+
+
+class SparseLatencyHistogram:
+    """
+    Latency histogram for short intervals that stores only non-empty buckets
+
+    Uses the same bucket layout as LatencyHistogram, so a run can keep one per
+    second without allocating a full counter array for each.
+    """
+
+    def __init__(self, significant_digits: int = INTERVAL_SIGNIFICANT_DIGITS):
+        """
+        Initialize an empty histogram
+
+        Args:
+            significant_digits: Decimal digits of precision kept (1-5)
+        """
+        self.significant_digits = significant_digits
+        self.counts: Dict[int, int] = {}
+        self.total_count = 0
+        self.max_us = 0
+
+    def record(self, latency_ms: float, count: int = 1) -> None:
+        """
+        Record a latency
+
+        Args:
+            latency_ms: Latency in milliseconds
+            count: Number of occurrences to record
+        """
+        layout = _layout(self.significant_digits)
+        value = min(max(int(round(latency_ms * 1000)), 0), layout.highest_us)
+        index = layout._index_for(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += count
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other: "SparseLatencyHistogram") -> "SparseLatencyHistogram":
+        """
+        Add all counts from another histogram into this one
+
+        Args:
+            other: Histogram with the same precision
+
+        Returns:
+            This histogram, for chaining
+
+        Raises:
+            ValueError: If the histograms have different precision
+        """
+        if other.significant_digits != self.significant_digits:
+            raise ValueError(
+                f"Cannot merge histograms with different precision: "
+                f"{self.significant_digits} vs {other.significant_digits}"
+            )
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Latency at a percentile in milliseconds
+
+        Args:
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            Latency in milliseconds (0 for an empty histogram)
+        """
+        if not self.total_count:
+            return 0.0
+
+        layout = _layout(self.significant_digits)
+        percentile = min(max(percentile, 0.0), 100.0)
+        rank = max(1, math.ceil(percentile / 100 * self.total_count))
+        running = 0
+        for index in sorted(self.counts):
+            running += self.counts[index]
+            if running >= rank:
+                _, highest = layout._value_range_at(index)
+                return min(highest, self.max_us) / 1000
+        return self.max_us / 1000
+
+    @property
+    def max(self) -> float:
+        """Largest recorded latency in milliseconds"""
+        return self.max_us / 1000
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+"""
+Offline HPA Simulator
+
+Replays a recorded request rate (from access logs or a Prometheus export)
+through a model of each service's HorizontalPodAutoscaler as the chart
+configures it. The model covers the prometheus-adapter rule's
+rate(...[5m]), Prometheus scrape staleness, the HPA sync period, tolerance,
+stabilization windows, the default scale-up policy and pod startup time. It
+estimates how many requests arrive while ready pods cannot serve them, and
+how many pod-hours the autoscaling costs. Windows and targets can then be
+tuned with values overrides in seconds instead of hours on a live cluster.
+"""
+
+import json
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+from .hpa_timeline import SERVICES, parse_quantity, stabilization_windows
+
+if TYPE_CHECKING:
+    from .replay import ReplayRequest
+
+# HPA controller --horizontal-pod-autoscaler-sync-period
+SYNC_PERIOD_S = 15
+# Prometheus scrape interval of the ingress controller metrics
+SCRAPE_INTERVAL_S = 15
+# rate(...[5m]) in the prometheus-adapter rules
+RATE_WINDOW_S = 300
+# metrics-server CPU usage window
+CPU_WINDOW_S = 60
+# HPA controller --horizontal-pod-autoscaler-tolerance
+TOLERANCE = 0.1
+# Default scaleUp policies: the larger of doubling or adding 4 pods per period
+SCALE_UP_PERCENT = 100
+SCALE_UP_PODS = 4
+DEFAULT_POD_STARTUP_S = 30.0
+AUTOSCALING_TYPES = ("cpu", "requestRate", "both")
+
+
+@dataclass(frozen=True)
+class HPAConfig:
+    """A service's autoscaling block in values.yaml"""
+
+    min_replicas: int = 1
+    max_replicas: int = 10
+    type: str = "requestRate"
+    # Target average CPU utilization, percent of the pod's CPU request
+    cpu_target: float = 75.0
+    # Target average request rate per pod, req/s
+    rate_target: float = 100.0
+    scale_up_window: int = 0
+    scale_down_window: int = 300
+    # CPU request per pod in cores, for cpu-based scaling
+    cpu_request: Optional[float] = None
+
+    @classmethod
+    def from_values(cls, values: Dict, service: str) -> "HPAConfig":
+        """
+        Read a service's autoscaling settings from chart values
+
+        Args:
+            values: Merged chart values
+            service: Service key, e.g. raster
+
+        Returns:
+            HPAConfig for the service
+
+        Raises:
+            ValueError: If the service has no autoscaling block, scales on
+                latency or has an unknown autoscaling type
+        """
+        section = values.get(service) or {}
+        autoscaling = section.get("autoscaling")
+        if not autoscaling:
+            raise ValueError(f"{service} has no autoscaling settings")
+        kind = autoscaling.get("type", "requestRate")
+        if kind == "latency":
+            raise ValueError(
+                f"{service} scales on latency, which request rates alone cannot "
+                f"simulate; try --values with a requestRate or cpu override"
+            )
+        if kind not in AUTOSCALING_TYPES:
+            raise ValueError(
+                f"{service}.autoscaling.type must be one of {AUTOSCALING_TYPES}: {kind}"
+            )
+        targets = autoscaling.get("targets") or {}
+        windows = stabilization_windows(values)[service]
+        cpu = (
+            ((section.get("settings") or {}).get("resources") or {}).get("requests")
+            or {}
+        ).get("cpu")
+        return cls(
+            min_replicas=int(autoscaling.get("minReplicas", 1)),
+            max_replicas=int(autoscaling.get("maxReplicas", 10)),
+            type=kind,
+            cpu_target=float(targets.get("cpu", 75)),
+            rate_target=parse_quantity(targets.get("requestRate", "100000m")),
+            scale_up_window=int(windows["scale_up"]),
+            scale_down_window=int(windows["scale_down"]),
+            cpu_request=parse_quantity(cpu) if cpu is not None else None,
+        )
+
+
+@dataclass
+class Simulation:
+    """What the HPA did with one service's traffic"""
+
+    service: str
+    config: HPAConfig
+    # One row per sync period: timestamp, rate, metric, desired, ready,
+    # capacity and excess requests
+    timeline: List[Dict[str, Any]] = field(default_factory=list)
+    total_requests: float = 0.0
+    excess_requests: float = 0.0
+    seconds_over_capacity: int = 0
+    pod_seconds: float = 0.0
+    peak_replicas: int = 0
+    scale_ups: int = 0
+    scale_downs: int = 0
+
+    @property
+    def excess_share(self) -> float:
+        return (
+            self.excess_requests / self.total_requests if self.total_requests else 0.0
+        )
+
+    @property
+    def pod_hours(self) -> float:
+        return self.pod_seconds / 3600
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals for reports"""
+        return {
+            "total_requests": self.total_requests,
+            "excess_requests": self.excess_requests,
+            "excess_share": self.excess_share,
+            "seconds_over_capacity": self.seconds_over_capacity,
+            "pod_hours": self.pod_hours,
+            "peak_replicas": self.peak_replicas,
+            "scale_ups": self.scale_ups,
+            "scale_downs": self.scale_downs,
+        }
+
+
+def service_of_path(path: str) -> Optional[str]:
+    """Service a request path is routed to by its first segment"""
+    first = path.lstrip("/").split("/", 1)[0].split("?", 1)[0]
+    return first if first in SERVICES else None
+
+
+def rates_from_requests(
+    requests: List["ReplayRequest"],
+) -> Tuple[Dict[str, List[float]], float]:
+    """
+    Per-second request counts by service from replay log requests
+
+    Args:
+        requests: Requests from replay.load_requests, ordered by offset
+
+    Returns:
+        Tuple of (service -> requests per second, duration in seconds)
+    """
+    duration = int(requests[-1].offset) + 1 if requests else 0
+    rates: Dict[str, List[float]] = {}
+    for request in requests:
+        service = service_of_path(request.path)
+        if service is None:
+            continue
+        series = rates.setdefault(service, [0.0] * duration)
+        series[int(request.offset)] += 1
+    return rates, float(duration)
+
+
+def _service_of_labels(labels: Dict[str, str]) -> Optional[str]:
+    for key in ("service", "ingress"):
+        value = labels.get(key, "")
+        for service in SERVICES:
+            if value == service or value.endswith(f"-{service}"):
+                return service
+    return service_of_path(labels.get("path", ""))
+
+
+def rates_from_prometheus(
+    data: Dict, service: Optional[str] = None
+) -> Tuple[Dict[str, List[float]], float]:
+    """
+    Per-second request rates by service from a Prometheus range result
+
+    Each sample holds until the next one. Series are assigned to services by
+    their service, ingress or path label, and summed per service.
+
+    Args:
+        data: A query_range API response, its data section, or a load test
+            report whose infrastructure has request_metrics.request_rate
+        service: Service to assign series without a recognizable label to
+
+    Returns:
+        Tuple of (service -> requests per second, start as Unix time)
+
+    Raises:
+        ValueError: If data holds no request rate series
+    """
+    if "data" in data and isinstance(data["data"], dict):
+        data = data["data"]
+    if "result" not in data:
+        data = _request_rate_of_report(data) or {}
+    series = []
+    for entry in data.get("result") or []:
+        name = _service_of_labels(entry.get("metric") or {}) or service
+        samples = [(float(t), float(v)) for t, v in entry.get("values") or []]
+        samples = [(t, v) for t, v in samples if not math.isnan(v)]
+        if name and samples:
+            series.append((name, samples))
+    if not series:
+        raise ValueError("No request rate series with a known service")
+
+    start = min(samples[0][0] for _, samples in series)
+    end = max(samples[-1][0] for _, samples in series)
+    steps = [b[0] - a[0] for _, s in series for a, b in zip(s, s[1:])]
+    step = min(steps) if steps else 1.0
+    duration = int(end - start + step)
+    rates: Dict[str, List[float]] = {}
+    for name, samples in series:
+        total = rates.setdefault(name, [0.0] * duration)
+        for i, (t, value) in enumerate(samples):
+            until = samples[i + 1][0] if i + 1 < len(samples) else t + step
+            # Gaps longer than one step mean the series was absent
+            until = min(until, t + step)
+            for second in range(int(t - start), min(int(until - start), duration)):
+                total[second] += value
+    return rates, start
+
+
+def _request_rate_of_report(report: Any) -> Optional[Dict]:
+    """request_metrics.request_rate of the first infrastructure in a report"""
+    if isinstance(report, dict):
+        infrastructure = report.get("infrastructure")
+        if isinstance(infrastructure, dict):
+            found = (infrastructure.get("request_metrics") or {}).get("request_rate")
+            if found:
+                return found
+        for value in report.values():
+            found = _request_rate_of_report(value)
+            if found:
+                return found
+    return None
+
+
+def load_rates(
+    paths: List[str], service: Optional[str] = None
+) -> Tuple[Dict[str, List[float]], float]:
+    """
+    Per-second request rates by service from logs or Prometheus exports
+
+    Args:
+        paths: Access logs/JSONL (merged by timestamp) or a single JSON file
+            with a Prometheus range result or load test report
+        service: Service for Prometheus series without a service label
+
+    Returns:
+        Tuple of (service -> requests per second, Unix time of the first
+        Prometheus sample, or 0 for logs, whose seconds count from the
+        first request)
+
+    Raises:
+        ValueError: If no request rates are found
+    """
+    if len(paths) == 1:
+        try:
+            data = json.loads(Path(paths[0]).read_text())
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and ("data" in data or "result" in data):
+            return rates_from_prometheus(data, service)
+        if isinstance(data, dict) and _request_rate_of_report(data):
+            return rates_from_prometheus(data, service)
+
+    # replay needs httpx, which Prometheus exports do not
+    from .replay import load_requests
+
+    requests, _ = load_requests(paths, include_writes=True)
+    rates, _ = rates_from_requests(requests)
+    if not rates:
+        raise ValueError(f"No requests to eoAPI services in {', '.join(paths)}")
+    return rates, 0.0
+
+
+class _Window:
+    """Mean of the last `size` values of a series, from prefix sums"""
+
+    def __init__(self, values: List[float]):
+        self.prefix = [0.0]
+        for value in values:
+            self.prefix.append(self.prefix[-1] + value)
+
+    def mean(self, end: int, size: int) -> float:
+        """Mean over seconds [end - size, end), clipped to the series start"""
+        start = max(0, end - size)
+        return (self.prefix[end] - self.prefix[start]) / (end - start) if end else 0.0
+
+
+def _recommend(
+    config: HPAConfig,
+    current: int,
+    rate_metric: float,
+    cpu_cores: Optional[float],
+) -> int:
+    """Replica recommendation before stabilization, as the HPA computes it"""
+    recommendations = []
+    if config.type in ("requestRate", "both"):
+        # Pods metric: average per pod over target, times current replicas
+        ratio = rate_metric / max(current, 1) / config.rate_target
+        if abs(ratio - 1) > TOLERANCE:
+            recommendations.append(math.ceil(rate_metric / config.rate_target))
+        else:
+            recommendations.append(current)
+    if config.type in ("cpu", "both") and cpu_cores is not None and config.cpu_request:
+        target_cores = config.cpu_request * config.cpu_target / 100
+        ratio = cpu_cores / max(current, 1) / target_cores
+        if abs(ratio - 1) > TOLERANCE:
+            recommendations.append(math.ceil(cpu_cores / target_cores))
+        else:
+            recommendations.append(current)
+    recommendation = max(recommendations) if recommendations else current
+    return min(max(recommendation, config.min_replicas), config.max_replicas)
+
+
+def simulate(
+    service: str,
+    rates: List[float],
+    config: HPAConfig,
+    pod_capacity: float,
+    pod_startup_s: float = DEFAULT_POD_STARTUP_S,
+    cpu_cost: Optional[float] = None,
+    initial_replicas: Optional[int] = None,
+    start: float = 0.0,
+) -> Simulation:
+    """
+    Run one service's traffic through the HPA model
+
+    Every second, requests beyond what ready pods can serve count as excess
+    (no queueing carries over). Every sync period the HPA reads the adapter
+    metric as of the last scrape, recommends replicas, stabilizes the
+    recommendation over the scaleUp/scaleDown windows and applies the
+    default scale-up rate limit. New pods become ready after pod_startup_s;
+    scaling down removes the newest pods first.
+
+    Args:
+        service: Service name
+        rates: Requests per second
+        config: Autoscaling settings
+        pod_capacity: Requests per second one ready pod serves within SLO
+        pod_startup_s: Seconds from scale-up until a new pod is ready
+        cpu_cost: CPU core-seconds per request, for cpu and both types
+        initial_replicas: Replicas at the start (default: what the HPA
+            recommends for the first five minutes of traffic)
+        start: Unix time of the first second, for timeline timestamps
+
+    Returns:
+        Simulation with a per-sync-period timeline and totals
+
+    Raises:
+        ValueError: If pod_capacity is not positive, or cpu scaling lacks a
+            CPU cost or CPU request
+    """
+    if pod_capacity <= 0:
+        raise ValueError(f"pod_capacity must be positive: {pod_capacity}")
+    if config.type in ("cpu", "both") and (cpu_cost is None or not config.cpu_request):
+        raise ValueError(
+            f"{service} scales on cpu: needs a CPU cost per request and "
+            f"settings.resources.requests.cpu"
+        )
+
+    window = _Window(rates)
+    if initial_replicas is None:
+        first = window.mean(min(len(rates), RATE_WINDOW_S), RATE_WINDOW_S)
+        initial_replicas = _recommend(
+            config,
+            config.min_replicas,
+            first,
+            first * cpu_cost if cpu_cost is not None else None,
+        )
+    # Ready time of each pod; the initial pods are ready from the start
+    pods = [-math.inf] * initial_replicas
+    history: Deque[Tuple[int, int]] = deque()
+    longest_window = max(config.scale_up_window, config.scale_down_window)
+    result = Simulation(service, config, peak_replicas=initial_replicas)
+    # Requests served per second, which is what pods spend CPU on
+    cpu_window: Deque[float] = deque(maxlen=CPU_WINDOW_S)
+    period_rate = period_excess = 0.0
+
+    for second, rate in enumerate(rates):
+        ready = sum(1 for ready_at in pods if ready_at <= second)
+        capacity = ready * pod_capacity
+        excess = max(rate - capacity, 0.0)
+        cpu_window.append(min(rate, capacity))
+        result.total_requests += rate
+        result.excess_requests += excess
+        result.seconds_over_capacity += excess > 0
+        result.pod_seconds += len(pods)
+        period_rate += rate
+        period_excess += excess
+
+        if (second + 1) % SYNC_PERIOD_S:
+            continue
+        now = second + 1
+        scraped = now - now % SCRAPE_INTERVAL_S
+        rate_metric = window.mean(scraped, RATE_WINDOW_S)
+        cpu_cores = (
+            sum(cpu_window) / len(cpu_window) * cpu_cost
+            if cpu_cost is not None
+            else None
+        )
+        current = len(pods)
+        recommendation = _recommend(config, current, rate_metric, cpu_cores)
+
+        history.append((now, recommendation))
+        while history and history[0][0] <= now - longest_window - SYNC_PERIOD_S:
+            history.popleft()
+        up = min(r for t, r in history if t > now - config.scale_up_window - 1)
+        down = max(r for t, r in history if t > now - config.scale_down_window - 1)
+        desired = current
+        if up > current:
+            limit = max(
+                current * (100 + SCALE_UP_PERCENT) // 100, current + SCALE_UP_PODS
+            )
+            desired = min(up, limit, config.max_replicas)
+        elif down < current:
+            desired = down
+
+        if desired > current:
+            pods.extend([now + pod_startup_s] * (desired - current))
+            result.scale_ups += 1
+        elif desired < current:
+            pods.sort()
+            del pods[desired:]
+            result.scale_downs += 1
+        result.peak_replicas = max(result.peak_replicas, desired)
+
+        result.timeline.append(
+            {
+                "timestamp": int(start + now - SYNC_PERIOD_S),
+                "rate": period_rate / SYNC_PERIOD_S,
+                "metric": rate_metric,
+                "cpu_cores": cpu_cores,
+                "desired": desired,
+                "ready": ready,
+                "capacity": capacity,
+                "excess": period_excess,
+            }
+        )
+        period_rate = period_excess = 0.0
+    return result
+
+
+def simulate_services(
+    rates: Dict[str, List[float]],
+    values: Dict,
+    pod_capacity: Dict[str, float],
+    pod_startup_s: float = DEFAULT_POD_STARTUP_S,
+    cpu_cost: Optional[float] = None,
+    start: float = 0.0,
+) -> Dict[str, Simulation]:
+    """
+    Simulate every service with traffic and a pod capacity
+
+    Args:
+        rates: Service -> requests per second
+        values: Merged chart values with the autoscaling blocks
+        pod_capacity: Service -> req/s per ready pod ("*" for any service)
+        pod_startup_s: Seconds from scale-up until a new pod is ready
+        cpu_cost: CPU core-seconds per request, for cpu and both types
+        start: Unix time of the first second
+
+    Returns:
+        Dict of service -> Simulation
+
+    Raises:
+        ValueError: If a service with traffic has no capacity or settings
+    """
+    simulations = {}
+    for service, series in sorted(rates.items()):
+        capacity = pod_capacity.get(service, pod_capacity.get("*"))
+        if capacity is None:
+            raise ValueError(f"No pod capacity for {service}; pass {service}=RPS")
+        simulations[service] = simulate(
+            service,
+            series,
+            HPAConfig.from_values(values, service),
+            capacity,
+            pod_startup_s=pod_startup_s,
+            cpu_cost=cpu_cost,
+            start=start,
+        )
+    return simulations
+
+
+def describe_simulation(simulation: Simulation) -> List[str]:
+    """
+    Display lines for a Simulation
+
+    Args:
+        simulation: Result of simulate
+
+    Returns:
+        Lines with the settings used and the totals
+    """
+    config = simulation.config
+    target = (
+        f"{config.rate_target:g} req/s per pod"
+        if config.type == "requestRate"
+        else f"{config.cpu_target:g}% CPU"
+        if config.type == "cpu"
+        else f"{config.rate_target:g} req/s per pod or {config.cpu_target:g}% CPU"
+    )
+    return [
+        f"{simulation.service}: {config.min_replicas}-{config.max_replicas} replicas "
+        f"at {target}, windows up {config.scale_up_window}s / down "
+        f"{config.scale_down_window}s",
+        f"  Requests over capacity: {simulation.excess_requests:,.0f} of "
+        f"{simulation.total_requests:,.0f} ({simulation.excess_share:.2%}), "
+        f"{simulation.seconds_over_capacity}s over capacity",
+        f"  Cost: {simulation.pod_hours:.1f} pod-hours, peak "
+        f"{simulation.peak_replicas} replicas, {simulation.scale_ups} scale-ups, "
+        f"{simulation.scale_downs} scale-downs",
+    ]
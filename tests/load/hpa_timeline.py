@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+HPA Scaling Timeline
+
+Records how HorizontalPodAutoscalers, their Deployments and pods change
+during a load run. Changes stream from the Kubernetes watch API (`kubectl
+get --raw <path>?watch=true`) rather than from polling, so every replica
+and readiness change is timestamped as it happens. The timeline then yields
+reaction metrics per HPA: time to first scale, time until the scaled-out
+capacity is ready, overshoot and flapping, checked against the
+scaleUp/scaleDown stabilization windows the chart configures.
+"""
+
+import json
+import logging
+import re
+import statistics
+import subprocess
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WATCH_PATHS = {
+    "hpa": "/apis/autoscaling/v2/namespaces/{namespace}/horizontalpodautoscalers",
+    "deployment": "/apis/apps/v1/namespaces/{namespace}/deployments",
+    "pod": "/api/v1/namespaces/{namespace}/pods",
+}
+SERVICES = ("raster", "stac", "vector", "multidim")
+# Kubernetes defaults when an HPA sets no behavior
+DEFAULT_SCALE_UP_WINDOW_S = 0
+DEFAULT_SCALE_DOWN_WINDOW_S = 300
+# Direction changes of the desired replicas beyond which an HPA is flapping
+MAX_REVERSALS = 1
+QUANTITY = re.compile(r"^([+-]?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)([a-zA-Z]*)$")
+QUANTITY_SUFFIXES = {
+    "": 1.0,
+    "n": 1e-9,
+    "u": 1e-6,
+    "m": 1e-3,
+    "k": 1e3,
+    "M": 1e6,
+    "G": 1e9,
+    "T": 1e12,
+    "Ki": 2.0**10,
+    "Mi": 2.0**20,
+    "Gi": 2.0**30,
+    "Ti": 2.0**40,
+}
+
+
+def parse_quantity(value: Any) -> float:
+    """
+    Parse a Kubernetes quantity ("100000m", "512Mi", "75") into a number
+
+    Args:
+        value: Quantity string or number
+
+    Returns:
+        Value in base units
+
+    Raises:
+        ValueError: If value is not a quantity
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = QUANTITY.match(str(value).strip())
+    if not match or match.group(2) not in QUANTITY_SUFFIXES:
+        raise ValueError(f"invalid quantity {value!r}")
+    return float(match.group(1)) * QUANTITY_SUFFIXES[match.group(2)]
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    """Unix time of an RFC 3339 timestamp from an object's metadata"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _metric_value(metric: Dict) -> Tuple[Optional[str], Optional[float]]:
+    """Name and current value of one entry of an HPA's status.currentMetrics"""
+    kind = metric.get("type", "")
+    source = metric.get(kind[:1].lower() + kind[1:]) or {}
+    name = source.get("name") or (source.get("metric") or {}).get("name")
+    current = source.get("current") or {}
+    for field in ("averageUtilization", "averageValue", "value"):
+        if current.get(field) is not None:
+            try:
+                return name, parse_quantity(current[field])
+            except ValueError:
+                return name, None
+    return name, None
+
+
+def hpa_sample(hpa: Dict) -> Dict:
+    """
+    Replica counts, metric values and behavior of an HPA object
+
+    Args:
+        hpa: autoscaling/v2 HorizontalPodAutoscaler
+
+    Returns:
+        Dict with name, target (Deployment name), desired, current, min and
+        max replicas, metrics (name -> current value) and the scale_up and
+        scale_down stabilization windows in seconds
+    """
+    spec = hpa.get("spec") or {}
+    status = hpa.get("status") or {}
+    behavior = spec.get("behavior") or {}
+    metrics = {}
+    for metric in status.get("currentMetrics") or []:
+        name, value = _metric_value(metric)
+        if name:
+            metrics[name] = value
+    return {
+        "name": hpa["metadata"]["name"],
+        "target": (spec.get("scaleTargetRef") or {}).get("name"),
+        "desired": status.get("desiredReplicas", 0),
+        "current": status.get("currentReplicas", 0),
+        "min": spec.get("minReplicas", 1),
+        "max": spec.get("maxReplicas"),
+        "metrics": metrics,
+        "scale_up_window": (behavior.get("scaleUp") or {}).get(
+            "stabilizationWindowSeconds"
+        ),
+        "scale_down_window": (behavior.get("scaleDown") or {}).get(
+            "stabilizationWindowSeconds"
+        ),
+    }
+
+
+def deployment_sample(deployment: Dict) -> Dict:
+    """Requested, ready and available replicas of a Deployment object"""
+    status = deployment.get("status") or {}
+    return {
+        "name": deployment["metadata"]["name"],
+        "replicas": (deployment.get("spec") or {}).get("replicas", 0),
+        "ready": status.get("readyReplicas", 0),
+        "available": status.get("availableReplicas", 0),
+    }
+
+
+def pod_sample(pod: Dict) -> Dict:
+    """Workload, readiness and creation/ready times of a Pod object"""
+    metadata = pod["metadata"]
+    labels = metadata.get("labels") or {}
+    ready: Dict = next(
+        (
+            condition
+            for condition in (pod.get("status") or {}).get("conditions") or []
+            if condition.get("type") == "Ready"
+        ),
+        {},
+    )
+    is_ready = ready.get("status") == "True"
+    return {
+        "name": metadata["name"],
+        "workload": labels.get("app.kubernetes.io/component") or labels.get("app"),
+        "ready": is_ready,
+        "created": _timestamp(metadata.get("creationTimestamp")),
+        "ready_at": _timestamp(ready.get("lastTransitionTime")) if is_ready else None,
+    }
+
+
+SAMPLERS: Dict[str, Callable[[Dict], Dict]] = {
+    "hpa": hpa_sample,
+    "deployment": deployment_sample,
+    "pod": pod_sample,
+}
+
+
+class HPATimeline:
+    """Watches HPAs, Deployments and pods of a namespace in the background"""
+
+    def __init__(self, namespace: str = "eoapi", kubectl: str = "kubectl"):
+        """
+        Create (but do not start) a recorder
+
+        Args:
+            namespace: Namespace to watch
+            kubectl: kubectl executable
+        """
+        self.namespace = namespace
+        self.kubectl = kubectl
+        self.events: List[Dict] = []
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._last: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "HPATimeline":
+        self.started_at = time.time()
+        for kind in WATCH_PATHS:
+            thread = threading.Thread(target=self._watch, args=(kind,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self) -> List[Dict]:
+        """Stop watching and return the recorded events in time order"""
+        self.stopped_at = time.time()
+        self._stopped.set()
+        with self._lock:
+            processes = list(self._processes.values())
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        with self._lock:
+            return sorted(self.events, key=lambda event: event["time"])
+
+    def __enter__(self) -> "HPATimeline":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def record(self, kind: str, event_type: str, obj: Dict) -> None:
+        """
+        Add one watch event, skipping updates that change nothing recorded
+
+        Args:
+            kind: "hpa", "deployment" or "pod"
+            event_type: Watch event type (ADDED, MODIFIED, DELETED)
+            obj: Object from the event
+        """
+        sample = SAMPLERS[kind](obj)
+        if event_type == "DELETED":
+            sample["deleted"] = True
+            if kind == "pod":
+                sample["ready"] = False
+        key = (kind, sample["name"])
+        with self._lock:
+            if self._last.get(key) == sample:
+                return
+            self._last[key] = sample
+            self.events.append({"time": time.time(), "kind": kind, **sample})
+
+    def _watch(self, kind: str) -> None:
+        """Stream watch events of one resource until stopped"""
+        path = WATCH_PATHS[kind].format(namespace=self.namespace)
+        resource_version = None
+        while not self._stopped.is_set():
+            query = "watch=true"
+            if resource_version:
+                query += f"&resourceVersion={resource_version}"
+            try:
+                process = subprocess.Popen(
+                    [self.kubectl, "get", "--raw", f"{path}?{query}"],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    text=True,
+                )
+            except OSError as e:
+                logger.error(f"Cannot watch {kind} resources: {e}")
+                return
+            with self._lock:
+                self._processes[kind] = process
+            # stop() may have run while the process was starting
+            if self._stopped.is_set():
+                process.terminate()
+
+            assert process.stdout is not None
+            relist = False
+            for line in process.stdout:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                obj = event.get("object") or {}
+                if event.get("type") == "ERROR":
+                    # Usually 410 Gone: the version expired, so list afresh
+                    resource_version = None
+                    relist = True
+                    break
+                resource_version = (obj.get("metadata") or {}).get(
+                    "resourceVersion", resource_version
+                )
+                try:
+                    self.record(kind, event.get("type", ""), obj)
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.debug(f"Skipping malformed {kind} event: {e}")
+            process.stdout.close()
+            if process.poll() is None:
+                process.terminate()
+            # A watch ended on purpose exits with the signal's code
+            if process.wait() != 0 and not relist and not self._stopped.is_set():
+                error = process.stderr.read().strip() if process.stderr else ""
+                logger.warning(f"Watching {kind} resources failed: {error}")
+                return
+
+
+def service_of_hpa(name: str) -> Optional[str]:
+    """eoAPI service an HPA or Deployment name belongs to, if any"""
+    for service in SERVICES:
+        if name.endswith((f"-{service}-hpa", f"-{service}")):
+            return service
+    return None
+
+
+def stabilization_windows(values: Dict) -> Dict[str, Dict[str, int]]:
+    """
+    scaleUp/scaleDown stabilization windows per service from chart values
+
+    Args:
+        values: Chart values, e.g. from results_store.load_values
+
+    Returns:
+        Dict of service -> {"scale_up": seconds, "scale_down": seconds}
+    """
+    windows = {}
+    for service in SERVICES:
+        behavior = ((values.get(service) or {}).get("autoscaling") or {}).get(
+            "behavior"
+        ) or {}
+        windows[service] = {
+            "scale_up": (behavior.get("scaleUp") or {}).get(
+                "stabilizationWindowSeconds", DEFAULT_SCALE_UP_WINDOW_S
+            ),
+            "scale_down": (behavior.get("scaleDown") or {}).get(
+                "stabilizationWindowSeconds", DEFAULT_SCALE_DOWN_WINDOW_S
+            ),
+        }
+    return windows
+
+
+def _value_at(samples: List[Dict], field: str, at: float) -> Optional[Any]:
+    """Value of field in the last sample at or before at"""
+    before = [sample[field] for sample in samples if sample["time"] <= at]
+    return before[-1] if before else None
+
+
+def reaction_metrics(
+    events: List[Dict],
+    load_start: float,
+    load_end: Optional[float] = None,
+    windows: Optional[Dict[str, Dict[str, int]]] = None,
+) -> Dict[str, Dict]:
+    """
+    How each HPA reacted to a load run
+
+    Args:
+        events: Recorded events, in time order
+        load_start: Unix time the load started
+        load_end: Unix time the load stopped (default: the last event)
+        windows: Stabilization windows per service from the chart values;
+            the HPA's own behavior (or the Kubernetes defaults) otherwise
+
+    Returns:
+        Dict of HPA name -> initial, peak and settled (at load_end) desired
+        replicas; first_scale_s (load start to the first scale-up),
+        ready_s (load start until the target Deployment had the peak
+        replicas ready), pod_ready_s (median creation-to-ready time of new
+        pods), overshoot (peak minus settled replicas), scale_ups,
+        scale_downs, reversals (direction changes), scale_down_after_s
+        (shortest time from a scale-up to a following scale-down), the
+        stabilization windows used and notes on anything outside them
+    """
+    end = load_end if load_end is not None else max(e["time"] for e in events)
+    hpas: Dict[str, List[Dict]] = {}
+    for event in events:
+        if event["kind"] == "hpa":
+            hpas.setdefault(event["name"], []).append(event)
+
+    reactions = {}
+    for name, samples in hpas.items():
+        initial = _value_at(samples, "desired", load_start)
+        if initial is None:
+            initial = samples[0]["desired"]
+        target = samples[-1]["target"]
+        service = service_of_hpa(name)
+
+        window = {
+            "scale_up": samples[-1]["scale_up_window"],
+            "scale_down": samples[-1]["scale_down_window"],
+        }
+        if windows and service in windows:
+            window = dict(windows[service])
+        if window["scale_up"] is None:
+            window["scale_up"] = DEFAULT_SCALE_UP_WINDOW_S
+        if window["scale_down"] is None:
+            window["scale_down"] = DEFAULT_SCALE_DOWN_WINDOW_S
+
+        # Changes of the desired replicas after the load started
+        changes: List[Tuple[float, int]] = []
+        desired = initial
+        for sample in samples:
+            if load_start < sample["time"] and sample["desired"] != desired:
+                changes.append((sample["time"], sample["desired"] - desired))
+                desired = sample["desired"]
+
+        during = [c for c in changes if c[0] <= end]
+        peak, level = initial, initial
+        for _, step in during:
+            level += step
+            peak = max(peak, level)
+        settled = _value_at(samples, "desired", end)
+        first_up = next((t for t, step in changes if step > 0), None)
+
+        ready_s = None
+        if peak > initial:
+            for event in events:
+                if (
+                    event["kind"] == "deployment"
+                    and event["name"] == target
+                    and event["time"] > load_start
+                    and event["ready"] >= peak
+                ):
+                    ready_s = event["time"] - load_start
+                    break
+
+        startup = [
+            event["ready_at"] - event["created"]
+            for event in events
+            if event["kind"] == "pod"
+            and event["ready_at"] is not None
+            and event["created"] is not None
+            and event["created"] > load_start
+            and (event["workload"] == service or event["name"].startswith(f"{target}-"))
+        ]
+
+        directions = [step > 0 for _, step in changes]
+        reversals = sum(1 for a, b in zip(directions, directions[1:]) if a != b)
+        last_up: Optional[float] = None
+        scale_down_after = []
+        for t, step in changes:
+            if step > 0:
+                last_up = t
+            elif last_up is not None:
+                scale_down_after.append(t - last_up)
+
+        notes = []
+        first_scale_s = first_up - load_start if first_up is not None else None
+        if first_scale_s is not None and first_scale_s < window["scale_up"]:
+            notes.append(
+                f"scaled up {first_scale_s:.0f}s after load started, inside the "
+                f"{window['scale_up']}s scaleUp stabilization window"
+            )
+        if scale_down_after and min(scale_down_after) < window["scale_down"]:
+            notes.append(
+                f"scaled down {min(scale_down_after):.0f}s after scaling up, "
+                f"inside the {window['scale_down']}s scaleDown stabilization window"
+            )
+        if reversals > MAX_REVERSALS:
+            notes.append(f"flapping: desired replicas changed direction {reversals}×")
+
+        reactions[name] = {
+            "target": target,
+            "initial_replicas": initial,
+            "peak_replicas": peak,
+            "settled_replicas": settled,
+            "first_scale_s": first_scale_s,
+            "ready_s": ready_s,
+            "pod_ready_s": statistics.median(startup) if startup else None,
+            "overshoot": peak - settled if settled is not None else None,
+            "scale_ups": sum(1 for _, step in changes if step > 0),
+            "scale_downs": sum(1 for _, step in changes if step < 0),
+            "reversals": reversals,
+            "scale_down_after_s": min(scale_down_after) if scale_down_after else None,
+            "windows": window,
+            "notes": notes,
+        }
+    return reactions
+
+
+def describe_reactions(reactions: Dict[str, Dict]) -> List[str]:
+    """
+    Display lines for reaction_metrics
+
+    Args:
+        reactions: Result of reaction_metrics
+
+    Returns:
+        One line per HPA, then one per note
+    """
+
+    def seconds(value: Optional[float]) -> str:
+        return f"{value:.0f}s" if value is not None else "never"
+
+    lines = []
+    for name, r in reactions.items():
+        lines.append(
+            f"{name}: {r['initial_replicas']}→{r['peak_replicas']} replicas, "
+            f"first scale {seconds(r['first_scale_s'])}, "
+            f"ready {seconds(r['ready_s'])}, overshoot {r['overshoot']}, "
+            f"{r['reversals']} reversals (windows: up {r['windows']['scale_up']}s, "
+            f"down {r['windows']['scale_down']}s)"
+        )
+        lines.extend(f"  {name}: {note}" for note in r["notes"])
+    return lines
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Numeric Summaries of Prometheus Range Results
+
+Converts query_range matrices collected by prometheus_utils into NumPy
+arrays and reduces them to the numbers a load test report needs: per-pod and
+per-workload CPU (mean/p95/max cores), peak working-set memory, HPA replica
+timelines with time-to-scale, and database connection peaks.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Deployment pods are <deployment>-<replicaset hash>-<suffix>, StatefulSet
+# pods <statefulset>-<ordinal>
+POD_NAME = re.compile(r"^(?P<workload>.+?)(?:(?:-[a-z0-9]{6,10})?-[a-z0-9]{5}|-\d+)$")
+BYTES_PER_MIB = 1024 * 1024
+
+
+@dataclass
+class Series:
+    """One Prometheus series as sample times (Unix seconds) and values"""
+
+    labels: Dict[str, str]
+    times: np.ndarray
+    values: np.ndarray
+
+
+def to_series(data: Optional[Dict]) -> List[Series]:
+    """
+    Convert a query_range result into arrays
+
+    Args:
+        data: "data" object of a Prometheus range query (resultType matrix)
+
+    Returns:
+        One Series per result, samples ordered by time; NaN samples dropped
+    """
+    series = []
+    for entry in (data or {}).get("result") or []:
+        values = entry.get("values") or []
+        if not values:
+            continue
+        samples = np.asarray(values, dtype=float)
+        samples = samples[np.argsort(samples[:, 0], kind="stable")]
+        keep = ~np.isnan(samples[:, 1])
+        if not keep.any():
+            continue
+        series.append(
+            Series(entry.get("metric", {}), samples[keep, 0], samples[keep, 1])
+        )
+    return series
+
+
+def workload_of(pod: str) -> str:
+    """Deployment or StatefulSet name a pod belongs to"""
+    match = POD_NAME.match(pod)
+    return match["workload"] if match else pod
+
+
+def sum_series(series: List[Series], labels: Optional[Dict[str, str]] = None) -> Series:
+    """
+    Sum series at each sample time
+
+    Args:
+        series: Non-empty list of series
+        labels: Labels of the summed series
+
+    Returns:
+        Series over the union of sample times
+    """
+    times, inverse = np.unique(
+        np.concatenate([s.times for s in series]), return_inverse=True
+    )
+    values = np.bincount(inverse, weights=np.concatenate([s.values for s in series]))
+    return Series(labels or {}, times, values)
+
+
+def sum_by(series: List[Series], label: str) -> Dict[str, Series]:
+    """
+    Sum series sharing a label value at each sample time
+
+    Args:
+        series: Series to group
+        label: Label to group by (series without it are grouped under "")
+
+    Returns:
+        Dict of label value -> summed Series
+    """
+    grouped: Dict[str, List[Series]] = {}
+    for s in series:
+        grouped.setdefault(s.labels.get(label, ""), []).append(s)
+    return {key: sum_series(members, {label: key}) for key, members in grouped.items()}
+
+
+def _stats(values: np.ndarray) -> Dict[str, float]:
+    return {
+        "mean": float(values.mean()),
+        "p95": float(np.percentile(values, 95)),
+        "max": float(values.max()),
+    }
+
+
+def cpu_stats(data: Optional[Dict]) -> Dict[str, Dict]:
+    """
+    CPU usage per pod and per workload in cores
+
+    Args:
+        data: Range result of the per-container CPU rate query
+
+    Returns:
+        Dict with "pods" (pod -> mean/p95/max) and "workloads" (workload ->
+        pod count, total mean/p95/max and the highest single-pod peak)
+    """
+    pods = sum_by(to_series(data), "pod")
+    pods.pop("", None)
+    by_workload: Dict[str, List[Series]] = {}
+    for pod, s in pods.items():
+        by_workload.setdefault(workload_of(pod), []).append(s)
+
+    workloads = {}
+    for workload, members in by_workload.items():
+        total = sum_series(members)
+        workloads[workload] = {
+            "pods": len(members),
+            **_stats(total.values),
+            "pod_peak": max(float(s.values.max()) for s in members),
+        }
+    return {
+        "pods": {pod: _stats(s.values) for pod, s in sorted(pods.items())},
+        "workloads": dict(sorted(workloads.items())),
+    }
+
+
+def memory_stats(data: Optional[Dict]) -> Dict[str, Dict]:
+    """
+    Peak working-set memory per pod and per workload in MiB
+
+    Args:
+        data: Range result of the per-container working set query
+
+    Returns:
+        Dict with "pods" (pod -> peak MiB) and "workloads" (workload -> peak
+        MiB of any single pod)
+    """
+    pods = sum_by(to_series(data), "pod")
+    pods.pop("", None)
+    peaks = {pod: float(s.values.max()) / BYTES_PER_MIB for pod, s in pods.items()}
+    workloads: Dict[str, float] = {}
+    for pod, peak in peaks.items():
+        workload = workload_of(pod)
+        workloads[workload] = max(workloads.get(workload, 0.0), peak)
+    return {
+        "pods": dict(sorted(peaks.items())),
+        "workloads": dict(sorted(workloads.items())),
+    }
+
+
+def replica_stats(
+    current: Optional[Dict], desired: Optional[Dict] = None
+) -> Dict[str, Dict]:
+    """
+    HPA replica timelines and time-to-scale
+
+    Time-to-scale runs from the first sample where the HPA wanted more
+    replicas than it started with (or, without desired replica data, the
+    first increase) to the first sample at the peak replica count. Its
+    resolution is the query step.
+
+    Args:
+        current: Range result of kube_horizontalpodautoscaler_status_current_replicas
+        desired: Range result of kube_horizontalpodautoscaler_status_desired_replicas
+
+    Returns:
+        Dict of HPA name -> start/min/max/end replicas, time_to_scale_s (None
+        if it never scaled up) and changes as [unix time, replicas] pairs
+    """
+    wanted = {
+        s.labels.get("horizontalpodautoscaler", ""): s for s in to_series(desired)
+    }
+    stats = {}
+    for s in to_series(current):
+        name = s.labels.get("horizontalpodautoscaler", "")
+        values = s.values
+        start = values[0]
+        peak = values.max()
+        changed = np.flatnonzero(np.diff(values)) + 1
+        changes = [[float(s.times[0]), int(start)]] + [
+            [float(s.times[i]), int(values[i])] for i in changed
+        ]
+
+        time_to_scale = None
+        if peak > start:
+            reached = s.times[np.argmax(values >= peak)]
+            trigger = wanted.get(name)
+            if trigger is not None and (trigger.values > start).any():
+                began = trigger.times[np.argmax(trigger.values > start)]
+            else:
+                began = s.times[np.argmax(values > start)]
+            time_to_scale = float(max(reached - began, 0.0))
+
+        stats[name] = {
+            "start": int(start),
+            "min": int(values.min()),
+            "max": int(peak),
+            "end": int(values[-1]),
+            "time_to_scale_s": time_to_scale,
+            "changes": changes,
+        }
+    return dict(sorted(stats.items()))
+
+
+def connection_stats(data: Optional[Dict]) -> Optional[Dict[str, float]]:
+    """
+    Database connection peak and mean across all databases and states
+
+    Args:
+        data: Range result of pg_stat_activity_count
+
+    Returns:
+        Dict with peak and mean connections, or None without data
+    """
+    series = to_series(data)
+    if not series:
+        return None
+    total = sum_series(series)
+    return {"peak": float(total.values.max()), "mean": float(total.values.mean())}
+
+
+def infrastructure_stats(metrics: Dict) -> Dict[str, Dict]:
+    """
+    Numeric summary of collect_test_metrics results
+
+    Args:
+        metrics: Infrastructure metrics dict
+
+    Returns:
+        Dict with "cpu", "memory", "replicas" and "db_connections" sections
+        for the metrics that were collected
+    """
+    pod = metrics.get("pod_metrics") or {}
+    hpa = metrics.get("hpa_metrics") or {}
+    db = metrics.get("database_metrics") or {}
+
+    stats: Dict[str, Dict] = {}
+    if pod.get("cpu"):
+        stats["cpu"] = cpu_stats(pod["cpu"])
+    if pod.get("memory"):
+        stats["memory"] = memory_stats(pod["memory"])
+    if hpa.get("current_replicas"):
+        stats["replicas"] = replica_stats(
+            hpa["current_replicas"], hpa.get("desired_replicas")
+        )
+    connections = connection_stats(db.get("db_connections"))
+    if connections:
+        stats["db_connections"] = connections
+    return stats
+
+
+def describe_stats(stats: Dict[str, Dict]) -> Dict[str, str]:
+    """
+    One readable line per workload, HPA and database
+
+    Args:
+        stats: Result of infrastructure_stats
+
+    Returns:
+        Dict of display key -> summary, e.g. "replicas eoapi-raster" ->
+        "3→7 in 94s (min 3, end 7)"
+    """
+    lines = {}
+    memory = stats.get("memory", {}).get("workloads", {})
+    for workload, cpu in stats.get("cpu", {}).get("workloads", {}).items():
+        line = (
+            f"{cpu['pods']} pods, peak {cpu['pod_peak']:.2f} cores/pod; total "
+            f"mean {cpu['mean']:.2f}, p95 {cpu['p95']:.2f}, max {cpu['max']:.2f} cores"
+        )
+        if workload in memory:
+            line += f"; memory peak {memory[workload]:.0f} MiB/pod"
+        lines[f"cpu {workload}"] = line
+    for workload, peak in memory.items():
+        if f"cpu {workload}" not in lines:
+            lines[f"memory {workload}"] = f"peak {peak:.0f} MiB/pod"
+
+    for name, replicas in stats.get("replicas", {}).items():
+        if replicas["time_to_scale_s"] is not None:
+            line = (
+                f"{replicas['start']}→{replicas['max']} in "
+                f"{replicas['time_to_scale_s']:.0f}s"
+            )
+        else:
+            line = f"steady at {replicas['start']}"
+        lines[f"replicas {name}"] = (
+            f"{line} (min {replicas['min']}, end {replicas['end']})"
+        )
+
+    if "db_connections" in stats:
+        db = stats["db_connections"]
+        lines["db_connections"] = f"peak {db['peak']:.0f}, mean {db['mean']:.1f}"
+    return lines
@@ -10,19 +10,64 @@ import argparse
 import concurrent.futures
 import json
 import logging
+import multiprocessing
 import os
 import random
-import statistics
 import subprocess
 import sys
+import threading
 import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from .distributed import run_forked, split_evenly
+from .histogram import DEFAULT_SIGNIFICANT_DIGITS
+from .hpa_timeline import (
+    HPATimeline,
+    describe_reactions,
+    reaction_metrics,
+    stabilization_windows,
+)
+from .hpa_simulator import (
+    DEFAULT_POD_STARTUP_S,
+    describe_simulation,
+    load_rates,
+    simulate_services,
+)
+from .notification_benchmark import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_COALESCE_WINDOW_MS,
+    DEFAULT_COLLECTION,
+    DEFAULT_DELIVERY,
+    DEFAULT_DRAIN_S,
+    DEFAULT_MAX_LATENCY_MS,
+    DEFAULT_RELAY_WORKERS,
+    DELIVERY_MODES,
+    NotificationBenchmark,
+    describe_benchmark,
+)
+from .recorder import NO_RESPONSE, RequestRecorder
+from .regression import (
+    DEFAULT_ALPHA,
+    DEFAULT_MIN_RUNS,
+    DEFAULT_TOLERANCE,
+    MetricComparison,
+    compare_reports,
+)
+from .results_store import (
+    DEFAULT_CHART_DIR,
+    DEFAULT_STORE,
+    Deployment,
+    ResultsStore,
+    load_values,
+)
+from .search import LevelDeadline, search_breaking_point, throughput_steady
+from .timeseries import export_timeseries, timeseries_format
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -32,6 +77,7 @@ logger = logging.getLogger(__name__)
 
 try:
     from .prometheus_utils import (
+        DEFAULT_CACHE_DIR,
         PrometheusClient,
         collect_test_metrics,
         summarize_metrics,
@@ -40,8 +86,53 @@ try:
     PROMETHEUS_AVAILABLE = True
 except ImportError:
     PROMETHEUS_AVAILABLE = False
+    DEFAULT_CACHE_DIR = None
     logger.warning("Prometheus utilities not available")
 
+try:
+    from .capacity import (
+        DEFAULT_DB_CONNECTIONS,
+        DEFAULT_DB_TIME_FRACTION,
+        DEFAULT_HEADROOM,
+        SERVICES,
+        ServiceSettings,
+        describe_plan,
+        load_stress_runs,
+        plan_capacity,
+        service_of,
+    )
+    from .infra_stats import infrastructure_stats
+    from .saturation import analyze_saturation, describe_saturation
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    DEFAULT_DB_CONNECTIONS, DEFAULT_DB_TIME_FRACTION, DEFAULT_HEADROOM = 80, 0.5, 0.2
+    SERVICES = ("raster", "stac", "vector", "multidim")
+
+try:
+    from .async_engine import DEFAULT_MAX_CONNECTIONS, AsyncLoadEngine
+    from .replay import ReplayRequest, ReplayRunner, load_requests
+    from .scenario import Scenario, ScenarioResult, ScenarioRunner, load_scenario
+    from .stac_search import SearchLoadRunner, SearchSpace
+    from .tiles import (
+        DEFAULT_MAX_EMPTY_SHARE,
+        EMPTY_STEP,
+        TileLoadRunner,
+        TileWorkload,
+        empty_share,
+        parse_bbox,
+        parse_viewport,
+        parse_zoom_weights,
+    )
+
+    ASYNC_ENGINE_AVAILABLE = True
+except ImportError:
+    ASYNC_ENGINE_AVAILABLE = False
+    DEFAULT_MAX_CONNECTIONS = 100
+    DEFAULT_MAX_EMPTY_SHARE = 0.2
+    logger.warning("Async load engine not available (httpx missing)")
+
 # Constants
 DEFAULT_MAX_WORKERS = 50
 DEFAULT_TIMEOUT = 30
@@ -49,11 +140,32 @@ DEFAULT_SUCCESS_THRESHOLD = 95.0
 LIGHT_LOAD_WORKERS = 3
 LIGHT_LOAD_DURATION = 5
 MODERATE_LOAD_WORKERS = 10
+DEFAULT_DURATION = 60
 STRESS_TEST_WORKERS = 20
 REQUEST_DELAY = 0.1  # Delay between request submissions
 RETRY_TOTAL = 3
 RETRY_BACKOFF_FACTOR = 1
 RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+ENGINES = ["thread", "async"]
+
+
+class _ThreadedResults:
+    """Thread-safe sink for results of requests running in a thread pool"""
+
+    def __init__(self, recorder: RequestRecorder):
+        self.recorder = recorder
+        self._lock = threading.Lock()
+
+    def collect(self, future: concurrent.futures.Future) -> None:
+        """Done-callback that records one finished fetch future"""
+        status, latency_ms = future.result()
+        with self._lock:
+            self.recorder.record(status == 200, latency_ms, status=status)
+
+    def reached(self, deadline: LevelDeadline, now: float) -> bool:
+        """Whether the run is over, judged on the results recorded so far"""
+        with self._lock:
+            return deadline.reached(now, self.recorder)
 
 
 class LoadTester:
@@ -66,6 +178,11 @@ class LoadTester:
         timeout: int = DEFAULT_TIMEOUT,
         prometheus_url: Optional[str] = None,
         namespace: str = "eoapi",
+        engine: str = "thread",
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        histogram_digits: int = DEFAULT_SIGNIFICANT_DIGITS,
+        processes: int = 1,
+        prometheus_cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
     ):
         """
         Initialize LoadTester with validation
@@ -76,6 +193,12 @@ class LoadTester:
             timeout: Request timeout in seconds
             prometheus_url: Optional Prometheus URL for infrastructure metrics
             namespace: Kubernetes namespace for Prometheus queries
+            engine: Request engine, "thread" (requests) or "async" (httpx)
+            max_connections: Connection pool size for the async engine
+            histogram_digits: Significant digits kept by latency histograms (1-5)
+            processes: Number of forked generator processes sharing each load level
+            prometheus_cache_dir: Directory caching Prometheus range query
+                responses, or None to disable the cache
 
         Raises:
             ValueError: If parameters are invalid
@@ -91,18 +214,46 @@ class LoadTester:
             raise ValueError(f"max_workers must be a positive integer: {max_workers}")
         if not isinstance(timeout, int) or timeout <= 0:
             raise ValueError(f"timeout must be a positive integer: {timeout}")
+        if engine not in ENGINES:
+            raise ValueError(f"engine must be one of {ENGINES}: {engine}")
+        if engine == "async" and not ASYNC_ENGINE_AVAILABLE:
+            raise ValueError("async engine requires httpx to be installed")
+        if not isinstance(processes, int) or processes <= 0:
+            raise ValueError(f"processes must be a positive integer: {processes}")
+        if histogram_digits not in range(1, 6):
+            raise ValueError(
+                f"histogram_digits must be between 1 and 5: {histogram_digits}"
+            )
 
         self.base_url = base_url.rstrip("/")
         self.max_workers = max_workers
         self.timeout = timeout
         self.prometheus_url = prometheus_url
         self.namespace = namespace
+        self.engine = engine
+        self.histogram_digits = histogram_digits
+        self.max_connections = max_connections
+        self.processes = processes
         self.session = self._create_session()
+        # Open-loop runs count every response as it comes, as the async
+        # engine does: a retried 502/503/504 would pass as one slow success
+        self.open_loop_session = self._create_session(retry=False)
+        self.async_engine = (
+            AsyncLoadEngine(
+                timeout,
+                max_connections=max_connections,
+                histogram_digits=histogram_digits,
+            )
+            if engine == "async"
+            else None
+        )
 
         # Initialize Prometheus client if available and URL provided
         self.prometheus = None
         if PROMETHEUS_AVAILABLE and prometheus_url:
-            self.prometheus = PrometheusClient(prometheus_url)
+            self.prometheus = PrometheusClient(
+                prometheus_url, cache_dir=prometheus_cache_dir
+            )
             if self.prometheus.available:
                 logger.info(f"Prometheus integration enabled: {prometheus_url}")
             else:
@@ -111,114 +262,329 @@ class LoadTester:
 
         logger.info(
             f"LoadTester initialized: base_url={self.base_url}, "
-            f"max_workers={self.max_workers}, timeout={self.timeout}"
+            f"max_workers={self.max_workers}, timeout={self.timeout}, "
+            f"engine={self.engine}, processes={self.processes}"
         )
 
-    def _create_session(self) -> requests.Session:
-        """Create a session with retry strategy"""
+    def _create_session(self, retry: bool = True) -> requests.Session:
+        """Create a session, with the retry strategy unless retry is False"""
         session = requests.Session()
 
         # Retry strategy
-        retry_strategy = Retry(
-            total=RETRY_TOTAL,
-            backoff_factor=RETRY_BACKOFF_FACTOR,
-            status_forcelist=RETRY_STATUS_CODES,
+        retry_strategy = (
+            Retry(
+                total=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=RETRY_STATUS_CODES,
+            )
+            if retry
+            else 0
         )
 
         adapter = HTTPAdapter(max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
 
-        logger.debug("HTTP session created with retry strategy")
+        logger.debug(f"HTTP session created (retries: {retry})")
         return session
 
-    def make_request(self, url: str) -> Tuple[bool, float]:
+    def make_request(
+        self, url: str, scheduled_at: Optional[float] = None
+    ) -> Tuple[bool, float]:
         """
         Make a single request and return success status with latency
 
         Args:
             url: URL to request
+            scheduled_at: Optional time.time() the request was scheduled for;
+                latency is measured from it to correct coordinated omission
 
         Returns:
             Tuple of (success, latency_ms) where success is True if 200 status
         """
-        start_time = time.time()
+        status, latency_ms = self.fetch(url, scheduled_at)
+        return status == 200, latency_ms
+
+    def fetch(
+        self,
+        url: str,
+        scheduled_at: Optional[float] = None,
+        session: Optional[requests.Session] = None,
+    ) -> Tuple[int, float]:
+        """
+        Make a single request and return its status with latency
+
+        Args:
+            url: URL to request
+            scheduled_at: Optional time.time() the request was scheduled for;
+                latency is measured from it to correct coordinated omission
+            session: Session to send with (default: the retrying session)
+
+        Returns:
+            Tuple of (status, latency_ms); status is NO_RESPONSE if the
+            request failed without a response
+        """
+        start_time = scheduled_at if scheduled_at is not None else time.time()
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = (session or self.session).get(url, timeout=self.timeout)
             latency_ms = (time.time() - start_time) * 1000
-            success = response.status_code == 200
-            if not success:
+            if response.status_code != 200:
                 logger.debug(f"Request to {url} returned status {response.status_code}")
-            return success, latency_ms
+            return response.status_code, latency_ms
         except requests.exceptions.Timeout:
-            latency_ms = (time.time() - start_time) * 1000
             logger.debug(f"Request to {url} timed out after {self.timeout}s")
-            return False, latency_ms
         except requests.exceptions.ConnectionError as e:
-            latency_ms = (time.time() - start_time) * 1000
             logger.debug(f"Connection error for {url}: {e}")
-            return False, latency_ms
         except requests.exceptions.RequestException as e:
-            latency_ms = (time.time() - start_time) * 1000
             logger.debug(f"Request failed for {url}: {e}")
-            return False, latency_ms
         except Exception as e:
-            latency_ms = (time.time() - start_time) * 1000
             logger.error(f"Unexpected error in make_request for {url}: {e}")
-            return False, latency_ms
+        return NO_RESPONSE, (time.time() - start_time) * 1000
 
-    def test_concurrency_level(
+    def _run_threaded(
+        self, url: str, workers: int, deadline: LevelDeadline
+    ) -> RequestRecorder:
+        """
+        Submit blocking requests to a thread pool until the deadline
+
+        Args:
+            url: URL to test
+            workers: Number of worker threads
+            deadline: When the level stops
+
+        Returns:
+            RequestRecorder with counters, latency histogram and duration
+        """
+        start_time = time.time()
+        deadline.start(start_time)
+        results = _ThreadedResults(RequestRecorder(self.histogram_digits))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            # Submit requests until the level is over
+            while not results.reached(deadline, time.time()):
+                future = executor.submit(self.fetch, url)
+                future.add_done_callback(results.collect)
+                time.sleep(REQUEST_DELAY)
+
+        results.recorder.duration = time.time() - start_time
+        return results.recorder
+
+    def _run_threaded_rate(
+        self, url: str, rate: float, deadline: LevelDeadline
+    ) -> RequestRecorder:
+        """
+        Submit blocking requests to a thread pool on a fixed arrival schedule
+
+        Requests are not retried, so a 502/503/504 counts as a failure rather
+        than as a success whose latency includes the retry backoff.
+
+        Args:
+            url: URL to test
+            rate: Target arrival rate in requests per second
+            deadline: When the level stops
+
+        Returns:
+            RequestRecorder with counters, latency histogram and duration
+        """
+        start_time = time.time()
+        deadline.start(start_time)
+        results = _ThreadedResults(RequestRecorder(self.histogram_digits))
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as executor:
+            i = 0
+            while not results.reached(deadline, start_time + i / rate):
+                scheduled_at = start_time + i / rate
+                delay = scheduled_at - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                future = executor.submit(
+                    self.fetch,
+                    url,
+                    scheduled_at=scheduled_at,
+                    session=self.open_loop_session,
+                )
+                future.add_done_callback(results.collect)
+                i += 1
+
+        results.recorder.duration = time.time() - start_time
+        return results.recorder
+
+    def _run_level(
         self,
         url: str,
-        workers: int,
-        duration: int = 10,
-        collect_infra_metrics: bool = False,
-    ) -> Dict:
+        duration: int,
+        workers: Optional[int] = None,
+        rate: Optional[float] = None,
+        deadline: Optional[LevelDeadline] = None,
+    ) -> RequestRecorder:
         """
-        Test a specific concurrency level for a given duration
+        Run one load level with the configured engine and process count
 
         Args:
             url: URL to test
-            workers: Number of concurrent workers
             duration: Test duration in seconds
-            collect_infra_metrics: Whether to collect Prometheus infrastructure metrics
+            workers: Concurrent workers (closed-loop), used when rate is None
+            rate: Open-loop arrival rate in requests per second
+            deadline: Optional deadline that extends the level past duration
+                without restarting its load
 
         Returns:
-            Dict with metrics including success rate, latencies, throughput, and optional infra metrics
+            RequestRecorder with the results of the level
         """
-        logger.info(f"Testing {url} with {workers} concurrent requests for {duration}s")
+        deadline = deadline or LevelDeadline(duration)
+        if self.processes > 1:
+            return self._run_processes(url, deadline, workers=workers, rate=rate)
+        if rate is not None:
+            if self.async_engine:
+                return self.async_engine.run_constant_rate(
+                    url, rate, duration, deadline=deadline
+                )
+            return self._run_threaded_rate(url, rate, deadline)
+        if workers is None:
+            raise ValueError("either workers or rate is required")
+        if self.async_engine:
+            return self.async_engine.run_concurrency_level(
+                url, workers, duration, deadline=deadline
+            )
+        return self._run_threaded(url, workers, deadline)
 
-        test_start = datetime.now()
-        start_time = time.time()
-        success_count = 0
-        total_requests = 0
-        latencies: List[float] = []
+    def _run_until_steady(
+        self,
+        url: str,
+        duration: int,
+        max_duration: int,
+        workers: Optional[int] = None,
+        rate: Optional[float] = None,
+    ) -> Tuple[RequestRecorder, bool]:
+        """
+        Run one load level, extending it until its throughput is steady
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = []
+        The level runs for duration, then keeps its load going while the
+        windowed throughput of its live results is still changing, up to
+        max_duration.
 
-            # Submit requests for the specified duration
-            while time.time() - start_time < duration:
-                future = executor.submit(self.make_request, url)
-                futures.append(future)
-                total_requests += 1
-                time.sleep(REQUEST_DELAY)
+        Args:
+            url: URL to test
+            duration: Seconds the level runs at least
+            max_duration: Longest the level may run in seconds
+            workers: Concurrent workers (closed-loop), used when rate is None
+            rate: Open-loop arrival rate in requests per second
 
-            # Collect results and latencies
-            for future in concurrent.futures.as_completed(futures):
-                success, latency_ms = future.result()
-                if success:
-                    success_count += 1
-                latencies.append(latency_ms)
+        Returns:
+            Tuple of (RequestRecorder of the whole level, whether it reached
+            a steady state)
+        """
+        deadline = LevelDeadline(duration, max_duration, settled=throughput_steady)
+        recorder = self._run_level(
+            url, duration, workers=workers, rate=rate, deadline=deadline
+        )
+        if not deadline.steady:
+            logger.info(f"Throughput not steady after {recorder.duration:.0f}s")
+        return recorder, deadline.steady
 
-        test_end = datetime.now()
-        actual_duration = time.time() - start_time
+    def _run_processes(
+        self,
+        url: str,
+        deadline: LevelDeadline,
+        workers: Optional[int] = None,
+        rate: Optional[float] = None,
+    ) -> RequestRecorder:
+        """
+        Split a load level across forked generator processes and merge results
+
+        A deadline with a settled check is judged by the first generator on
+        its share of the load; the others stop when it does.
+
+        Args:
+            url: URL to test
+            deadline: When the level stops
+            workers: Total concurrent workers, split across processes
+            rate: Total arrival rate, split across processes
+
+        Returns:
+            Merged RequestRecorder from all generator processes
+        """
+        if rate is not None:
+            shares: List[Tuple[Optional[int], Optional[float]]] = [
+                (None, share) for share in split_evenly(rate, self.processes)
+            ]
+        elif workers is not None:
+            shares = [
+                (share, None)
+                for share in split_evenly(workers, min(workers, self.processes))
+            ]
+        else:
+            raise ValueError("either workers or rate is required")
+
+        settled = multiprocessing.get_context("fork").Event()
+
+        def share_deadline(leader: bool) -> LevelDeadline:
+            if deadline.settled is None:
+                return LevelDeadline(deadline.duration)
+            check = deadline.settled
+
+            def leader_settled(recorder: RequestRecorder) -> bool:
+                if check(recorder):
+                    settled.set()
+                return settled.is_set()
+
+            return LevelDeadline(
+                deadline.duration,
+                deadline.max_duration,
+                settled=leader_settled if leader else lambda _: settled.is_set(),
+            )
+
+        def make_job(share_workers, share_rate, leader):
+            def job() -> RequestRecorder:
+                # Each generator gets a fresh session/event loop; nothing
+                # network-related is shared with the parent across fork
+                tester = LoadTester(
+                    base_url=self.base_url,
+                    max_workers=max(1, self.max_workers // len(shares)),
+                    timeout=self.timeout,
+                    engine=self.engine,
+                    max_connections=max(1, self.max_connections // len(shares)),
+                    histogram_digits=self.histogram_digits,
+                )
+                return tester._run_level(
+                    url,
+                    int(deadline.duration),
+                    workers=share_workers,
+                    rate=share_rate,
+                    deadline=share_deadline(leader),
+                )
+
+            return job
+
+        recorder = run_forked(
+            [make_job(w, r, i == 0) for i, (w, r) in enumerate(shares)],
+            deadline.max_duration,
+        )
+        deadline.done = True
+        deadline.steady = settled.is_set()
+        return recorder
+
+    def _build_metrics(self, recorder: RequestRecorder) -> Dict:
+        """
+        Aggregate a run's recorder into the metrics dict
+
+        Args:
+            recorder: Results of the run
+
+        Returns:
+            Dict with success rate, latency percentiles, throughput and a
+            per-second timeline
+        """
+        success_count = recorder.success_count
+        total_requests = recorder.total_requests
+        actual_duration = recorder.duration
         success_rate = (
             (success_count / total_requests) * 100 if total_requests > 0 else 0
         )
 
-        # Calculate latency metrics
-        metrics: Dict[str, float | Dict] = {
+        metrics: Dict[str, float | Dict | List] = {
             "success_count": success_count,
             "total_requests": total_requests,
             "success_rate": success_rate,
@@ -228,39 +594,143 @@ class LoadTester:
             else 0,
         }
 
-        if latencies:
-            sorted_latencies = sorted(latencies)
-            metrics.update(
-                {
-                    "latency_min": min(latencies),
-                    "latency_max": max(latencies),
-                    "latency_avg": statistics.mean(latencies),
-                    "latency_p50": statistics.median(sorted_latencies),
-                    "latency_p95": sorted_latencies[int(len(sorted_latencies) * 0.95)]
-                    if len(sorted_latencies) > 1
-                    else sorted_latencies[0],
-                    "latency_p99": sorted_latencies[int(len(sorted_latencies) * 0.99)]
-                    if len(sorted_latencies) > 1
-                    else sorted_latencies[0],
-                }
+        # Latency metrics (min/max/avg and p50-p99.9) from the histogram
+        metrics.update(recorder.latencies.summary())
+        metrics["timeline"] = recorder.timeline()
+
+        return metrics
+
+    def _attach_infra_metrics(
+        self, metrics: Dict, test_start: datetime, test_end: datetime
+    ) -> None:
+        """Collect Prometheus metrics for the test window into metrics"""
+        if not self.prometheus:
+            return
+
+        logger.info("Collecting infrastructure metrics from Prometheus...")
+        infra_metrics = collect_test_metrics(
+            self.prometheus_url,
+            self.namespace,
+            test_start,
+            test_end,
+            client=self.prometheus,
+        )
+        if infra_metrics:
+            metrics["infrastructure"] = infra_metrics
+            if NUMPY_AVAILABLE:
+                metrics["infrastructure_summary"] = infrastructure_stats(infra_metrics)
+            summary = summarize_metrics(infra_metrics)
+            logger.info(f"Infrastructure metrics: {summary}")
+
+    def test_concurrency_level(
+        self,
+        url: str,
+        workers: int,
+        duration: int = 10,
+        collect_infra_metrics: bool = False,
+        max_duration: Optional[int] = None,
+    ) -> Dict:
+        """
+        Test a specific concurrency level for a given duration
+
+        Args:
+            url: URL to test
+            workers: Number of concurrent workers
+            duration: Test duration in seconds
+            collect_infra_metrics: Whether to collect Prometheus infrastructure metrics
+            max_duration: Extend the level past duration until throughput is
+                steady, up to this many seconds
+
+        Returns:
+            Dict with metrics including success rate, latencies, throughput, and optional infra metrics
+        """
+        logger.info(f"Testing {url} with {workers} concurrent requests for {duration}s")
+
+        test_start = datetime.now()
+        steady = None
+        if max_duration:
+            recorder, steady = self._run_until_steady(
+                url, duration, max_duration, workers=workers
             )
+        else:
+            recorder = self._run_level(url, duration, workers=workers)
+        test_end = datetime.now()
+
+        metrics = self._build_metrics(recorder)
+        if steady is not None:
+            metrics["steady_state"] = steady
 
         logger.info(
-            f"Workers: {workers}, Success: {success_rate:.1f}% ({success_count}/{total_requests}), "
+            f"Workers: {workers}, Success: {metrics['success_rate']:.1f}% "
+            f"({metrics['success_count']}/{metrics['total_requests']}), "
             f"Latency p50/p95/p99: {metrics.get('latency_p50', 0):.0f}/{metrics.get('latency_p95', 0):.0f}/{metrics.get('latency_p99', 0):.0f}ms, "
             f"Throughput: {metrics['throughput']:.1f} req/s"
         )
 
         # Collect infrastructure metrics if requested and available
-        if collect_infra_metrics and self.prometheus:
-            logger.info("Collecting infrastructure metrics from Prometheus...")
-            infra_metrics = collect_test_metrics(
-                self.prometheus_url, self.namespace, test_start, test_end
+        if collect_infra_metrics:
+            self._attach_infra_metrics(metrics, test_start, test_end)
+
+        return metrics
+
+    def test_arrival_rate(
+        self,
+        url: str,
+        rate: float,
+        duration: int = 10,
+        collect_infra_metrics: bool = False,
+        max_duration: Optional[int] = None,
+    ) -> Dict:
+        """
+        Test a constant open-loop arrival rate for a given duration
+
+        Requests are sent on a fixed schedule whether or not earlier ones have
+        completed, and latency is measured from each request's intended send
+        time so a slow backend cannot hide queueing delay (coordinated omission).
+
+        Args:
+            url: URL to test
+            rate: Target arrival rate in requests per second
+            duration: Test duration in seconds
+            collect_infra_metrics: Whether to collect Prometheus infrastructure metrics
+            max_duration: Extend the level past duration until throughput is
+                steady, up to this many seconds
+
+        Returns:
+            Dict with the same metrics as test_concurrency_level plus target_rate
+
+        Raises:
+            ValueError: If rate is not positive
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive: {rate}")
+
+        logger.info(f"Testing {url} at {rate:g} req/s for {duration}s (open-loop)")
+
+        test_start = datetime.now()
+        steady = None
+        if max_duration:
+            recorder, steady = self._run_until_steady(
+                url, duration, max_duration, rate=rate
             )
-            if infra_metrics:
-                metrics["infrastructure"] = infra_metrics
-                summary = summarize_metrics(infra_metrics)
-                logger.info(f"Infrastructure metrics: {summary}")
+        else:
+            recorder = self._run_level(url, duration, rate=rate)
+        test_end = datetime.now()
+
+        metrics = self._build_metrics(recorder)
+        metrics["target_rate"] = rate
+        if steady is not None:
+            metrics["steady_state"] = steady
+
+        logger.info(
+            f"Rate: {rate:g} req/s, Success: {metrics['success_rate']:.1f}% "
+            f"({metrics['success_count']}/{metrics['total_requests']}), "
+            f"Latency p50/p95/p99: {metrics.get('latency_p50', 0):.0f}/{metrics.get('latency_p95', 0):.0f}/{metrics.get('latency_p99', 0):.0f}ms, "
+            f"Throughput: {metrics['throughput']:.1f} req/s"
+        )
+
+        if collect_infra_metrics:
+            self._attach_infra_metrics(metrics, test_start, test_end)
 
         return metrics
 
@@ -271,45 +741,134 @@ class LoadTester:
         step_size: int = 5,
         test_duration: int = 10,
         cooldown: int = 2,
-    ) -> Tuple[int, Dict]:
+        max_rate: Optional[float] = None,
+        rate_step: Optional[float] = None,
+        p95_threshold: Optional[float] = None,
+        search: str = "linear",
+        resolution: Optional[float] = None,
+        max_level_duration: Optional[int] = None,
+    ) -> Tuple[float, Dict]:
         """
-        Find the breaking point by gradually increasing concurrent load
+        Find the breaking point by gradually increasing load
+
+        Steps through worker counts by default. When max_rate is given it
+        steps through open-loop arrival rates instead. The adaptive search
+        doubles the load from the first step until a level breaks, then
+        bisects down to the resolution.
 
         Args:
             endpoint: API endpoint to test (relative to base_url)
             success_threshold: Minimum success rate to maintain
             step_size: Increment for number of workers
-            test_duration: Duration to test each concurrency level
+            test_duration: Duration to test each load level
             cooldown: Time to wait between tests
+            max_rate: Highest arrival rate (req/s) to test; enables rate mode
+            rate_step: Arrival rate increment (default: max_rate / 10)
+            p95_threshold: Optional maximum p95 latency (ms) to maintain
+            search: "linear" to step through every level, or "adaptive"
+            resolution: Bracket width adaptive search stops at (default: the
+                step size or rate step)
+            max_level_duration: Extend each level past test_duration until
+                its throughput is steady, up to this many seconds
 
         Returns:
-            Tuple of (breaking_point_workers, all_metrics)
+            Tuple of (breaking_point, all_metrics) keyed by workers or req/s
+
+        Raises:
+            ValueError: If the rate, rate step or search mode is invalid
         """
+        if search not in ("linear", "adaptive"):
+            raise ValueError(f"search must be linear or adaptive: {search!r}")
         url = f"{self.base_url}{endpoint}"
         logger.info(f"Starting stress test on {url}")
-        logger.info(
-            f"Max workers: {self.max_workers}, Success threshold: {success_threshold}%"
-        )
 
-        all_metrics = {}
-        for workers in range(step_size, self.max_workers + 1, step_size):
-            metrics = self.test_concurrency_level(url, workers, test_duration)
-            all_metrics[workers] = metrics
-
-            # Stop if success rate drops below threshold
-            if metrics["success_rate"] < success_threshold:
-                logger.info(
-                    f"Breaking point found at {workers} concurrent requests "
-                    f"(success rate: {metrics['success_rate']:.1f}%)"
+        levels: List[float]
+        if max_rate is not None:
+            if max_rate <= 0:
+                raise ValueError(f"max_rate must be positive: {max_rate}")
+            step = rate_step or max_rate / 10
+            if step <= 0:
+                raise ValueError(f"rate_step must be positive: {rate_step}")
+            count = int(max_rate / step + 1e-9)
+            levels = [round(step * i, 6) for i in range(1, count + 1)]
+            start = step
+            unit = "req/s"
+            logger.info(
+                f"Max rate: {max_rate:g} req/s, Success threshold: {success_threshold}%"
+            )
+        else:
+            levels = list(range(step_size, self.max_workers + 1, step_size))
+            start = step_size
+            unit = "concurrent requests"
+            logger.info(
+                f"Max workers: {self.max_workers}, Success threshold: {success_threshold}%"
+            )
+
+        def probe(level: float) -> Dict:
+            if max_rate is not None:
+                return self.test_arrival_rate(
+                    url, level, test_duration, max_duration=max_level_duration
                 )
-                return workers, all_metrics
+            return self.test_concurrency_level(
+                url, int(level), test_duration, max_duration=max_level_duration
+            )
+
+        def breaks(metrics: Dict) -> bool:
+            p95 = metrics.get("latency_p95", 0)
+            return metrics["success_rate"] < success_threshold or (
+                p95_threshold is not None and p95 > p95_threshold
+            )
+
+        def log_breaking_point(level: float, metrics: Dict) -> None:
+            logger.info(
+                f"Breaking point found at {level:g} {unit} "
+                f"(success rate: {metrics['success_rate']:.1f}%, "
+                f"p95: {metrics.get('latency_p95', 0):.0f}ms)"
+            )
+
+        maximum = max_rate if max_rate is not None else self.max_workers
+        if search == "adaptive":
+            tested = 0
+
+            def cooled_probe(level: float) -> Dict:
+                nonlocal tested
+                # Cool down between test levels
+                if tested and cooldown > 0:
+                    time.sleep(cooldown)
+                tested += 1
+                return probe(level)
+
+            breaking_point, all_metrics = search_breaking_point(
+                cooled_probe,
+                breaks,
+                start,
+                maximum,
+                resolution or start,
+                integer=max_rate is None,
+            )
+            if breaking_point in all_metrics and breaks(all_metrics[breaking_point]):
+                log_breaking_point(breaking_point, all_metrics[breaking_point])
+            else:
+                logger.info("Stress test completed - no breaking point found")
+            logger.info(f"Adaptive search tested {len(all_metrics)} levels")
+            return breaking_point, all_metrics
+
+        all_metrics = {}
+        for level in levels:
+            metrics = probe(level)
+            all_metrics[level] = metrics
+
+            # Stop if success rate or latency breaches the threshold
+            if breaks(metrics):
+                log_breaking_point(level, metrics)
+                return level, all_metrics
 
             # Cool down between test levels
             if cooldown > 0:
                 time.sleep(cooldown)
 
         logger.info("Stress test completed - no breaking point found")
-        return self.max_workers, all_metrics
+        return maximum, all_metrics
 
     def run_normal_load(
         self,
@@ -317,6 +876,7 @@ class LoadTester:
         duration: int = 60,
         concurrent_users: int = MODERATE_LOAD_WORKERS,
         ramp_up: int = 30,
+        rate: Optional[float] = None,
     ) -> Dict:
         """
         Run realistic mixed-workload test
@@ -326,6 +886,8 @@ class LoadTester:
             duration: Total test duration
             concurrent_users: Peak concurrent users
             ramp_up: Time to reach peak load (currently unused)
+            rate: Optional open-loop arrival rate (req/s) per endpoint;
+                replaces concurrent_users when given
 
         Returns:
             Dict with results for each endpoint
@@ -346,11 +908,14 @@ class LoadTester:
             url = f"{self.base_url}{endpoint}"
             logger.info(f"Testing {endpoint}...")
 
-            # Gradual ramp-up
-            workers = max(1, concurrent_users // len(endpoints))
-            metrics = self.test_concurrency_level(
-                url, workers, duration // len(endpoints)
-            )
+            if rate is not None:
+                metrics = self.test_arrival_rate(url, rate, duration // len(endpoints))
+            else:
+                # Gradual ramp-up
+                workers = max(1, concurrent_users // len(endpoints))
+                metrics = self.test_concurrency_level(
+                    url, workers, duration // len(endpoints)
+                )
 
             results[endpoint] = metrics
 
@@ -362,70 +927,409 @@ class LoadTester:
 
         return results
 
-    def run_chaos_test(
+    def run_scenario(
         self,
-        namespace: str = "eoapi",
-        duration: int = 300,
-        kill_interval: int = 60,
-        endpoint: str = "/stac/collections",
+        scenario: "Scenario",
+        duration: Optional[int] = None,
+        users: Optional[int] = None,
+        collect_infra_metrics: bool = False,
     ) -> Dict:
         """
-        Run chaos test by killing pods during load
+        Run a weighted workflow scenario with concurrent virtual users
+
+        Every workflow shares one pool of users, so endpoints are loaded at
+        the same time rather than one after another. Scenarios always run on
+        the async engine; with processes > 1 the users are split across
+        forked generators.
 
         Args:
-            namespace: Kubernetes namespace
-            duration: Test duration
-            kill_interval: Seconds between pod kills
-            endpoint: Endpoint to test
+            scenario: Parsed scenario (see scenario.load_scenario)
+            duration: Run duration in seconds (default: the scenario's, then
+                DEFAULT_DURATION)
+            users: Concurrent virtual users (default: the scenario's, then
+                MODERATE_LOAD_WORKERS)
+            collect_infra_metrics: Whether to collect Prometheus infrastructure metrics
 
         Returns:
-            Test results and pod kill events
+            Dict with overall metrics, per-step metrics keyed by
+            "workflow/step" (or just the workflow for single-request
+            workflows) and per-workflow iteration counts
+
+        Raises:
+            ValueError: If httpx is missing
         """
-        url = f"{self.base_url}{endpoint}"
-        logger.info(f"Starting chaos test on {url} (namespace: {namespace})")
+        if not ASYNC_ENGINE_AVAILABLE:
+            raise ValueError("scenario tests require httpx to be installed")
+        # Explicit arguments win over the scenario file
+        if duration is None:
+            duration = scenario.duration or DEFAULT_DURATION
+        if users is None:
+            users = scenario.users or MODERATE_LOAD_WORKERS
 
-        # Get initial pod list
-        try:
-            pods = (
-                subprocess.check_output(
-                    [
-                        "kubectl",
-                        "get",
-                        "pods",
-                        "-n",
-                        namespace,
-                        "-l",
-                        "app.kubernetes.io/component in (stac,raster,vector)",
-                        "-o",
-                        "jsonpath={.items[*].metadata.name}",
-                    ],
-                    text=True,
-                )
-                .strip()
-                .split()
+        logger.info(
+            f"Running scenario '{scenario.name}' with {users} users for {duration}s "
+            f"({len(scenario.workflows)} workflows)"
+        )
+
+        def run(engine: "AsyncLoadEngine", share_users: int) -> "ScenarioResult":
+            return ScenarioRunner(scenario, engine, self.base_url).run(
+                share_users, duration
             )
-            logger.info(f"Found {len(pods)} pods for chaos testing")
-        except subprocess.CalledProcessError as e:
-            logger.warning(f"Could not get pod list, chaos disabled: {e}")
-            pods = []
 
-        results: Dict[str, list | float | int] = {
-            "killed_pods": [],
-            "success_rate": 0,
-        }
+        test_start = datetime.now()
+        result = self._run_virtual_users(run, users, duration)
+        test_end = datetime.now()
+
+        report = self._build_virtual_user_report(result, "workflows")
+        if collect_infra_metrics:
+            self._attach_infra_metrics(report["overall"], test_start, test_end)
+
+        overall = report["overall"]
+        logger.info(
+            f"Scenario '{scenario.name}': Success: {overall['success_rate']:.1f}% "
+            f"({overall['success_count']}/{overall['total_requests']}), "
+            f"Throughput: {overall['throughput']:.1f} req/s"
+        )
+        return {"scenario": scenario.name, "users": users, **report}
+
+    def run_tile_viewer(
+        self,
+        workload: Optional["TileWorkload"] = None,
+        duration: int = 60,
+        users: int = MODERATE_LOAD_WORKERS,
+        ramp_up: float = 0,
+        collect_infra_metrics: bool = False,
+    ) -> Dict:
+        """
+        Simulate map users panning and zooming over a registered mosaic
+
+        Each user move requests every tile in the user's viewport at once.
+        The mosaic search is registered before the clock starts.
+
+        Args:
+            workload: Tile workload (defaults to the sample NOAA mosaic)
+            duration: Run duration in seconds
+            users: Concurrent map users
+            ramp_up: Seconds over which users start
+            collect_infra_metrics: Whether to collect Prometheus infrastructure metrics
+
+        Returns:
+            Dict with overall tile metrics, per-zoom metrics ("tiles/z<zoom>"),
+            full-viewport load times ("viewport"), per-move counts and the
+            count and share of empty (404) tiles, which are left out of the
+            tile metrics
+
+        Raises:
+            ValueError: If httpx is missing
+            RuntimeError: If the mosaic search cannot be registered
+        """
+        if not ASYNC_ENGINE_AVAILABLE:
+            raise ValueError("tile tests require httpx to be installed")
+        workload = workload or TileWorkload()
+
+        logger.info(
+            f"Running tile viewer with {users} users for {duration}s over "
+            f"{','.join(workload.collections)} (zooms {sorted(workload.zoom_weights)})"
+        )
+
+        def run(engine: "AsyncLoadEngine", share_users: int) -> "ScenarioResult":
+            runner = TileLoadRunner(workload, engine, self.base_url)
+            return runner.run(share_users, duration, ramp_up)
+
+        test_start = datetime.now()
+        result = self._run_virtual_users(run, users, duration)
+        test_end = datetime.now()
+
+        report = self._build_virtual_user_report(result, "moves")
+        if collect_infra_metrics:
+            self._attach_infra_metrics(report["overall"], test_start, test_end)
+
+        overall = report["overall"]
+        viewport = report["steps"].get("viewport", {})
+        empty = report["steps"].get(EMPTY_STEP, {}).get("total_requests", 0)
+        report["empty"] = {
+            "tiles": empty,
+            "share": empty_share(empty, overall["total_requests"]),
+        }
+        logger.info(
+            f"Tiles: Success: {overall['success_rate']:.1f}% "
+            f"({overall['success_count']}/{overall['total_requests']}), "
+            f"Empty: {report['empty']['share']:.1%}, "
+            f"Throughput: {overall['throughput']:.1f} tiles/s, "
+            f"Viewport p95: {viewport.get('latency_p95', 0):.0f}ms"
+        )
+        return {"users": users, **report}
+
+    def run_stac_search(
+        self,
+        space: Optional["SearchSpace"] = None,
+        duration: int = 60,
+        users: int = MODERATE_LOAD_WORKERS,
+        ramp_up: float = 0,
+        page_walk_share: float = 0.3,
+        max_pages: int = 10,
+        collect_infra_metrics: bool = False,
+    ) -> Dict:
+        """
+        Send a randomized mix of STAC searches, walking next links
+
+        Args:
+            space: Collections and queryables to draw searches from
+                (defaults to the chart's initdb sample data)
+            duration: Run duration in seconds
+            users: Concurrent search users
+            ramp_up: Seconds over which users start
+            page_walk_share: Share of searches whose next links are followed
+            max_pages: Deepest page a walk goes to
+            collect_infra_metrics: Whether to collect Prometheus infrastructure metrics
+
+        Returns:
+            Dict with overall metrics, per-kind first-page metrics
+            ("search/<kind>"), per-depth page metrics ("page/<depth>") and
+            completed searches per kind
+
+        Raises:
+            ValueError: If httpx is missing or parameters are invalid
+        """
+        if not ASYNC_ENGINE_AVAILABLE:
+            raise ValueError("search tests require httpx to be installed")
+        space = space or SearchSpace.from_initdb()
+
+        logger.info(
+            f"Running STAC search mix with {users} users for {duration}s over "
+            f"{', '.join(c.id for c in space.collections)} "
+            f"(walking {page_walk_share:.0%} of searches up to {max_pages} pages)"
+        )
+
+        def run(engine: "AsyncLoadEngine", share_users: int) -> "ScenarioResult":
+            runner = SearchLoadRunner(
+                space,
+                engine,
+                self.base_url,
+                page_walk_share=page_walk_share,
+                max_pages=max_pages,
+            )
+            return runner.run(share_users, duration, ramp_up)
+
+        test_start = datetime.now()
+        result = self._run_virtual_users(run, users, duration)
+        test_end = datetime.now()
+
+        report = self._build_virtual_user_report(result, "searches")
+        if collect_infra_metrics:
+            self._attach_infra_metrics(report["overall"], test_start, test_end)
+
+        overall = report["overall"]
+        logger.info(
+            f"Search: Success: {overall['success_rate']:.1f}% "
+            f"({overall['success_count']}/{overall['total_requests']}), "
+            f"Latency p95: {overall.get('latency_p95', 0):.0f}ms, "
+            f"Throughput: {overall['throughput']:.1f} req/s"
+        )
+        return {"users": users, **report}
+
+    def run_replay(
+        self,
+        requests: List["ReplayRequest"],
+        speedup: float = 1.0,
+        collect_infra_metrics: bool = False,
+    ) -> Dict:
+        """
+        Replay recorded requests open-loop at their original pacing
+
+        With processes > 1 the requests are dealt round-robin across
+        generators, each keeping the recorded send times.
+
+        Args:
+            requests: Requests from replay.load_requests, ordered by offset
+            speedup: Replay speed factor
+            collect_infra_metrics: Whether to collect Prometheus infrastructure metrics
+
+        Returns:
+            Dict with overall metrics and per-route metrics
+
+        Raises:
+            ValueError: If httpx is missing, there are no requests or speedup
+                is not positive
+        """
+        if not ASYNC_ENGINE_AVAILABLE:
+            raise ValueError("replay tests require httpx to be installed")
+        if not requests:
+            raise ValueError("no requests to replay")
+        if speedup <= 0:
+            raise ValueError(f"speedup must be positive: {speedup}")
+
+        span = requests[-1].offset / speedup
+        logger.info(
+            f"Replaying {len(requests)} requests over {span:.0f}s "
+            f"({speedup:g}x, {len(requests) / max(span, 1e-9):.1f} req/s average)"
+        )
+
+        generators = min(self.processes, len(requests))
+
+        def make_job(share: List["ReplayRequest"]):
+            def job() -> ScenarioResult:
+                engine = AsyncLoadEngine(
+                    self.timeout,
+                    max_connections=max(1, self.max_connections // generators),
+                    histogram_digits=self.histogram_digits,
+                )
+                return ReplayRunner(engine, self.base_url).run(share, speedup)
+
+            return job
+
+        test_start = datetime.now()
+        if generators > 1:
+            result = run_forked(
+                [make_job(requests[i::generators]) for i in range(generators)],
+                span,
+            )
+        else:
+            result = make_job(requests)()
+        test_end = datetime.now()
+
+        overall = self._build_metrics(result.overall)
+        if collect_infra_metrics:
+            self._attach_infra_metrics(overall, test_start, test_end)
+
+        logger.info(
+            f"Replay: Success: {overall['success_rate']:.1f}% "
+            f"({overall['success_count']}/{overall['total_requests']}), "
+            f"Latency p95: {overall.get('latency_p95', 0):.0f}ms, "
+            f"{len(result.steps)} routes"
+        )
+        return {
+            "speedup": speedup,
+            "overall": overall,
+            "routes": {
+                route: self._build_metrics(recorder)
+                for route, recorder in sorted(result.steps.items())
+            },
+        }
+
+    def _run_virtual_users(
+        self,
+        run: Callable[["AsyncLoadEngine", int], "ScenarioResult"],
+        users: int,
+        duration: int,
+    ) -> "ScenarioResult":
+        """
+        Run virtual users on the async engine, split across processes
+
+        Args:
+            run: Callable running share_users users on the given engine
+            users: Total virtual users
+            duration: Run duration in seconds, used for the result timeout
+
+        Returns:
+            Merged ScenarioResult from all generators
+        """
+        shares = split_evenly(users, min(users, self.processes))
+
+        def make_job(share_users: int):
+            def job() -> ScenarioResult:
+                engine = AsyncLoadEngine(
+                    self.timeout,
+                    max_connections=max(1, self.max_connections // len(shares)),
+                    histogram_digits=self.histogram_digits,
+                )
+                return run(engine, share_users)
+
+            return job
+
+        if len(shares) > 1:
+            return run_forked([make_job(share) for share in shares], duration)
+        return make_job(users)()
+
+    def _build_virtual_user_report(self, result: "ScenarioResult", unit: str) -> Dict:
+        """
+        Aggregate a virtual-user run into overall, per-step and completion metrics
+
+        Args:
+            result: Merged ScenarioResult
+            unit: Report key for the completion counts ("workflows" or "moves")
+
+        Returns:
+            Dict with overall, steps and unit keys
+        """
+        completion = {}
+        for name, (iterations, completed) in sorted(result.workflows.items()):
+            completion[name] = {
+                "iterations": iterations,
+                "completed": completed,
+                "completion_rate": completed / iterations * 100 if iterations else 0,
+            }
+        return {
+            "overall": self._build_metrics(result.overall),
+            "steps": {
+                key: self._build_metrics(recorder)
+                for key, recorder in sorted(result.steps.items())
+            },
+            unit: completion,
+        }
+
+    def run_chaos_test(
+        self,
+        namespace: str = "eoapi",
+        duration: int = 300,
+        kill_interval: int = 60,
+        endpoint: str = "/stac/collections",
+    ) -> Dict:
+        """
+        Run chaos test by killing pods during load
+
+        Args:
+            namespace: Kubernetes namespace
+            duration: Test duration
+            kill_interval: Seconds between pod kills
+            endpoint: Endpoint to test
+
+        Returns:
+            Test results with a per-second timeline and timestamped pod kill
+            events
+        """
+        url = f"{self.base_url}{endpoint}"
+        logger.info(f"Starting chaos test on {url} (namespace: {namespace})")
+
+        # Get initial pod list
+        try:
+            pods = (
+                subprocess.check_output(
+                    [
+                        "kubectl",
+                        "get",
+                        "pods",
+                        "-n",
+                        namespace,
+                        "-l",
+                        "app.kubernetes.io/component in (stac,raster,vector)",
+                        "-o",
+                        "jsonpath={.items[*].metadata.name}",
+                    ],
+                    text=True,
+                )
+                .strip()
+                .split()
+            )
+            logger.info(f"Found {len(pods)} pods for chaos testing")
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Could not get pod list, chaos disabled: {e}")
+            pods = []
+
+        results: Dict[str, Any] = {
+            "killed_pods": [],
+            "kill_events": [],
+            "success_rate": 0,
+        }
         start_time = time.time()
 
         # Background load generation
-        import threading
-
-        load_results: Dict[str, int] = {"success": 0, "total": 0}
+        recorder = RequestRecorder(self.histogram_digits)
 
         def generate_load():
             while time.time() - start_time < duration:
-                success, _ = self.make_request(url)
-                if success:
-                    load_results["success"] += 1
-                load_results["total"] += 1
+                status, latency_ms = self.fetch(url)
+                recorder.record(status == 200, latency_ms, status=status)
                 time.sleep(0.5)
 
         # Start load generation with daemon thread for cleanup
@@ -453,9 +1357,11 @@ class LoadTester:
                             check=True,
                             capture_output=True,
                         )
-                        killed_pods = results["killed_pods"]
-                        if isinstance(killed_pods, list):
-                            killed_pods.append(pod_to_kill)
+                        results["killed_pods"].append(pod_to_kill)
+                        # Timestamped so kills line up with the timeline
+                        results["kill_events"].append(
+                            {"timestamp": time.time(), "pod": pod_to_kill}
+                        )
                         pods.remove(pod_to_kill)
                     except subprocess.CalledProcessError as e:
                         logger.error(f"Failed to kill pod {pod_to_kill}: {e}")
@@ -463,20 +1369,43 @@ class LoadTester:
             # Ensure we wait for load thread to complete
             load_thread.join(timeout=duration + 10)
 
-        if load_results["total"] > 0:
-            results["success_rate"] = (
-                load_results["success"] / load_results["total"]
-            ) * 100
-            results.update(load_results)
+        recorder.duration = time.time() - start_time
+        if recorder.total_requests > 0:
+            results.update(self._build_metrics(recorder))
+            results["success"] = recorder.success_count
+            results["total"] = recorder.total_requests
 
-        killed_pods_list = results["killed_pods"]
         logger.info(
             f"Chaos test completed: {results['success_rate']:.1f}% success rate, "
-            f"killed {len(killed_pods_list) if isinstance(killed_pods_list, list) else 0} pods"
+            f"killed {len(results['killed_pods'])} pods"
         )
         return results
 
 
+def parse_rate(value: str) -> float:
+    """
+    Parse an arrival rate such as "500", "500/s" or "30000/m" into req/s
+
+    Args:
+        value: Rate string with an optional /s, /m or /h unit
+
+    Returns:
+        Rate in requests per second
+
+    Raises:
+        ValueError: If the rate is malformed or not positive
+    """
+    per_unit = {"s": 1, "sec": 1, "m": 60, "min": 60, "h": 3600}
+    amount, _, unit = value.strip().partition("/")
+    if unit and unit not in per_unit:
+        raise ValueError(f"Unknown rate unit '{unit}' in {value!r}")
+
+    rate = float(amount) / per_unit.get(unit or "s", 1)
+    if rate <= 0:
+        raise ValueError(f"Rate must be positive: {value!r}")
+    return rate
+
+
 def print_metrics_summary(metrics: Dict, title: str = "Test Results"):
     """
     Print concise, readable metrics summary
@@ -496,14 +1425,19 @@ def print_metrics_summary(metrics: Dict, title: str = "Test Results"):
     if "latency_p50" in metrics:
         print(
             f"Latency (ms):  p50={metrics['latency_p50']:.0f} "
+            f"p90={metrics.get('latency_p90', 0):.0f} "
             f"p95={metrics['latency_p95']:.0f} "
             f"p99={metrics['latency_p99']:.0f} "
+            f"p99.9={metrics.get('latency_p999', 0):.0f} "
             f"(min={metrics['latency_min']:.0f}, max={metrics['latency_max']:.0f}, avg={metrics['latency_avg']:.0f})"
         )
 
     if "throughput" in metrics:
         print(f"Throughput:    {metrics['throughput']:.1f} req/s")
 
+    if "target_rate" in metrics:
+        print(f"Target Rate:   {metrics['target_rate']:g} req/s (open-loop)")
+
     if "duration" in metrics:
         print(f"Duration:      {metrics['duration']:.1f}s")
 
@@ -533,6 +1467,385 @@ def export_metrics_json(metrics: Dict, filename: str):
         logger.error(f"Failed to export metrics: {e}")
 
 
+def report_saturation(report: Dict):
+    """
+    Find and print what saturated when a report has infrastructure metrics
+
+    Stores the analysis under "saturation" in the report.
+
+    Args:
+        report: Metrics dictionary of a finished test
+    """
+    overall = report.get("overall")
+    if not NUMPY_AVAILABLE or not (
+        report.get("infrastructure")
+        or (isinstance(overall, dict) and overall.get("infrastructure"))
+    ):
+        return
+    try:
+        analysis = analyze_saturation(report)
+    except Exception as e:
+        logger.error(f"Saturation analysis failed: {e}")
+        return
+    report["saturation"] = analysis
+    print("Saturation Analysis:")
+    for line in describe_saturation(analysis):
+        print(f"  {line}")
+    print()
+
+
+def report_hpa_timeline(
+    report: Dict, timeline: Optional[HPATimeline], args: argparse.Namespace
+):
+    """
+    Stop the HPA recorder of a finished test and print how each HPA reacted
+
+    Stores the recorded events and reaction metrics under "hpa_timeline" in
+    the report. Stabilization windows come from the chart values.
+
+    Args:
+        report: Metrics dictionary of a finished test
+        timeline: Recorder started before the test, or None
+        args: Parsed CLI arguments with chart_dir and values
+    """
+    if timeline is None:
+        return
+    load_end = time.time()
+    events = timeline.stop()
+    report["hpa_timeline"] = {"events": events}
+    if not any(event["kind"] == "hpa" for event in events):
+        logger.warning(f"No HPA events recorded in namespace {timeline.namespace}")
+        return
+
+    try:
+        windows = stabilization_windows(load_values(args.chart_dir, args.values))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Using the live HPA behavior for stabilization windows: {e}")
+        windows = None
+    reactions = reaction_metrics(
+        events, timeline.started_at or events[0]["time"], load_end, windows
+    )
+    report["hpa_timeline"]["reactions"] = reactions
+    print("HPA Reaction:")
+    for line in describe_reactions(reactions):
+        print(f"  {line}")
+    print()
+
+
+def export_reports(report: Dict, args: argparse.Namespace):
+    """
+    Export a report to the files requested on the command line
+
+    Args:
+        report: Metrics dictionary to export
+        args: Parsed CLI arguments with report_json, report_timeseries and
+            the results store options
+    """
+    if args.report_json:
+        export_metrics_json(report, args.report_json)
+    if args.report_timeseries:
+        try:
+            export_timeseries(report, args.report_timeseries)
+        except Exception as e:
+            logger.error(f"Failed to export time series: {e}")
+    if args.store:
+        try:
+            deployment = Deployment.from_chart(args.chart_dir, args.values)
+            with ResultsStore(args.store) as store:
+                store.save(args.test_type, report, deployment, label=args.label)
+        except Exception as e:
+            logger.error(f"Failed to store results: {e}")
+
+
+def print_comparison(comparisons: List[MetricComparison]):
+    """
+    Print baseline vs candidate verdicts, one line per series and metric
+
+    Args:
+        comparisons: Results of compare_reports
+    """
+    print(f"\n{'=' * 60}")
+    print("Regression Check (mean of run medians, 95% CI of change)")
+    print(f"{'=' * 60}")
+    for c in comparisons:
+        verdict = "REGRESSED" if c.regressed else "ok"
+        print(
+            f"{c.series} {c.metric}: {c.baseline_median:.1f} -> "
+            f"{c.candidate_median:.1f} ({c.change:+.1%}, CI {c.ci_low:+.1%}.."
+            f"{c.ci_high:+.1%}, p={c.p_value:.3g}, runs={c.runs[0]}/{c.runs[1]}) "
+            f"{verdict}"
+        )
+    print(f"{'=' * 60}\n")
+
+
+def run_compare(args: argparse.Namespace) -> int:
+    """
+    Compare stored candidate runs against baseline runs
+
+    Args:
+        args: Parsed CLI arguments with the compare options
+
+    Returns:
+        Exit code: 1 if any metric regressed, 0 otherwise
+
+    Raises:
+        ValueError: If runs cannot be found or compared
+    """
+    if not args.baseline or not args.candidate:
+        raise ValueError("compare needs --baseline and --candidate")
+    with ResultsStore(args.store or DEFAULT_STORE) as store:
+        candidates = store.find(args.candidate)
+        test_types = sorted({run.test_type for run in candidates})
+        if len(test_types) > 1:
+            raise ValueError(
+                f"Candidate '{args.candidate}' matches runs of several test "
+                f"types ({', '.join(test_types)}); use a reference that "
+                "selects one"
+            )
+        test_type = test_types[0]
+        candidate_ids = {run.id for run in candidates}
+        baselines = [
+            run
+            for run in store.find(args.baseline, test_type)
+            if run.id not in candidate_ids
+        ]
+    if not baselines:
+        raise ValueError(f"Baseline '{args.baseline}' only matches the candidate runs")
+
+    for role, runs in (("Baseline", baselines), ("Candidate", candidates)):
+        for run in runs:
+            logger.info(f"{role}: {run.describe()}")
+
+    comparisons = compare_reports(
+        [run.report for run in baselines],
+        [run.report for run in candidates],
+        series=args.series,
+        alpha=args.alpha,
+        tolerance=args.tolerance,
+        min_runs=args.min_runs,
+    )
+    print_comparison(comparisons)
+
+    if args.report_json:
+        export_metrics_json(
+            {
+                "baseline": [run.id for run in baselines],
+                "candidate": [run.id for run in candidates],
+                "comparisons": [{**vars(c), "change": c.change} for c in comparisons],
+            },
+            args.report_json,
+        )
+
+    regressed = [c for c in comparisons if c.regressed]
+    logger.info(
+        f"Compare completed. {len(regressed)} of {len(comparisons)} metrics regressed"
+    )
+    return 1 if regressed else 0
+
+
+def run_plan(args: argparse.Namespace) -> int:
+    """
+    Recommend replicas and worker settings from stress runs
+
+    Args:
+        args: Parsed CLI arguments with the plan options
+
+    Returns:
+        Exit code: 1 if the target rate is out of reach, 0 otherwise
+
+    Raises:
+        ValueError: If the options or stress reports are unusable
+    """
+    if not NUMPY_AVAILABLE:
+        raise ValueError("plan requires numpy to be installed")
+    if not args.inputs:
+        raise ValueError("plan needs stress reports as REPLICAS=FILE")
+    if args.target_rps is None or args.p95_slo is None:
+        raise ValueError("plan needs --target-rps and --p95-slo")
+
+    runs = load_stress_runs(args.inputs)
+    service = args.service or next(
+        (
+            service_of(report["endpoint"])
+            for report in runs.values()
+            if service_of(report.get("endpoint", ""))
+        ),
+        None,
+    )
+    if service is None:
+        raise ValueError("Cannot tell which service was stressed; pass --service")
+    try:
+        current = ServiceSettings.from_chart(service, args.chart_dir, args.values)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read current {service} settings: {e}")
+        current = ServiceSettings()
+
+    plan = plan_capacity(
+        runs,
+        target_rps=args.target_rps,
+        p95_slo=args.p95_slo,
+        service=service,
+        base_rps=args.base_rps,
+        headroom=args.headroom,
+        success_threshold=args.success_threshold,
+        db_connections=args.db_connections,
+        current=current,
+        cpu_per_pod=args.cpu_per_pod,
+        db_time_fraction=args.db_time_fraction,
+    )
+
+    print(f"\n{'=' * 60}")
+    print(
+        f"Capacity Plan - {service} at {args.target_rps:g} req/s, p95 ≤ {args.p95_slo:g}ms"
+    )
+    print(f"{'=' * 60}")
+    for line in describe_plan(plan):
+        print(line)
+    print(f"\nValues override:\n{plan.values_yaml()}")
+    print(f"{'=' * 60}\n")
+
+    if args.report_json:
+        export_metrics_json(
+            {
+                "service": service,
+                "target_rps": plan.target_rps,
+                "p95_slo": plan.p95_slo,
+                "model": vars(plan.model),
+                "sustained": plan.sustained,
+                "capacity": plan.capacity,
+                "in_flight_per_pod": plan.in_flight_per_pod,
+                "db_in_flight_per_pod": plan.db_in_flight_per_pod,
+                "connections": plan.connections,
+                "values": plan.values(),
+                "notes": plan.notes,
+            },
+            args.report_json,
+        )
+    return 0 if plan.capacity >= plan.target_rps else 1
+
+
+def parse_pod_capacity(values: List[str]) -> Dict[str, float]:
+    """
+    Parse --pod-capacity options into req/s per ready pod by service
+
+    Args:
+        values: "RPS" for every service or "SERVICE=RPS", rates as in
+            parse_rate
+
+    Returns:
+        Dict of service -> req/s, with "*" for the default
+
+    Raises:
+        ValueError: If a service or rate is unknown or malformed
+    """
+    capacity = {}
+    for value in values:
+        service, _, rate = value.rpartition("=")
+        if service and service not in SERVICES:
+            raise ValueError(f"Unknown service '{service}' in --pod-capacity {value}")
+        capacity[service or "*"] = parse_rate(rate)
+    return capacity
+
+
+def run_simulate(args: argparse.Namespace) -> int:
+    """
+    Replay a recorded request rate through the chart's HPA settings
+
+    Args:
+        args: Parsed CLI arguments with the simulation options
+
+    Returns:
+        Exit code: 1 if any requests exceeded ready capacity, 0 otherwise
+
+    Raises:
+        ValueError: If the options, inputs or autoscaling settings are unusable
+    """
+    if not args.inputs:
+        raise ValueError("simulate needs access logs or a Prometheus export")
+    if not args.pod_capacity:
+        raise ValueError("simulate needs --pod-capacity, e.g. 40 or raster=40")
+
+    rates, start = load_rates(args.inputs, service=args.service)
+    if args.service:
+        rates = {args.service: rates.get(args.service, [])}
+    simulations = simulate_services(
+        rates,
+        load_values(args.chart_dir, args.values),
+        parse_pod_capacity(args.pod_capacity),
+        pod_startup_s=args.pod_startup,
+        cpu_cost=args.cpu_cost,
+        start=start,
+    )
+
+    print(f"\n{'=' * 60}")
+    print("HPA Simulation")
+    print(f"{'=' * 60}")
+    for simulation in simulations.values():
+        for line in describe_simulation(simulation):
+            print(line)
+    print(f"{'=' * 60}\n")
+
+    export_reports(
+        {
+            "simulation": {
+                service: {
+                    "config": vars(simulation.config),
+                    "summary": simulation.summary(),
+                    "timeline": simulation.timeline,
+                }
+                for service, simulation in simulations.items()
+            }
+        },
+        args,
+    )
+    return 1 if any(s.excess_requests for s in simulations.values()) else 0
+
+
+def run_notifications(args: argparse.Namespace) -> int:
+    """
+    Benchmark item change notifications against a local pgstac database
+
+    Args:
+        args: Parsed CLI arguments with the notification benchmark options
+
+    Returns:
+        Exit code: 1 if not even the lowest rate kept up, 0 otherwise
+
+    Raises:
+        ValueError: If a rate is malformed
+    """
+    rates = sorted(parse_rate(rate) for rate in args.notify_rates.split(","))
+
+    benchmark = NotificationBenchmark(
+        dsn=args.dsn,
+        collection=args.collection,
+        batch_size=args.batch_size,
+        sink_port=args.sink_port,
+        external_notifier=args.external_notifier,
+        delivery=args.delivery,
+        coalesce_window_ms=args.coalesce_window_ms,
+        relay_workers=args.relay_workers,
+    )
+    if args.install_triggers:
+        benchmark.install_triggers()
+    report = benchmark.run(
+        rates,
+        duration=args.test_duration,
+        drain_s=args.drain,
+        max_latency_ms=args.max_latency_ms,
+    )
+
+    print(f"\n{'=' * 60}")
+    print("Notification Benchmark")
+    print(f"{'=' * 60}")
+    for line in describe_benchmark(report):
+        print(line)
+    print(f"{'=' * 60}\n")
+
+    export_reports(report, args)
+    return 1 if report["max_sustainable_rate"] is None else 0
+
+
 def main():
     """Main entry point for eoAPI load testing CLI"""
     parser = argparse.ArgumentParser(description="eoAPI Load Testing CLI")
@@ -540,11 +1853,31 @@ def main():
     # Test type selection
     parser.add_argument(
         "test_type",
-        choices=["stress", "normal", "chaos"],
+        choices=[
+            "stress",
+            "normal",
+            "chaos",
+            "scenario",
+            "tiles",
+            "search",
+            "replay",
+            "compare",
+            "plan",
+            "simulate",
+            "notifications",
+        ],
         default="stress",
         nargs="?",
         help="Type of test to run (default: stress)",
     )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        metavar="FILE",
+        help="Scenario file (scenario tests), access logs/JSONL (replay tests), "
+        "REPLICAS=FILE stress reports (plan), or access logs or a Prometheus "
+        "request rate export (simulate)",
+    )
 
     # Common arguments
     parser.add_argument(
@@ -569,6 +1902,13 @@ def main():
         type=str,
         help="Export metrics to JSON file",
     )
+    parser.add_argument(
+        "--report-timeseries",
+        type=str,
+        metavar="FILE",
+        help="Export per-second throughput, errors and latency quantiles "
+        "(.csv, .parquet or .ndjson)",
+    )
     parser.add_argument(
         "--prometheus-url",
         type=str,
@@ -586,6 +1926,53 @@ def main():
         action="store_true",
         help="Collect infrastructure metrics from Prometheus during tests",
     )
+    parser.add_argument(
+        "--watch-hpa",
+        action="store_true",
+        help="Record HPA, Deployment and pod changes in the namespace with "
+        "kubectl watches and report scaling reaction times",
+    )
+    parser.add_argument(
+        "--prometheus-cache",
+        metavar="DIR",
+        default=DEFAULT_CACHE_DIR,
+        help="Cache Prometheus range query responses here; pass an empty "
+        "string to disable (default: PROMETHEUS_CACHE_DIR env or "
+        "~/.cache/eoapi-load-tests/prometheus)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="thread",
+        help="Request engine: thread (requests) or async (httpx, HTTP/2) (default: thread)",
+    )
+    parser.add_argument(
+        "--max-connections",
+        type=int,
+        default=DEFAULT_MAX_CONNECTIONS,
+        help=f"Connection pool size for the async engine (default: {DEFAULT_MAX_CONNECTIONS})",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Fork N generator processes and split each load level across them (default: 1)",
+    )
+    parser.add_argument(
+        "--histogram-precision",
+        type=int,
+        choices=range(1, 6),
+        default=DEFAULT_SIGNIFICANT_DIGITS,
+        metavar="DIGITS",
+        help=f"Significant digits kept by latency histograms, 1-5 (default: {DEFAULT_SIGNIFICANT_DIGITS})",
+    )
+
+    parser.add_argument(
+        "--rate",
+        type=parse_rate,
+        help="Open-loop arrival rate, e.g. 500/s or 30000/m. Stress tests step "
+        "up to this rate; normal tests send each endpoint at this rate",
+    )
 
     # Stress test arguments
     stress_group = parser.add_argument_group("stress test options")
@@ -597,17 +1984,335 @@ def main():
     stress_group.add_argument("--step-size", type=int, default=5)
     stress_group.add_argument("--test-duration", type=int, default=10)
     stress_group.add_argument("--cooldown", type=int, default=2)
+    stress_group.add_argument(
+        "--rate-step",
+        type=parse_rate,
+        help="Arrival rate increment when --rate is set (default: rate/10)",
+    )
+    stress_group.add_argument(
+        "--max-p95-ms",
+        type=float,
+        help="Treat a p95 latency above this (ms) as the breaking point",
+    )
+    stress_group.add_argument(
+        "--search",
+        choices=["linear", "adaptive"],
+        default="linear",
+        help="Step through every level, or double the load until it breaks "
+        "and bisect (default: linear)",
+    )
+    stress_group.add_argument(
+        "--resolution",
+        type=float,
+        help="Bracket width adaptive search stops at, in workers or req/s "
+        "(default: --step-size or --rate-step)",
+    )
+    stress_group.add_argument(
+        "--max-level-duration",
+        type=int,
+        help="Extend each level past --test-duration until its throughput is "
+        "steady, up to this many seconds",
+    )
+    stress_group.add_argument(
+        "--replicas",
+        type=int,
+        help="Replica count of the stressed service, recorded in the report for plan",
+    )
 
     # Normal test arguments
     normal_group = parser.add_argument_group("normal test options")
+    # Defaults are filled in after parsing, so scenarios can tell whether
+    # these were given
     normal_group.add_argument(
-        "--duration", type=int, default=60, help="Test duration (default: 60)"
+        "--duration",
+        type=int,
+        help=f"Test duration (default: the scenario's, or {DEFAULT_DURATION})",
     )
     normal_group.add_argument(
         "--users",
         type=int,
-        default=MODERATE_LOAD_WORKERS,
-        help=f"Concurrent users (default: {MODERATE_LOAD_WORKERS})",
+        help=f"Concurrent users (default: the scenario's, or {MODERATE_LOAD_WORKERS})",
+    )
+
+    # Tile viewer test arguments
+    tile_group = parser.add_argument_group("tile viewer test options")
+    tile_group.add_argument(
+        "--collections",
+        default="noaa-emergency-response",
+        help="Comma-separated collections in the mosaic search (default: noaa-emergency-response)",
+    )
+    tile_group.add_argument(
+        "--bbox",
+        help="Area users browse as west,south,east,north (default: sample data extent)",
+    )
+    tile_group.add_argument(
+        "--zooms",
+        help="Zoom distribution as a range (12-16) or zoom:weight pairs "
+        "(13:2,14:4,15:6) (default: 12-18 peaking at 15)",
+    )
+    tile_group.add_argument(
+        "--viewport",
+        default="1280x800",
+        help="Map size in pixels as WIDTHxHEIGHT (default: 1280x800)",
+    )
+    tile_group.add_argument(
+        "--repeat-share",
+        type=float,
+        default=0.2,
+        help="Share of moves that revisit popular, cacheable views (default: 0.2)",
+    )
+    tile_group.add_argument(
+        "--max-empty-share",
+        type=float,
+        default=DEFAULT_MAX_EMPTY_SHARE,
+        help="Fail when more than this share of tiles are empty (404), as "
+        f"the browsed area is mostly outside the mosaic (default: "
+        f"{DEFAULT_MAX_EMPTY_SHARE})",
+    )
+
+    # STAC search test arguments
+    search_group = parser.add_argument_group("search test options")
+    search_group.add_argument(
+        "--initdb-dir",
+        help="initdb directory with samples/ and queryables/ to draw searches "
+        "from (default: charts/eoapi/data/initdb)",
+    )
+    search_group.add_argument(
+        "--page-walk-share",
+        type=float,
+        default=0.3,
+        help="Share of searches whose next links are followed (default: 0.3)",
+    )
+    search_group.add_argument(
+        "--max-pages",
+        type=int,
+        default=10,
+        help="Deepest page followed when walking next links (default: 10)",
+    )
+
+    # Replay test arguments
+    replay_group = parser.add_argument_group("replay test options")
+    replay_group.add_argument(
+        "--speedup",
+        type=float,
+        default=1.0,
+        help="Replay speed factor; 2 replays an hour of logs in 30 minutes (default: 1)",
+    )
+    replay_group.add_argument(
+        "--replay-writes",
+        action="store_true",
+        help="Also replay PUT/PATCH/DELETE and non-search POST requests",
+    )
+
+    # Results store and compare arguments
+    store_group = parser.add_argument_group("results store options")
+    store_group.add_argument(
+        "--store",
+        metavar="FILE",
+        help="SQLite results store; test runs are saved to it, and compare "
+        f"reads from it (compare default: {DEFAULT_STORE})",
+    )
+    store_group.add_argument(
+        "--label", help="Label saved with the run, usable as a compare reference"
+    )
+    store_group.add_argument(
+        "--chart-dir",
+        default=str(DEFAULT_CHART_DIR),
+        help="Chart whose version, gitSha and image tags key stored runs "
+        "(default: charts/eoapi)",
+    )
+    store_group.add_argument(
+        "--values",
+        action="append",
+        metavar="FILE",
+        help="Values file layered over the chart's values.yaml, as with helm -f "
+        "(repeatable)",
+    )
+    store_group.add_argument(
+        "--baseline",
+        metavar="REF",
+        help="Baseline runs for compare: a run id, label, chart version, gitSha "
+        "or image such as titiler-pgstac:3.0.0 (all matches are pooled)",
+    )
+    store_group.add_argument(
+        "--candidate",
+        metavar="REF",
+        help="Candidate runs for compare, referenced like --baseline",
+    )
+    store_group.add_argument(
+        "--series",
+        action="append",
+        help="Report series to compare, e.g. overall or metrics/20 (repeatable; "
+        "default: all shared series)",
+    )
+    store_group.add_argument(
+        "--alpha",
+        type=float,
+        default=DEFAULT_ALPHA,
+        help=f"Bootstrap significance level (default: {DEFAULT_ALPHA})",
+    )
+    store_group.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Relative change the CI must exceed to count as a regression "
+        f"(default: {DEFAULT_TOLERANCE})",
+    )
+    store_group.add_argument(
+        "--min-runs",
+        type=int,
+        default=DEFAULT_MIN_RUNS,
+        help="Fewest baseline and candidate runs for a verdict "
+        f"(default: {DEFAULT_MIN_RUNS})",
+    )
+
+    # Capacity plan arguments
+    plan_group = parser.add_argument_group("capacity plan options")
+    plan_group.add_argument(
+        "--target-rps",
+        type=parse_rate,
+        help="Peak request rate to plan for, e.g. 200 or 12000/m",
+    )
+    plan_group.add_argument(
+        "--p95-slo", type=float, help="p95 latency (ms) every level must meet"
+    )
+    plan_group.add_argument(
+        "--base-rps",
+        type=parse_rate,
+        help="Steady request rate minReplicas must carry (default: half the target)",
+    )
+    plan_group.add_argument(
+        "--headroom",
+        type=float,
+        default=DEFAULT_HEADROOM,
+        help=f"Spare capacity on top of each rate (default: {DEFAULT_HEADROOM})",
+    )
+    plan_group.add_argument(
+        "--service",
+        choices=SERVICES,
+        help="Service the stress runs exercised (default: from their endpoint); "
+        "for simulate, the only service to simulate",
+    )
+    plan_group.add_argument(
+        "--db-connections",
+        type=int,
+        default=DEFAULT_DB_CONNECTIONS,
+        help="Connections the service may open at maxReplicas "
+        f"(default: {DEFAULT_DB_CONNECTIONS})",
+    )
+    plan_group.add_argument(
+        "--cpu-per-pod",
+        type=float,
+        help="CPUs of a pod, one worker each (default: the chart's CPU request "
+        "or limit, else 1)",
+    )
+    plan_group.add_argument(
+        "--db-time-fraction",
+        type=float,
+        default=DEFAULT_DB_TIME_FRACTION,
+        help="Share of request latency spent holding a database connection "
+        f"(default: {DEFAULT_DB_TIME_FRACTION})",
+    )
+
+    # HPA simulation arguments
+    simulate_group = parser.add_argument_group("HPA simulation options")
+    simulate_group.add_argument(
+        "--pod-capacity",
+        action="append",
+        metavar="[SERVICE=]RPS",
+        help="Request rate one ready pod serves within SLO, for every service "
+        "or one, e.g. 40 or raster=40 (repeatable)",
+    )
+    simulate_group.add_argument(
+        "--pod-startup",
+        type=float,
+        default=DEFAULT_POD_STARTUP_S,
+        help="Seconds from scale-up until a new pod is ready "
+        f"(default: {DEFAULT_POD_STARTUP_S:g})",
+    )
+    simulate_group.add_argument(
+        "--cpu-cost",
+        type=float,
+        help="CPU core-seconds per request, needed for cpu and both autoscaling",
+    )
+
+    # Notification benchmark arguments
+    notify_group = parser.add_argument_group("notification benchmark options")
+    notify_group.add_argument(
+        "--dsn",
+        default=os.getenv("PGSTAC_DSN", ""),
+        help="pgstac database to write to (default: PGSTAC_DSN env or the "
+        "PG* variables)",
+    )
+    notify_group.add_argument(
+        "--notify-rates",
+        default="50,100,200,500,1000",
+        help="Comma-separated item changes/s to try per operation, for "
+        "--test-duration seconds each (default: 50,100,200,500,1000)",
+    )
+    notify_group.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Items changed per statement (default: {DEFAULT_BATCH_SIZE})",
+    )
+    notify_group.add_argument(
+        "--drain",
+        type=float,
+        default=DEFAULT_DRAIN_S,
+        help="Seconds to wait for late events after each level "
+        f"(default: {DEFAULT_DRAIN_S:g})",
+    )
+    notify_group.add_argument(
+        "--max-latency-ms",
+        type=float,
+        default=DEFAULT_MAX_LATENCY_MS,
+        help="p95 commit-to-delivery latency a level must meet "
+        f"(default: {DEFAULT_MAX_LATENCY_MS:g})",
+    )
+    notify_group.add_argument(
+        "--collection",
+        default=DEFAULT_COLLECTION,
+        help=f"Collection the benchmark items are written to "
+        f"(default: {DEFAULT_COLLECTION})",
+    )
+    notify_group.add_argument(
+        "--sink-port",
+        type=int,
+        default=0,
+        help="Port of the local CloudEvents sink (default: any free port)",
+    )
+    notify_group.add_argument(
+        "--external-notifier",
+        action="store_true",
+        help="Let a running notifier deliver to the sink instead of the "
+        "built-in relay",
+    )
+    notify_group.add_argument(
+        "--relay-workers",
+        type=int,
+        default=DEFAULT_RELAY_WORKERS,
+        help=f"Concurrent HTTP senders of the built-in relay "
+        f"(default: {DEFAULT_RELAY_WORKERS})",
+    )
+    notify_group.add_argument(
+        "--delivery",
+        choices=DELIVERY_MODES,
+        default=DEFAULT_DELIVERY,
+        help="pgstac.notify_items_delivery of the writes; with outbox the "
+        f"benchmark runs the coalescer (default: {DEFAULT_DELIVERY})",
+    )
+    notify_group.add_argument(
+        "--coalesce-window-ms",
+        type=float,
+        default=DEFAULT_COALESCE_WINDOW_MS,
+        help=f"Milliseconds between coalescing runs with --delivery outbox "
+        f"(default: {DEFAULT_COALESCE_WINDOW_MS:g})",
+    )
+    notify_group.add_argument(
+        "--install-triggers",
+        action="store_true",
+        help="Create the chart's notification triggers before the run",
     )
 
     # Chaos test arguments
@@ -620,53 +2325,97 @@ def main():
     )
 
     args = parser.parse_args()
+    if args.test_type != "scenario":
+        if args.duration is None:
+            args.duration = DEFAULT_DURATION
+        if args.users is None:
+            args.users = MODERATE_LOAD_WORKERS
 
     # Set logging level based on verbosity
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
         logger.setLevel(logging.DEBUG)
 
+    hpa_timeline: Optional[HPATimeline] = None
     try:
+        # Fail on an unusable output format before running the test
+        if args.report_timeseries:
+            timeseries_format(args.report_timeseries)
+
+        if args.test_type == "compare":
+            sys.exit(run_compare(args))
+        if args.test_type == "plan":
+            sys.exit(run_plan(args))
+        if args.test_type == "simulate":
+            sys.exit(run_simulate(args))
+        if args.test_type == "notifications":
+            sys.exit(run_notifications(args))
+
         tester = LoadTester(
             base_url=args.base_url,
             max_workers=getattr(args, "max_workers", DEFAULT_MAX_WORKERS),
             timeout=args.timeout,
             prometheus_url=args.prometheus_url,
+            prometheus_cache_dir=args.prometheus_cache or None,
             namespace=args.namespace,
+            engine=args.engine,
+            max_connections=args.max_connections,
+            histogram_digits=args.histogram_precision,
+            processes=args.processes,
         )
+        if args.watch_hpa:
+            hpa_timeline = HPATimeline(args.namespace).start()
 
         if args.test_type == "stress":
+            test_start = datetime.now()
             breaking_point, all_metrics = tester.find_breaking_point(
                 endpoint=args.endpoint,
                 success_threshold=args.success_threshold,
                 step_size=args.step_size,
                 test_duration=args.test_duration,
                 cooldown=args.cooldown,
+                max_rate=args.rate,
+                rate_step=args.rate_step,
+                p95_threshold=args.max_p95_ms,
+                search=args.search,
+                resolution=args.resolution,
+                max_level_duration=args.max_level_duration,
             )
+            unit = "req/s" if args.rate else "workers"
+            max_level = args.rate if args.rate else args.max_workers
 
             # Print summary for breaking point
             if breaking_point in all_metrics:
                 print_metrics_summary(
                     all_metrics[breaking_point],
-                    f"Stress Test - Breaking Point at {breaking_point} workers",
+                    f"Stress Test - Breaking Point at {breaking_point:g} {unit}",
                 )
 
+            report = {
+                "endpoint": args.endpoint,
+                "breaking_point": breaking_point,
+                "metrics": all_metrics,
+            }
+            if args.replicas:
+                report["replicas"] = args.replicas
+            if args.collect_infra_metrics:
+                tester._attach_infra_metrics(report, test_start, datetime.now())
+            report_saturation(report)
+            report_hpa_timeline(report, hpa_timeline, args)
+
             # Export if requested
-            if args.report_json:
-                export_metrics_json(
-                    {"breaking_point": breaking_point, "metrics": all_metrics},
-                    args.report_json,
-                )
+            export_reports(report, args)
 
             logger.info(
-                f"Stress test completed. Breaking point: {breaking_point} workers"
+                f"Stress test completed. Breaking point: {breaking_point:g} {unit}"
             )
-            sys.exit(1 if breaking_point < args.max_workers else 0)
+            sys.exit(1 if breaking_point < max_level else 0)
 
         elif args.test_type == "normal":
             results = tester.run_normal_load(
                 duration=args.duration,
                 concurrent_users=args.users,
+                rate=args.rate,
             )
 
             # Print summary for each endpoint
@@ -677,15 +2426,151 @@ def main():
                 results
             )
 
+            report_hpa_timeline(results, hpa_timeline, args)
+
             # Export if requested
-            if args.report_json:
-                export_metrics_json(results, args.report_json)
+            export_reports(results, args)
 
             logger.info(
                 f"Normal load test completed. Average success rate: {avg_success:.1f}%"
             )
             sys.exit(0 if avg_success >= DEFAULT_SUCCESS_THRESHOLD else 1)
 
+        elif args.test_type == "scenario":
+            if len(args.inputs) != 1:
+                raise ValueError("scenario tests need exactly one scenario file")
+            results = tester.run_scenario(
+                load_scenario(args.inputs[0]),
+                duration=args.duration,
+                users=args.users,
+                collect_infra_metrics=args.collect_infra_metrics,
+            )
+
+            print_metrics_summary(
+                results["overall"], f"Scenario Test - {results['scenario']}"
+            )
+            for key, metrics in results["steps"].items():
+                print_metrics_summary(metrics, f"Scenario Step - {key}")
+            for name, counts in results["workflows"].items():
+                print(
+                    f"Workflow {name}: {counts['completed']}/{counts['iterations']} "
+                    f"iterations completed ({counts['completion_rate']:.1f}%)"
+                )
+
+            report_saturation(results)
+            report_hpa_timeline(results, hpa_timeline, args)
+            export_reports(results, args)
+
+            # Failed extractions abort workflows without failing a request,
+            # so workflow completion counts towards the verdict too
+            success_rate = min(
+                [results["overall"]["success_rate"]]
+                + [w["completion_rate"] for w in results["workflows"].values()]
+            )
+            logger.info(
+                f"Scenario test completed. Lowest success/completion rate: "
+                f"{success_rate:.1f}%"
+            )
+            sys.exit(0 if success_rate >= DEFAULT_SUCCESS_THRESHOLD else 1)
+
+        elif args.test_type == "tiles":
+            options = {}
+            if args.bbox:
+                options["bbox"] = parse_bbox(args.bbox)
+            if args.zooms:
+                options["zoom_weights"] = parse_zoom_weights(args.zooms)
+            workload = TileWorkload(
+                collections=args.collections.split(","),
+                viewport=parse_viewport(args.viewport),
+                repeat_share=args.repeat_share,
+                **options,
+            )
+            results = tester.run_tile_viewer(
+                workload,
+                duration=args.duration,
+                users=args.users,
+                collect_infra_metrics=args.collect_infra_metrics,
+            )
+
+            print_metrics_summary(results["overall"], "Tile Viewer Test - All Tiles")
+            for key, metrics in results["steps"].items():
+                print_metrics_summary(metrics, f"Tile Viewer Test - {key}")
+            for name, counts in results["moves"].items():
+                print(
+                    f"Move {name}: {counts['completed']}/{counts['iterations']} "
+                    f"viewports fully loaded ({counts['completion_rate']:.1f}%)"
+                )
+
+            report_saturation(results)
+            report_hpa_timeline(results, hpa_timeline, args)
+            export_reports(results, args)
+
+            success_rate = results["overall"]["success_rate"]
+            share = results["empty"]["share"]
+            logger.info(
+                f"Tile viewer test completed. Tile success rate: {success_rate:.1f}%, "
+                f"empty tiles: {share:.1%}"
+            )
+            if share > args.max_empty_share:
+                logger.error(
+                    f"{share:.1%} of tiles were empty (limit "
+                    f"{args.max_empty_share:.1%}); check --bbox and --collections"
+                )
+                sys.exit(1)
+            sys.exit(0 if success_rate >= DEFAULT_SUCCESS_THRESHOLD else 1)
+
+        elif args.test_type == "search":
+            results = tester.run_stac_search(
+                SearchSpace.from_initdb(args.initdb_dir) if args.initdb_dir else None,
+                duration=args.duration,
+                users=args.users,
+                page_walk_share=args.page_walk_share,
+                max_pages=args.max_pages,
+                collect_infra_metrics=args.collect_infra_metrics,
+            )
+
+            print_metrics_summary(results["overall"], "STAC Search Test - All Requests")
+            for key, metrics in results["steps"].items():
+                print_metrics_summary(metrics, f"STAC Search Test - {key}")
+            for name, counts in results["searches"].items():
+                print(
+                    f"Search {name}: {counts['completed']}/{counts['iterations']} "
+                    f"completed ({counts['completion_rate']:.1f}%)"
+                )
+
+            report_saturation(results)
+            report_hpa_timeline(results, hpa_timeline, args)
+            export_reports(results, args)
+
+            success_rate = results["overall"]["success_rate"]
+            logger.info(f"Search test completed. Success rate: {success_rate:.1f}%")
+            sys.exit(0 if success_rate >= DEFAULT_SUCCESS_THRESHOLD else 1)
+
+        elif args.test_type == "replay":
+            if not args.inputs:
+                raise ValueError("replay tests need at least one log file")
+            requests, skipped = load_requests(args.inputs, args.replay_writes)
+            if skipped:
+                logger.info(f"Skipped {skipped} unparseable or write log lines")
+            results = tester.run_replay(
+                requests,
+                speedup=args.speedup,
+                collect_infra_metrics=args.collect_infra_metrics,
+            )
+            results["skipped"] = skipped
+
+            print_metrics_summary(results["overall"], "Replay Test - All Requests")
+            for route, metrics in results["routes"].items():
+                print_metrics_summary(metrics, f"Replay Test - {route}")
+
+            report_saturation(results)
+            report_hpa_timeline(results, hpa_timeline, args)
+            export_reports(results, args)
+
+            success_rate = results["overall"]["success_rate"]
+            logger.info(f"Replay test completed. Success rate: {success_rate:.1f}%")
+            sys.exit(0 if success_rate >= DEFAULT_SUCCESS_THRESHOLD else 1)
+
         elif args.test_type == "chaos":
             results = tester.run_chaos_test(
                 namespace=args.namespace,
@@ -696,9 +2581,11 @@ def main():
             # Print summary
             print_metrics_summary(results, "Chaos Test Results")
 
+            report_saturation(results)
+            report_hpa_timeline(results, hpa_timeline, args)
+
             # Export if requested
-            if args.report_json:
-                export_metrics_json(results, args.report_json)
+            export_reports(results, args)
 
             logger.info(
                 f"Chaos test completed. Success rate: {results['success_rate']:.1f}%"
@@ -716,6 +2603,10 @@ def main():
             f"{args.test_type.title()} test failed: {e}", exc_info=args.verbose
         )
         sys.exit(1)
+    finally:
+        # Do not leave kubectl watches running after a failed test
+        if hpa_timeline is not None:
+            hpa_timeline.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,833 @@
+#!/usr/bin/env python3
+"""
+Notification Benchmark
+
+Commit-to-delivery latency and sustainable throughput of pgstac item change
+notifications, measured against a local PostgreSQL with pgstac and no
+cluster.
+
+A writer inserts, updates and deletes items at controlled rates and notes
+when it committed each statement. A local CloudEvents sink stands in for the
+notifier's MQTT/CloudEvents output and notes when each item event arrives.
+By default a relay LISTENs on the notification channel, notes when each
+change reached it and forwards every item to the sink as a CloudEvent, one
+event per item like eoapi-notifier, from a pool of HTTP workers. Levels are
+then judged on commit-to-LISTEN latency, which is what pgstac delivers, and
+the relay's own lag to the sink is reported next to it. With
+external_notifier, a notifier configured to send to the sink URL takes the
+relay's place and levels are judged on arrival at the sink.
+
+The delivery mode (notify_items_delivery) is set for the writer's session:
+'notify' sends a notification per statement, 'both' also writes the outbox,
+and 'outbox' writes only the outbox while the benchmark runs the coalescer
+(pgstac_items_outbox_coalesce) every coalesce window, like the chart's
+notification-coalescer.
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from .histogram import LatencyHistogram
+
+try:
+    import psycopg
+
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "pgstac_items_change"
+OPERATIONS = ("INSERT", "UPDATE", "DELETE")
+# CloudEvents types eoapi-notifier derives from the operation
+EVENT_TYPES = {
+    "INSERT": "org.ogc.api.collection.item.create",
+    "UPDATE": "org.ogc.api.collection.item.replace",
+    "DELETE": "org.ogc.api.collection.item.delete",
+}
+EVENT_SOURCE = "/eoapi/pgstac"
+
+DEFAULT_COLLECTION = "notification-benchmark"
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_LEVEL_DURATION = 10.0
+DEFAULT_DRAIN_S = 5.0
+DEFAULT_MAX_LATENCY_MS = 1000.0
+DEFAULT_MIN_DELIVERED = 0.999
+DELIVERY_MODES = ("notify", "outbox", "both")
+DEFAULT_DELIVERY = "notify"
+DEFAULT_COALESCE_WINDOW_MS = 1000.0
+COALESCE_MAX_ROWS = 10000
+COALESCE_CONSUMER = "notification-benchmark"
+DEFAULT_RELAY_WORKERS = 8
+# Item events the relay may hold before LISTEN waits for its workers
+RELAY_QUEUE_SIZE = 10000
+# Share of the target rate the writer must reach for a level to count
+MIN_WRITE_RATE_SHARE = 0.95
+
+SETTINGS_DIR = (
+    Path(__file__).resolve().parents[2]
+    / "charts"
+    / "eoapi"
+    / "data"
+    / "initdb"
+    / "settings"
+)
+TRIGGER_FILES = ("pgstac-items-outbox.sql", "pgstac-notification-triggers.sql")
+
+# (operation, collection, item id)
+EventKey = Tuple[str, str, str]
+
+
+def _operation_of(event_type: str, data: Dict[str, Any]) -> Optional[str]:
+    for operation, known_type in EVENT_TYPES.items():
+        if event_type == known_type:
+            return operation
+    fallback = data.get("operation")
+    return str(fallback).upper() if fallback else None
+
+
+def parse_cloudevent(headers: Dict[str, str], body: bytes) -> List[EventKey]:
+    """
+    Item changes carried by one CloudEvents HTTP request
+
+    Accepts binary mode (ce-* headers, data as the body), structured mode
+    (application/cloudevents+json) and batches. Events whose data holds a
+    whole notification payload yield one key per item.
+
+    Args:
+        headers: Request headers with lowercase names
+        body: Request body
+
+    Returns:
+        (operation, collection, id) of every item change found
+    """
+    content_type = headers.get("content-type", "")
+    try:
+        payload = json.loads(body or b"null")
+    except ValueError:
+        return []
+
+    if content_type.startswith("application/cloudevents-batch+json"):
+        events = payload if isinstance(payload, list) else []
+    elif content_type.startswith("application/cloudevents+json"):
+        events = [payload]
+    else:
+        events = [{"type": headers.get("ce-type", ""), "data": payload}]
+
+    keys = []
+    for event in events:
+        if not isinstance(event, dict) or not isinstance(event.get("data"), dict):
+            continue
+        data = event["data"]
+        operation = _operation_of(event.get("type", ""), data)
+        items = data.get("items", [data])
+        for item in items if isinstance(items, list) else []:
+            item_id = item.get("id") or item.get("item_id")
+            if operation and item_id and item.get("collection"):
+                keys.append((operation, str(item["collection"]), str(item_id)))
+    return keys
+
+
+class CloudEventsSink:
+    """Local CloudEvents HTTP receiver that records when each item arrives"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the sink
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free one)
+        """
+        self.host = host
+        self.received: Dict[EventKey, float] = {}
+        self.duplicates = 0
+        self.unparsed = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler(self) -> type:
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                received_at = time.time()
+                length = int(self.headers.get("content-length") or 0)
+                body = self.rfile.read(length)
+                headers = {k.lower(): v for k, v in self.headers.items()}
+                sink.record(parse_cloudevent(headers, body), received_at)
+                self.send_response(202)
+                self.send_header("content-length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    @property
+    def url(self) -> str:
+        """URL notifiers should send events to"""
+        return f"http://{self.host}:{self._server.server_port}/"
+
+    def record(self, keys: List[EventKey], received_at: float) -> None:
+        """
+        Record the arrival of item changes
+
+        Args:
+            keys: (operation, collection, id) of each change in one request
+            received_at: Unix time the request arrived
+        """
+        with self._lock:
+            if not keys:
+                self.unparsed += 1
+            for key in keys:
+                if key in self.received:
+                    self.duplicates += 1
+                else:
+                    self.received[key] = received_at
+
+    def start(self) -> "CloudEventsSink":
+        """Serve in a background thread"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="cloudevents-sink", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving"""
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class NotifyRelay:
+    """Forward pgstac_items_change notifications to a sink as CloudEvents"""
+
+    def __init__(self, dsn: str, sink_url: str, workers: int = DEFAULT_RELAY_WORKERS):
+        """
+        Initialize the relay
+
+        Args:
+            dsn: PostgreSQL connection string
+            sink_url: URL CloudEvents are POSTed to
+            workers: Concurrent HTTP senders
+        """
+        self.dsn = dsn
+        self.sink_url = sink_url
+        self.workers = workers
+        self.summaries = 0
+        # First time each change reached LISTEN
+        self.notified: Dict[EventKey, float] = {}
+        self._events: "queue.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.Queue(
+            maxsize=RELAY_QUEUE_SIZE
+        )
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._senders: List[threading.Thread] = []
+
+    def start(self, timeout: float = 10.0) -> "NotifyRelay":
+        """
+        LISTEN and forward in background threads
+
+        Args:
+            timeout: Seconds to wait for LISTEN to take effect
+
+        Raises:
+            RuntimeError: If the relay is not listening in time
+        """
+        self.start_forwarding()
+        self._thread = threading.Thread(
+            target=self._run, name="notify-relay", daemon=True
+        )
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise RuntimeError(f"Relay could not LISTEN on {CHANNEL}")
+        return self
+
+    def start_forwarding(self) -> "NotifyRelay":
+        """Start the HTTP workers that send received changes to the sink"""
+        for index in range(self.workers):
+            sender = threading.Thread(
+                target=self._send, name=f"notify-relay-{index}", daemon=True
+            )
+            sender.start()
+            self._senders.append(sender)
+        return self
+
+    def stop(self) -> None:
+        """Stop listening, then let the workers send what was received"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        for _ in self._senders:
+            self._events.put(None)
+        for sender in self._senders:
+            sender.join()
+        self._senders = []
+
+    def _run(self) -> None:
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute(f"LISTEN {CHANNEL}")
+            self._ready.set()
+            while not self._stop.is_set():
+                for notify in conn.notifies(timeout=0.5):
+                    self.receive(notify.payload, time.time())
+
+    def receive(self, payload: str, received_at: float) -> None:
+        """
+        Note when a notification's changes arrived and queue them for sending
+
+        Args:
+            payload: Notification payload
+            received_at: Unix time the notification reached LISTEN
+        """
+        notification = json.loads(payload)
+        if "items" not in notification:
+            # Summary payloads carry no ids to deliver
+            self.summaries += 1
+            return
+        operation = notification["operation"]
+        for item in notification["items"]:
+            with self._lock:
+                self.notified.setdefault(
+                    (operation, item["collection"], item["id"]), received_at
+                )
+            self._events.put((operation, item))
+
+    def _send(self) -> None:
+        with requests.Session() as http:
+            while True:
+                event = self._events.get()
+                if event is None:
+                    return
+                operation, item = event
+                try:
+                    http.post(
+                        self.sink_url,
+                        data=json.dumps({**item, "operation": operation}),
+                        headers={
+                            "content-type": "application/json",
+                            "ce-specversion": "1.0",
+                            "ce-id": str(uuid.uuid4()),
+                            "ce-source": EVENT_SOURCE,
+                            "ce-type": EVENT_TYPES.get(operation, operation),
+                            "ce-subject": item["id"],
+                        },
+                        timeout=10,
+                    )
+                except requests.RequestException as e:
+                    logger.debug(f"Relay could not send {item.get('id')}: {e}")
+
+
+class Coalescer:
+    """Run pgstac_items_outbox_coalesce on a fixed window, like the chart"""
+
+    def __init__(
+        self,
+        dsn: str,
+        window_ms: float = DEFAULT_COALESCE_WINDOW_MS,
+        consumer: str = COALESCE_CONSUMER,
+    ):
+        """
+        Initialize the coalescer
+
+        Args:
+            dsn: PostgreSQL connection string
+            window_ms: Milliseconds between coalescing runs
+            consumer: Outbox cursor the benchmark reads with
+        """
+        self.dsn = dsn
+        self.window_ms = window_ms
+        self.consumer = consumer
+        self.notifications = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Coalescer":
+        """Move the cursor past earlier changes and start coalescing"""
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute("SET search_path TO pgstac, public")
+            conn.execute(
+                "INSERT INTO pgstac_items_outbox_cursors (consumer, txid, seq) "
+                "SELECT %s, coalesce(max(txid), 0), coalesce(max(seq), 0) "
+                "FROM (SELECT txid, seq FROM pgstac_items_outbox "
+                "ORDER BY txid DESC, seq DESC LIMIT 1) AS last "
+                "ON CONFLICT (consumer) DO UPDATE "
+                "SET txid = excluded.txid, seq = excluded.seq",
+                [self.consumer],
+            )
+        self._thread = threading.Thread(
+            target=self._run, name="outbox-coalescer", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop after the current run"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self) -> None:
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute("SET search_path TO pgstac, public")
+            while True:
+                # One last run after stop() picks up the final changes
+                stopping = self._stop.wait(self.window_ms / 1000)
+                self.notifications += conn.execute(
+                    "SELECT pgstac_items_outbox_coalesce(%s, %s)",
+                    [self.consumer, COALESCE_MAX_ROWS],
+                ).fetchone()[0]
+                if stopping:
+                    return
+
+
+def make_item(collection: str, item_id: str) -> Dict[str, Any]:
+    """Smallest STAC item pgstac accepts"""
+    return {
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "id": item_id,
+        "collection": collection,
+        "geometry": {"type": "Point", "coordinates": [0.0, 0.0]},
+        "bbox": [0.0, 0.0, 0.0, 0.0],
+        "properties": {"datetime": "2020-01-01T00:00:00Z"},
+        "assets": {},
+        "links": [],
+    }
+
+
+def _batches(ids: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def summarize_deliveries(
+    commits: Dict[EventKey, float],
+    received: Dict[EventKey, float],
+    write_seconds: Dict[str, float],
+) -> Dict[str, Any]:
+    """
+    Delivery and commit-to-delivery latency per operation and overall
+
+    Args:
+        commits: Unix time each change was committed
+        received: Unix time each change reached the sink
+        write_seconds: Seconds the writer spent on each operation
+
+    Returns:
+        Dict keyed by operation and "total" with sent, delivered, lost,
+        delivered_share, write_rate and latency_* metrics (ms)
+    """
+    histograms = {op: LatencyHistogram() for op in (*OPERATIONS, "total")}
+    sent = dict.fromkeys(histograms, 0)
+    for key, committed_at in commits.items():
+        operation = key[0]
+        sent[operation] += 1
+        sent["total"] += 1
+        if key in received:
+            latency_ms = max(received[key] - committed_at, 0.0) * 1000
+            histograms[operation].record(latency_ms)
+            histograms["total"].record(latency_ms)
+
+    summary: Dict[str, Any] = {}
+    total_seconds = sum(write_seconds.values())
+    for operation, histogram in histograms.items():
+        if not sent[operation]:
+            continue
+        seconds = (
+            total_seconds if operation == "total" else write_seconds.get(operation)
+        )
+        delivered = histogram.total_count
+        summary[operation] = {
+            "sent": sent[operation],
+            "delivered": delivered,
+            "lost": sent[operation] - delivered,
+            "delivered_share": delivered / sent[operation],
+            "write_rate": sent[operation] / seconds if seconds else 0.0,
+            **histogram.summary(),
+        }
+    return summary
+
+
+def relay_lag(
+    notified: Dict[EventKey, float], received: Dict[EventKey, float]
+) -> Dict[str, Any]:
+    """
+    How long the relay took from LISTEN to the sink
+
+    Args:
+        notified: Unix time each change reached the relay
+        received: Unix time each change reached the sink
+
+    Returns:
+        Dict with notified, forwarded and lag_* metrics (ms)
+    """
+    histogram = LatencyHistogram()
+    for key, notified_at in notified.items():
+        if key in received:
+            histogram.record(max(received[key] - notified_at, 0.0) * 1000)
+    return {
+        "notified": len(notified),
+        "forwarded": histogram.total_count,
+        **{
+            name.replace("latency_", "lag_"): value
+            for name, value in histogram.summary().items()
+        },
+    }
+
+
+def level_sustained(
+    summary: Dict[str, Any],
+    rate: float,
+    max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+    min_delivered: float = DEFAULT_MIN_DELIVERED,
+) -> bool:
+    """
+    Whether a rate level kept up: delivered, on time and written at rate
+
+    Args:
+        summary: Result of summarize_deliveries for the level
+        rate: Target events/s of the level
+        max_latency_ms: Highest acceptable p95 commit-to-delivery latency
+        min_delivered: Lowest acceptable share of events delivered
+
+    Returns:
+        True if every operation met all three limits
+    """
+    operations = [summary[op] for op in OPERATIONS if op in summary]
+    return bool(operations) and all(
+        stats["delivered_share"] >= min_delivered
+        and stats.get("latency_p95", float("inf")) <= max_latency_ms
+        and stats["write_rate"] >= rate * MIN_WRITE_RATE_SHARE
+        for stats in operations
+    )
+
+
+class NotificationBenchmark:
+    """Drive item changes at rising rates and measure their delivery"""
+
+    def __init__(
+        self,
+        dsn: str,
+        collection: str = DEFAULT_COLLECTION,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        sink_port: int = 0,
+        external_notifier: bool = False,
+        delivery: str = DEFAULT_DELIVERY,
+        coalesce_window_ms: float = DEFAULT_COALESCE_WINDOW_MS,
+        relay_workers: int = DEFAULT_RELAY_WORKERS,
+    ):
+        """
+        Initialize the benchmark
+
+        Args:
+            dsn: PostgreSQL connection string ("" uses the PG* variables)
+            collection: Collection the benchmark items are written to
+            batch_size: Items changed per statement
+            sink_port: Port of the CloudEvents sink (0 picks a free one)
+            external_notifier: Leave delivery to a notifier sending to the
+                sink instead of the built-in relay
+            delivery: notify_items_delivery of the writes: notify, outbox
+                (coalesced by the benchmark) or both
+            coalesce_window_ms: Milliseconds between coalescing runs with
+                outbox delivery
+            relay_workers: Concurrent HTTP senders of the built-in relay
+
+        Raises:
+            ImportError: If psycopg is not installed
+            ValueError: If batch_size or relay_workers is not positive, or
+                the delivery mode is unknown
+        """
+        if not PSYCOPG_AVAILABLE:
+            raise ImportError("The notification benchmark needs psycopg>=3.2")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive: {batch_size}")
+        if relay_workers < 1:
+            raise ValueError(f"relay_workers must be positive: {relay_workers}")
+        if delivery not in DELIVERY_MODES:
+            raise ValueError(
+                f"delivery must be one of {', '.join(DELIVERY_MODES)}: {delivery}"
+            )
+        self.dsn = dsn
+        self.collection = collection
+        self.batch_size = batch_size
+        self.sink_port = sink_port
+        self.external_notifier = external_notifier
+        self.delivery = delivery
+        self.coalesce_window_ms = coalesce_window_ms
+        self.relay_workers = relay_workers
+
+    def install_triggers(self) -> None:
+        """Create the chart's outbox and notification triggers"""
+        with psycopg.connect(self.dsn, autocommit=True) as conn:
+            conn.execute("SET search_path TO pgstac, public")
+            for name in TRIGGER_FILES:
+                conn.execute((SETTINGS_DIR / name).read_text())
+
+    def _connect(self) -> Any:
+        conn = psycopg.connect(self.dsn)
+        # Session settings, so the benchmark does not depend on pgstac_settings
+        conn.execute("SET pgstac.notify_items_mode = 'items'")
+        conn.execute(
+            "SELECT set_config('pgstac.notify_items_delivery', %s, false)",
+            [self.delivery],
+        )
+        if not conn.execute(
+            "SELECT to_regprocedure('pgstac.notify_items_change_func()')"
+        ).fetchone()[0]:
+            conn.close()
+            raise RuntimeError(
+                "notify_items_change_func is missing; install the triggers first"
+            )
+        conn.execute(
+            "SELECT pgstac.upsert_collection(%s::jsonb)",
+            [json.dumps(self._collection())],
+        )
+        conn.commit()
+        return conn
+
+    def _collection(self) -> Dict[str, Any]:
+        return {
+            "type": "Collection",
+            "stac_version": "1.0.0",
+            "id": self.collection,
+            "description": "Notification benchmark items",
+            "license": "proprietary",
+            "extent": {
+                "spatial": {"bbox": [[-180, -90, 180, 90]]},
+                "temporal": {"interval": [[None, None]]},
+            },
+            "links": [],
+        }
+
+    def _statement(self, operation: str, ids: List[str]) -> Tuple[str, List[Any]]:
+        if operation == "INSERT":
+            items = [make_item(self.collection, item_id) for item_id in ids]
+            return "SELECT pgstac.create_items(%s::jsonb)", [json.dumps(items)]
+        if operation == "UPDATE":
+            return (
+                "UPDATE pgstac.items SET content = jsonb_set(content, "
+                "'{properties,updated}', to_jsonb(now()::text)) "
+                "WHERE collection = %s AND id = ANY(%s)",
+                [self.collection, ids],
+            )
+        return (
+            "DELETE FROM pgstac.items WHERE collection = %s AND id = ANY(%s)",
+            [self.collection, ids],
+        )
+
+    def write(
+        self, conn: Any, operation: str, ids: List[str], rate: float
+    ) -> Tuple[Dict[EventKey, float], float]:
+        """
+        Apply one operation to items at a fixed rate, one commit per batch
+
+        Batches are sent on an open-loop schedule; a writer that falls behind
+        sends the next batch at once and the achieved rate drops.
+
+        Args:
+            conn: Writer connection
+            operation: INSERT, UPDATE or DELETE
+            ids: Item ids to change
+            rate: Target item changes per second
+
+        Returns:
+            Commit time of every change and the seconds spent writing
+        """
+        commits: Dict[EventKey, float] = {}
+        start = time.time()
+        for index, batch in enumerate(_batches(ids, self.batch_size)):
+            delay = start + index * self.batch_size / rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            conn.execute(*self._statement(operation, batch))
+            # Timed from the COMMIT request: it includes the flush that
+            # delivery has to wait for
+            committed_at = time.time()
+            conn.commit()
+            for item_id in batch:
+                commits[(operation, self.collection, item_id)] = committed_at
+        return commits, time.time() - start
+
+    def run_level(
+        self,
+        conn: Any,
+        sink: CloudEventsSink,
+        rate: float,
+        duration: float = DEFAULT_LEVEL_DURATION,
+        drain_s: float = DEFAULT_DRAIN_S,
+        relay: Optional[NotifyRelay] = None,
+    ) -> Dict[str, Any]:
+        """
+        Insert, update and delete a fresh set of items at one rate
+
+        Args:
+            conn: Writer connection
+            sink: Sink receiving the events
+            rate: Item changes per second for each operation
+            duration: Seconds each operation runs for
+            drain_s: Seconds to wait for late events after the last commit
+            relay: Built-in relay, whose LISTEN receipt times are measured
+                (default: arrival at the sink)
+
+        Returns:
+            Result of summarize_deliveries for the level, with the relay's
+            lag to the sink under "relay" when there is one
+        """
+        run_id = uuid.uuid4().hex[:8]
+        ids = [f"bench-{run_id}-{i}" for i in range(max(1, round(rate * duration)))]
+        commits: Dict[EventKey, float] = {}
+        write_seconds: Dict[str, float] = {}
+        for operation in OPERATIONS:
+            operation_commits, write_seconds[operation] = self.write(
+                conn, operation, ids, rate
+            )
+            commits.update(operation_commits)
+
+        arrivals = relay.notified if relay else sink.received
+        deadline = time.time() + drain_s
+        while time.time() < deadline and not (
+            commits.keys() <= arrivals.keys() and commits.keys() <= sink.received.keys()
+        ):
+            time.sleep(0.1)
+        summary = summarize_deliveries(commits, dict(arrivals), write_seconds)
+        if relay:
+            notified = {
+                key: relay.notified[key] for key in commits if key in relay.notified
+            }
+            summary["relay"] = relay_lag(notified, sink.received)
+        return summary
+
+    def run(
+        self,
+        rates: List[float],
+        duration: float = DEFAULT_LEVEL_DURATION,
+        drain_s: float = DEFAULT_DRAIN_S,
+        max_latency_ms: float = DEFAULT_MAX_LATENCY_MS,
+        min_delivered: float = DEFAULT_MIN_DELIVERED,
+    ) -> Dict[str, Any]:
+        """
+        Raise the rate level by level until delivery falls behind
+
+        Args:
+            rates: Item changes per second to try, in increasing order
+            duration: Seconds each operation runs for at each level
+            drain_s: Seconds to wait for late events at the end of a level
+            max_latency_ms: Highest acceptable p95 commit-to-delivery latency
+            min_delivered: Lowest acceptable share of events delivered
+
+        Returns:
+            Report with per-level summaries, the max_sustainable_rate (None
+            if no level kept up) and the sink's duplicate and unparsed counts
+        """
+        sink = CloudEventsSink(port=self.sink_port).start()
+        relay = (
+            None
+            if self.external_notifier
+            else NotifyRelay(self.dsn, sink.url, workers=self.relay_workers)
+        )
+        if relay:
+            relay.start()
+        else:
+            logger.info(f"Waiting for a notifier to send events to {sink.url}")
+        coalescer = (
+            Coalescer(self.dsn, self.coalesce_window_ms).start()
+            if self.delivery == "outbox"
+            else None
+        )
+
+        levels: Dict[str, Any] = {}
+        max_sustainable: Optional[float] = None
+        try:
+            with self._connect() as conn:
+                for rate in rates:
+                    logger.info(f"Notification level: {rate:g} events/s")
+                    summary = self.run_level(
+                        conn, sink, rate, duration, drain_s, relay=relay
+                    )
+                    sustained = level_sustained(
+                        summary, rate, max_latency_ms, min_delivered
+                    )
+                    levels[f"{rate:g}"] = {**summary, "sustained": sustained}
+                    if not sustained:
+                        break
+                    max_sustainable = rate
+        finally:
+            if coalescer:
+                coalescer.stop()
+            if relay:
+                relay.stop()
+            sink.stop()
+
+        return {
+            "levels": levels,
+            "max_sustainable_rate": max_sustainable,
+            "delivery": self.delivery,
+            # Where latency ends: LISTEN receipt by the relay, or the sink
+            "measured_at": "sink" if self.external_notifier else "listen",
+            "limits": {
+                "max_latency_ms": max_latency_ms,
+                "min_delivered": min_delivered,
+            },
+            "duplicates": sink.duplicates,
+            "unparsed": sink.unparsed,
+            "summary_notifications": relay.summaries if relay else None,
+        }
+
+
+def describe_benchmark(report: Dict[str, Any]) -> List[str]:
+    """
+    Human-readable lines for a benchmark report
+
+    Args:
+        report: Result of NotificationBenchmark.run
+
+    Returns:
+        One line per level and operation, then the sustainable rate
+    """
+    lines = []
+    for rate, level in report["levels"].items():
+        verdict = "ok" if level["sustained"] else "FELL BEHIND"
+        lines.append(f"{rate} events/s: {verdict}")
+        for operation in OPERATIONS:
+            stats = level.get(operation)
+            if not stats:
+                continue
+            lines.append(
+                f"  {operation:<6} {stats['delivered']}/{stats['sent']} delivered "
+                f"at {stats['write_rate']:.0f}/s, latency "
+                f"p50 {stats.get('latency_p50', 0):.1f} ms, "
+                f"p95 {stats.get('latency_p95', 0):.1f} ms, "
+                f"p99 {stats.get('latency_p99', 0):.1f} ms, "
+                f"max {stats.get('latency_max', 0):.1f} ms"
+            )
+        relay = level.get("relay")
+        if relay:
+            lines.append(
+                f"  relay  {relay['forwarded']}/{relay['notified']} forwarded, lag "
+                f"p50 {relay.get('lag_p50', 0):.1f} ms, "
+                f"p95 {relay.get('lag_p95', 0):.1f} ms"
+            )
+    best = report["max_sustainable_rate"]
+    lines.append(
+        f"Max sustainable rate: {best:g} events/s"
+        if best is not None
+        else "Max sustainable rate: none of the levels kept up"
+    )
+    return lines
@@ -6,23 +6,51 @@ Optional module for querying Prometheus metrics during load tests.
 Gracefully degrades if Prometheus is unavailable.
 """
 
+import concurrent.futures
+import hashlib
+import json
 import logging
+import math
+import os
+import threading
+import time
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .infra_stats import describe_stats, infrastructure_stats
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_PROMETHEUS_URL = "http://localhost:9090"
 DEFAULT_TIMEOUT = 10
+DEFAULT_CACHE_DIR: Optional[str] = os.getenv(
+    "PROMETHEUS_CACHE_DIR",
+    str(Path.home() / ".cache" / "eoapi-load-tests" / "prometheus"),
+)
+# Range queries sent at once by collect_test_metrics
+MAX_PARALLEL_QUERIES = 16
+# Windows ending more recently than this may still be missing scrapes or
+# rate() samples, so their responses are not cached
+CACHE_MIN_AGE_SECONDS = 120
 
 
 class PrometheusClient:
     """Simple Prometheus client for querying metrics during load tests"""
 
     def __init__(
-        self, url: str = DEFAULT_PROMETHEUS_URL, timeout: int = DEFAULT_TIMEOUT
+        self,
+        url: str = DEFAULT_PROMETHEUS_URL,
+        timeout: int = DEFAULT_TIMEOUT,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
     ):
         """
         Initialize Prometheus client
@@ -30,15 +58,27 @@ class PrometheusClient:
         Args:
             url: Prometheus server URL
             timeout: Request timeout in seconds
+            cache_dir: Directory caching range query responses on disk, or
+                None to always query Prometheus
         """
         self.url = url.rstrip("/")
         self.timeout = timeout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.session = self._create_session()
         self.available = self._check_availability()
 
+    def _create_session(self) -> requests.Session:
+        """Session pooling enough connections for parallel range queries"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_PARALLEL_QUERIES)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
     def _check_availability(self) -> bool:
         """Check if Prometheus is available"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/api/v1/status/config",
                 timeout=self.timeout,
             )
@@ -70,7 +110,7 @@ class PrometheusClient:
             if time:
                 params["time"] = time.timestamp()
 
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/api/v1/query",
                 params=params,
                 timeout=self.timeout,
@@ -87,6 +127,17 @@ class PrometheusClient:
             logger.debug(f"Prometheus query error: {e}")
             return None
 
+    def _cache_path(self, params: Dict[str, str | float]) -> Optional[Path]:
+        """Cache file for a range query, or None if it must not be cached"""
+        if self.cache_dir is None:
+            return None
+        if time.time() - float(params["end"]) < CACHE_MIN_AGE_SECONDS:
+            return None
+        key = json.dumps(
+            [self.url, params["query"], params["start"], params["end"], params["step"]]
+        )
+        return self.cache_dir / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
     def query_range(
         self,
         query: str,
@@ -97,6 +148,10 @@ class PrometheusClient:
         """
         Execute range Prometheus query
 
+        Responses for windows that ended at least CACHE_MIN_AGE_SECONDS ago
+        are cached on disk by (query, start, end, step), so re-running a
+        report does not query Prometheus again.
+
         Args:
             query: PromQL query string
             start: Start time
@@ -106,18 +161,26 @@ class PrometheusClient:
         Returns:
             Query result dict or None if unavailable
         """
+        # Whole-second bounds put samples on the same Unix seconds as the
+        # load test timelines
+        params: dict[str, str | float] = {
+            "query": query,
+            "start": math.floor(start.timestamp()),
+            "end": math.ceil(end.timestamp()),
+            "step": step,
+        }
+        cache_path = self._cache_path(params)
+        if cache_path is not None and cache_path.exists():
+            try:
+                return json.loads(cache_path.read_text())
+            except (OSError, ValueError) as e:
+                logger.debug(f"Ignoring unreadable Prometheus cache {cache_path}: {e}")
+
         if not self.available:
             return None
 
         try:
-            params: dict[str, str | float] = {
-                "query": query,
-                "start": start.timestamp(),
-                "end": end.timestamp(),
-                "step": step,
-            }
-
-            response = requests.get(
+            response = self.session.get(
                 f"{self.url}/api/v1/query_range",
                 params=params,
                 timeout=self.timeout,
@@ -126,7 +189,10 @@ class PrometheusClient:
             if response.status_code == 200:
                 data = response.json()
                 if data.get("status") == "success":
-                    return data.get("data", {})
+                    result = data.get("data", {})
+                    if cache_path is not None:
+                        self._write_cache(cache_path, result)
+                    return result
 
             logger.warning(f"Prometheus range query failed: {response.status_code}")
             return None
@@ -134,6 +200,117 @@ class PrometheusClient:
             logger.debug(f"Prometheus range query error: {e}")
             return None
 
+    def _write_cache(self, path: Path, result: Dict) -> None:
+        """Write a cache entry atomically so parallel readers never see half"""
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            partial.write_text(json.dumps(result))
+            partial.replace(path)
+        except OSError as e:
+            logger.debug(f"Could not cache Prometheus response: {e}")
+
+    def query_range_many(
+        self,
+        queries: Dict[str, str],
+        start: datetime,
+        end: datetime,
+        step: str = "15s",
+    ) -> Dict[str, Optional[Dict]]:
+        """
+        Execute several range queries in parallel over the pooled session
+
+        Args:
+            queries: Dict of name -> PromQL query string
+            start: Start time
+            end: End time
+            step: Query resolution step
+
+        Returns:
+            Dict of name -> query result dict or None if unavailable
+        """
+        if not queries:
+            return {}
+        workers = min(MAX_PARALLEL_QUERIES, len(queries))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                name: executor.submit(self.query_range, query, start, end, step)
+                for name, query in queries.items()
+            }
+            return {name: future.result() for name, future in futures.items()}
+
+
+def pod_queries(namespace: str) -> Dict[str, str]:
+    """Pod CPU, CPU throttling and memory queries for a namespace"""
+    return {
+        # CPU usage
+        "cpu": (
+            f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}",'
+            f'container!="",container!="POD"}}[1m])'
+        ),
+        # Share of CFS periods in which the container hit its CPU limit
+        "cpu_throttled": (
+            f"rate(container_cpu_cfs_throttled_periods_total"
+            f'{{namespace="{namespace}",container!="",container!="POD"}}[1m]) / '
+            f"rate(container_cpu_cfs_periods_total"
+            f'{{namespace="{namespace}",container!="",container!="POD"}}[1m])'
+        ),
+        # Memory usage
+        "memory": (
+            f'container_memory_working_set_bytes{{namespace="{namespace}",'
+            f'container!="",container!="POD"}}'
+        ),
+    }
+
+
+def hpa_queries(namespace: str) -> Dict[str, str]:
+    """HPA current and desired replica queries for a namespace"""
+    return {
+        "current_replicas": f'kube_horizontalpodautoscaler_status_current_replicas{{namespace="{namespace}"}}',
+        "desired_replicas": f'kube_horizontalpodautoscaler_status_desired_replicas{{namespace="{namespace}"}}',
+    }
+
+
+def request_queries(namespace: str) -> Dict[str, str]:
+    """Ingress request rate and p95 latency queries for a namespace"""
+    return {
+        # Request rate (depends on ingress controller), nginx ingress first
+        "request_rate": (
+            f'rate(nginx_ingress_controller_requests{{namespace="{namespace}"}}[1m])'
+        ),
+        # Request duration
+        "request_latency_p95": (
+            f"histogram_quantile(0.95, "
+            f"rate(nginx_ingress_controller_request_duration_seconds_bucket"
+            f'{{namespace="{namespace}"}}[1m]))'
+        ),
+    }
+
+
+def database_queries(namespace: str) -> Dict[str, str]:
+    """PostgreSQL connection, pgbouncer pool and query duration queries"""
+    return {
+        "db_connections": f'pg_stat_activity_count{{namespace="{namespace}"}}',
+        # Clients queued for a server connection; pgmonitor's exporter first,
+        # then the community pgbouncer exporter
+        "pgbouncer_waiting": (
+            f'sum(ccp_pgbouncer_clients_wait{{namespace="{namespace}"}}) or '
+            f'sum(pgbouncer_pools_client_waiting_connections{{namespace="{namespace}"}})'
+        ),
+        "db_query_duration": (
+            f'rate(pg_stat_statements_mean_exec_time{{namespace="{namespace}"}}[1m])'
+        ),
+    }
+
+
+# Metric group in collect_test_metrics results -> query builder
+METRIC_GROUPS = {
+    "pod_metrics": pod_queries,
+    "hpa_metrics": hpa_queries,
+    "request_metrics": request_queries,
+    "database_metrics": database_queries,
+}
+
 
 def get_pod_metrics(
     client: PrometheusClient,
@@ -153,23 +330,7 @@ def get_pod_metrics(
     Returns:
         Dict with CPU and memory metrics or empty values if unavailable
     """
-    metrics = {}
-
-    # CPU usage
-    cpu_query = (
-        f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}",'
-        f'container!="",container!="POD"}}[1m])'
-    )
-    metrics["cpu"] = client.query_range(cpu_query, start, end)
-
-    # Memory usage
-    memory_query = (
-        f'container_memory_working_set_bytes{{namespace="{namespace}",'
-        f'container!="",container!="POD"}}'
-    )
-    metrics["memory"] = client.query_range(memory_query, start, end)
-
-    return metrics
+    return client.query_range_many(pod_queries(namespace), start, end)
 
 
 def get_hpa_metrics(
@@ -190,17 +351,7 @@ def get_hpa_metrics(
     Returns:
         Dict with HPA metrics or empty values if unavailable
     """
-    metrics = {}
-
-    # Current replicas
-    replicas_query = f'kube_horizontalpodautoscaler_status_current_replicas{{namespace="{namespace}"}}'
-    metrics["current_replicas"] = client.query_range(replicas_query, start, end)
-
-    # Desired replicas
-    desired_query = f'kube_horizontalpodautoscaler_status_desired_replicas{{namespace="{namespace}"}}'
-    metrics["desired_replicas"] = client.query_range(desired_query, start, end)
-
-    return metrics
+    return client.query_range_many(hpa_queries(namespace), start, end)
 
 
 def get_request_metrics(
@@ -221,24 +372,7 @@ def get_request_metrics(
     Returns:
         Dict with request metrics or empty values if unavailable
     """
-    metrics = {}
-
-    # Request rate (depends on ingress controller)
-    # Try nginx ingress first
-    rate_query = (
-        f'rate(nginx_ingress_controller_requests{{namespace="{namespace}"}}[1m])'
-    )
-    metrics["request_rate"] = client.query_range(rate_query, start, end)
-
-    # Request duration
-    latency_query = (
-        f"histogram_quantile(0.95, "
-        f"rate(nginx_ingress_controller_request_duration_seconds_bucket"
-        f'{{namespace="{namespace}"}}[1m]))'
-    )
-    metrics["request_latency_p95"] = client.query_range(latency_query, start, end)
-
-    return metrics
+    return client.query_range_many(request_queries(namespace), start, end)
 
 
 def get_database_metrics(
@@ -259,19 +393,7 @@ def get_database_metrics(
     Returns:
         Dict with database metrics or empty values if unavailable
     """
-    metrics = {}
-
-    # PostgreSQL connections
-    connections_query = f'pg_stat_activity_count{{namespace="{namespace}"}}'
-    metrics["db_connections"] = client.query_range(connections_query, start, end)
-
-    # Query duration
-    query_duration = (
-        f'rate(pg_stat_statements_mean_exec_time{{namespace="{namespace}"}}[1m])'
-    )
-    metrics["db_query_duration"] = client.query_range(query_duration, start, end)
-
-    return metrics
+    return client.query_range_many(database_queries(namespace), start, end)
 
 
 def collect_test_metrics(
@@ -279,36 +401,52 @@ def collect_test_metrics(
     namespace: str,
     start: datetime,
     end: datetime,
+    client: Optional[PrometheusClient] = None,
 ) -> Dict[str, Dict]:
     """
     Collect all available infrastructure metrics for a test
 
+    All range queries run in parallel over the client's pooled session, and
+    cached responses are reused.
+
     Args:
         prometheus_url: Prometheus URL (None to skip)
         namespace: Kubernetes namespace
         start: Test start time
         end: Test end time
+        client: Existing client to reuse instead of creating (and probing)
+            a new one
 
     Returns:
         Dict with all collected metrics (empty dicts if unavailable)
     """
-    if not prometheus_url:
+    if not prometheus_url and client is None:
         logger.info("Prometheus URL not provided, skipping metrics collection")
         return {}
 
-    client = PrometheusClient(prometheus_url)
+    if client is None:
+        assert prometheus_url is not None
+        client = PrometheusClient(prometheus_url)
     if not client.available:
-        logger.info("Prometheus unavailable, skipping metrics collection")
-        return {}
+        # Cached responses can still cover the window
+        logger.info("Prometheus unavailable, using cached metrics only")
 
     logger.info(f"Collecting infrastructure metrics from {start} to {end}")
 
-    all_metrics = {
-        "pod_metrics": get_pod_metrics(client, namespace, start, end),
-        "hpa_metrics": get_hpa_metrics(client, namespace, start, end),
-        "request_metrics": get_request_metrics(client, namespace, start, end),
-        "database_metrics": get_database_metrics(client, namespace, start, end),
-    }
+    # One parallel batch across all groups, keyed "group/name"
+    results = client.query_range_many(
+        {
+            f"{group}/{name}": query
+            for group, build in METRIC_GROUPS.items()
+            for name, query in build(namespace).items()
+        },
+        start,
+        end,
+    )
+    all_metrics: Dict[str, Dict] = {group: {} for group in METRIC_GROUPS}
+    for key, result in results.items():
+        group, name = key.split("/", 1)
+        all_metrics[group][name] = result
 
     # Filter out None values
     return {k: v for k, v in all_metrics.items() if v and any(v.values())}
@@ -324,6 +462,11 @@ def summarize_metrics(metrics: Dict) -> Dict[str, str]:
     Returns:
         Dict with summarized metrics for display
     """
+    if NUMPY_AVAILABLE:
+        lines = describe_stats(infrastructure_stats(metrics))
+        if lines:
+            return lines
+
     summary = {}
 
     # Pod metrics
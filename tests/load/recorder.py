@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Load Run Recorder
+
+Accumulates the results of one load run: request counters, a latency
+histogram and per-second buckets keyed by Unix time. Recorders from several
+workers or generator processes merge exactly into one.
+
+Each second keeps request and success counts, failures by status class and a
+sparse latency histogram, so a run can be plotted against Prometheus range
+data (which is also keyed by Unix time) to see when latency rose, how long a
+scale-up took or how a pod kill showed up.
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from .histogram import (
+    DEFAULT_SIGNIFICANT_DIGITS,
+    INTERVAL_SIGNIFICANT_DIGITS,
+    LatencyHistogram,
+    SparseLatencyHistogram,
+)
+
+# Status passed to record() for requests that failed without a response
+NO_RESPONSE = 0
+# Per-second failure counters; "other" covers unexpected 1xx-3xx responses and
+# failures recorded without a status
+ERROR_CLASSES = ("errors_4xx", "errors_5xx", "errors_network", "errors_other")
+# Latency quantiles reported for every second of the timeline
+TIMELINE_PERCENTILES = {"p50": 50.0, "p90": 90.0, "p95": 95.0, "p99": 99.0}
+
+
+def error_class(status: Optional[int]) -> str:
+    """Timeline failure counter for a failed request's status"""
+    if status == NO_RESPONSE:
+        return "errors_network"
+    if status is not None and 400 <= status < 600:
+        return f"errors_{status // 100}xx"
+    return "errors_other"
+
+
+class RequestRecorder:
+    """Mergeable counters, latency histogram and per-second buckets for a run"""
+
+    def __init__(self, histogram_digits: int = DEFAULT_SIGNIFICANT_DIGITS):
+        """
+        Initialize an empty recorder
+
+        Args:
+            histogram_digits: Significant digits kept by the latency histogram
+        """
+        self.histogram_digits = histogram_digits
+        self.latencies = LatencyHistogram(significant_digits=histogram_digits)
+        self.success_count = 0
+        self.total_requests = 0
+        self.duration = 0.0
+        # Unix second -> [requests, successes, *ERROR_CLASSES]
+        self.per_second: Dict[int, List[int]] = {}
+        self.per_second_latencies: Dict[int, SparseLatencyHistogram] = {}
+
+    def record(
+        self,
+        success: bool,
+        latency_ms: float,
+        timestamp: Optional[float] = None,
+        status: Optional[int] = None,
+    ) -> None:
+        """
+        Record one completed request
+
+        Args:
+            success: Whether the request succeeded
+            latency_ms: Request latency in milliseconds
+            timestamp: Unix time the request completed (defaults to now)
+            status: HTTP status, NO_RESPONSE if the request failed without a
+                response, or None if unknown; classifies failures
+        """
+        second = int(timestamp if timestamp is not None else time.time())
+        bucket = self.per_second.get(second)
+        if bucket is None:
+            bucket = self.per_second[second] = [0] * (2 + len(ERROR_CLASSES))
+            self.per_second_latencies[second] = SparseLatencyHistogram(
+                min(self.histogram_digits, INTERVAL_SIGNIFICANT_DIGITS)
+            )
+        bucket[0] += 1
+        self.total_requests += 1
+        if success:
+            bucket[1] += 1
+            self.success_count += 1
+        else:
+            bucket[2 + ERROR_CLASSES.index(error_class(status))] += 1
+        self.latencies.record(latency_ms)
+        self.per_second_latencies[second].record(latency_ms)
+
+    def merge(self, other: "RequestRecorder") -> "RequestRecorder":
+        """
+        Add another recorder's results into this one
+
+        Runs are assumed to overlap in time, so the merged duration is the
+        longest of the two rather than their sum.
+
+        Args:
+            other: Recorder to merge
+
+        Returns:
+            This recorder, for chaining
+
+        Raises:
+            ValueError: If the latency histograms are configured differently
+        """
+        self.latencies.merge(other.latencies)
+        self.success_count += other.success_count
+        self.total_requests += other.total_requests
+        self.duration = max(self.duration, other.duration)
+        for second, counts in other.per_second.items():
+            bucket = self.per_second.get(second)
+            if bucket is None:
+                self.per_second[second] = list(counts)
+                self.per_second_latencies[second] = SparseLatencyHistogram(
+                    other.per_second_latencies[second].significant_digits
+                ).merge(other.per_second_latencies[second])
+                continue
+            for i, count in enumerate(counts):
+                bucket[i] += count
+            self.per_second_latencies[second].merge(other.per_second_latencies[second])
+        return self
+
+    def timeline(self) -> List[Dict[str, float]]:
+        """
+        Per-second counts and latency quantiles ordered by time
+
+        Returns:
+            List of dicts with timestamp (Unix seconds, the start of the
+            second), requests, successes, failures per error class and
+            latency_p50/p90/p95/p99/max in milliseconds
+        """
+        rows = []
+        for second, counts in sorted(self.per_second.items()):
+            latencies = self.per_second_latencies[second]
+            row: Dict[str, float] = {
+                "timestamp": second,
+                "requests": counts[0],
+                "successes": counts[1],
+            }
+            row.update(zip(ERROR_CLASSES, counts[2:]))
+            for name, percentile in TIMELINE_PERCENTILES.items():
+                row[f"latency_{name}"] = latencies.percentile(percentile)
+            row["latency_max"] = latencies.max
+            rows.append(row)
+        return rows
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Statistical Regression Detection
+
+Decides whether candidate load test runs are slower than baseline runs.
+Per-second samples of one run are autocorrelated, and two runs of the same
+build differ by more than their seconds do, so samples are never treated as
+independent: a hierarchical bootstrap resamples runs, then blocks of
+consecutive seconds within each run, and compares the mean of the run
+medians. A metric regresses only when the bootstrap says the change is
+significant and its confidence interval lies entirely beyond the tolerance,
+so run-to-run drift and tiny but significant shifts do not fail the gate.
+Each side needs several runs, since a single run says nothing about
+run-to-run variance.
+"""
+
+import math
+import random
+import statistics
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .timeseries import timeseries_rows
+
+# Timeline metric -> whether a higher value is worse
+COMPARED_METRICS = {"latency_p95": True, "requests": False}
+DEFAULT_ALPHA = 0.05
+DEFAULT_TOLERANCE = 0.05
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_BOOTSTRAP_ITERATIONS = 2000
+# Fewest runs per side for a verdict
+DEFAULT_MIN_RUNS = 3
+# Consecutive seconds resampled together, longer than the autocorrelation
+# of per-second load test metrics
+DEFAULT_BLOCK_SECONDS = 5
+# Fewest per-second samples per run for a comparison to be meaningful
+MIN_SAMPLES = 5
+
+
+def run_level(runs: Sequence[Sequence[float]]) -> float:
+    """Mean over runs of each run's median"""
+    return statistics.fmean(statistics.median(run) for run in runs)
+
+
+def long_runs(runs: List[List[float]]) -> List[List[float]]:
+    """
+    Runs with at least MIN_SAMPLES samples
+
+    A short or aborted run says little about its level, so it is left out
+    rather than failing the comparison of the runs that completed.
+    """
+    return [run for run in runs if len(run) >= MIN_SAMPLES]
+
+
+def block_resample(
+    samples: Sequence[float], rng: random.Random, block: int = DEFAULT_BLOCK_SECONDS
+) -> List[float]:
+    """
+    Circular block bootstrap resample of one run's per-second samples
+
+    Args:
+        samples: Per-second samples in time order
+        rng: Random source
+        block: Consecutive samples drawn together
+
+    Returns:
+        Resample of the same length
+    """
+    n = len(samples)
+    block = max(1, min(block, n))
+    resample: List[float] = []
+    while len(resample) < n:
+        start = rng.randrange(n)
+        resample.extend(samples[(start + i) % n] for i in range(block))
+    return resample[:n]
+
+
+def hierarchical_bootstrap(
+    baseline: Sequence[Sequence[float]],
+    candidate: Sequence[Sequence[float]],
+    rng: random.Random,
+    iterations: int = DEFAULT_BOOTSTRAP_ITERATIONS,
+    block: int = DEFAULT_BLOCK_SECONDS,
+) -> List[float]:
+    """
+    Bootstrap distribution of the relative change of the run-level statistic
+
+    Each iteration resamples runs with replacement on both sides, then
+    blocks of seconds within every drawn run, so both run-to-run and
+    within-run variance are represented.
+
+    Args:
+        baseline: Per-second samples of each baseline run
+        candidate: Per-second samples of each candidate run
+        rng: Random source, seeded for reproducible verdicts
+        iterations: Bootstrap resamples
+        block: Consecutive seconds resampled together
+
+    Returns:
+        Relative changes, e.g. 0.12 for +12%, sorted
+    """
+
+    def resample(runs: Sequence[Sequence[float]]) -> float:
+        drawn = rng.choices(runs, k=len(runs))
+        return run_level([block_resample(run, rng, block) for run in drawn])
+
+    changes = []
+    for _ in range(iterations):
+        base = resample(baseline)
+        cand = resample(candidate)
+        if base > 0:
+            changes.append(cand / base - 1)
+    return sorted(changes)
+
+
+@dataclass(frozen=True)
+class MetricComparison:
+    """Verdict for one metric of one report series"""
+
+    series: str
+    metric: str
+    baseline_median: float
+    candidate_median: float
+    ci_low: float
+    ci_high: float
+    p_value: float
+    samples: Tuple[int, int]
+    runs: Tuple[int, int]
+    regressed: bool
+
+    @property
+    def change(self) -> float:
+        """Relative change of the candidate run-level median"""
+        if not self.baseline_median:
+            return 0.0
+        return self.candidate_median / self.baseline_median - 1
+
+
+def compare_samples(
+    series: str,
+    metric: str,
+    baseline: List[List[float]],
+    candidate: List[List[float]],
+    higher_is_worse: bool,
+    alpha: float = DEFAULT_ALPHA,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_runs: int = DEFAULT_MIN_RUNS,
+    confidence: float = DEFAULT_CONFIDENCE,
+    rng: Optional[random.Random] = None,
+) -> MetricComparison:
+    """
+    Compare one metric between baseline and candidate runs
+
+    Args:
+        series: Report series the samples come from
+        metric: Timeline metric name
+        baseline: Per-second samples of each baseline run
+        candidate: Per-second samples of each candidate run
+        higher_is_worse: True for latencies, False for throughput
+        alpha: Significance level: the bootstrap share of resamples that
+            are not worse must stay below it
+        tolerance: Relative change that must be exceeded with confidence
+        min_runs: Fewest runs per side with at least MIN_SAMPLES samples
+        confidence: Coverage of the change's confidence interval
+        rng: Random source for the bootstrap (seeded if omitted)
+
+    Returns:
+        MetricComparison
+
+    Raises:
+        ValueError: If a side has fewer than min_runs runs with at least
+            MIN_SAMPLES samples
+    """
+    baseline = long_runs(baseline)
+    candidate = long_runs(candidate)
+    if min(len(baseline), len(candidate)) < min_runs:
+        raise ValueError(
+            f"{series} {metric}: need at least {min_runs} runs per side with "
+            f"{MIN_SAMPLES} or more per-second samples to judge run-to-run "
+            f"variance, got {len(baseline)} baseline and {len(candidate)} "
+            f"candidate runs"
+        )
+    rng = rng or random.Random(0)
+
+    changes = hierarchical_bootstrap(baseline, candidate, rng)
+    if changes:
+        tail = (1 - confidence) / 2
+        ci_low = changes[int(tail * (len(changes) - 1))]
+        ci_high = changes[int(math.ceil((1 - tail) * (len(changes) - 1)))]
+        # One-sided: share of resamples where the candidate is not worse
+        not_worse = sum(
+            1 for change in changes if (change <= 0 if higher_is_worse else change >= 0)
+        )
+        p_value = (not_worse + 1) / (len(changes) + 1)
+    else:
+        ci_low = ci_high = 0.0
+        p_value = 1.0
+    worse_beyond_tolerance = (
+        ci_low > tolerance if higher_is_worse else ci_high < -tolerance
+    )
+    return MetricComparison(
+        series=series,
+        metric=metric,
+        baseline_median=run_level(baseline),
+        candidate_median=run_level(candidate),
+        ci_low=ci_low,
+        ci_high=ci_high,
+        p_value=p_value,
+        samples=(sum(map(len, baseline)), sum(map(len, candidate))),
+        runs=(len(baseline), len(candidate)),
+        regressed=p_value < alpha and worse_beyond_tolerance,
+    )
+
+
+def series_samples(reports: List[Dict]) -> Dict[str, Dict[str, List[List[float]]]]:
+    """
+    Per-second samples of the compared metrics, kept per report
+
+    The first and last second of every series are dropped because they are
+    partial and would skew throughput.
+
+    Args:
+        reports: Reports of one side of the comparison
+
+    Returns:
+        Dict of series -> metric -> samples of each report with that series
+    """
+    grouped: Dict[str, Dict[str, List[List[float]]]] = {}
+    for report in reports:
+        by_series: Dict[str, List[Dict]] = {}
+        for row in timeseries_rows(report):
+            by_series.setdefault(row["series"], []).append(row)
+        for series, rows in by_series.items():
+            metrics = grouped.setdefault(series, {m: [] for m in COMPARED_METRICS})
+            for metric in COMPARED_METRICS:
+                metrics[metric].append(
+                    [
+                        float(row[metric])
+                        for row in rows[1:-1]
+                        if row.get(metric) is not None
+                    ]
+                )
+    return grouped
+
+
+def compare_reports(
+    baseline: List[Dict],
+    candidate: List[Dict],
+    series: Optional[List[str]] = None,
+    alpha: float = DEFAULT_ALPHA,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_runs: int = DEFAULT_MIN_RUNS,
+    seed: int = 0,
+) -> List[MetricComparison]:
+    """
+    Compare p95 latency and throughput between baseline and candidate reports
+
+    Args:
+        baseline: Baseline reports, one per run
+        candidate: Candidate reports, one per run
+        series: Report series to compare (default: every series in both
+            with enough runs and samples)
+        alpha: Significance level of the bootstrap
+        tolerance: Relative change that must be exceeded with confidence
+        min_runs: Fewest runs per side with at least MIN_SAMPLES samples
+        seed: Bootstrap seed, so the same data always gives the same verdict
+
+    Returns:
+        One MetricComparison per series and metric
+
+    Raises:
+        ValueError: If a side has fewer than min_runs runs or there is
+            nothing to compare
+    """
+    if min(len(baseline), len(candidate)) < min_runs:
+        raise ValueError(
+            f"Need at least {min_runs} baseline and candidate runs to judge "
+            f"run-to-run variance, got {len(baseline)} and {len(candidate)}"
+        )
+    base = series_samples(baseline)
+    cand = series_samples(candidate)
+    if series:
+        missing = [name for name in series if name not in base or name not in cand]
+        if missing:
+            raise ValueError(
+                f"Series missing from baseline or candidate: {', '.join(missing)}"
+            )
+        names = series
+    else:
+        # Skip series too short to judge, e.g. 3s stress levels
+        def judgeable(runs: List[List[float]]) -> bool:
+            return len(long_runs(runs)) >= min_runs
+
+        names = [
+            name
+            for name in sorted(set(base) & set(cand))
+            if judgeable(base[name]["requests"]) and judgeable(cand[name]["requests"])
+        ]
+    if not names:
+        raise ValueError(
+            f"Baseline and candidate reports share no timeline series with "
+            f"at least {MIN_SAMPLES} seconds of data in {min_runs} runs per side"
+        )
+
+    rng = random.Random(seed)
+    comparisons = []
+    for name in names:
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            comparisons.append(
+                compare_samples(
+                    name,
+                    metric,
+                    base[name][metric],
+                    cand[name][metric],
+                    higher_is_worse,
+                    alpha=alpha,
+                    tolerance=tolerance,
+                    min_runs=min_runs,
+                    rng=rng,
+                )
+            )
+    return comparisons
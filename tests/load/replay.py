@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Access-Log Replay
+
+Replays recorded production traffic against a target: ingress-nginx or
+Traefik access logs (common/combined format or Traefik JSON) or a JSONL file
+of {timestamp, method, path, body} records. Requests are sent open-loop at
+their original pacing, optionally sped up, and latency is measured from each
+request's scheduled send time. Results are grouped by route, with ids and
+tile coordinates folded into placeholders.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .async_engine import AsyncLoadEngine, ClientShard, status_of
+from .recorder import NO_RESPONSE
+from .scenario import ScenarioResult
+
+logger = logging.getLogger(__name__)
+
+# [time] "METHOD /path HTTP/1.1" status - shared by nginx and Traefik CLF logs
+ACCESS_LOG_LINE = re.compile(
+    r'\[(?P<time>[^\]]+)\]\s+"(?P<method>[A-Z]+) (?P<path>\S+)(?: HTTP/[0-9.]+)?"'
+)
+ACCESS_LOG_TIME = "%d/%b/%Y:%H:%M:%S %z"
+# JSON keys accepted for each field, covering our JSONL and Traefik JSON logs
+TIMESTAMP_KEYS = ("timestamp", "time", "StartUTC", "start_time")
+METHOD_KEYS = ("method", "RequestMethod")
+PATH_KEYS = ("path", "RequestPath", "uri")
+READ_ONLY_METHODS = {"GET", "HEAD", "OPTIONS"}
+# POSTs that only read data and are safe to replay by default
+READ_ONLY_POST_SUFFIXES = ("/search", "/searches/register")
+# Path segment following these names is an identifier
+ID_SEGMENTS = {
+    "collections": "{collection_id}",
+    "items": "{item_id}",
+    "searches": "{search_id}",
+}
+# Fixed endpoints that sit where an identifier would
+RESERVED_SEGMENTS = {"register", "list"}
+NUMBER = re.compile(r"^-?\d+(\.\d+)?(@\d+x)?(\.\w+)?$")
+# Long segments mixing letters and digits (hashes, uuids, item ids)
+OPAQUE_ID = re.compile(r"^(?=.*\d)[\w.:-]{16,}$")
+
+
+@dataclass(frozen=True)
+class ReplayRequest:
+    """One recorded request, timed relative to the first in the log"""
+
+    offset: float
+    method: str
+    path: str
+    body: Any = None
+
+
+def _parse_timestamp(value: Any) -> float:
+    """Unix time from an epoch number or ISO 8601 string"""
+    if isinstance(value, (int, float)):
+        # Epoch milliseconds are common in JSON logs
+        return value / 1000 if value > 1e11 else float(value)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def _first(record: Dict, keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        if record.get(key) is not None:
+            return record[key]
+    return None
+
+
+def parse_line(line: str) -> Optional[Tuple[float, str, str, Any]]:
+    """
+    Parse one access log or JSONL line
+
+    Args:
+        line: nginx/Traefik CLF line, Traefik JSON line or JSONL record
+
+    Returns:
+        Tuple of (unix time, method, path, body), or None if the line is not
+        a request
+    """
+    line = line.strip()
+    if not line:
+        return None
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            return None
+        timestamp = _first(record, TIMESTAMP_KEYS)
+        path = _first(record, PATH_KEYS)
+        if timestamp is None or not path:
+            return None
+        method = str(_first(record, METHOD_KEYS) or "GET").upper()
+        return _parse_timestamp(timestamp), method, path, record.get("body")
+
+    match = ACCESS_LOG_LINE.search(line)
+    if not match:
+        return None
+    timestamp = datetime.strptime(match["time"], ACCESS_LOG_TIME).timestamp()
+    return timestamp, match["method"], match["path"], None
+
+
+def is_replayable(method: str, path: str, body: Any, include_writes: bool) -> bool:
+    """Whether a request can be replayed without changing the target's data"""
+    if include_writes:
+        return True
+    if method in READ_ONLY_METHODS:
+        return True
+    # Access logs have no bodies, and a bodiless POST search is a different query
+    return (
+        method == "POST"
+        and body is not None
+        and path.split("?")[0].rstrip("/").endswith(READ_ONLY_POST_SUFFIXES)
+    )
+
+
+def load_requests(
+    paths: List[str], include_writes: bool = False
+) -> Tuple[List[ReplayRequest], int]:
+    """
+    Load and time-order requests from one or more log files
+
+    Logs from several ingress pods can be passed together; their lines are
+    merged by timestamp.
+
+    Args:
+        paths: Access log or JSONL files
+        include_writes: Also replay non-read-only requests (PUT, DELETE,
+            POST other than searches)
+
+    Returns:
+        Tuple of (requests ordered by offset, number of skipped lines)
+
+    Raises:
+        ValueError: If no replayable requests are found
+    """
+    parsed = []
+    skipped = 0
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                entry = parse_line(line)
+                if entry is None:
+                    skipped += int(bool(line.strip()))
+                    continue
+                if not is_replayable(entry[1], entry[2], entry[3], include_writes):
+                    skipped += 1
+                    continue
+                parsed.append(entry)
+    if not parsed:
+        raise ValueError(f"No replayable requests found in {', '.join(paths)}")
+
+    parsed.sort(key=lambda entry: entry[0])
+    first = parsed[0][0]
+    requests = [
+        ReplayRequest(timestamp - first, method, path, body)
+        for timestamp, method, path, body in parsed
+    ]
+    return requests, skipped
+
+
+def route_of(method: str, path: str) -> str:
+    """
+    Route template used to group replay results
+
+    Query strings are dropped, segments after collections/items/searches
+    become named placeholders, and numbers (tile coordinates) and long opaque
+    ids become {n} and {id}.
+
+    Args:
+        method: HTTP method
+        path: Request path, possibly with a query string
+
+    Returns:
+        "METHOD /route/{template}"
+    """
+    segments = path.split("?")[0].split("/")
+    route: List[str] = []
+    for i, segment in enumerate(segments):
+        previous = segments[i - 1] if i else ""
+        is_identifier = (
+            segment
+            and segment not in RESERVED_SEGMENTS
+            and previous in ID_SEGMENTS
+            # /collections/items/items/x: the first "items" is a collection id
+            and route[-1] == previous
+        )
+        if is_identifier:
+            route.append(ID_SEGMENTS[previous])
+        elif NUMBER.match(segment):
+            route.append("{n}")
+        elif OPAQUE_ID.match(segment):
+            route.append("{id}")
+        else:
+            route.append(segment)
+    return f"{method} {'/'.join(route) or '/'}"
+
+
+class ReplayRunner:
+    """Replays recorded requests open-loop on an AsyncLoadEngine"""
+
+    def __init__(self, engine: AsyncLoadEngine, base_url: str):
+        """
+        Initialize the runner
+
+        Args:
+            engine: Async engine whose client shards carry the requests
+            base_url: Target base URL that recorded paths are appended to
+        """
+        self.engine = engine
+        self.base_url = base_url.rstrip("/")
+
+    async def _send(
+        self,
+        shard: ClientShard,
+        request: ReplayRequest,
+        scheduled_at: float,
+        result: ScenarioResult,
+    ) -> None:
+        body = request.body
+        response, latency_ms = await self.engine.request(
+            shard,
+            request.method,
+            f"{self.base_url}/{request.path.lstrip('/')}",
+            json=body if isinstance(body, (dict, list)) else None,
+            content=body if isinstance(body, str) else None,
+            scheduled_at=scheduled_at,
+        )
+        status = status_of(response)
+        result.record(
+            route_of(request.method, request.path),
+            NO_RESPONSE < status < 400,
+            latency_ms,
+            time.time(),
+            status=status,
+        )
+
+    async def _run(
+        self, requests: List[ReplayRequest], speedup: float
+    ) -> ScenarioResult:
+        result = ScenarioResult(self.engine.histogram_digits)
+        async with AsyncExitStack() as stack:
+            shards = await self.engine.open_shards(stack, self.base_url)
+            in_flight: Set[asyncio.Task] = set()
+            start_time = time.perf_counter()
+
+            for i, request in enumerate(requests):
+                scheduled_at = start_time + request.offset / speedup
+                delay = scheduled_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                # Late requests keep their scheduled time, so a slow target
+                # shows as latency instead of a stretched-out replay
+                task = asyncio.create_task(
+                    self._send(shards[i % len(shards)], request, scheduled_at, result)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            if in_flight:
+                await asyncio.gather(*in_flight)
+
+        result.duration = time.perf_counter() - start_time
+        return result
+
+    def run(
+        self, requests: List[ReplayRequest], speedup: float = 1.0
+    ) -> ScenarioResult:
+        """
+        Replay requests at their recorded pacing divided by speedup
+
+        Args:
+            requests: Requests ordered by offset
+            speedup: Replay speed factor (2.0 replays an hour of logs in 30 minutes)
+
+        Returns:
+            ScenarioResult with one recorder per route
+
+        Raises:
+            ValueError: If speedup is not positive or there are no requests
+        """
+        if speedup <= 0:
+            raise ValueError(f"speedup must be positive: {speedup}")
+        if not requests:
+            raise ValueError("no requests to replay")
+        return asyncio.run(self._run(requests, speedup))
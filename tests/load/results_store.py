@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Load Test Results Store
+
+Keeps every load test report in a local SQLite database, keyed by what was
+deployed: the chart version, the chart's gitSha and the image of every
+service in values.yaml. Stored runs are looked up by id, label, chart
+version, gitSha or image tag, so an upgrade of titiler-pgstac or
+stac-fastapi-pgstac can be compared against the runs of the release before it.
+"""
+
+import json
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import yaml
+
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHART_DIR = Path(__file__).resolve().parents[2] / "charts" / "eoapi"
+DEFAULT_STORE = "load-results.db"
+LATEST = "latest"
+GIT_SHA_PLACEHOLDER = "gitshaABC123"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    test_type TEXT NOT NULL,
+    label TEXT,
+    chart_version TEXT,
+    git_sha TEXT,
+    images TEXT NOT NULL,
+    report TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_deployment ON runs (test_type, chart_version, git_sha);
+"""
+
+
+def _merge_values(base: Dict, override: Dict) -> Dict:
+    """Deep-merge Helm values the way `helm -f` layers them"""
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_values(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _images(values: Any, path: str = "") -> Dict[str, str]:
+    """Every image: {name, tag} block in values, keyed by its dotted path"""
+    found: Dict[str, str] = {}
+    if not isinstance(values, dict):
+        return found
+    image = values.get("image")
+    if isinstance(image, dict) and image.get("tag") is not None:
+        name = image.get("name") or image.get("repository") or ""
+        found[path or "image"] = f"{name}:{image['tag']}" if name else str(image["tag"])
+    for key, value in values.items():
+        if key != "image":
+            found.update(_images(value, f"{path}.{key}" if path else str(key)))
+    return found
+
+
+def load_values(
+    chart_dir: Path = DEFAULT_CHART_DIR, values_files: Optional[List[str]] = None
+) -> Dict:
+    """
+    Chart values.yaml with overrides layered on top
+
+    Args:
+        chart_dir: Chart directory with values.yaml
+        values_files: Extra values files, as passed to `helm -f`
+
+    Returns:
+        Merged values
+
+    Raises:
+        ValueError: If PyYAML is not installed
+    """
+    if not YAML_AVAILABLE:
+        raise ValueError("Reading chart values requires PyYAML to be installed")
+    values = yaml.safe_load((Path(chart_dir) / "values.yaml").read_text()) or {}
+    for path in values_files or []:
+        values = _merge_values(values, yaml.safe_load(Path(path).read_text()) or {})
+    return values
+
+
+@dataclass(frozen=True)
+class Deployment:
+    """What a load test ran against: chart version, gitSha and images"""
+
+    chart_version: Optional[str] = None
+    git_sha: Optional[str] = None
+    images: Dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def from_chart(
+        cls,
+        chart_dir: Path = DEFAULT_CHART_DIR,
+        values_files: Optional[List[str]] = None,
+    ) -> "Deployment":
+        """
+        Read the deployment key from a chart and its values overrides
+
+        Args:
+            chart_dir: Chart directory with Chart.yaml and values.yaml
+            values_files: Extra values files layered over values.yaml, as
+                passed to `helm -f`
+
+        Returns:
+            Deployment (empty if PyYAML is not installed)
+        """
+        if not YAML_AVAILABLE:
+            logger.warning("PyYAML not installed, runs are stored without versions")
+            return cls()
+
+        chart_dir = Path(chart_dir)
+        chart = yaml.safe_load((chart_dir / "Chart.yaml").read_text()) or {}
+        values = load_values(chart_dir, values_files)
+
+        git_sha = values.get("gitSha")
+        # Unset until a release injects it; older charts shipped a placeholder
+        if git_sha == GIT_SHA_PLACEHOLDER:
+            git_sha = None
+        return cls(
+            chart_version=str(chart.get("version")) if chart.get("version") else None,
+            git_sha=str(git_sha) if git_sha else None,
+            images=_images(values),
+        )
+
+    def matches(self, ref: str) -> bool:
+        """Whether ref names this deployment's version, gitSha or an image"""
+        if ref == self.chart_version:
+            return True
+        if self.git_sha and len(ref) >= 7 and self.git_sha.startswith(ref):
+            return True
+        # "titiler-pgstac:3.0.0" matches ghcr.io/stac-utils/titiler-pgstac:3.0.0
+        return any(
+            image == ref or image.endswith(f"/{ref}") for image in self.images.values()
+        )
+
+
+@dataclass(frozen=True)
+class StoredRun:
+    """One stored load test report"""
+
+    id: int
+    created_at: str
+    test_type: str
+    label: Optional[str]
+    deployment: Deployment
+    report: Dict
+
+    def describe(self) -> str:
+        parts = [f"#{self.id}", self.test_type, self.created_at]
+        if self.label:
+            parts.append(f"label={self.label}")
+        if self.deployment.chart_version:
+            parts.append(f"chart={self.deployment.chart_version}")
+        if self.deployment.git_sha:
+            parts.append(f"gitSha={self.deployment.git_sha[:12]}")
+        return " ".join(parts)
+
+
+class ResultsStore:
+    """SQLite database of load test reports"""
+
+    def __init__(self, path: str = DEFAULT_STORE):
+        """
+        Open (and create if needed) a results database
+
+        Args:
+            path: SQLite file
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def save(
+        self,
+        test_type: str,
+        report: Dict,
+        deployment: Deployment,
+        label: Optional[str] = None,
+    ) -> int:
+        """
+        Store one report
+
+        Args:
+            test_type: Test type the report came from (stress, normal, ...)
+            report: Metrics dict as exported with --report-json
+            deployment: What the test ran against
+            label: Optional free-form label, e.g. "titiler-pgstac-upgrade"
+
+        Returns:
+            Id of the stored run
+        """
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (created_at, test_type, label, chart_version, "
+                "git_sha, images, report) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    test_type,
+                    label,
+                    deployment.chart_version,
+                    deployment.git_sha,
+                    json.dumps(deployment.images, sort_keys=True),
+                    json.dumps(report),
+                ),
+            )
+        run_id = cursor.lastrowid
+        assert run_id is not None
+        logger.info(f"Stored {test_type} run #{run_id} in {self.path}")
+        return run_id
+
+    def _run(self, row: sqlite3.Row) -> StoredRun:
+        return StoredRun(
+            id=row["id"],
+            created_at=row["created_at"],
+            test_type=row["test_type"],
+            label=row["label"],
+            deployment=Deployment(
+                chart_version=row["chart_version"],
+                git_sha=row["git_sha"],
+                images=json.loads(row["images"]),
+            ),
+            report=json.loads(row["report"]),
+        )
+
+    def runs(self, test_type: Optional[str] = None) -> List[StoredRun]:
+        """
+        Stored runs, newest first
+
+        Args:
+            test_type: Only runs of this test type
+
+        Returns:
+            List of StoredRun
+        """
+        query = "SELECT * FROM runs"
+        params: tuple = ()
+        if test_type:
+            query += " WHERE test_type = ?"
+            params = (test_type,)
+        rows = self.connection.execute(query + " ORDER BY id DESC", params)
+        return [self._run(row) for row in rows]
+
+    def find(self, ref: str, test_type: Optional[str] = None) -> List[StoredRun]:
+        """
+        Runs selected by a reference
+
+        Args:
+            ref: "latest", a run id, a label, a chart version, a gitSha
+                prefix (7+ characters) or an image ("titiler-pgstac:3.0.0")
+            test_type: Only runs of this test type
+
+        Returns:
+            Matching runs, newest first; "latest" and ids select one run,
+            other references every matching run
+
+        Raises:
+            ValueError: If no run matches
+        """
+        runs = self.runs(test_type)
+        if ref == LATEST:
+            selected = runs[:1]
+        elif ref.isdigit():
+            selected = [run for run in runs if run.id == int(ref)]
+        else:
+            selected = [
+                run for run in runs if run.label == ref or run.deployment.matches(ref)
+            ]
+        if not selected:
+            scope = f" {test_type}" if test_type else ""
+            raise ValueError(f"No stored{scope} runs match '{ref}' in {self.path}")
+        return selected
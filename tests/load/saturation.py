@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Latency vs Resource Saturation Analysis
+
+Joins the per-second client-side p95 latency of a load test report with the
+Prometheus series collected for the same window (pod CPU, CPU throttling,
+database connections, pgbouncer clients waiting) and finds the p95 knee: the
+second latency left its baseline for good. The resource whose rise precedes
+the knee and tracks latency most closely is reported as the one that
+saturated, e.g. CPU throttling on raster pods versus pgbouncer pool
+exhaustion, so a breaking point comes with a likely cause.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .infra_stats import Series, sum_by, sum_series, to_series, workload_of
+from .timeseries import ROOT_SERIES, timeseries_rows
+
+# Smoothing window (seconds) of the p95 series, and how long it must stay
+# above the knee threshold
+KNEE_WINDOW = 5
+# p95 must reach this multiple of its baseline to count as a knee
+KNEE_FACTOR = 2.0
+# Leading share of the run that defines baselines
+BASELINE_FRACTION = 0.2
+# A resource has risen once it covers this share of its baseline-to-peak rise
+RISE_FRACTION = 0.25
+# Smallest rise that counts, per resource kind
+MIN_RISE = {
+    "cpu": 0.1,  # cores
+    "cpu_throttled": 0.05,  # share of CFS periods throttled
+    "db_connections": 2.0,
+    "pgbouncer_waiting": 1.0,
+}
+# rate(...[1m]) ramps over the minute after a step change, so it crosses
+# RISE_FRACTION of the change that share of a window late
+RATE_WINDOW_S = 60.0
+RATE_KINDS = ("cpu", "cpu_throttled")
+DEFAULT_STEP_S = 15.0
+# Correlation is taken with the resource leading latency by up to this
+# much, in LAG_STEP_S increments, since a pool fills before requests queue
+MAX_LAG_S = 60
+LAG_STEP_S = 5
+
+
+def latency_series(report: Dict) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Per-second p95 latency of a report on one time axis
+
+    Uses the "overall" timeline when there is one, otherwise every timeline
+    (stress levels and normal-test endpoints run one after another). When
+    series share a second the highest p95 is kept.
+
+    Args:
+        report: Metrics dict as exported with --report-json
+
+    Returns:
+        Tuple of (unix seconds, p95 ms, series name per second)
+    """
+    rows = timeseries_rows(report)
+    if any(row["series"] == ROOT_SERIES for row in rows):
+        rows = [row for row in rows if row["series"] == ROOT_SERIES]
+
+    by_second: Dict[int, Tuple[float, str]] = {}
+    for row in rows:
+        p95 = row.get("latency_p95")
+        if p95 is None:
+            continue
+        second = int(row["timestamp"])
+        if second not in by_second or p95 > by_second[second][0]:
+            by_second[second] = (float(p95), row["series"])
+    seconds = sorted(by_second)
+    return (
+        np.asarray(seconds, dtype=float),
+        np.asarray([by_second[s][0] for s in seconds], dtype=float),
+        [by_second[s][1] for s in seconds],
+    )
+
+
+def _smooth(values: np.ndarray, window: int = KNEE_WINDOW) -> np.ndarray:
+    """Centered rolling median, edges padded with the nearest value"""
+    if len(values) < window:
+        return values.copy()
+    half = window // 2
+    padded = np.pad(values, (half, window - 1 - half), mode="edge")
+    return np.median(np.lib.stride_tricks.sliding_window_view(padded, window), axis=1)
+
+
+def _baseline_count(n: int) -> int:
+    return max(KNEE_WINDOW, int(n * BASELINE_FRACTION))
+
+
+def find_knee(p95: np.ndarray) -> Tuple[Optional[int], float]:
+    """
+    Index of the p95 knee
+
+    The knee is the first second at which the smoothed p95 reaches
+    KNEE_FACTOR times its baseline (the median over the leading
+    BASELINE_FRACTION of the run) and stays there for KNEE_WINDOW seconds.
+
+    Args:
+        p95: Per-second p95 latencies
+
+    Returns:
+        Tuple of (knee index or None, baseline p95)
+    """
+    if len(p95) < 2 * KNEE_WINDOW:
+        return None, float(np.median(p95)) if len(p95) else 0.0
+    smoothed = _smooth(p95)
+    baseline = float(np.median(smoothed[: _baseline_count(len(smoothed))]))
+    above = smoothed >= baseline * KNEE_FACTOR
+    for i in np.flatnonzero(above):
+        if above[i : i + KNEE_WINDOW].all() and i + KNEE_WINDOW <= len(above):
+            return int(i), baseline
+    return None, baseline
+
+
+def _max_series(series: List[Series]) -> Series:
+    """Highest value across series at each sample time"""
+    times, inverse = np.unique(
+        np.concatenate([s.times for s in series]), return_inverse=True
+    )
+    values = np.full(len(times), -np.inf)
+    np.maximum.at(values, inverse, np.concatenate([s.values for s in series]))
+    return Series({}, times, values)
+
+
+def resource_series(infrastructure: Dict) -> Dict[str, Series]:
+    """
+    Resource signals that can saturate, from collect_test_metrics results
+
+    Args:
+        infrastructure: Infrastructure metrics dict
+
+    Returns:
+        Dict of resource name -> Series: "cpu <workload>" (total cores),
+        "cpu_throttled <workload>" (highest throttled share of any
+        container), "db_connections" and "pgbouncer_waiting"
+    """
+    pod = infrastructure.get("pod_metrics") or {}
+    db = infrastructure.get("database_metrics") or {}
+    resources: Dict[str, Series] = {}
+
+    pods = sum_by(to_series(pod.get("cpu")), "pod")
+    pods.pop("", None)
+    by_workload: Dict[str, List[Series]] = {}
+    for name, s in pods.items():
+        by_workload.setdefault(workload_of(name), []).append(s)
+    for workload, members in sorted(by_workload.items()):
+        resources[f"cpu {workload}"] = sum_series(members)
+
+    throttled: Dict[str, List[Series]] = {}
+    for s in to_series(pod.get("cpu_throttled")):
+        if s.labels.get("pod"):
+            throttled.setdefault(workload_of(s.labels["pod"]), []).append(s)
+    for workload, members in sorted(throttled.items()):
+        resources[f"cpu_throttled {workload}"] = _max_series(members)
+
+    for name in ("db_connections", "pgbouncer_waiting"):
+        series = to_series(db.get(name))
+        if series:
+            resources[name] = sum_series(series)
+    return resources
+
+
+def hold(series: Series, seconds: np.ndarray, shift: float = 0.0) -> np.ndarray:
+    """
+    Sample a Prometheus series at each second, holding each sample one step
+
+    Args:
+        series: Series ordered by time
+        seconds: Unix seconds
+        shift: Seconds to move the series earlier by
+
+    Returns:
+        Values, NaN before the first sample and over a step after the last
+    """
+    times = series.times - shift
+    step = float(np.diff(times).min()) if len(times) > 1 else 0.0
+    index = np.searchsorted(times, seconds, side="right") - 1
+    values = series.values[np.clip(index, 0, None)].astype(float)
+    values[index < 0] = np.nan
+    values[(index == len(times) - 1) & (seconds - times[-1] > step)] = np.nan
+    return values
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Ranks with ties averaged"""
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    ends = np.cumsum(counts)
+    return ((ends - counts + ends - 1) / 2)[inverse]
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation, 0 when either side is constant"""
+    if len(a) < 3:
+        return 0.0
+    ra, rb = _ranks(a), _ranks(b)
+    if ra.std() == 0 or rb.std() == 0:
+        return 0.0
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def _kind(resource: str) -> str:
+    return resource.split(" ", 1)[0]
+
+
+def lagged_correlation(
+    series: Series, seconds: np.ndarray, p95: np.ndarray, shift: float = 0.0
+) -> Tuple[float, int]:
+    """
+    Best rank correlation of a resource with p95 over resource leads
+
+    Args:
+        series: Resource series
+        seconds: Unix seconds of the p95 samples
+        p95: Per-second p95 latencies
+        shift: Seconds to move the series earlier by
+
+    Returns:
+        Tuple of (correlation, lag in seconds), the shortest lag on ties
+    """
+    best = (0.0, 0)
+    for lag in range(0, MAX_LAG_S + 1, LAG_STEP_S):
+        values = hold(series, seconds - lag, shift)
+        present = ~np.isnan(values)
+        if present.sum() < 2 * KNEE_WINDOW:
+            continue
+        correlation = spearman(values[present], p95[present])
+        if correlation > best[0]:
+            best = (correlation, lag)
+    return best
+
+
+def analyze_saturation(report: Dict, infrastructure: Optional[Dict] = None) -> Dict:
+    """
+    Find the p95 knee and the resource that saturated before it
+
+    A resource is a candidate when it rose by at least MIN_RISE for its kind
+    and crossed RISE_FRACTION of that rise no later than one Prometheus step
+    after the knee (the resolution of the infrastructure data). The
+    candidate whose per-second values best correlate with p95, allowing the
+    resource to lead by up to MAX_LAG_S, is reported: a pool that fills
+    shortly before latency jumps tracks it closely, while CPU growing with
+    load all run long does not.
+
+    Args:
+        report: Metrics dict as exported with --report-json
+        infrastructure: Infrastructure metrics (default: the report's own,
+            at the top level or under "overall")
+
+    Returns:
+        Dict with "knee" (None if p95 never left its baseline), "resources"
+        (name -> onset, lead_s, correlation, lag_s, baseline, peak) and
+        "saturated" (resource name or None)
+    """
+    if infrastructure is None:
+        overall = report.get(ROOT_SERIES)
+        infrastructure = report.get("infrastructure") or (
+            overall.get("infrastructure") if isinstance(overall, dict) else None
+        )
+    seconds, p95, series_names = latency_series(report)
+    knee_index, baseline_p95 = find_knee(p95)
+
+    knee: Optional[Dict] = None
+    if knee_index is not None:
+        knee = {
+            "timestamp": int(seconds[knee_index]),
+            "offset_s": float(seconds[knee_index] - seconds[0]),
+            "series": series_names[knee_index],
+            "baseline_p95": baseline_p95,
+            "p95": float(_smooth(p95)[knee_index]),
+        }
+
+    resources: Dict[str, Dict] = {}
+    candidates = []
+    for name, series in resource_series(infrastructure or {}).items():
+        shift = RISE_FRACTION * RATE_WINDOW_S if _kind(name) in RATE_KINDS else 0.0
+        values = hold(series, seconds, shift)
+        present = ~np.isnan(values)
+        if present.sum() < 2 * KNEE_WINDOW:
+            continue
+        t, v = seconds[present], values[present]
+        baseline = float(np.median(v[: _baseline_count(len(v))]))
+        peak = float(v.max())
+        rise = peak - baseline
+
+        onset = None
+        if rise >= MIN_RISE.get(_kind(name), 0.0):
+            onset = float(t[np.argmax(v >= baseline + RISE_FRACTION * rise)])
+        correlation, lag = lagged_correlation(series, seconds, p95, shift)
+        entry: Dict[str, Optional[float]] = {
+            "onset": onset,
+            "lead_s": None,
+            "correlation": correlation,
+            "lag_s": lag,
+            "baseline": baseline,
+            "peak": peak,
+        }
+        if knee is not None and onset is not None:
+            lead = knee["timestamp"] - onset
+            entry["lead_s"] = lead
+            step = float(np.diff(series.times).min()) if len(series.times) > 1 else 0
+            if lead >= -(step or DEFAULT_STEP_S):
+                candidates.append(name)
+        resources[name] = entry
+
+    saturated = max(
+        candidates,
+        key=lambda name: (resources[name]["correlation"], -resources[name]["lead_s"]),
+        default=None,
+    )
+    return {"knee": knee, "resources": resources, "saturated": saturated}
+
+
+def describe_saturation(analysis: Dict) -> List[str]:
+    """
+    Readable lines for an analyze_saturation result
+
+    Args:
+        analysis: Result of analyze_saturation
+
+    Returns:
+        Lines for the knee, the saturated resource and every resource that
+        rose during the run
+    """
+    knee = analysis["knee"]
+    if knee is None:
+        return ["p95 stayed within its baseline, no knee found"]
+
+    at = datetime.fromtimestamp(knee["timestamp"]).strftime("%H:%M:%S")
+    where = "" if knee["series"] == ROOT_SERIES else f", {knee['series']}"
+    lines = [
+        f"p95 knee at {at} (+{knee['offset_s']:.0f}s{where}): "
+        f"{knee['p95']:.0f}ms vs {knee['baseline_p95']:.0f}ms baseline"
+    ]
+    saturated = analysis["saturated"]
+    if saturated:
+        lines.append(f"Saturated: {saturated}")
+    else:
+        lines.append("No collected resource rose before the knee")
+
+    for name, entry in analysis["resources"].items():
+        if entry["lead_s"] is None:
+            continue
+        when = (
+            f"{entry['lead_s']:.0f}s before"
+            if entry["lead_s"] >= 0
+            else f"{-entry['lead_s']:.0f}s after"
+        )
+        lines.append(
+            f"  {name}: {entry['baseline']:.2f} -> {entry['peak']:.2f}, rose "
+            f"{when} the knee (r={entry['correlation']:.2f})"
+        )
+    return lines
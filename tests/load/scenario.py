@@ -0,0 +1,594 @@
+#!/usr/bin/env python3
+"""
+Scenario Load Testing
+
+Runs a YAML or JSON scenario of weighted workflows against eoAPI with all
+workflows sharing the same virtual users, so STAC, raster and vector traffic
+compete for pgbouncer and the database at the same time as in production.
+
+A scenario looks like::
+
+    name: mixed
+    duration: 60
+    users: 20
+    ramp_up: 10
+    think_time: [0.5, 2.0]
+    variables:
+      collection: {choice: [noaa-emergency-response]}
+    workflows:
+      - name: mosaic
+        weight: 1
+        steps:
+          - name: register
+            method: POST
+            path: /raster/searches/register
+            json: {collections: ["{collection}"], filter-lang: cql2-json}
+            extract: {search_id: id}
+          - name: tile
+            path: /raster/searches/{search_id}/tiles/WebMercatorQuad/{z}/{x}/{y}
+            variables: {z: 15, x: {randint: [8585, 8593]}, y: {randint: [12845, 12853]}}
+            repeat: 4
+    endpoints:
+      - {path: /stac/collections, weight: 3}
+
+Placeholders ``{name}`` are filled from scenario variables, step variables and
+values extracted from earlier responses in the same workflow iteration.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import re
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .async_engine import AsyncLoadEngine, ClientShard, status_of
+from .histogram import DEFAULT_SIGNIFICANT_DIGITS
+from .recorder import RequestRecorder
+
+try:
+    import yaml
+
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+# Path segment selecting the first list element with a matching field,
+# e.g. links[rel=next]
+SELECTOR = re.compile(r"^(?P<key>[^\[]*)\[(?P<field>[^=\]]+)=(?P<value>[^\]]*)\]$")
+HTTP_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+
+
+class ScenarioError(Exception):
+    """A workflow iteration could not continue (missing variable, bad extraction)"""
+
+
+@dataclass(frozen=True)
+class ThinkTime:
+    """Uniformly distributed pause between a user's requests, in seconds"""
+
+    min: float = 0.0
+    max: float = 0.0
+
+    @classmethod
+    def parse(cls, value: Any) -> "ThinkTime":
+        """
+        Parse a think time given as a number, [min, max] or {min, max}
+
+        Raises:
+            ValueError: If the value is malformed or negative
+        """
+        if isinstance(value, (int, float)):
+            low = high = float(value)
+        elif isinstance(value, (list, tuple)) and len(value) == 2:
+            low, high = float(value[0]), float(value[1])
+        elif isinstance(value, dict) and {"min", "max"} >= set(value):
+            low = float(value.get("min", 0))
+            high = float(value.get("max", low))
+        else:
+            raise ValueError(
+                f"think_time must be a number, [min, max] or {{min, max}}: {value!r}"
+            )
+        if low < 0 or high < low:
+            raise ValueError(f"think_time needs 0 <= min <= max: {value!r}")
+        return cls(low, high)
+
+    def sample(self, rng: random.Random) -> float:
+        return rng.uniform(self.min, self.max) if self.max > self.min else self.min
+
+
+@dataclass(frozen=True)
+class Step:
+    """One request in a workflow"""
+
+    name: str
+    path: str
+    method: str = "GET"
+    json: Any = None
+    params: Optional[Dict[str, Any]] = None
+    headers: Optional[Dict[str, str]] = None
+    expect: Tuple[int, ...] = (200,)
+    extract: Dict[str, str] = field(default_factory=dict)
+    variables: Dict[str, Any] = field(default_factory=dict)
+    repeat: int = 1
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Step":
+        """
+        Build a step from its scenario definition
+
+        Raises:
+            ValueError: If the step is malformed
+        """
+        if not isinstance(data, dict) or not isinstance(data.get("path"), str):
+            raise ValueError(f"step needs a path: {data!r}")
+        unknown = set(data) - {
+            "name",
+            "path",
+            "method",
+            "json",
+            "params",
+            "headers",
+            "expect",
+            "extract",
+            "variables",
+            "repeat",
+        }
+        if unknown:
+            raise ValueError(f"unknown step keys {sorted(unknown)} in {data['path']}")
+
+        method = str(data.get("method", "GET")).upper()
+        if method not in HTTP_METHODS:
+            raise ValueError(f"unsupported method {method} in {data['path']}")
+        expect = data.get("expect", 200)
+        expect = tuple(expect) if isinstance(expect, list) else (expect,)
+        if not all(isinstance(code, int) for code in expect):
+            raise ValueError(f"expect must be status codes: {data['expect']!r}")
+        repeat = data.get("repeat", 1)
+        if not isinstance(repeat, int) or repeat < 1:
+            raise ValueError(f"repeat must be a positive integer: {repeat!r}")
+
+        return cls(
+            name=data.get("name", f"{method} {data['path']}"),
+            path=data["path"],
+            method=method,
+            json=data.get("json"),
+            params=data.get("params"),
+            headers=data.get("headers"),
+            expect=expect,
+            extract=dict(data.get("extract") or {}),
+            variables=dict(data.get("variables") or {}),
+            repeat=repeat,
+        )
+
+
+@dataclass(frozen=True)
+class Workflow:
+    """Ordered steps run by one user per iteration, picked by weight"""
+
+    name: str
+    steps: List[Step]
+    weight: float = 1.0
+    think_time: Optional[ThinkTime] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Workflow":
+        """
+        Build a workflow from its scenario definition
+
+        Raises:
+            ValueError: If the workflow is malformed
+        """
+        name = data.get("name")
+        steps = data.get("steps")
+        if not name or not isinstance(steps, list) or not steps:
+            raise ValueError(f"workflow needs a name and steps: {data!r}")
+        weight = float(data.get("weight", 1))
+        if weight <= 0:
+            raise ValueError(f"workflow {name} weight must be positive: {weight}")
+        think_time = data.get("think_time")
+        return cls(
+            name=name,
+            steps=[Step.from_dict(step) for step in steps],
+            weight=weight,
+            think_time=ThinkTime.parse(think_time) if think_time is not None else None,
+        )
+
+    @classmethod
+    def from_endpoint(cls, data: Any) -> "Workflow":
+        """Single-request workflow from the endpoints shorthand"""
+        if isinstance(data, str):
+            data = {"path": data}
+        if not isinstance(data, dict):
+            raise ValueError(f"endpoint must be a path or mapping: {data!r}")
+        step = {k: v for k, v in data.items() if k not in ("weight", "think_time")}
+        return cls.from_dict(
+            {
+                "name": data.get("name", data.get("path")),
+                "weight": data.get("weight", 1),
+                "think_time": data.get("think_time"),
+                "steps": [step],
+            }
+        )
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Weighted workflows shared by a pool of virtual users"""
+
+    name: str
+    workflows: List[Workflow]
+    duration: Optional[int] = None
+    users: Optional[int] = None
+    ramp_up: float = 0.0
+    think_time: ThinkTime = ThinkTime()
+    variables: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        """
+        Build a scenario from a parsed YAML/JSON document
+
+        Raises:
+            ValueError: If the scenario is malformed
+        """
+        if not isinstance(data, dict):
+            raise ValueError("scenario must be a mapping")
+        workflows = [Workflow.from_dict(w) for w in data.get("workflows") or []]
+        workflows += [Workflow.from_endpoint(e) for e in data.get("endpoints") or []]
+        if not workflows:
+            raise ValueError("scenario needs at least one workflow or endpoint")
+        names = [w.name for w in workflows]
+        duplicates = sorted({n for n in names if names.count(n) > 1})
+        if duplicates:
+            raise ValueError(f"duplicate workflow names: {duplicates}")
+
+        duration = data.get("duration")
+        users = data.get("users")
+        for key, value in (("duration", duration), ("users", users)):
+            if value is not None and (not isinstance(value, int) or value <= 0):
+                raise ValueError(f"{key} must be a positive integer: {value!r}")
+        ramp_up = float(data.get("ramp_up", 0))
+        if ramp_up < 0:
+            raise ValueError(f"ramp_up must not be negative: {ramp_up}")
+
+        return cls(
+            name=data.get("name", "scenario"),
+            workflows=workflows,
+            duration=duration,
+            users=users,
+            ramp_up=ramp_up,
+            think_time=ThinkTime.parse(data.get("think_time", 0)),
+            variables=dict(data.get("variables") or {}),
+        )
+
+
+def load_scenario(path: str) -> Scenario:
+    """
+    Load a scenario from a YAML (.yaml/.yml) or JSON file
+
+    Args:
+        path: Scenario file path
+
+    Returns:
+        Parsed Scenario
+
+    Raises:
+        ValueError: If the file cannot be parsed or the scenario is invalid
+    """
+    with open(path) as f:
+        text = f.read()
+    if path.endswith(".json"):
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid scenario JSON in {path}: {e}") from e
+    else:
+        if not YAML_AVAILABLE:
+            raise ValueError("YAML scenarios require PyYAML to be installed")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid scenario YAML in {path}: {e}") from e
+    return Scenario.from_dict(data)
+
+
+def resolve_variables(
+    definitions: Dict[str, Any], rng: random.Random
+) -> Dict[str, Any]:
+    """
+    Draw concrete values for variable definitions
+
+    ``{choice: [...]}`` picks one item and ``{randint: [low, high]}`` an
+    inclusive integer; anything else is used as-is.
+    """
+    values = {}
+    for name, definition in definitions.items():
+        if isinstance(definition, dict) and set(definition) == {"choice"}:
+            values[name] = rng.choice(definition["choice"])
+        elif isinstance(definition, dict) and set(definition) == {"randint"}:
+            low, high = definition["randint"]
+            values[name] = rng.randint(low, high)
+        else:
+            values[name] = definition
+    return values
+
+
+def render(template: Any, variables: Dict[str, Any]) -> Any:
+    """
+    Substitute {name} placeholders throughout strings, lists and dicts
+
+    A string that is exactly one placeholder takes the variable's value with
+    its type (so lists and numbers survive into JSON bodies).
+
+    Raises:
+        ScenarioError: If a placeholder names an unknown variable
+    """
+    if isinstance(template, str):
+        whole = PLACEHOLDER.fullmatch(template)
+        if whole:
+            return _lookup(variables, whole.group(1))
+        return PLACEHOLDER.sub(lambda m: str(_lookup(variables, m.group(1))), template)
+    if isinstance(template, list):
+        return [render(item, variables) for item in template]
+    if isinstance(template, dict):
+        return {key: render(value, variables) for key, value in template.items()}
+    return template
+
+
+def _lookup(variables: Dict[str, Any], name: str) -> Any:
+    try:
+        return variables[name]
+    except KeyError:
+        raise ScenarioError(f"undefined variable {name}") from None
+
+
+def extract(document: Any, expression: str) -> Any:
+    """
+    Pull a value out of a JSON response
+
+    Expressions are dotted paths of keys and list indexes, where a segment
+    like ``links[rel=next]`` selects the first list item whose field matches:
+    ``features.0.id``, ``links[rel=next].href``.
+
+    Raises:
+        ScenarioError: If the path does not exist in the document
+    """
+    value = document
+    for segment in expression.split("."):
+        selector = SELECTOR.match(segment)
+        try:
+            if selector:
+                items = value[selector["key"]] if selector["key"] else value
+                value = next(
+                    item
+                    for item in items
+                    if str(item.get(selector["field"])) == selector["value"]
+                )
+            elif isinstance(value, list):
+                value = value[int(segment)]
+            else:
+                value = value[segment]
+        except (
+            KeyError,
+            IndexError,
+            ValueError,
+            TypeError,
+            AttributeError,
+            StopIteration,
+        ):
+            raise ScenarioError(
+                f"cannot extract {expression!r} at {segment!r}"
+            ) from None
+    return value
+
+
+async def pause(seconds: float, deadline: float) -> None:
+    """Sleep for think time, waking early at the run deadline (perf_counter)"""
+    await asyncio.sleep(max(0.0, min(seconds, deadline - time.perf_counter())))
+
+
+class ScenarioResult:
+    """Mergeable per-step recorders and workflow completion counts for a run"""
+
+    def __init__(self, histogram_digits: int = DEFAULT_SIGNIFICANT_DIGITS):
+        self.histogram_digits = histogram_digits
+        self.overall = RequestRecorder(histogram_digits)
+        self.steps: Dict[str, RequestRecorder] = {}
+        # workflow name -> [iterations finished, iterations completed]
+        self.workflows: Dict[str, List[int]] = {}
+
+    def record(
+        self,
+        step_key: str,
+        success: bool,
+        latency_ms: float,
+        timestamp: float,
+        overall: bool = True,
+        status: Optional[int] = None,
+    ) -> None:
+        """
+        Record one result in the per-step recorder and, unless overall is
+        False (e.g. for derived timings that are not requests), the overall one
+        """
+        recorder = self.steps.get(step_key)
+        if recorder is None:
+            recorder = self.steps[step_key] = RequestRecorder(self.histogram_digits)
+        recorder.record(success, latency_ms, timestamp, status)
+        if overall:
+            self.overall.record(success, latency_ms, timestamp, status)
+
+    def record_iteration(self, workflow: str, completed: bool) -> None:
+        counts = self.workflows.setdefault(workflow, [0, 0])
+        counts[0] += 1
+        counts[1] += int(completed)
+
+    @property
+    def duration(self) -> float:
+        return self.overall.duration
+
+    @duration.setter
+    def duration(self, value: float) -> None:
+        self.overall.duration = value
+        for recorder in self.steps.values():
+            recorder.duration = value
+
+    def merge(self, other: "ScenarioResult") -> "ScenarioResult":
+        """
+        Add another generator's results into this one
+
+        Returns:
+            This result, for chaining
+        """
+        self.overall.merge(other.overall)
+        for key, recorder in other.steps.items():
+            if key in self.steps:
+                self.steps[key].merge(recorder)
+            else:
+                self.steps[key] = recorder
+        for name, (iterations, completed) in other.workflows.items():
+            counts = self.workflows.setdefault(name, [0, 0])
+            counts[0] += iterations
+            counts[1] += completed
+        self.duration = max(self.duration, other.duration)
+        return self
+
+
+class ScenarioRunner:
+    """Drives a scenario's virtual users on an AsyncLoadEngine"""
+
+    def __init__(
+        self,
+        scenario: Scenario,
+        engine: AsyncLoadEngine,
+        base_url: str,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the runner
+
+        Args:
+            scenario: Scenario to run
+            engine: Async engine whose client shards carry the requests
+            base_url: Base URL that relative step paths are joined to
+            seed: Optional seed for workflow, variable and think time draws
+        """
+        self.scenario = scenario
+        self.engine = engine
+        self.base_url = base_url.rstrip("/")
+        self.rng = random.Random(seed)
+        self._weights = [w.weight for w in scenario.workflows]
+
+    def _url(self, path: str) -> str:
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def _send_step(
+        self,
+        shard: ClientShard,
+        workflow: Workflow,
+        step: Step,
+        variables: Dict[str, Any],
+        result: ScenarioResult,
+    ) -> None:
+        """Send one step (all repeats) and extract variables from its response"""
+        # Single-request workflows (the endpoints shorthand) key by workflow only
+        key = (
+            workflow.name
+            if len(workflow.steps) == 1
+            else f"{workflow.name}/{step.name}"
+        )
+        for _ in range(step.repeat):
+            scope = {**variables, **resolve_variables(step.variables, self.rng)}
+            url = self._url(render(step.path, scope))
+            body = render(step.json, scope)
+            params = render(step.params, scope)
+            headers = render(step.headers, scope)
+            response, latency_ms = await self.engine.request(
+                shard, step.method, url, json=body, params=params, headers=headers
+            )
+            status = status_of(response)
+            if response is None or status not in step.expect:
+                result.record(key, False, latency_ms, time.time(), status=status)
+                raise ScenarioError(f"{key} returned {status or 'error'}")
+            result.record(key, True, latency_ms, time.time(), status=status)
+
+            if step.extract:
+                try:
+                    document = response.json()
+                except ValueError:
+                    raise ScenarioError(f"{key} did not return JSON") from None
+                for name, expression in step.extract.items():
+                    variables[name] = extract(document, expression)
+
+    async def _user(
+        self,
+        shard: ClientShard,
+        start_delay: float,
+        deadline: float,
+        result: ScenarioResult,
+    ) -> None:
+        """One virtual user running weighted workflow iterations until deadline"""
+        await asyncio.sleep(start_delay)
+        while time.perf_counter() < deadline:
+            workflow = self.rng.choices(self.scenario.workflows, self._weights)[0]
+            think_time = workflow.think_time or self.scenario.think_time
+            variables = resolve_variables(self.scenario.variables, self.rng)
+
+            completed = True
+            for step in workflow.steps:
+                if time.perf_counter() >= deadline:
+                    # Iterations cut short by the end of the run are not counted
+                    return
+                try:
+                    await self._send_step(shard, workflow, step, variables, result)
+                except ScenarioError as e:
+                    logger.debug(f"Workflow {workflow.name} iteration failed: {e}")
+                    completed = False
+                await pause(think_time.sample(self.rng), deadline)
+                if not completed:
+                    break
+            result.record_iteration(workflow.name, completed)
+
+    async def _run(self, users: int, duration: float) -> ScenarioResult:
+        result = ScenarioResult(self.engine.histogram_digits)
+        async with AsyncExitStack() as stack:
+            shards = await self.engine.open_shards(stack, self.base_url)
+            start_time = time.perf_counter()
+            deadline = start_time + duration
+            stagger = self.scenario.ramp_up / users
+            await asyncio.gather(
+                *(
+                    self._user(shards[i % len(shards)], i * stagger, deadline, result)
+                    for i in range(users)
+                )
+            )
+        result.duration = time.perf_counter() - start_time
+        return result
+
+    def run(self, users: int, duration: float) -> ScenarioResult:
+        """
+        Run the scenario with `users` virtual users for duration seconds
+
+        Args:
+            users: Number of concurrent virtual users
+            duration: Run duration in seconds
+
+        Returns:
+            ScenarioResult with overall and per-step recorders
+
+        Raises:
+            ValueError: If users or duration is not positive
+        """
+        if users <= 0 or duration <= 0:
+            raise ValueError(
+                f"users and duration must be positive: {users}, {duration}"
+            )
+        return asyncio.run(self._run(users, duration))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Adaptive Breaking-Point Search
+
+Finds the load level where a service stops meeting its success rate or p95
+threshold in a logarithmic number of levels: the load doubles until a level
+breaks, then the bracket between the last passing and the first breaking
+level is bisected. Bisection stops once the bracket is narrower than the
+resolution, or once both ends measure the same success rate and p95 within
+noise, where further levels would only locate noise.
+
+Each level can also be held until it reaches a steady state, judged by the
+per-second throughput of its last two windows, instead of for a fixed time.
+The level keeps its load running while it is extended, so the check sees a
+continued level rather than the warm-up of a restarted one.
+"""
+
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .recorder import RequestRecorder
+
+# Per-second buckets compared on each side of the steady-state check
+STEADY_WINDOW_S = 4
+# Seconds between steady-state checks once a level runs past its duration
+STEADY_CHECK_INTERVAL_S = 1.0
+# Largest relative change in mean throughput between the windows
+STEADY_TOLERANCE = 0.1
+# Bracket ends closer than this are treated as the same measurement
+SUCCESS_RATE_TOLERANCE = 0.5
+P95_TOLERANCE = 0.1
+
+
+def is_steady(
+    timeline: List[Dict[str, float]],
+    window: int = STEADY_WINDOW_S,
+    tolerance: float = STEADY_TOLERANCE,
+) -> bool:
+    """
+    Whether windowed throughput has stopped changing
+
+    The first and last seconds are partial and ignored. The mean requests
+    per second of the last window must be within tolerance of the window
+    before it.
+
+    Args:
+        timeline: Per-second rows from RequestRecorder.timeline()
+        window: Seconds per window
+        tolerance: Largest relative change between the windows
+
+    Returns:
+        True if the level has reached a steady state
+    """
+    counts = [row["requests"] for row in timeline[1:-1]]
+    if len(counts) < 2 * window:
+        return False
+    previous = statistics.fmean(counts[-2 * window : -window])
+    last = statistics.fmean(counts[-window:])
+    if previous == 0:
+        return last == 0
+    return abs(last - previous) / previous <= tolerance
+
+
+def throughput_steady(recorder: RequestRecorder) -> bool:
+    """Whether a recorder's windowed throughput has stopped changing"""
+    return is_steady(recorder.timeline())
+
+
+class LevelDeadline:
+    """
+    When a running load level stops
+
+    The level runs for duration seconds. With a settled check, it then keeps
+    running and is checked on its live results every
+    STEADY_CHECK_INTERVAL_S until the check passes or max_duration is
+    reached. Engines call reached() from their send loops with the clock
+    they schedule by.
+    """
+
+    def __init__(
+        self,
+        duration: float,
+        max_duration: Optional[float] = None,
+        settled: Optional[Callable[[RequestRecorder], bool]] = None,
+    ):
+        """
+        Initialize the deadline
+
+        Args:
+            duration: Seconds the level runs at least
+            max_duration: Longest the level may run in seconds (default:
+                duration)
+            settled: Check on the live recorder that ends the level early,
+                or None to stop at duration
+
+        Raises:
+            ValueError: If duration is not positive
+        """
+        if duration <= 0:
+            raise ValueError(f"duration must be positive: {duration}")
+        self.duration = duration
+        self.max_duration = max(duration, max_duration or duration)
+        self.settled = settled
+        self.steady = False
+        self.done = False
+        self._start = 0.0
+        self._end = float(duration)
+
+    def start(self, now: float) -> None:
+        """Start the level at now"""
+        self._start = now
+        self._end = now + self.duration
+
+    def reached(self, now: float, recorder: RequestRecorder) -> bool:
+        """
+        Whether the level should stop at now
+
+        Args:
+            now: Current time on the clock passed to start()
+            recorder: Live results of the level
+
+        Returns:
+            True once the level is over; it stays over
+        """
+        if self.done or now < self._end:
+            return self.done
+        if self.settled is None:
+            self.done = True
+        elif self.settled(recorder):
+            self.steady = self.done = True
+        elif now >= self._start + self.max_duration:
+            self.done = True
+        else:
+            self._end = min(
+                now + STEADY_CHECK_INTERVAL_S, self._start + self.max_duration
+            )
+        return self.done
+
+
+def converged(low: Optional[Dict], high: Dict) -> bool:
+    """
+    Whether the metrics at both ends of a bracket are the same within noise
+
+    Args:
+        low: Metrics of the highest passing level, or None
+        high: Metrics of the lowest breaking level
+
+    Returns:
+        True if success rate and p95 latency barely differ
+    """
+    if low is None:
+        return False
+    if abs(high["success_rate"] - low["success_rate"]) > SUCCESS_RATE_TOLERANCE:
+        return False
+    low_p95 = low.get("latency_p95", 0)
+    high_p95 = high.get("latency_p95", 0)
+    return abs(high_p95 - low_p95) <= P95_TOLERANCE * max(low_p95, 1e-9)
+
+
+def search_breaking_point(
+    probe: Callable[[float], Dict],
+    breaks: Callable[[Dict], bool],
+    start: float,
+    maximum: float,
+    resolution: float,
+    integer: bool = True,
+) -> Tuple[float, Dict[float, Dict]]:
+    """
+    Exponential ramp followed by bisection
+
+    Args:
+        probe: Runs one level and returns its metrics
+        breaks: Whether a level's metrics breach the thresholds
+        start: First level
+        maximum: Highest level to test
+        resolution: Stop bisecting once the bracket is no wider than this
+        integer: Levels are whole numbers (workers) rather than rates
+
+    Returns:
+        Tuple of (lowest breaking level, or maximum if none broke, metrics
+        keyed by level in ascending order)
+
+    Raises:
+        ValueError: If start, maximum or resolution is not positive
+    """
+    if start <= 0 or maximum <= 0 or resolution <= 0:
+        raise ValueError(
+            f"start, maximum and resolution must be positive: "
+            f"{start}, {maximum}, {resolution}"
+        )
+
+    results: Dict[float, Dict] = {}
+    good: float = 0
+    bad: Optional[float] = None
+    level = min(start, maximum)
+    while bad is None:
+        results[level] = probe(level)
+        if breaks(results[level]):
+            bad = level
+        elif level >= maximum:
+            return maximum, dict(sorted(results.items()))
+        else:
+            good = level
+            level = min(level * 2, maximum)
+
+    while bad - good > resolution and not converged(results.get(good), results[bad]):
+        middle: float = (good + bad) / 2
+        middle = int(middle) if integer else round(middle, 6)
+        if not good < middle < bad:
+            break
+        results[middle] = probe(middle)
+        if breaks(results[middle]):
+            bad = middle
+        else:
+            good = middle
+    return bad, dict(sorted(results.items()))
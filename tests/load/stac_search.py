@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+STAC Search Workload
+
+Generates a randomized mix of STAC API /search requests (bbox, datetime,
+CQL2-JSON filters, sortby, ids and limits) from the collection extents,
+sample items and queryables shipped in charts/eoapi/data/initdb, and walks
+"next" links to reach deep pages. Filtered searches and deep token
+pagination are where pgstac slows down under load, so this replaces the
+bare GET /search used elsewhere in the suite.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .async_engine import AsyncLoadEngine, ClientShard, status_of
+from .scenario import ScenarioResult, ThinkTime, pause
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITDB_DIR = (
+    Path(__file__).resolve().parents[2] / "charts" / "eoapi" / "data" / "initdb"
+)
+# Relative weights of the kinds of search users send
+DEFAULT_SEARCH_MIX = {
+    "collection": 2.0,
+    "bbox": 3.0,
+    "datetime": 2.0,
+    "filter": 3.0,
+    "sorted": 1.0,
+    "ids": 1.0,
+    "combined": 2.0,
+}
+LIMITS = [10, 10, 10, 20, 50, 100, 250]
+SORT_FIELDS = ["datetime", "id"]
+DEFAULT_PAGE_WALK_SHARE = 0.3
+DEFAULT_MAX_PAGES = 10
+DEFAULT_THINK_TIME = ThinkTime(0.5, 2.0)
+# Share of searches sent as GET with query parameters instead of POST
+GET_SHARE = 0.3
+# Page depth buckets for reporting, as (first page, last page, label)
+PAGE_BUCKETS = [(2, 2, "2"), (3, 5, "3-5"), (6, 10, "6-10"), (11, math.inf, "11+")]
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_datetime(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass(frozen=True)
+class CollectionExtent:
+    """Where and when a collection has items, plus sample item values"""
+
+    id: str
+    bbox: Tuple[float, float, float, float]
+    start: datetime
+    end: datetime
+    item_ids: List[str] = field(default_factory=list)
+    # Observed values of scalar item properties, for equality filters
+    properties: Dict[str, List[Any]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Queryable:
+    """A filterable property advertised by /queryables"""
+
+    name: str
+    type: str
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+
+class SearchSpace:
+    """Collections and queryables that searches are drawn from"""
+
+    def __init__(
+        self, collections: List[CollectionExtent], queryables: List[Queryable]
+    ):
+        """
+        Initialize a search space
+
+        Raises:
+            ValueError: If there are no collections
+        """
+        if not collections:
+            raise ValueError("search space needs at least one collection")
+        self.collections = collections
+        self.queryables = queryables
+
+    @classmethod
+    def from_initdb(cls, directory: Path = DEFAULT_INITDB_DIR) -> "SearchSpace":
+        """
+        Build a search space from the chart's initdb sample data
+
+        Reads collections and items (JSON or NDJSON) from samples/ and JSON
+        schemas from queryables/. Item bboxes and datetimes take precedence
+        over collection extents, which are often global placeholders.
+
+        Args:
+            directory: initdb directory containing samples/ and queryables/
+
+        Returns:
+            SearchSpace for the sample data
+
+        Raises:
+            ValueError: If no collections are found
+        """
+        directory = Path(directory)
+        collections: Dict[str, Dict] = {}
+        items: Dict[str, List[Dict]] = {}
+        for path in sorted((directory / "samples").glob("*.json")):
+            with open(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    document = json.loads(line)
+                    if document.get("type") == "Collection":
+                        collections[document["id"]] = document
+                    elif document.get("type") == "Feature":
+                        items.setdefault(document.get("collection"), []).append(
+                            document
+                        )
+
+        extents = [
+            _collection_extent(collection, items.get(collection_id, []))
+            for collection_id, collection in sorted(collections.items())
+        ]
+
+        queryables = []
+        for path in sorted((directory / "queryables").glob("*.json")):
+            with open(path) as f:
+                schema = json.load(f)
+            for name, spec in schema.get("properties", {}).items():
+                queryables.append(
+                    Queryable(
+                        name=name,
+                        type=spec.get("format", spec.get("type", "object")),
+                        minimum=spec.get("minimum"),
+                        maximum=spec.get("maximum"),
+                    )
+                )
+        return cls(extents, queryables)
+
+
+def _collection_extent(collection: Dict, items: List[Dict]) -> CollectionExtent:
+    """Extent of a collection, narrowed to its items when there are any"""
+    extent = collection.get("extent", {})
+    bbox = tuple(extent.get("spatial", {}).get("bbox", [[-180, -90, 180, 90]])[0][:4])
+    interval = extent.get("temporal", {}).get("interval", [[None, None]])[0]
+    start = _parse_datetime(interval[0]) if interval[0] else None
+    end = _parse_datetime(interval[1]) if interval[1] else None
+
+    properties: Dict[str, List[Any]] = {}
+    if items:
+        bboxes = [item["bbox"] for item in items if "bbox" in item]
+        if bboxes:
+            bbox = (
+                min(b[0] for b in bboxes),
+                min(b[1] for b in bboxes),
+                max(b[2] for b in bboxes),
+                max(b[3] for b in bboxes),
+            )
+        datetimes = [
+            _parse_datetime(item["properties"]["datetime"])
+            for item in items
+            if item.get("properties", {}).get("datetime")
+        ]
+        if datetimes:
+            start, end = min(datetimes), max(datetimes)
+        for item in items:
+            for name, value in item.get("properties", {}).items():
+                if name != "datetime" and isinstance(value, (str, int, float)):
+                    values = properties.setdefault(name, [])
+                    if value not in values:
+                        values.append(value)
+
+    now = datetime.now(timezone.utc)
+    return CollectionExtent(
+        id=collection["id"],
+        bbox=bbox,  # type: ignore[arg-type]
+        start=start or now - timedelta(days=365),
+        end=end or now,
+        item_ids=[item["id"] for item in items],
+        properties=properties,
+    )
+
+
+class SearchQueryGenerator:
+    """Draws randomized /search request bodies from a SearchSpace"""
+
+    def __init__(
+        self,
+        space: SearchSpace,
+        rng: random.Random,
+        mix: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Initialize a generator
+
+        Args:
+            space: Collections and queryables to draw from
+            rng: Random source
+            mix: Relative weights of search kinds (see DEFAULT_SEARCH_MIX)
+
+        Raises:
+            ValueError: If the mix names unknown kinds or has no positive weight
+        """
+        self.space = space
+        self.rng = rng
+        self.mix = dict(mix or DEFAULT_SEARCH_MIX)
+        unknown = set(self.mix) - set(DEFAULT_SEARCH_MIX)
+        if unknown:
+            raise ValueError(f"Unknown search kinds: {sorted(unknown)}")
+        if sum(self.mix.values()) <= 0:
+            raise ValueError("search mix needs a positive weight")
+
+    def bbox(self, extent: CollectionExtent) -> List[float]:
+        """A random box inside the extent, 1-100% of its size (log-uniform)"""
+        west, south, east, north = extent.bbox
+        fraction = 10 ** self.rng.uniform(-2, 0)
+        width, height = (east - west) * fraction, (north - south) * fraction
+        x = self.rng.uniform(west, east - width)
+        y = self.rng.uniform(south, north - height)
+        return [round(v, 6) for v in (x, y, x + width, y + height)]
+
+    def datetime_interval(self, extent: CollectionExtent) -> str:
+        """A random closed or half-open interval overlapping the extent"""
+        span = (extent.end - extent.start).total_seconds()
+        start = extent.start + timedelta(seconds=self.rng.uniform(0, span))
+        end = start + timedelta(seconds=self.rng.uniform(0, span) + 1)
+        shape = self.rng.random()
+        if shape < 0.15:
+            return f"../{_format_datetime(end)}"
+        if shape < 0.3:
+            return f"{_format_datetime(start)}/.."
+        return f"{_format_datetime(start)}/{_format_datetime(end)}"
+
+    def predicate(self, extent: CollectionExtent) -> Dict:
+        """One CQL2-JSON predicate on a queryable or observed item property"""
+        candidates: List[Tuple[str, Any]] = []
+        for queryable in self.space.queryables:
+            if queryable.type in ("number", "integer") and (
+                queryable.minimum is not None and queryable.maximum is not None
+            ):
+                candidates.append(("range", queryable))
+            elif queryable.name == "id" and extent.item_ids:
+                candidates.append(("ids", queryable))
+            elif queryable.type == "date-time":
+                candidates.append(("interval", queryable))
+            elif queryable.name == "geometry":
+                candidates.append(("intersects", queryable))
+        for name in extent.properties:
+            candidates.append(("equals", name))
+        if not candidates:
+            return {
+                "op": "=",
+                "args": [{"property": "collection"}, extent.id],
+            }
+
+        kind, target = self.rng.choice(candidates)
+        if kind == "range":
+            value = round(self.rng.uniform(target.minimum, target.maximum), 1)
+            op = self.rng.choice(["<", "<=", ">", ">="])
+            return {"op": op, "args": [{"property": target.name}, value]}
+        if kind == "ids":
+            ids = self.rng.sample(extent.item_ids, min(len(extent.item_ids), 5))
+            return {"op": "in", "args": [{"property": "id"}, ids]}
+        if kind == "interval":
+            start, _, end = self.datetime_interval(extent).partition("/")
+            return {
+                "op": "t_intersects",
+                "args": [{"property": target.name}, {"interval": [start, end]}],
+            }
+        if kind == "intersects":
+            west, south, east, north = self.bbox(extent)
+            polygon = [
+                [
+                    [west, south],
+                    [east, south],
+                    [east, north],
+                    [west, north],
+                    [west, south],
+                ]
+            ]
+            return {
+                "op": "s_intersects",
+                "args": [
+                    {"property": "geometry"},
+                    {"type": "Polygon", "coordinates": polygon},
+                ],
+            }
+        value = self.rng.choice(extent.properties[target])
+        return {"op": "=", "args": [{"property": target}, value]}
+
+    def filter(self, extent: CollectionExtent) -> Dict:
+        """One or two predicates, combined with "and" when there are two"""
+        predicates = [self.predicate(extent) for _ in range(self.rng.randint(1, 2))]
+        if len(predicates) == 1:
+            return predicates[0]
+        return {"op": "and", "args": predicates}
+
+    def sortby(self) -> List[Dict[str, str]]:
+        return [
+            {
+                "field": self.rng.choice(SORT_FIELDS),
+                "direction": self.rng.choice(["asc", "desc"]),
+            }
+        ]
+
+    def next_query(self) -> Tuple[str, Dict]:
+        """
+        Draw the next search
+
+        Returns:
+            Tuple of (kind, body) where body is a POST /search request body
+        """
+        kind = self.rng.choices(list(self.mix), list(self.mix.values()))[0]
+        extent = self.rng.choice(self.space.collections)
+        body: Dict[str, Any] = {"limit": self.rng.choice(LIMITS)}
+
+        if kind == "ids" and extent.item_ids:
+            body["ids"] = self.rng.sample(
+                extent.item_ids, min(len(extent.item_ids), self.rng.randint(1, 10))
+            )
+            return kind, body
+
+        body["collections"] = [extent.id]
+        if kind in ("bbox", "combined") or (
+            kind == "sorted" and self.rng.random() < 0.5
+        ):
+            body["bbox"] = self.bbox(extent)
+        if kind in ("datetime", "combined"):
+            body["datetime"] = self.datetime_interval(extent)
+        if kind in ("filter", "combined"):
+            body["filter-lang"] = "cql2-json"
+            body["filter"] = self.filter(extent)
+        if kind in ("sorted", "combined"):
+            body["sortby"] = self.sortby()
+        return kind, body
+
+
+def to_query_params(body: Dict) -> Dict[str, str]:
+    """
+    Convert a POST /search body into GET /search query parameters
+
+    Args:
+        body: Search body from SearchQueryGenerator
+
+    Returns:
+        Query parameters with lists comma-joined, sortby as +/- fields and
+        filters as CQL2-JSON strings
+    """
+    params = {}
+    for key, value in body.items():
+        if key in ("collections", "ids", "bbox"):
+            params[key] = ",".join(str(v) for v in value)
+        elif key == "sortby":
+            params[key] = ",".join(
+                f"{'-' if s['direction'] == 'desc' else '+'}{s['field']}" for s in value
+            )
+        elif key == "filter":
+            params[key] = json.dumps(value, separators=(",", ":"))
+        else:
+            params[key] = str(value)
+    return params
+
+
+def page_bucket(page: int) -> str:
+    """Report label for a page number beyond the first"""
+    for first, last, label in PAGE_BUCKETS:
+        if first <= page <= last:
+            return label
+    raise ValueError(f"page must be at least 2: {page}")
+
+
+def next_link(document: Any) -> Optional[Dict]:
+    """The rel=next link of a search response, if any"""
+    if not isinstance(document, dict):
+        return None
+    for link in document.get("links") or []:
+        if link.get("rel") == "next" and link.get("href"):
+            return link
+    return None
+
+
+class SearchLoadRunner:
+    """Drives STAC search users on an AsyncLoadEngine"""
+
+    def __init__(
+        self,
+        space: SearchSpace,
+        engine: AsyncLoadEngine,
+        base_url: str,
+        stac_path: str = "/stac",
+        page_walk_share: float = DEFAULT_PAGE_WALK_SHARE,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        think_time: ThinkTime = DEFAULT_THINK_TIME,
+        mix: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the runner
+
+        Args:
+            space: Collections and queryables searches are drawn from
+            engine: Async engine whose client shards carry the requests
+            base_url: Base URL for eoAPI services
+            stac_path: Path of the STAC API below base_url
+            page_walk_share: Share of searches whose next links are followed
+            max_pages: Deepest page a walk goes to (including the first)
+            think_time: Pause between a user's searches
+            mix: Relative weights of search kinds (see DEFAULT_SEARCH_MIX)
+            seed: Optional seed for query and think time draws
+
+        Raises:
+            ValueError: If page walking parameters are invalid
+        """
+        if not 0 <= page_walk_share <= 1:
+            raise ValueError(
+                f"page_walk_share must be between 0 and 1: {page_walk_share}"
+            )
+        if max_pages < 1:
+            raise ValueError(f"max_pages must be at least 1: {max_pages}")
+        self.space = space
+        self.engine = engine
+        self.search_url = f"{base_url.rstrip('/')}/{stac_path.strip('/')}/search"
+        self.page_walk_share = page_walk_share
+        self.max_pages = max_pages
+        self.think_time = think_time
+        self.rng = random.Random(seed)
+        # Validate the mix once up front rather than in every user
+        self.mix = SearchQueryGenerator(space, self.rng, mix).mix
+
+    async def _search(
+        self,
+        shard: ClientShard,
+        key: str,
+        method: str,
+        url: str,
+        result: ScenarioResult,
+        body: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+    ) -> Tuple[bool, Any]:
+        """Send one search page, record it and return (success, json document)"""
+        response, latency_ms = await self.engine.request(
+            shard, method, url, json=body, params=params
+        )
+        status = status_of(response)
+        result.record(key, status == 200, latency_ms, time.time(), status=status)
+        if status != 200 or response is None:
+            return False, None
+        try:
+            return True, response.json()
+        except ValueError:
+            return True, None
+
+    async def _walk(
+        self,
+        shard: ClientShard,
+        kind: str,
+        body: Dict,
+        generator: SearchQueryGenerator,
+        result: ScenarioResult,
+    ) -> bool:
+        """Run one search and possibly follow its next links; True if all pages OK"""
+        if generator.rng.random() < GET_SHARE:
+            ok, document = await self._search(
+                shard,
+                f"search/{kind}",
+                "GET",
+                self.search_url,
+                result,
+                params=to_query_params(body),
+            )
+        else:
+            ok, document = await self._search(
+                shard, f"search/{kind}", "POST", self.search_url, result, body=body
+            )
+        if not ok or generator.rng.random() >= self.page_walk_share:
+            return ok
+
+        for page in range(2, self.max_pages + 1):
+            link = next_link(document)
+            if link is None:
+                break
+            method = link.get("method", "GET").upper()
+            link_body = link.get("body")
+            if link_body is not None and link.get("merge"):
+                link_body = {**body, **link_body}
+            ok, document = await self._search(
+                shard,
+                f"page/{page_bucket(page)}",
+                method,
+                link["href"],
+                result,
+                body=link_body if method != "GET" else None,
+            )
+            if not ok:
+                return False
+        return True
+
+    async def _user(
+        self,
+        shard: ClientShard,
+        start_delay: float,
+        deadline: float,
+        result: ScenarioResult,
+    ) -> None:
+        """One user sending searches until deadline"""
+        await asyncio.sleep(start_delay)
+        generator = SearchQueryGenerator(
+            self.space, random.Random(self.rng.random()), self.mix
+        )
+        while time.perf_counter() < deadline:
+            kind, body = generator.next_query()
+            ok = await self._walk(shard, kind, body, generator, result)
+            result.record_iteration(kind, ok)
+            await pause(self.think_time.sample(generator.rng), deadline)
+
+    async def _run(self, users: int, duration: float, ramp_up: float) -> ScenarioResult:
+        result = ScenarioResult(self.engine.histogram_digits)
+        async with AsyncExitStack() as stack:
+            shards = await self.engine.open_shards(stack, self.search_url)
+            start_time = time.perf_counter()
+            deadline = start_time + duration
+            stagger = ramp_up / users
+            await asyncio.gather(
+                *(
+                    self._user(shards[i % len(shards)], i * stagger, deadline, result)
+                    for i in range(users)
+                )
+            )
+        result.duration = time.perf_counter() - start_time
+        return result
+
+    def run(self, users: int, duration: float, ramp_up: float = 0.0) -> ScenarioResult:
+        """
+        Run `users` search users for duration seconds
+
+        Args:
+            users: Number of concurrent users
+            duration: Run duration in seconds
+            ramp_up: Seconds over which users start
+
+        Returns:
+            ScenarioResult with first pages under "search/<kind>", followed
+            pages under "page/<depth>" and completed searches per kind
+
+        Raises:
+            ValueError: If users or duration is not positive
+        """
+        if users <= 0 or duration <= 0:
+            raise ValueError(
+                f"users and duration must be positive: {users}, {duration}"
+            )
+        return asyncio.run(self._run(users, duration, ramp_up))
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the USL capacity model and replica planner
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from .capacity import (  # noqa: E402
+    ServiceSettings,
+    USLModel,
+    describe_plan,
+    fit_usl,
+    load_stress_runs,
+    plan_capacity,
+    service_of,
+)
+
+TRUE_MODEL = USLModel(lam=50.0, sigma=0.05, kappa=0.002)
+SLO = 500.0
+
+
+def stress_report(replicas: int, model: USLModel = TRUE_MODEL) -> dict:
+    """Levels below capacity meet the SLO, the last one breaks it"""
+    capacity = model.throughput(replicas)
+    metrics = {}
+    for workers, share, p95 in ((5, 0.4, 120.0), (10, 0.8, 250.0), (15, 1.0, 480.0)):
+        metrics[str(workers)] = {
+            "throughput": capacity * share,
+            "latency_p95": p95,
+            "latency_avg": 100.0,
+            "success_rate": 100.0,
+        }
+    metrics["20"] = {
+        "throughput": capacity * 1.05,
+        "latency_p95": 2400.0,
+        "latency_avg": 900.0,
+        "success_rate": 100.0,
+    }
+    return {"endpoint": "/raster/healthz", "breaking_point": 20, "metrics": metrics}
+
+
+def runs(*counts) -> dict:
+    return {replicas: stress_report(replicas) for replicas in counts}
+
+
+class TestFit:
+    """The USL fit recovers the model behind the data"""
+
+    def test_recovers_parameters(self):
+        counts = [1, 2, 4, 8, 16]
+        model = fit_usl(counts, [TRUE_MODEL.throughput(n) for n in counts])
+        assert model.lam == pytest.approx(TRUE_MODEL.lam, rel=1e-6)
+        assert model.sigma == pytest.approx(TRUE_MODEL.sigma, rel=1e-6)
+        assert model.kappa == pytest.approx(TRUE_MODEL.kappa, rel=1e-6)
+        assert model.peak == pytest.approx(21.8, abs=0.1)
+
+    def test_linear_with_one_count(self):
+        model = fit_usl([2], [80.0])
+        assert (model.lam, model.sigma, model.kappa) == (40.0, 0.0, 0.0)
+
+    def test_shape_parameters_stay_non_negative(self):
+        # Superlinear scaling would need a negative σ
+        model = fit_usl([1, 2, 4], [10.0, 25.0, 60.0])
+        assert model.sigma >= 0 and model.kappa >= 0
+
+
+class TestPlan:
+    """Recommendations follow from the fitted capacity"""
+
+    def test_replicas(self):
+        plan = plan_capacity(runs(1, 2, 4, 8), 200, SLO, "raster", cpu_per_pod=2)
+        # 240 req/s with headroom needs 7 replicas (6 carry 229), 120 req/s 3
+        assert plan.max_replicas == 7
+        assert plan.min_replicas == 3
+        assert plan.capacity >= 240
+        assert plan.sustained[4] == pytest.approx(TRUE_MODEL.throughput(4))
+        assert plan.notes == []
+
+    def test_pool_from_database_concurrency(self):
+        plan = plan_capacity(
+            runs(1, 2, 4, 8), 200, SLO, "raster", cpu_per_pod=1, db_time_fraction=0.8
+        )
+        # 34.3 req/s per pod at 100ms mean latency keeps 3.4 requests in
+        # flight, 2.7 of them in the database, all on the one worker
+        assert plan.in_flight_per_pod == pytest.approx(240 / 7 / 10)
+        assert plan.db_in_flight_per_pod == pytest.approx(240 / 7 / 10 * 0.8)
+        assert plan.web_concurrency == 1
+        assert plan.db_max_conn_size == 3
+        assert plan.connections == 7 * 1 * 1 * 3
+        assert plan.connections <= 80
+
+    def test_workers_from_cpu(self):
+        current = ServiceSettings(cpu=2.5)
+        plan = plan_capacity(runs(1, 2, 4, 8), 200, SLO, "raster", current=current)
+        assert plan.web_concurrency == 2
+        assert plan.db_max_conn_size == 1
+        assert plan.notes == []
+
+        plan = plan_capacity(runs(1, 2, 4, 8), 200, SLO, "raster")
+        assert plan.web_concurrency == 1
+        assert "No CPU request" in plan.notes[0]
+
+    def test_pool_capped_by_budget(self):
+        plan = plan_capacity(
+            runs(1, 2, 4, 8),
+            200,
+            SLO,
+            "raster",
+            db_connections=14,
+            cpu_per_pod=1,
+            db_time_fraction=0.8,
+        )
+        # 7 replicas × 1 worker have room for 2 of the 3 connections needed
+        assert plan.db_max_conn_size == 2
+        assert plan.connections == 14
+        assert "DB_MAX_CONN_SIZE capped at 2 (needs 3)" in plan.notes[0]
+
+    def test_connection_budget(self):
+        current = ServiceSettings(pools=2, cpu=4)
+        plan = plan_capacity(
+            runs(1, 2, 4, 8), 200, SLO, "stac", db_connections=24, current=current
+        )
+        # 7 replicas × 2 pools leave room for one worker per pod
+        assert plan.connections == 14
+        assert plan.web_concurrency == 1
+        assert "WEB_CONCURRENCY capped" in plan.notes[0]
+
+    def test_invalid_db_time_fraction(self):
+        with pytest.raises(ValueError):
+            plan_capacity(runs(1, 2), 100, SLO, "raster", db_time_fraction=0)
+
+    def test_unreachable_target(self):
+        plan = plan_capacity(runs(1, 2, 4, 8), 1000, SLO, "raster")
+        assert plan.max_replicas == 22
+        assert plan.capacity < 1000
+        assert any(note.startswith("Target not reachable") for note in plan.notes)
+
+    def test_few_replica_counts_are_noted(self):
+        plan = plan_capacity(runs(2), 50, SLO, "raster")
+        assert plan.model.sigma == 0
+        assert "three or more" in plan.notes[0]
+
+    def test_no_level_meets_slo(self):
+        with pytest.raises(ValueError):
+            plan_capacity(runs(1, 2), 100, 50.0, "raster")
+
+    def test_describe(self):
+        current = ServiceSettings(
+            min_replicas=1, max_replicas=10, web_concurrency=4, cpu=4
+        )
+        lines = describe_plan(
+            plan_capacity(runs(1, 2, 4, 8), 200, SLO, "raster", current=current)
+        )
+        assert "raster.maxReplicas: 7 (currently 10)" in lines
+        assert "raster.WEB_CONCURRENCY: 4" in lines
+        assert "Worst-case connections: 7 × 4 × 1 × 1 = 28" in lines
+
+
+class TestInputs:
+    def test_load_stress_runs(self, tmp_path):
+        tagged = tmp_path / "r2.json"
+        tagged.write_text(json.dumps({"replicas": 2, **stress_report(2)}))
+        untagged = tmp_path / "r4.json"
+        untagged.write_text(json.dumps(stress_report(4)))
+        loaded = load_stress_runs([str(tagged), f"4={untagged}"])
+        assert sorted(loaded) == [2, 4]
+        with pytest.raises(ValueError):
+            load_stress_runs([str(untagged)])
+
+    def test_service_of(self):
+        assert service_of("/raster/healthz") == "raster"
+        assert service_of("/stac/collections") == "stac"
+        assert service_of("/healthz") is None
+
+    def test_settings_from_values(self):
+        values = {
+            "stac": {
+                "autoscaling": {"minReplicas": 1, "maxReplicas": 10},
+                "settings": {
+                    "envVars": {
+                        "WEB_CONCURRENCY": "10",
+                        "DB_MAX_CONN_SIZE": "5",
+                        "ENABLE_TRANSACTIONS_EXTENSIONS": "true",
+                    },
+                    "resources": {"requests": {"cpu": "1500m"}},
+                },
+            }
+        }
+        settings = ServiceSettings.from_values(values, "stac")
+        assert settings == ServiceSettings(1, 10, 10, 5, pools=2, cpu=1.5)
+        assert ServiceSettings.from_values(values, "raster") == ServiceSettings()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Unit tests for multi-process load generation
+
+Generator jobs here record synthetic results instead of sending requests,
+so these run offline and do not need an eoAPI deployment.
+"""
+
+import pytest
+
+from .distributed import run_forked, split_evenly
+from .recorder import RequestRecorder
+
+
+def synthetic_job(offset: int, successes: int, failures: int):
+    """Build a generator job that records fixed results"""
+
+    def job() -> RequestRecorder:
+        recorder = RequestRecorder()
+        for i in range(successes):
+            recorder.record(True, 10.0 + i, timestamp=1_700_000_000 + offset)
+        for _ in range(failures):
+            recorder.record(False, 500.0, timestamp=1_700_000_001 + offset)
+        recorder.duration = 1.0 + offset
+        return recorder
+
+    return job
+
+
+class TestSplitEvenly:
+    """Load is split across generator processes without losing any"""
+
+    @pytest.mark.parametrize("total,parts", [(10, 3), (3, 3), (7, 1), (100, 8)])
+    def test_worker_split(self, total: int, parts: int):
+        shares = split_evenly(total, parts)
+        assert sum(shares) == total
+        assert max(shares) - min(shares) <= 1
+
+    def test_rate_split(self):
+        assert split_evenly(500.0, 4) == [125.0] * 4
+
+
+class TestRunForked:
+    """Results from forked generators merge into one recorder"""
+
+    def test_merges_counters_timeline_and_histograms(self):
+        jobs = [synthetic_job(0, 50, 5), synthetic_job(1, 30, 0)]
+        merged = run_forked(jobs, duration=5)
+
+        expected = RequestRecorder()
+        for job in jobs:
+            expected.merge(job())
+
+        assert merged.total_requests == 85
+        assert merged.success_count == 80
+        assert merged.duration == 2.0
+        assert merged.timeline() == expected.timeline()
+        assert merged.latencies.counts == expected.latencies.counts
+
+    def test_generator_failure_is_reported(self):
+        def failing_job() -> RequestRecorder:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            run_forked([synthetic_job(0, 1, 0), failing_job], duration=5)
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Unit tests for metrics collection against the fake Prometheus server
+
+Queries go over HTTP to a local stand-in, so these run offline and do not
+need Prometheus or an eoAPI deployment.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from .fake_prometheus import (
+    FakePrometheus,
+    SyntheticSeries,
+    eoapi_generators,
+    load_fixtures,
+    parse_duration,
+)
+from .prometheus_utils import (
+    METRIC_GROUPS,
+    PrometheusClient,
+    collect_test_metrics,
+    pod_queries,
+    summarize_metrics,
+)
+
+START = datetime(2026, 10, 1, 12, 0, 0)
+END = START + timedelta(minutes=5)
+
+
+def client(fake: FakePrometheus) -> PrometheusClient:
+    return PrometheusClient(fake.url, timeout=5, cache_dir=None)
+
+
+@pytest.fixture
+def synthetic():
+    with FakePrometheus(generators=eoapi_generators(pods=4)) as fake:
+        yield fake
+
+
+class TestQueries:
+    """Range queries are answered on the step grid Prometheus uses"""
+
+    def test_range_alignment(self):
+        series = SyntheticSeries({"pod": "a"}, lambda offset: offset)
+        with FakePrometheus(generators={"up": [series]}) as fake:
+            data = client(fake).query_range("up", START, START + timedelta(seconds=60))
+        values = data["result"][0]["values"]
+        start = START.timestamp()
+        assert [t for t, _ in values] == [start + k * 15 for k in range(5)]
+        assert [v for _, v in values] == ["0", "15", "30", "45", "60"]
+
+    def test_instant_query(self, synthetic):
+        query = pod_queries("eoapi")["cpu"]
+        data = client(synthetic).query(query, START)
+        assert data["resultType"] == "vector"
+        assert len(data["result"]) == 12
+
+    def test_unknown_query_is_empty(self, synthetic):
+        assert client(synthetic).query_range("nope", START, END) == {
+            "resultType": "matrix",
+            "result": [],
+        }
+
+    @pytest.mark.parametrize("step", ["0s", "fast", "1s"])
+    def test_bad_or_too_fine_step(self, synthetic, step):
+        # 1s over a day is more than 11,000 points
+        day = START + timedelta(days=1)
+        assert client(synthetic).query_range("up", START, day, step=step) is None
+
+    def test_parse_duration(self):
+        assert parse_duration("1m30s") == 90
+        assert parse_duration("15") == 15
+        with pytest.raises(ValueError):
+            parse_duration("15x")
+
+
+class TestCollection:
+    """collect_test_metrics and summaries run end to end over HTTP"""
+
+    def test_collect_and_summarize(self, synthetic):
+        prometheus = client(synthetic)
+        assert prometheus.available
+        metrics = collect_test_metrics(None, "eoapi", START, END, client=prometheus)
+        assert set(metrics) == set(METRIC_GROUPS)
+        assert len(metrics["pod_metrics"]["cpu"]["result"]) == 12
+
+        paths = [path for path, _ in synthetic.queries]
+        query_count = sum(len(build("eoapi")) for build in METRIC_GROUPS.values())
+        assert paths.count("/api/v1/query_range") == query_count
+
+        pytest.importorskip("numpy")
+        summary = summarize_metrics(metrics)
+        assert summary["replicas eoapi-raster"].startswith("1→4 in ")
+        assert summary["cpu eoapi-raster"].startswith("4 pods, peak 0.95 cores/pod")
+
+    def test_cache_through_http(self, synthetic, tmp_path):
+        first = PrometheusClient(synthetic.url, timeout=5, cache_dir=str(tmp_path))
+        metrics = collect_test_metrics(None, "eoapi", START, END, client=first)
+        served = len(synthetic.queries)
+
+        second = PrometheusClient(synthetic.url, timeout=5, cache_dir=str(tmp_path))
+        assert collect_test_metrics(None, "eoapi", START, END, client=second) == metrics
+        # Only the availability probe reached the server
+        assert len(synthetic.queries) == served + 1
+
+
+class TestFixtures:
+    """Recorded reports replay on the window they are queried for"""
+
+    def test_replay_report(self, synthetic, tmp_path):
+        recorded = collect_test_metrics(
+            None, "eoapi", START, END, client=client(synthetic)
+        )
+        path = tmp_path / "report.json"
+        path.write_text(json.dumps({"overall": {"infrastructure": recorded}}))
+        fixtures = load_fixtures(str(path))
+
+        later = timedelta(days=3)
+        with FakePrometheus(fixtures=fixtures, rebase=True) as fake:
+            replayed = collect_test_metrics(
+                None, "eoapi", START + later, END + later, client=client(fake)
+            )
+        original = recorded["hpa_metrics"]["current_replicas"]["result"][0]
+        moved = replayed["hpa_metrics"]["current_replicas"]["result"][0]
+        assert [v for _, v in moved["values"]] == [v for _, v in original["values"]]
+        assert moved["values"][0][0] - original["values"][0][0] == later.total_seconds()
+
+    def test_query_keyed_fixtures(self, tmp_path):
+        path = tmp_path / "fixtures.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "up": {
+                        "resultType": "matrix",
+                        "result": [{"metric": {}, "values": []}],
+                    }
+                }
+            )
+        )
+        assert list(load_fixtures(str(path))) == ["up"]
+        (tmp_path / "empty.json").write_text("{}")
+        with pytest.raises(ValueError):
+            load_fixtures(str(tmp_path / "empty.json"))
+
+
+class TestLargeMatrices:
+    """Summaries stay fast on many pods over long windows"""
+
+    def test_hour_of_many_pods(self):
+        pytest.importorskip("numpy")
+        from .infra_stats import infrastructure_stats
+
+        generators = eoapi_generators(pods=40, containers=3, ramp_seconds=1800)
+        with FakePrometheus(generators=generators) as fake:
+            metrics = collect_test_metrics(
+                None, "eoapi", START, START + timedelta(hours=1), client=client(fake)
+            )
+        # 3 services × 40 pods × 3 containers, 241 samples each
+        cpu = metrics["pod_metrics"]["cpu"]["result"]
+        assert len(cpu) == 360
+        assert len(cpu[0]["values"]) == 241
+
+        began = time.perf_counter()
+        stats = infrastructure_stats(metrics)
+        assert time.perf_counter() - began < 2.0
+        assert stats["cpu"]["workloads"]["eoapi-vector"]["pods"] == 40
+        assert stats["replicas"]["eoapi-stac"]["max"] == 40
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the streaming latency histogram
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import math
+import random
+
+import pytest
+
+from .histogram import LatencyHistogram
+
+
+def exact_percentile(sorted_values: list[float], percentile: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@pytest.fixture
+def latencies() -> list[float]:
+    rng = random.Random(42)
+    return [rng.lognormvariate(3, 1) for _ in range(20000)]
+
+
+class TestLatencyHistogram:
+    """Accuracy, memory and merge behaviour of LatencyHistogram"""
+
+    @pytest.mark.parametrize("digits", [2, 3])
+    def test_percentiles_within_precision(self, latencies, digits: int):
+        """Percentiles stay within the configured relative error"""
+        histogram = LatencyHistogram(significant_digits=digits)
+        for value in latencies:
+            histogram.record(value)
+
+        ordered = sorted(latencies)
+        tolerance = 10**-digits
+        for percentile in (50, 90, 99, 99.9):
+            expected = exact_percentile(ordered, percentile)
+            actual = histogram.percentile(percentile)
+            assert (
+                abs(actual - expected) / expected <= tolerance
+            ), f"p{percentile}: {actual} vs {expected}"
+
+        assert histogram.max == pytest.approx(max(latencies), abs=1e-3)
+        assert histogram.mean == pytest.approx(sum(latencies) / len(latencies), 1e-6)
+
+    def test_memory_is_fixed(self, latencies):
+        """Recording more values does not grow the counter array"""
+        histogram = LatencyHistogram()
+        size = len(histogram.counts)
+        for value in latencies * 5:
+            histogram.record(value)
+        assert len(histogram.counts) == size
+        assert histogram.total_count == len(latencies) * 5
+
+    def test_merge_is_exact(self, latencies):
+        """Merging shards equals recording everything into one histogram"""
+        combined = LatencyHistogram()
+        shards = [LatencyHistogram() for _ in range(4)]
+        for i, value in enumerate(latencies):
+            combined.record(value)
+            shards[i % 4].record(value)
+
+        merged = LatencyHistogram()
+        for shard in shards:
+            merged.merge(shard)
+
+        assert merged.counts == combined.counts
+        assert merged.summary() == combined.summary()
+
+    def test_merge_rejects_different_precision(self):
+        """Histograms with different configurations cannot merge"""
+        with pytest.raises(ValueError):
+            LatencyHistogram(significant_digits=2).merge(
+                LatencyHistogram(significant_digits=3)
+            )
+
+    def test_round_trip_serialization(self, latencies):
+        """to_dict/from_dict preserves every count"""
+        histogram = LatencyHistogram()
+        for value in latencies:
+            histogram.record(value)
+
+        restored = LatencyHistogram.from_dict(histogram.to_dict())
+        assert restored.counts == histogram.counts
+        assert restored.summary() == histogram.summary()
+
+    def test_values_above_range_are_clamped(self):
+        """Out-of-range latencies are clamped rather than dropped"""
+        histogram = LatencyHistogram(highest_us=1_000_000)
+        histogram.record(5_000)
+        assert histogram.total_count == 1
+        assert histogram.max == 1_000
+
+    def test_empty_histogram_summary(self):
+        """An empty histogram reports no latency metrics"""
+        assert LatencyHistogram().summary() == {}
+        assert LatencyHistogram().percentile(99) == 0.0
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the offline HPA simulator
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import json
+
+import pytest
+
+from .hpa_simulator import (
+    HPAConfig,
+    describe_simulation,
+    load_rates,
+    rates_from_prometheus,
+    simulate,
+    simulate_services,
+)
+from .load_tester import parse_pod_capacity
+from .results_store import DEFAULT_CHART_DIR, load_values
+
+START = 1_790_856_000
+
+# 10 minutes at 50 req/s, 15 at 400 req/s, 15 back at 50 req/s
+STEP = [50.0] * 600 + [400.0] * 900 + [50.0] * 900
+
+
+class TestConfig:
+    """Autoscaling blocks in chart values become HPA settings"""
+
+    def test_chart_defaults(self):
+        config = HPAConfig.from_values(load_values(str(DEFAULT_CHART_DIR)), "raster")
+        assert config.type == "requestRate"
+        assert config.rate_target == 100.0
+        assert (config.min_replicas, config.max_replicas) == (1, 10)
+        assert config.scale_down_window == 60
+
+    def test_overrides(self):
+        values = {
+            "raster": {
+                "autoscaling": {
+                    "type": "both",
+                    "minReplicas": 2,
+                    "targets": {"cpu": 60, "requestRate": "40000m"},
+                    "behavior": {"scaleDown": {"stabilizationWindowSeconds": 600}},
+                },
+                "settings": {"resources": {"requests": {"cpu": "500m"}}},
+            }
+        }
+        config = HPAConfig.from_values(values, "raster")
+        assert (config.type, config.min_replicas) == ("both", 2)
+        assert (config.rate_target, config.cpu_target) == (40.0, 60.0)
+        assert config.cpu_request == 0.5
+        assert config.scale_down_window == 600
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            HPAConfig.from_values({"raster": {}}, "raster")
+        with pytest.raises(ValueError):
+            HPAConfig.from_values(
+                {"raster": {"autoscaling": {"type": "qps"}}}, "raster"
+            )
+        with pytest.raises(ValueError, match="latency"):
+            HPAConfig.from_values(
+                {"raster": {"autoscaling": {"type": "latency"}}}, "raster"
+            )
+
+
+class TestSimulate:
+    """The model lags a step in traffic by the adapter's 5m rate window"""
+
+    def test_flat_traffic_within_capacity(self):
+        sim = simulate("raster", [150.0] * 600, HPAConfig(), pod_capacity=120)
+        # Warm start from the first window: 150 req/s at 100 per pod
+        assert sim.peak_replicas == 2
+        assert (sim.excess_requests, sim.scale_ups, sim.scale_downs) == (0, 0, 0)
+        assert sim.pod_hours == pytest.approx(2 * 600 / 3600)
+
+    def test_step_scales_late_and_back(self):
+        sim = simulate(
+            "raster", STEP, HPAConfig(scale_down_window=60), pod_capacity=120
+        )
+        assert sim.peak_replicas == 4
+        assert sim.scale_ups == 3
+        assert sim.scale_downs >= 1
+        assert sim.timeline[-1]["desired"] == 1
+        # Over capacity until the fourth pod is ready, then never again
+        assert 0 < sim.seconds_over_capacity < 600
+        assert sim.excess_requests == pytest.approx(
+            sum(row["excess"] for row in sim.timeline)
+        )
+        assert 0 < sim.excess_share < 0.2
+
+    def test_slower_pods_and_longer_windows_cost_more(self):
+        fast = simulate("raster", STEP, HPAConfig(scale_down_window=60), 120)
+        slow = simulate(
+            "raster",
+            STEP,
+            HPAConfig(scale_down_window=600),
+            120,
+            pod_startup_s=120,
+        )
+        assert slow.excess_requests > fast.excess_requests
+        assert slow.pod_hours > fast.pod_hours
+
+    def test_max_replicas_caps_capacity(self):
+        sim = simulate("raster", STEP, HPAConfig(max_replicas=2), pod_capacity=120)
+        assert sim.peak_replicas == 2
+        # 160 req/s beyond two pods for most of the peak
+        assert sim.excess_requests > 160 * 600
+
+    def test_cpu_scaling(self):
+        config = HPAConfig(type="cpu", cpu_target=50, cpu_request=1.0)
+        sim = simulate("raster", STEP, config, pod_capacity=500, cpu_cost=0.01)
+        # 400 req/s costs 4 cores, 0.5 cores per pod at target
+        assert sim.peak_replicas == 8
+        with pytest.raises(ValueError):
+            simulate("raster", STEP, config, pod_capacity=500)
+
+    def test_describe(self):
+        lines = describe_simulation(simulate("raster", STEP, HPAConfig(), 120))
+        assert lines[0].startswith("raster: 1-10 replicas at 100 req/s per pod")
+        assert "Requests over capacity" in lines[1]
+
+
+def range_result(values_by_service: dict, step: int = 15) -> dict:
+    return {
+        "status": "success",
+        "data": {
+            "resultType": "matrix",
+            "result": [
+                {
+                    "metric": labels,
+                    "values": [
+                        [START + i * step, str(value)] for i, value in enumerate(values)
+                    ],
+                }
+                for labels, values in values_by_service
+            ],
+        },
+    }
+
+
+class TestInputs:
+    """Rates come from Prometheus exports, load test reports or access logs"""
+
+    def test_prometheus_series_summed_per_service(self):
+        data = range_result(
+            [
+                ({"service": "eoapi-raster", "path": "/raster"}, [10, 20]),
+                ({"ingress": "eoapi", "path": "/raster/tiles"}, [1, 2]),
+                ({"service": "eoapi-stac"}, [5, 5]),
+            ]
+        )
+        rates, start = rates_from_prometheus(data)
+        assert start == START
+        assert rates["raster"] == [11.0] * 15 + [22.0] * 15
+        assert rates["stac"] == [5.0] * 30
+
+    def test_unlabelled_series_needs_service(self):
+        data = range_result([({"namespace": "eoapi"}, [10, 10])])
+        with pytest.raises(ValueError):
+            rates_from_prometheus(data)
+        assert rates_from_prometheus(data, service="vector")[0]["vector"][0] == 10.0
+
+    def test_report_and_log_files(self, tmp_path):
+        report = tmp_path / "report.json"
+        data = range_result([({"service": "eoapi-raster"}, [30, 30])])["data"]
+        report.write_text(
+            json.dumps({"infrastructure": {"request_metrics": {"request_rate": data}}})
+        )
+        rates, start = load_rates([str(report)])
+        assert (rates["raster"], start) == ([30.0] * 30, START)
+
+        log = tmp_path / "access.jsonl"
+        log.write_text(
+            "\n".join(
+                json.dumps({"timestamp": START + t, "path": path})
+                for t, path in [(0, "/raster/a"), (0, "/raster/b"), (2, "/stac/")]
+            )
+        )
+        rates, _ = load_rates([str(log)])
+        assert rates == {"raster": [2.0, 0.0, 0.0], "stac": [0.0, 0.0, 1.0]}
+
+    def test_simulate_services(self):
+        values = load_values(str(DEFAULT_CHART_DIR))
+        capacity = parse_pod_capacity(["120", "stac=50"])
+        assert capacity == {"*": 120.0, "stac": 50.0}
+        sims = simulate_services(
+            {"raster": STEP, "stac": [40.0] * 300}, values, capacity
+        )
+        assert sims["stac"].excess_requests == 0
+        assert sims["raster"].excess_requests > 0
+        with pytest.raises(ValueError):
+            parse_pod_capacity(["tiles=10"])
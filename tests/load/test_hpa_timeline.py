@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HPA scaling timeline and reaction metrics
+
+These run offline and do not need an eoAPI deployment: watches go to a
+stand-in kubectl that streams canned watch events.
+"""
+
+import json
+import sys
+import time
+
+import pytest
+
+from .hpa_timeline import (
+    HPATimeline,
+    deployment_sample,
+    describe_reactions,
+    hpa_sample,
+    parse_quantity,
+    pod_sample,
+    reaction_metrics,
+    stabilization_windows,
+)
+
+START = 1_790_856_000.0
+
+
+def hpa_object(desired: int, current: int, rate: str = "42500m") -> dict:
+    return {
+        "metadata": {"name": "eoapi-raster-hpa", "resourceVersion": str(desired)},
+        "spec": {
+            "scaleTargetRef": {"kind": "Deployment", "name": "eoapi-raster"},
+            "minReplicas": 1,
+            "maxReplicas": 10,
+            "behavior": {
+                "scaleUp": {"stabilizationWindowSeconds": 0},
+                "scaleDown": {"stabilizationWindowSeconds": 60},
+            },
+        },
+        "status": {
+            "desiredReplicas": desired,
+            "currentReplicas": current,
+            "currentMetrics": [
+                {
+                    "type": "Pods",
+                    "pods": {
+                        "metric": {"name": "nginx_ingress_controller_requests_rate"},
+                        "current": {"averageValue": rate},
+                    },
+                },
+                {
+                    "type": "Resource",
+                    "resource": {"name": "cpu", "current": {"averageUtilization": 80}},
+                },
+            ],
+        },
+    }
+
+
+def hpa_event(t: float, desired: int, **extra) -> dict:
+    return {
+        "time": START + t,
+        "kind": "hpa",
+        "name": "eoapi-raster-hpa",
+        "target": "eoapi-raster",
+        "desired": desired,
+        "current": desired,
+        "scale_up_window": 0,
+        "scale_down_window": 60,
+        **extra,
+    }
+
+
+def ready_event(t: float, ready: int) -> dict:
+    return {
+        "time": START + t,
+        "kind": "deployment",
+        "name": "eoapi-raster",
+        "replicas": ready,
+        "ready": ready,
+        "available": ready,
+    }
+
+
+class TestSamples:
+    """Watch objects reduce to the fields the timeline keeps"""
+
+    def test_parse_quantity(self):
+        assert parse_quantity("100000m") == 100.0
+        assert parse_quantity("512Mi") == 512 * 2**20
+        assert parse_quantity(75) == 75.0
+        with pytest.raises(ValueError):
+            parse_quantity("10 apples")
+
+    def test_hpa_sample(self):
+        sample = hpa_sample(hpa_object(3, 2))
+        assert sample["target"] == "eoapi-raster"
+        assert (sample["desired"], sample["current"]) == (3, 2)
+        assert sample["metrics"] == {
+            "nginx_ingress_controller_requests_rate": 42.5,
+            "cpu": 80.0,
+        }
+        assert sample["scale_down_window"] == 60
+
+    def test_deployment_and_pod_samples(self):
+        deployment = {
+            "metadata": {"name": "eoapi-raster"},
+            "spec": {"replicas": 3},
+            "status": {"readyReplicas": 2, "availableReplicas": 2},
+        }
+        assert deployment_sample(deployment)["ready"] == 2
+        pod = {
+            "metadata": {
+                "name": "eoapi-raster-abc",
+                "labels": {"app.kubernetes.io/component": "raster"},
+                "creationTimestamp": "2026-10-01T12:00:00Z",
+            },
+            "status": {
+                "conditions": [
+                    {
+                        "type": "Ready",
+                        "status": "True",
+                        "lastTransitionTime": "2026-10-01T12:00:25Z",
+                    }
+                ]
+            },
+        }
+        sample = pod_sample(pod)
+        assert sample["workload"] == "raster"
+        assert sample["ready_at"] - sample["created"] == 25
+
+
+class TestReactions:
+    """Reaction metrics follow from the recorded desired and ready replicas"""
+
+    def test_scale_out_and_back(self):
+        events = [
+            hpa_event(-30, 1),
+            hpa_event(20, 3),
+            ready_event(45, 2),
+            hpa_event(50, 5),
+            ready_event(80, 5),
+            hpa_event(150, 4),
+            hpa_event(300, 1),
+        ]
+        reaction = reaction_metrics(events, START, load_end=START + 200)[
+            "eoapi-raster-hpa"
+        ]
+        assert reaction["initial_replicas"] == 1
+        assert reaction["first_scale_s"] == 20
+        assert reaction["peak_replicas"] == 5
+        assert reaction["ready_s"] == 80
+        assert reaction["settled_replicas"] == 4
+        assert reaction["overshoot"] == 1
+        assert (reaction["scale_ups"], reaction["scale_downs"]) == (2, 2)
+        assert reaction["reversals"] == 1
+        assert reaction["scale_down_after_s"] == 100
+        assert reaction["notes"] == []
+
+    def test_flapping_inside_window(self):
+        events = [hpa_event(0, 2), hpa_event(10, 4), hpa_event(30, 2), hpa_event(40, 4)]
+        reaction = reaction_metrics(events, START)["eoapi-raster-hpa"]
+        assert reaction["reversals"] == 2
+        assert any("scaleDown stabilization window" in n for n in reaction["notes"])
+        assert any(n.startswith("flapping") for n in reaction["notes"])
+        assert (
+            "first scale 10s, ready never" in describe_reactions({"hpa": reaction})[0]
+        )
+
+    def test_windows_from_values_override_live_behavior(self):
+        values = {
+            "raster": {
+                "autoscaling": {
+                    "behavior": {
+                        "scaleUp": {"stabilizationWindowSeconds": 30},
+                        "scaleDown": {"stabilizationWindowSeconds": 120},
+                    }
+                }
+            }
+        }
+        windows = stabilization_windows(values)
+        assert windows["raster"] == {"scale_up": 30, "scale_down": 120}
+        # Kubernetes defaults for services without behavior
+        assert windows["stac"] == {"scale_up": 0, "scale_down": 300}
+
+        events = [hpa_event(0, 1), hpa_event(10, 2)]
+        reaction = reaction_metrics(events, START, windows=windows)["eoapi-raster-hpa"]
+        assert reaction["windows"]["scale_up"] == 30
+        assert "scaleUp stabilization window" in reaction["notes"][0]
+
+    def test_no_scaling(self):
+        reaction = reaction_metrics([hpa_event(0, 2)], START)["eoapi-raster-hpa"]
+        assert reaction["first_scale_s"] is None
+        assert reaction["ready_s"] is None
+        assert "first scale never" in describe_reactions({"hpa": reaction})[0]
+
+
+FAKE_KUBECTL = """#!{python}
+import json, sys, time
+path = sys.argv[-1]
+if "horizontalpodautoscalers" in path:
+    for desired in (1, 1, 3):
+        print(json.dumps({{"type": "MODIFIED", "object": {hpa}(desired)}}), flush=True)
+time.sleep(30)
+"""
+
+# The first HPA watch fails with 410 Gone; later ones deliver events
+FAKE_KUBECTL_EXPIRED = """#!{python}
+import json, sys, time
+path = sys.argv[-1]
+if "horizontalpodautoscalers" in path:
+    with open({calls!r}, "a") as f:
+        f.write(path + "\\n")
+    with open({calls!r}) as f:
+        calls = len(f.readlines())
+    if calls == 1:
+        status = {{"kind": "Status", "code": 410, "reason": "Expired"}}
+        print(json.dumps({{"type": "ERROR", "object": status}}), flush=True)
+    else:
+        print(json.dumps({{"type": "MODIFIED", "object": {hpa}}}), flush=True)
+time.sleep(30)
+"""
+
+
+class TestWatch:
+    """The recorder reads watch streams and drops repeated states"""
+
+    def test_records_watch_events(self, tmp_path):
+        hpa = json.dumps(hpa_object(0, 0))
+        kubectl = tmp_path / "kubectl"
+        kubectl.write_text(
+            FAKE_KUBECTL.format(
+                python=sys.executable,
+                hpa=f"(lambda d: {{**{hpa}, 'status': {{'desiredReplicas': d}}}})",
+            )
+        )
+        kubectl.chmod(0o755)
+
+        timeline = HPATimeline("eoapi", kubectl=str(kubectl)).start()
+        deadline = time.time() + 10
+        while len(timeline.events) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        events = timeline.stop()
+        assert [e["desired"] for e in events] == [1, 3]
+        assert events[0]["time"] <= events[1]["time"]
+
+    def test_missing_kubectl(self, tmp_path):
+        timeline = HPATimeline(kubectl=str(tmp_path / "missing")).start()
+        assert timeline.stop() == []
+
+    def test_relists_after_expired_watch(self, tmp_path):
+        calls = tmp_path / "calls"
+        kubectl = tmp_path / "kubectl"
+        kubectl.write_text(
+            FAKE_KUBECTL_EXPIRED.format(
+                python=sys.executable,
+                calls=str(calls),
+                hpa=json.dumps(hpa_object(2, 2)),
+            )
+        )
+        kubectl.chmod(0o755)
+
+        timeline = HPATimeline("eoapi", kubectl=str(kubectl)).start()
+        deadline = time.time() + 10
+        while not timeline.events and time.time() < deadline:
+            time.sleep(0.05)
+        events = timeline.stop()
+        assert [e["desired"] for e in events] == [2]
+        watches = calls.read_text().splitlines()
+        assert len(watches) == 2
+        assert "resourceVersion" not in watches[1]
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for numeric summaries of Prometheus range results
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from .infra_stats import (  # noqa: E402
+    describe_stats,
+    infrastructure_stats,
+    replica_stats,
+    workload_of,
+)
+from .prometheus_utils import summarize_metrics  # noqa: E402
+
+START = 1_790_856_000
+MIB = 1024 * 1024
+
+
+def matrix(*series):
+    return {
+        "resultType": "matrix",
+        "result": [
+            {"metric": labels, "values": [[START + t, str(v)] for t, v in values]}
+            for labels, values in series
+        ],
+    }
+
+
+def replicas(name, counts, step=15):
+    return ({"horizontalpodautoscaler": name}, list(zip(range(0, 1000, step), counts)))
+
+
+def sample_metrics() -> dict:
+    return {
+        "pod_metrics": {
+            # Two containers of one pod are summed into the pod
+            "cpu": matrix(
+                (
+                    {"pod": "eoapi-raster-7d9f8c6b5-abcde", "container": "raster"},
+                    [(0, 0.2), (15, 0.6), (30, 0.9)],
+                ),
+                (
+                    {"pod": "eoapi-raster-7d9f8c6b5-abcde", "container": "proxy"},
+                    [(0, 0.1), (15, 0.1), (30, 0.1)],
+                ),
+                (
+                    {"pod": "eoapi-raster-7d9f8c6b5-fghij"},
+                    [(0, 0.3), (15, 0.5), (30, "NaN")],
+                ),
+                ({"pod": "eoapi-pgbouncer-0"}, [(0, 0.05), (15, 0.05), (30, 0.05)]),
+            ),
+            "memory": matrix(
+                (
+                    {"pod": "eoapi-raster-7d9f8c6b5-abcde"},
+                    [(0, 300 * MIB), (15, 412 * MIB)],
+                ),
+                ({"pod": "eoapi-raster-7d9f8c6b5-fghij"}, [(0, 250 * MIB)]),
+            ),
+        },
+        "hpa_metrics": {
+            "current_replicas": matrix(
+                replicas("eoapi-raster", [3, 3, 3, 5, 7, 7, 7]),
+                replicas("eoapi-stac", [2, 2, 2]),
+            ),
+            "desired_replicas": matrix(
+                replicas("eoapi-raster", [3, 7, 7, 7, 7, 7, 7]),
+            ),
+        },
+        "database_metrics": {
+            "db_connections": matrix(
+                ({"datname": "eoapi", "state": "active"}, [(0, 10), (15, 30)]),
+                ({"datname": "eoapi", "state": "idle"}, [(0, 5), (15, 18)]),
+            )
+        },
+    }
+
+
+class TestWorkloads:
+    """Pods are grouped by their Deployment or StatefulSet"""
+
+    @pytest.mark.parametrize(
+        "pod, workload",
+        [
+            ("eoapi-raster-7d9f8c6b5-abcde", "eoapi-raster"),
+            ("eoapi-stac-5c9b7d-x2k9p", "eoapi-stac"),
+            ("eoapi-pgbouncer-0", "eoapi-pgbouncer"),
+            ("standalone", "standalone"),
+        ],
+    )
+    def test_workload_of(self, pod, workload):
+        assert workload_of(pod) == workload
+
+
+class TestInfrastructureStats:
+    """Range matrices reduce to per-pod and per-workload numbers"""
+
+    def test_cpu(self):
+        cpu = infrastructure_stats(sample_metrics())["cpu"]
+        pod = cpu["pods"]["eoapi-raster-7d9f8c6b5-abcde"]
+        assert pod["max"] == pytest.approx(1.0)
+        assert pod["mean"] == pytest.approx(2.0 / 3)
+        # The NaN sample is dropped, not counted as zero
+        assert cpu["pods"]["eoapi-raster-7d9f8c6b5-fghij"]["max"] == 0.5
+
+        raster = cpu["workloads"]["eoapi-raster"]
+        assert raster["pods"] == 2
+        assert raster["max"] == pytest.approx(1.2)
+        assert raster["pod_peak"] == pytest.approx(1.0)
+        assert cpu["workloads"]["eoapi-pgbouncer"]["pods"] == 1
+
+    def test_memory(self):
+        memory = infrastructure_stats(sample_metrics())["memory"]
+        assert memory["pods"]["eoapi-raster-7d9f8c6b5-abcde"] == 412
+        assert memory["workloads"] == {"eoapi-raster": 412}
+
+    def test_replicas(self):
+        stats = infrastructure_stats(sample_metrics())["replicas"]
+        raster = stats["eoapi-raster"]
+        assert (raster["start"], raster["min"], raster["max"], raster["end"]) == (
+            3,
+            3,
+            7,
+            7,
+        )
+        # Wanted 7 at 15s, reached it at 60s
+        assert raster["time_to_scale_s"] == 45
+        assert raster["changes"] == [
+            [START, 3],
+            [START + 45, 5],
+            [START + 60, 7],
+        ]
+        assert stats["eoapi-stac"]["time_to_scale_s"] is None
+
+    def test_time_to_scale_without_desired(self):
+        stats = replica_stats(matrix(replicas("eoapi-raster", [3, 3, 5, 7])))
+        assert stats["eoapi-raster"]["time_to_scale_s"] == 15
+
+    def test_db_connections(self):
+        db = infrastructure_stats(sample_metrics())["db_connections"]
+        assert db == {"peak": 48, "mean": 31.5}
+
+    def test_missing_metrics(self):
+        assert infrastructure_stats({"pod_metrics": {"cpu": None}}) == {}
+
+
+class TestDescribe:
+    """Summaries print numbers rather than whether data was collected"""
+
+    def test_lines(self):
+        lines = describe_stats(infrastructure_stats(sample_metrics()))
+        assert lines["cpu eoapi-raster"].startswith("2 pods, peak 1.00 cores/pod")
+        assert lines["cpu eoapi-raster"].endswith("memory peak 412 MiB/pod")
+        assert lines["replicas eoapi-raster"] == "3→7 in 45s (min 3, end 7)"
+        assert lines["replicas eoapi-stac"] == "steady at 2 (min 2, end 2)"
+        assert lines["db_connections"] == "peak 48, mean 31.5"
+
+    def test_summarize_metrics(self):
+        assert summarize_metrics(sample_metrics()) == describe_stats(
+            infrastructure_stats(sample_metrics())
+        )
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the notification benchmark sink and statistics
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import json
+
+import pytest
+import requests
+
+from . import notification_benchmark
+from .notification_benchmark import (
+    CloudEventsSink,
+    NotificationBenchmark,
+    NotifyRelay,
+    describe_benchmark,
+    level_sustained,
+    parse_cloudevent,
+    relay_lag,
+    summarize_deliveries,
+)
+
+
+@pytest.fixture
+def sink():
+    sink = CloudEventsSink().start()
+    yield sink
+    sink.stop()
+
+
+class TestParseCloudEvent:
+    """Item changes are read from every CloudEvents HTTP content mode"""
+
+    def test_binary_mode(self):
+        headers = {
+            "content-type": "application/json",
+            "ce-type": "org.ogc.api.collection.item.create",
+        }
+        body = json.dumps({"id": "a", "collection": "c1"}).encode()
+        assert parse_cloudevent(headers, body) == [("INSERT", "c1", "a")]
+
+    def test_structured_and_batch_modes(self):
+        event = {
+            "type": "org.ogc.api.collection.item.delete",
+            "data": {"item_id": "a", "collection": "c1"},
+        }
+        structured = {"content-type": "application/cloudevents+json"}
+        assert parse_cloudevent(structured, json.dumps(event).encode()) == [
+            ("DELETE", "c1", "a")
+        ]
+        batch = {"content-type": "application/cloudevents-batch+json"}
+        body = json.dumps([event, {**event, "type": "custom", "data": {}}]).encode()
+        assert parse_cloudevent(batch, body) == [("DELETE", "c1", "a")]
+
+    def test_whole_notification_payload(self):
+        payload = {
+            "operation": "update",
+            "items": [{"id": "a", "collection": "c1"}, {"id": "b", "collection": "c1"}],
+        }
+        keys = parse_cloudevent({"ce-type": "other"}, json.dumps(payload).encode())
+        assert keys == [("UPDATE", "c1", "a"), ("UPDATE", "c1", "b")]
+
+    def test_unusable_bodies(self):
+        assert parse_cloudevent({}, b"not json") == []
+        assert parse_cloudevent({}, b"[1, 2]") == []
+
+
+class TestSink:
+    """The sink keeps the first arrival of each change"""
+
+    def test_records_arrivals(self, sink):
+        headers = {"ce-type": "org.ogc.api.collection.item.create"}
+        body = {"id": "a", "collection": "c1"}
+        for _ in range(2):
+            response = requests.post(sink.url, json=body, headers=headers, timeout=5)
+            assert response.status_code == 202
+        requests.post(sink.url, data=b"{}", timeout=5)
+
+        assert list(sink.received) == [("INSERT", "c1", "a")]
+        assert (sink.duplicates, sink.unparsed) == (1, 1)
+
+    def test_relay_sends_one_event_per_item(self, sink):
+        relay = NotifyRelay("", sink.url, workers=4).start_forwarding()
+        items = [{"id": f"i{i}", "collection": "c1"} for i in range(20)]
+        payload = {
+            "operation": "DELETE",
+            "items": items,
+            "batch": {"id": "x", "seq": 1, "total": 1},
+        }
+        relay.receive(json.dumps(payload), 100.0)
+        relay.receive(json.dumps({"operation": "DELETE", "collections": []}), 100.0)
+        relay.stop()
+
+        expected = {("DELETE", "c1", item["id"]) for item in items}
+        assert set(sink.received) == expected
+        # Receipt is noted at LISTEN, before the workers send
+        assert relay.notified == dict.fromkeys(expected, 100.0)
+        assert relay.summaries == 1
+
+    def test_relay_lag(self):
+        notified = {("INSERT", "c", "a"): 10.0, ("INSERT", "c", "b"): 10.0}
+        received = {("INSERT", "c", "a"): 10.05}
+
+        lag = relay_lag(notified, received)
+        assert (lag["notified"], lag["forwarded"]) == (2, 1)
+        assert lag["lag_p50"] == pytest.approx(50, rel=0.01)
+
+    def test_delivery_mode(self, monkeypatch):
+        monkeypatch.setattr(notification_benchmark, "PSYCOPG_AVAILABLE", True)
+        assert NotificationBenchmark("", delivery="outbox").delivery == "outbox"
+        with pytest.raises(ValueError, match="delivery must be one of"):
+            NotificationBenchmark("", delivery="queue")
+
+
+class TestSummary:
+    """Latency runs from commit to arrival; missing arrivals count as lost"""
+
+    def test_summarize_deliveries(self):
+        commits = {
+            ("INSERT", "c", "a"): 100.0,
+            ("INSERT", "c", "b"): 100.0,
+            ("DELETE", "c", "a"): 101.0,
+        }
+        received = {
+            ("INSERT", "c", "a"): 100.010,
+            ("INSERT", "c", "b"): 100.030,
+            ("OTHER", "c", "z"): 100.0,
+        }
+        summary = summarize_deliveries(
+            commits, received, {"INSERT": 1.0, "DELETE": 2.0}
+        )
+
+        inserts = summary["INSERT"]
+        assert (inserts["sent"], inserts["delivered"], inserts["lost"]) == (2, 2, 0)
+        assert inserts["write_rate"] == 2.0
+        assert inserts["latency_max"] == pytest.approx(30, rel=0.01)
+        assert summary["DELETE"]["delivered_share"] == 0.0
+        assert "UPDATE" not in summary
+        assert summary["total"]["write_rate"] == 1.0
+        assert summary["total"]["lost"] == 1
+
+    def test_level_sustained(self):
+        stats = {
+            "delivered_share": 1.0,
+            "latency_p95": 40.0,
+            "write_rate": 98.0,
+        }
+        assert level_sustained({"INSERT": stats}, rate=100)
+        assert not level_sustained({"INSERT": stats}, rate=200)
+        assert not level_sustained({"INSERT": stats}, rate=100, max_latency_ms=20)
+        lost = {**stats, "delivered_share": 0.99}
+        assert not level_sustained({"INSERT": stats, "DELETE": lost}, rate=100)
+        assert not level_sustained({}, rate=100)
+
+    def test_describe(self):
+        stats = {
+            "sent": 10,
+            "delivered": 10,
+            "write_rate": 10.0,
+            "latency_p50": 2.0,
+            "latency_p95": 5.0,
+        }
+        report = {
+            "levels": {"10": {"INSERT": stats, "sustained": True}},
+            "max_sustainable_rate": 10.0,
+        }
+        lines = describe_benchmark(report)
+        assert lines[0] == "10 events/s: ok"
+        assert "10/10 delivered" in lines[1]
+        assert lines[-1] == "Max sustainable rate: 10 events/s"
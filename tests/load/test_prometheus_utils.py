@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Unit tests for parallel, cached Prometheus collection
+
+The client's session is replaced with a recording stand-in, so these run
+offline and do not need Prometheus or an eoAPI deployment.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from .prometheus_utils import (
+    METRIC_GROUPS,
+    PrometheusClient,
+    collect_test_metrics,
+)
+
+QUERY_COUNT = sum(len(build("eoapi")) for build in METRIC_GROUPS.values())
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, query: str):
+        self.query = query
+
+    def json(self):
+        return {
+            "status": "success",
+            "data": {
+                "resultType": "matrix",
+                "result": [{"metric": {"q": self.query}, "values": [[0, "1"]]}],
+            },
+        }
+
+
+class RecordingSession:
+    """Session stand-in that answers slowly and tracks concurrency"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls: list = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self._lock:
+            self.calls.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        return FakeResponse((params or {}).get("query", ""))
+
+
+def client(cache_dir, delay: float = 0.0) -> PrometheusClient:
+    prometheus = PrometheusClient("http://127.0.0.1:1", timeout=1, cache_dir=cache_dir)
+    prometheus.session = RecordingSession(delay)  # type: ignore[assignment]
+    prometheus.available = True
+    return prometheus
+
+
+def window(minutes_ago: int):
+    end = datetime.now() - timedelta(minutes=minutes_ago)
+    return end - timedelta(minutes=5), end
+
+
+class TestCollection:
+    """All range queries go out at once over the reused client"""
+
+    def test_parallel(self):
+        prometheus = client(None, delay=0.2)
+        start = time.perf_counter()
+        metrics = collect_test_metrics(None, "eoapi", *window(10), client=prometheus)
+        elapsed = time.perf_counter() - start
+
+        assert len(prometheus.session.calls) == QUERY_COUNT
+        assert prometheus.session.max_in_flight == QUERY_COUNT
+        assert elapsed < 0.2 * QUERY_COUNT / 2
+        assert set(metrics) == set(METRIC_GROUPS)
+        assert metrics["pod_metrics"]["cpu"]["result"]
+
+
+class TestCache:
+    """Settled windows are served from disk on re-runs"""
+
+    def test_rerun_uses_cache(self, tmp_path):
+        start, end = window(10)
+        first = client(str(tmp_path))
+        metrics = collect_test_metrics(None, "eoapi", start, end, client=first)
+        assert len(first.session.calls) == QUERY_COUNT
+
+        # Even with Prometheus gone, the cached window is still reported
+        second = client(str(tmp_path))
+        second.available = False
+        assert collect_test_metrics(None, "eoapi", start, end, client=second) == metrics
+        assert second.session.calls == []
+
+    def test_recent_window_is_not_cached(self, tmp_path):
+        start, end = window(0)
+        prometheus = client(str(tmp_path))
+        for _ in range(2):
+            prometheus.query_range("up", start, end)
+        assert len(prometheus.session.calls) == 2
+        assert not list(tmp_path.iterdir())
+
+    @pytest.mark.parametrize("step", ["15s", "30s"])
+    def test_key_includes_step(self, tmp_path, step):
+        start, end = window(10)
+        prometheus = client(str(tmp_path))
+        prometheus.query_range("up", start, end, step="5s")
+        prometheus.query_range("up", start, end, step=step)
+        assert len(prometheus.session.calls) == 2
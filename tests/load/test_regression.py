@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Unit tests for statistical regression detection
+
+These run offline on synthetic timelines and do not need an eoAPI deployment.
+"""
+
+import random
+
+import pytest
+
+from .regression import block_resample, compare_reports
+
+START = 1_790_856_000
+
+
+def report(p95_ms: float, requests: int, seconds: int = 30, seed: int = 0) -> dict:
+    """Report with one noisy "overall" timeline"""
+    rng = random.Random(seed)
+    timeline = [
+        {
+            "timestamp": START + i,
+            "requests": int(requests * rng.uniform(0.95, 1.05)),
+            "latency_p95": p95_ms * rng.uniform(0.95, 1.05),
+        }
+        for i in range(seconds)
+    ]
+    return {"overall": {"timeline": timeline}}
+
+
+def runs(p95_ms: float, requests: int, first_seed: int, count: int = 3) -> list:
+    return [report(p95_ms, requests, seed=first_seed + i) for i in range(count)]
+
+
+class TestBlockResample:
+    """Resamples keep the length and runs of consecutive seconds"""
+
+    def test_blocks(self):
+        samples = list(range(20))
+        resample = block_resample(samples, random.Random(1), block=5)
+        assert len(resample) == 20
+        for start in range(0, 20, 5):
+            block = resample[start : start + 5]
+            assert all((b - a) % 20 == 1 for a, b in zip(block, block[1:]))
+
+
+class TestCompareReports:
+    """Regressions need both significance and a change beyond tolerance"""
+
+    def test_latency_regression(self):
+        (p95, throughput) = compare_reports(runs(100, 500, 1), runs(130, 500, 10))
+        assert p95.metric == "latency_p95" and p95.regressed
+        assert p95.change == pytest.approx(0.3, abs=0.05)
+        assert p95.runs == (3, 3)
+        assert p95.samples == (84, 84)
+        assert not throughput.regressed
+
+    def test_throughput_regression(self):
+        _, throughput = compare_reports(runs(100, 500, 1), runs(100, 400, 10))
+        assert throughput.regressed
+
+    def test_run_to_run_drift_passes(self):
+        # Runs of one build drifting by a few percent, the candidate's runs
+        # happening to land on the slow side
+        baseline = [report(p95, 500, seed=i) for i, p95 in enumerate((95, 100, 105))]
+        candidate = [
+            report(p95, 500, seed=10 + i) for i, p95 in enumerate((100, 104, 108))
+        ]
+        comparisons = compare_reports(baseline, candidate)
+        assert not any(c.regressed for c in comparisons)
+
+    def test_improvement_is_not_a_regression(self):
+        comparisons = compare_reports(runs(100, 500, 1), runs(60, 800, 10))
+        assert not any(c.regressed for c in comparisons)
+
+    def test_single_run_gives_no_verdict(self):
+        with pytest.raises(ValueError, match="at least 3"):
+            compare_reports([report(100, 500)], runs(130, 500, 10))
+        comparisons = compare_reports(
+            [report(100, 500, seed=1), report(100, 500, seed=2)],
+            runs(130, 500, 10, count=2),
+            min_runs=2,
+        )
+        assert comparisons[0].runs == (2, 2)
+
+    def test_short_run_is_left_out(self):
+        # An aborted baseline run does not block judging the completed ones
+        aborted = report(100, 500, seconds=5, seed=9)
+        (p95, _) = compare_reports(runs(100, 500, 1) + [aborted], runs(130, 500, 10))
+        assert p95.runs == (3, 3)
+        assert p95.regressed
+
+        short = [report(100, 500, seconds=4, seed=i) for i in range(2)]
+        with pytest.raises(ValueError, match="at least 3"):
+            compare_reports(
+                [report(100, 500, seed=1)] + short,
+                runs(100, 500, 10),
+                series=["overall"],
+            )
+
+    def test_too_short(self):
+        short = [report(100, 500, seconds=4, seed=i) for i in range(3)]
+        with pytest.raises(ValueError):
+            compare_reports(short, runs(100, 500, 10))
+        with pytest.raises(ValueError):
+            compare_reports(runs(100, 500, 1), runs(100, 500, 10), series=["steps"])
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Unit tests for access-log replay parsing and route grouping
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import json
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from .replay import load_requests, parse_line, route_of  # noqa: E402
+
+NGINX_LINE = (
+    '10.0.0.1 - - [01/Oct/2026:12:00:00 +0000] "GET /stac/collections?limit=5 '
+    'HTTP/1.1" 200 512 "-" "python-httpx/0.27.0" 230 0.011 [eoapi-stac-8080] [] '
+    "10.1.2.3:8080 512 0.011 200 4f1c"
+)
+TRAEFIK_LINE = (
+    '10.0.0.1 - - [01/Oct/2026:12:00:02 +0000] "GET /raster/healthz HTTP/2.0" '
+    '200 2 "-" "-" 17 "eoapi-raster@kubernetes" "http://10.1.2.4:8080" 3ms'
+)
+
+
+class TestParseLine:
+    """Supported log formats parse into (time, method, path, body)"""
+
+    def test_nginx(self):
+        timestamp, method, path, body = parse_line(NGINX_LINE)
+        assert (method, path, body) == ("GET", "/stac/collections?limit=5", None)
+        assert timestamp == 1790856000.0
+
+    def test_traefik_clf(self):
+        assert parse_line(TRAEFIK_LINE)[1:] == ("GET", "/raster/healthz", None)
+
+    def test_traefik_json(self):
+        line = json.dumps(
+            {
+                "StartUTC": "2026-10-01T12:00:01.5Z",
+                "RequestMethod": "GET",
+                "RequestPath": "/vector/collections",
+            }
+        )
+        assert parse_line(line) == (1790856001.5, "GET", "/vector/collections", None)
+
+    def test_jsonl_with_body_and_epoch_millis(self):
+        line = json.dumps(
+            {
+                "timestamp": 1790856000250,
+                "method": "post",
+                "path": "/stac/search",
+                "body": {"limit": 10},
+            }
+        )
+        assert parse_line(line) == (
+            1790856000.25,
+            "POST",
+            "/stac/search",
+            {"limit": 10},
+        )
+
+    @pytest.mark.parametrize(
+        "line", ["", "not a log line", '{"message": "hi"}', "{oops"]
+    )
+    def test_non_requests(self, line):
+        assert parse_line(line) is None
+
+
+class TestLoadRequests:
+    """Logs merge in time order and writes are skipped by default"""
+
+    def test_merge_and_skip(self, tmp_path):
+        nginx = tmp_path / "nginx.log"
+        nginx.write_text(
+            "\n".join(
+                [
+                    TRAEFIK_LINE,
+                    NGINX_LINE,
+                    NGINX_LINE.replace(
+                        '"GET /stac/collections?limit=5', '"DELETE /stac/x'
+                    ),
+                    "garbage",
+                ]
+            )
+        )
+        jsonl = tmp_path / "requests.jsonl"
+        jsonl.write_text(
+            "\n".join(
+                json.dumps(record)
+                for record in [
+                    {
+                        "timestamp": 1790856001,
+                        "method": "POST",
+                        "path": "/stac/search",
+                        "body": {},
+                    },
+                    {"timestamp": 1790856001, "method": "POST", "path": "/stac/search"},
+                ]
+            )
+        )
+
+        requests, skipped = load_requests([str(nginx), str(jsonl)])
+        assert [(r.offset, r.method, r.path) for r in requests] == [
+            (0.0, "GET", "/stac/collections?limit=5"),
+            (1.0, "POST", "/stac/search"),
+            (2.0, "GET", "/raster/healthz"),
+        ]
+        # DELETE, garbage and the bodiless POST search
+        assert skipped == 3
+
+        requests, _ = load_requests([str(nginx)], include_writes=True)
+        assert "DELETE" in {r.method for r in requests}
+
+    def test_nothing_to_replay(self, tmp_path):
+        empty = tmp_path / "empty.log"
+        empty.write_text("garbage\n")
+        with pytest.raises(ValueError):
+            load_requests([str(empty)])
+
+
+@pytest.mark.parametrize(
+    "path,route",
+    [
+        ("/stac/collections", "/stac/collections"),
+        (
+            "/stac/collections/noaa/items/20200307aC0853900w361030",
+            "/stac/collections/{collection_id}/items/{item_id}",
+        ),
+        ("/raster/searches/register", "/raster/searches/register"),
+        (
+            "/raster/searches/4f1c0d9e/tiles/WebMercatorQuad/15/8589/12849@2x.png?assets=cog",
+            "/raster/searches/{search_id}/tiles/WebMercatorQuad/{n}/{n}/{n}",
+        ),
+        (
+            "/stac/collections/items/items/abc",
+            "/stac/collections/{collection_id}/items/{item_id}",
+        ),
+        ("/stac/search?token=next:abc", "/stac/search"),
+    ],
+)
+def test_route_of(path, route):
+    assert route_of("GET", path) == f"GET {route}"
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the load test results store
+
+These run offline against the repository's chart and do not need an eoAPI
+deployment.
+"""
+
+import pytest
+
+from .results_store import YAML_AVAILABLE, Deployment, ResultsStore
+
+REPORT = {"overall": {"success_rate": 100.0, "timeline": []}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with ResultsStore(str(tmp_path / "results.db")) as store:
+        yield store
+
+
+def deployment(raster: str, sha: str = "0123456789abcdef") -> Deployment:
+    return Deployment(
+        chart_version="0.15.0",
+        git_sha=sha,
+        images={
+            "raster": f"ghcr.io/stac-utils/titiler-pgstac:{raster}",
+            "stac": "ghcr.io/stac-utils/stac-fastapi-pgstac:6.3.1",
+        },
+    )
+
+
+@pytest.mark.skipif(not YAML_AVAILABLE, reason="PyYAML not installed")
+class TestDeployment:
+    """Runs are keyed by chart version, gitSha and image tags"""
+
+    def test_from_chart(self):
+        chart = Deployment.from_chart()
+        assert chart.chart_version
+        # Only released charts carry a gitSha
+        assert chart.git_sha is None
+        assert chart.images["raster"].startswith("ghcr.io/stac-utils/titiler-pgstac:")
+        assert "stac" in chart.images and "vector" in chart.images
+
+    def test_values_override(self, tmp_path):
+        override = tmp_path / "upgrade.yaml"
+        override.write_text("gitSha: deadbeef\nraster:\n  image:\n    tag: 9.9.9\n")
+        chart = Deployment.from_chart(values_files=[str(override)])
+        assert chart.git_sha == "deadbeef"
+        assert chart.images["raster"] == "ghcr.io/stac-utils/titiler-pgstac:9.9.9"
+
+        override.write_text('gitSha: "gitshaABC123"\n')
+        assert Deployment.from_chart(values_files=[str(override)]).git_sha is None
+
+
+class TestResultsStore:
+    """Stored runs round-trip and are found by reference"""
+
+    def test_save_and_find(self, store):
+        old = store.save("stress", REPORT, deployment("3.0.0"), label="before")
+        new = store.save("stress", REPORT, deployment("3.1.0", "fedcba98765"))
+        store.save("normal", REPORT, deployment("3.1.0"))
+
+        (latest,) = store.find("latest", "stress")
+        assert latest.id == new
+        assert latest.report == REPORT
+        assert latest.deployment.images["raster"].endswith(":3.1.0")
+
+        assert [run.id for run in store.find(str(old))] == [old]
+        assert [run.id for run in store.find("before")] == [old]
+        assert [run.id for run in store.find("titiler-pgstac:3.0.0")] == [old]
+        assert [run.id for run in store.find("fedcba9", "stress")] == [new]
+        # References match every run, newest first
+        assert len(store.find("0.15.0", "stress")) == 2
+        assert len(store.find("stac-fastapi-pgstac:6.3.1")) == 3
+
+    def test_no_match(self, store):
+        with pytest.raises(ValueError):
+            store.find("latest")
+        store.save("stress", REPORT, deployment("3.0.0"))
+        with pytest.raises(ValueError):
+            store.find("titiler-pgstac:4.0.0")
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Unit tests for latency vs resource saturation analysis
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from .infra_stats import Series  # noqa: E402
+from .recorder import RequestRecorder  # noqa: E402
+from .saturation import (  # noqa: E402
+    analyze_saturation,
+    describe_saturation,
+    find_knee,
+    hold,
+    spearman,
+)
+
+START = 1_790_856_000
+DURATION = 150
+KNEE = 90
+STEP = 15
+
+
+def timeline(knee=KNEE) -> list:
+    """p95 of 50ms that jumps to 400ms at the knee, with one early spike"""
+    recorder = RequestRecorder()
+    for offset in range(DURATION):
+        latency = 400.0 if knee is not None and offset >= knee else 50.0
+        if offset == 20:
+            latency = 900.0
+        for _ in range(20):
+            recorder.record(True, latency, timestamp=START + offset, status=200)
+    return recorder.timeline()
+
+
+def matrix(*series):
+    return {
+        "resultType": "matrix",
+        "result": [
+            {
+                "metric": labels,
+                "values": [
+                    [START + t, str(value(t))] for t in range(0, DURATION + 1, STEP)
+                ],
+            }
+            for labels, value in series
+        ],
+    }
+
+
+def rate_of(step_at, height):
+    """rate(...[1m]) of a counter whose slope steps up to height at step_at"""
+    return lambda t: height * min(max(t - step_at, 0) / 60, 1)
+
+
+def infrastructure(throttle_at=None, waiting_at=None) -> dict:
+    raster = "eoapi-raster-7d9f8c6b5-abcde"
+    return {
+        "pod_metrics": {
+            # Rises steadily with load from the start
+            "cpu": matrix(({"pod": raster}, lambda t: 0.5 + t / 100)),
+            "cpu_throttled": matrix(
+                (
+                    {"pod": raster, "container": "raster"},
+                    rate_of(throttle_at, 0.4) if throttle_at else lambda t: 0,
+                )
+            ),
+        },
+        "database_metrics": {
+            "pgbouncer_waiting": matrix(
+                ({}, lambda t: 20 if waiting_at is not None and t >= waiting_at else 0)
+            ),
+        },
+    }
+
+
+def report(**kwargs) -> dict:
+    knee = kwargs.pop("knee", KNEE)
+    return {
+        "overall": {
+            "timeline": timeline(knee),
+            "infrastructure": infrastructure(**kwargs),
+        }
+    }
+
+
+class TestKnee:
+    """p95 knees need a sustained rise over the baseline"""
+
+    def test_spike_is_not_a_knee(self):
+        p95 = np.array([50.0] * 20 + [900.0] + [50.0] * 20)
+        assert find_knee(p95) == (None, 50.0)
+
+    def test_knee(self):
+        p95 = np.array([50.0] * 30 + [400.0] * 10)
+        assert find_knee(p95) == (30, 50.0)
+
+    def test_too_short(self):
+        assert find_knee(np.array([50.0, 400.0]))[0] is None
+
+
+class TestHelpers:
+    def test_hold(self):
+        series = Series({}, np.array([10.0, 25.0]), np.array([1.0, 2.0]))
+        values = hold(series, np.array([5.0, 10.0, 24.0, 40.0, 41.0]))
+        assert np.isnan(values[0])
+        assert list(values[1:4]) == [1.0, 1.0, 2.0]
+        assert np.isnan(values[4])
+
+    def test_spearman(self):
+        a = np.arange(10.0)
+        assert spearman(a, a**3) == pytest.approx(1.0)
+        assert spearman(a, -a) == pytest.approx(-1.0)
+        assert spearman(a, np.ones(10)) == 0.0
+
+
+class TestAnalyzeSaturation:
+    """The resource rising just ahead of the knee is blamed"""
+
+    def test_cpu_throttling(self):
+        analysis = analyze_saturation(report(throttle_at=80))
+        assert analysis["knee"]["timestamp"] == START + KNEE
+        assert analysis["knee"]["baseline_p95"] == pytest.approx(50, rel=0.01)
+        assert analysis["saturated"] == "cpu_throttled eoapi-raster"
+        throttled = analysis["resources"]["cpu_throttled eoapi-raster"]
+        assert 0 <= throttled["lead_s"] <= STEP
+        # Steady CPU growth is a candidate but tracks latency less closely
+        cpu = analysis["resources"]["cpu eoapi-raster"]
+        assert cpu["lead_s"] > throttled["lead_s"]
+        assert cpu["correlation"] < throttled["correlation"]
+        # No clients ever waited
+        assert analysis["resources"]["pgbouncer_waiting"]["onset"] is None
+
+    def test_pgbouncer_exhaustion(self):
+        analysis = analyze_saturation(report(waiting_at=75))
+        assert analysis["saturated"] == "pgbouncer_waiting"
+        assert analysis["resources"]["pgbouncer_waiting"]["lead_s"] == KNEE - 75
+
+    def test_rise_after_knee_is_not_blamed(self):
+        analysis = analyze_saturation(report(throttle_at=130))
+        assert analysis["saturated"] == "cpu eoapi-raster"
+        assert analysis["resources"]["cpu_throttled eoapi-raster"]["lead_s"] < -STEP
+
+    def test_no_knee(self):
+        analysis = analyze_saturation(report(knee=None, throttle_at=80))
+        assert analysis["knee"] is None
+        assert analysis["saturated"] is None
+        assert describe_saturation(analysis) == [
+            "p95 stayed within its baseline, no knee found"
+        ]
+
+    def test_stress_levels(self):
+        """Stress levels share infrastructure collected over the whole run"""
+        rows = timeline()
+        stress = {
+            "breaking_point": 20,
+            "metrics": {5: {"timeline": rows[:KNEE]}, 20: {"timeline": rows[KNEE:]}},
+            "infrastructure": infrastructure(waiting_at=75),
+        }
+        analysis = analyze_saturation(stress)
+        assert analysis["knee"]["series"] == "metrics/20"
+        assert analysis["saturated"] == "pgbouncer_waiting"
+
+    def test_describe(self):
+        lines = describe_saturation(analyze_saturation(report(waiting_at=75)))
+        assert lines[0].startswith("p95 knee at ")
+        assert "(+90s): 400ms vs 50ms baseline" in lines[0]
+        assert lines[1] == "Saturated: pgbouncer_waiting"
+        assert "  pgbouncer_waiting: 0.00 -> 20.00, rose 15s before the knee" in [
+            line.split(" (r=")[0] for line in lines
+        ]
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the scenario format
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import dataclasses
+import os
+import random
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from .scenario import (  # noqa: E402
+    Scenario,
+    ScenarioError,
+    ScenarioResult,
+    ThinkTime,
+    extract,
+    load_scenario,
+    render,
+    resolve_variables,
+)
+
+SCENARIOS_DIR = os.path.join(os.path.dirname(__file__), "scenarios")
+
+SEARCH_RESPONSE = {
+    "features": [{"id": "item-a"}, {"id": "item-b"}],
+    "links": [
+        {"rel": "self", "href": "http://eoapi/stac/search"},
+        {"rel": "next", "href": "http://eoapi/stac/search?token=next:item-b"},
+    ],
+}
+
+
+class TestScenarioParsing:
+    """Scenario documents are validated and normalized"""
+
+    def test_example_scenario_loads(self):
+        scenario = load_scenario(os.path.join(SCENARIOS_DIR, "mixed.yaml"))
+        names = [w.name for w in scenario.workflows]
+        assert names[:2] == ["mosaic", "browse"]
+        assert "/vector/collections" in names
+        assert scenario.think_time == ThinkTime(0.5, 2.0)
+
+    def test_endpoints_shorthand(self):
+        scenario = Scenario.from_dict(
+            {
+                "endpoints": [
+                    "/stac/collections",
+                    {"path": "/raster/healthz", "weight": 3},
+                ]
+            }
+        )
+        assert [w.weight for w in scenario.workflows] == [1.0, 3.0]
+        step = scenario.workflows[1].steps[0]
+        assert (step.method, step.path, step.expect) == (
+            "GET",
+            "/raster/healthz",
+            (200,),
+        )
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {},
+            {"endpoints": [{"path": "/a", "weight": 0}]},
+            {"endpoints": [{"path": "/a", "method": "BREW"}]},
+            {"endpoints": [{"path": "/a", "retries": 3}]},
+            {"endpoints": ["/a", "/a"]},
+            {"endpoints": ["/a"], "think_time": [2, 1]},
+            {"endpoints": ["/a"], "users": 0},
+        ],
+    )
+    def test_invalid_scenarios_rejected(self, data):
+        with pytest.raises(ValueError):
+            Scenario.from_dict(data)
+
+
+class TestTemplating:
+    """Variables are drawn, substituted and extracted"""
+
+    def test_render_keeps_types_for_whole_placeholders(self):
+        variables = {"collection": "noaa", "ids": ["a", "b"], "z": 15}
+        template = {
+            "collections": ["{collection}"],
+            "ids": "{ids}",
+            "path": "/tiles/{z}/{collection}",
+        }
+        assert render(template, variables) == {
+            "collections": ["noaa"],
+            "ids": ["a", "b"],
+            "path": "/tiles/15/noaa",
+        }
+
+    def test_render_undefined_variable(self):
+        with pytest.raises(ScenarioError, match="search_id"):
+            render("/searches/{search_id}/info", {})
+
+    def test_resolve_variables(self):
+        values = resolve_variables(
+            {"c": {"choice": ["x", "y"]}, "n": {"randint": [1, 3]}, "fixed": [1, 2]},
+            random.Random(1),
+        )
+        assert values["c"] in ("x", "y")
+        assert 1 <= values["n"] <= 3
+        assert values["fixed"] == [1, 2]
+
+    @pytest.mark.parametrize(
+        "expression,expected",
+        [
+            ("features.0.id", "item-a"),
+            ("features.1.id", "item-b"),
+            ("links[rel=next].href", "http://eoapi/stac/search?token=next:item-b"),
+        ],
+    )
+    def test_extract(self, expression, expected):
+        assert extract(SEARCH_RESPONSE, expression) == expected
+
+    @pytest.mark.parametrize(
+        "expression", ["features.5.id", "links[rel=prev].href", "context.matched"]
+    )
+    def test_extract_missing(self, expression):
+        with pytest.raises(ScenarioError):
+            extract(SEARCH_RESPONSE, expression)
+
+
+class TestScenarioResult:
+    """Results from several generators merge per step and workflow"""
+
+    def test_merge(self):
+        first, second = ScenarioResult(), ScenarioResult()
+        first.record("mosaic/tile", True, 12.0, 1_700_000_000)
+        first.record_iteration("mosaic", True)
+        second.record("mosaic/tile", False, 30.0, 1_700_000_001)
+        second.record("browse/collections", True, 5.0, 1_700_000_001)
+        second.record_iteration("mosaic", False)
+        second.duration = 2.0
+
+        merged = first.merge(second)
+        assert merged.overall.total_requests == 3
+        assert merged.steps["mosaic/tile"].total_requests == 2
+        assert merged.steps["mosaic/tile"].success_count == 1
+        assert merged.workflows == {"mosaic": [2, 1]}
+        assert merged.duration == 2.0
+        assert merged.steps["browse/collections"].duration == 2.0
+
+
+class TestRunSettings:
+    """Explicit duration and users win over the scenario's, then defaults"""
+
+    @pytest.fixture
+    def runs(self, monkeypatch):
+        from .load_tester import LoadTester
+
+        runs = []
+
+        def run_virtual_users(self, run, users, duration):
+            runs.append((duration, users))
+            return ScenarioResult()
+
+        monkeypatch.setattr(LoadTester, "_run_virtual_users", run_virtual_users)
+        monkeypatch.setattr(
+            LoadTester,
+            "_build_virtual_user_report",
+            lambda self, result, unit: {
+                "overall": {
+                    "success_rate": 100.0,
+                    "success_count": 0,
+                    "total_requests": 0,
+                    "throughput": 0.0,
+                }
+            },
+        )
+        tester = LoadTester("http://eoapi")
+
+        def run_scenario(scenario, **kwargs):
+            """Duration and users the scenario ran with"""
+            tester.run_scenario(scenario, **kwargs)
+            return runs.pop()
+
+        return run_scenario
+
+    def test_precedence(self, runs):
+        scenario = load_scenario(os.path.join(SCENARIOS_DIR, "mixed.yaml"))
+        configured = dataclasses.replace(scenario, duration=300, users=40)
+        unset = dataclasses.replace(scenario, duration=None, users=None)
+
+        assert runs(configured, duration=30, users=5) == (30, 5)
+        assert runs(configured, users=5) == (300, 5)
+        assert runs(configured) == (300, 40)
+        assert runs(unset) == (60, 10)
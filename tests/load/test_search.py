@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the adaptive breaking-point search and steady-state levels
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+import pytest
+
+from .load_tester import LoadTester
+from .recorder import RequestRecorder
+from .search import LevelDeadline, converged, is_steady, search_breaking_point
+
+START = 1_790_856_000
+
+
+def level_metrics(level: float, limit: float = 400) -> dict:
+    """Healthy below the limit, failing and slow from it on"""
+    if level < limit:
+        return {"success_rate": 100.0, "latency_p95": 100.0 + level / 10}
+    return {"success_rate": 80.0, "latency_p95": 3000.0}
+
+
+def breaks(metrics: dict) -> bool:
+    return metrics["success_rate"] < 95.0
+
+
+def timeline(counts: List[int]) -> List[dict]:
+    return [{"requests": count} for count in counts]
+
+
+class TestSearch:
+    """Exponential ramp and bisection locate the limit in few levels"""
+
+    def test_finds_limit_within_resolution(self):
+        probed: List[float] = []
+
+        def probe(level):
+            probed.append(level)
+            return level_metrics(level)
+
+        point, metrics = search_breaking_point(probe, breaks, 5, 1000, 5)
+        assert 400 <= point <= 405
+        # 5..640 is 8 levels, bisecting 320-640 to 5 wide takes 6 more
+        assert len(probed) <= 14
+        assert list(metrics) == sorted(probed)
+        assert all(isinstance(level, int) for level in probed)
+
+    def test_no_breaking_point_ends_at_maximum(self):
+        point, metrics = search_breaking_point(level_metrics, breaks, 5, 300, 5)
+        assert point == 300
+        assert list(metrics) == [5, 10, 20, 40, 80, 160, 300]
+
+    def test_breaks_at_first_level(self):
+        point, metrics = search_breaking_point(
+            lambda level: level_metrics(level, limit=1), breaks, 5, 100, 1
+        )
+        # Bisects between zero and the first level
+        assert point == 1
+        assert list(metrics) == [1, 2, 5]
+
+    def test_rates(self):
+        point, _ = search_breaking_point(
+            lambda rate: level_metrics(rate, limit=123.4),
+            breaks,
+            10.0,
+            500.0,
+            0.5,
+            integer=False,
+        )
+        assert 123.4 <= point <= 123.9
+
+    def test_stops_when_bracket_ends_agree(self):
+        def flat(level):
+            # Breaks at 400 but measures the same on both sides
+            return {"success_rate": 94.9 if level >= 400 else 95.0, "latency_p95": 500}
+
+        _, metrics = search_breaking_point(flat, breaks, 100, 1000, 1)
+        assert list(metrics) == [100, 200, 400]
+
+    def test_invalid_bounds(self):
+        with pytest.raises(ValueError):
+            search_breaking_point(level_metrics, breaks, 0, 100, 5)
+
+    def test_converged(self):
+        low = {"success_rate": 99.8, "latency_p95": 200.0}
+        assert converged(low, {"success_rate": 99.5, "latency_p95": 210.0})
+        assert not converged(low, {"success_rate": 99.5, "latency_p95": 260.0})
+        assert not converged(low, {"success_rate": 97.0, "latency_p95": 200.0})
+        assert not converged(None, low)
+
+
+class TestSteadyState:
+    """Windowed throughput decides when a level has settled"""
+
+    def test_ramping_is_not_steady(self):
+        assert not is_steady(timeline([3, 10, 20, 30, 40, 50, 60, 70, 80, 90, 4]))
+
+    def test_flat_is_steady(self):
+        assert is_steady(timeline([3, 50, 52, 49, 51, 50, 48, 51, 50, 50, 4]))
+
+    def test_too_short(self):
+        assert not is_steady(timeline([3, 50, 50, 50, 4]))
+
+
+class SimulatedTester(LoadTester):
+    """LoadTester whose levels warm up for a few seconds, then hold"""
+
+    def __init__(self, warmup_s: int):
+        super().__init__("http://127.0.0.1:1", max_workers=100, timeout=1)
+        self.warmup_s = max(warmup_s, 1)
+        self.runs: List[Optional[int]] = []
+        self.clock = START
+
+    def _run_level(
+        self, url, duration, workers=None, rate=None, deadline=None
+    ) -> RequestRecorder:
+        self.runs.append(workers)
+        deadline = deadline or LevelDeadline(duration)
+        deadline.start(self.clock)
+        recorder = RequestRecorder()
+        second = 0
+        while True:
+            # Throughput ramps up linearly to 40 requests per second
+            count = 40 * min(second + 1, self.warmup_s) // self.warmup_s
+            for _ in range(count):
+                success = workers is None or workers < 60
+                recorder.record(success, 50.0, timestamp=self.clock + second)
+            second += 1
+            if deadline.reached(self.clock + second, recorder):
+                break
+        self.clock += second
+        recorder.duration = float(second)
+        return recorder
+
+
+class TestLevelDeadline:
+    """Levels stop at duration, or once settled within max_duration"""
+
+    def test_fixed(self):
+        deadline = LevelDeadline(10)
+        deadline.start(100.0)
+        assert not deadline.reached(109.5, RequestRecorder())
+        assert deadline.reached(110.0, RequestRecorder())
+        assert not deadline.steady
+
+    def test_checked_every_second_until_max_duration(self):
+        checks = []
+        deadline = LevelDeadline(
+            10, 13, settled=lambda recorder: checks.append(recorder) is not None
+        )
+        deadline.start(100.0)
+        assert not deadline.reached(110.0, RequestRecorder())
+        assert not deadline.reached(110.5, RequestRecorder())
+        assert not deadline.reached(112.0, RequestRecorder())
+        assert deadline.reached(113.0, RequestRecorder())
+        assert len(checks) == 3
+        assert deadline.reached(120.0, RequestRecorder())
+        assert len(checks) == 3
+        assert not deadline.steady
+
+
+class Unavailable(BaseHTTPRequestHandler):
+    """Answers every request with 503 and counts them"""
+
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        self.send_response(503)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def unavailable():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Unavailable)
+    Unavailable.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/"
+    server.shutdown()
+    server.server_close()
+
+
+class TestLoadTesterLevels:
+    """find_breaking_point extends unsteady levels and searches adaptively"""
+
+    def test_level_extended_until_steady(self):
+        tester = SimulatedTester(warmup_s=10)
+        metrics = tester.test_concurrency_level("http://x", 10, 10, max_duration=60)
+        # One continued level: the warm-up happens once
+        assert tester.runs == [10]
+        assert metrics["steady_state"] is True
+        assert metrics["duration"] == 16.0
+        assert [row["requests"] for row in metrics["timeline"]] == [
+            4 * second for second in range(1, 11)
+        ] + [40] * 6
+
+    def test_level_gives_up_at_max_duration(self):
+        tester = SimulatedTester(warmup_s=100)
+        metrics = tester.test_concurrency_level("http://x", 10, 10, max_duration=25)
+        assert tester.runs == [10]
+        assert metrics["steady_state"] is False
+        assert metrics["duration"] == 25.0
+
+    def test_adaptive_breaking_point(self):
+        tester = SimulatedTester(warmup_s=0)
+        point, metrics = tester.find_breaking_point(
+            "/healthz", step_size=5, test_duration=10, cooldown=0, search="adaptive"
+        )
+        assert point == 60
+        # Doubling breaks at 80, bisecting 40-80 stops at the 55-60 bracket
+        assert list(metrics) == [5, 10, 20, 40, 50, 55, 60, 80]
+        assert "steady_state" not in metrics[60]
+
+    def test_unknown_search(self):
+        with pytest.raises(ValueError):
+            SimulatedTester(0).find_breaking_point(search="random")
+
+    def test_open_loop_does_not_retry(self, unavailable):
+        tester = LoadTester(unavailable, max_workers=5, timeout=2)
+        recorder = tester._run_level(unavailable, 1, rate=10.0)
+        assert recorder.total_requests == 10
+        assert recorder.success_count == 0
+        assert Unavailable.requests == 10
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the STAC search workload
+
+These run offline against the chart's initdb sample data and do not need an
+eoAPI deployment.
+"""
+
+import asyncio
+import json
+import random
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from .scenario import ScenarioResult  # noqa: E402
+from .stac_search import (  # noqa: E402
+    DEFAULT_SEARCH_MIX,
+    SearchLoadRunner,
+    SearchQueryGenerator,
+    SearchSpace,
+    page_bucket,
+    to_query_params,
+)
+
+CQL2_OPS = {"=", "<", "<=", ">", ">=", "in", "and", "t_intersects", "s_intersects"}
+
+
+@pytest.fixture(scope="module")
+def space() -> SearchSpace:
+    return SearchSpace.from_initdb()
+
+
+def ops(node) -> set:
+    """All operators used in a CQL2-JSON expression"""
+    if isinstance(node, dict):
+        found = {node["op"]} if "op" in node else set()
+        for arg in node.get("args", []):
+            found |= ops(arg)
+        return found
+    return set()
+
+
+class TestSearchSpace:
+    """Sample data narrows placeholder collection extents"""
+
+    def test_sample_extent(self, space):
+        (noaa,) = space.collections
+        assert noaa.id == "noaa-emergency-response"
+        assert noaa.bbox == (-87.0251, 36.0999, -85.4249, 36.2251)
+        assert noaa.start.isoformat() == "2020-03-07T00:00:00+00:00"
+        assert len(noaa.item_ids) == 163
+        assert noaa.properties["event"] == ["Nashville Tornado"]
+        assert {q.name for q in space.queryables} >= {"eo:cloud_cover", "datetime"}
+
+
+class TestSearchQueryGenerator:
+    """Generated searches are well-formed and stay inside the data"""
+
+    def test_queries(self, space):
+        generator = SearchQueryGenerator(space, random.Random(5))
+        (noaa,) = space.collections
+        kinds = set()
+        for _ in range(500):
+            kind, body = generator.next_query()
+            kinds.add(kind)
+            assert body["limit"] > 0
+            if kind == "ids":
+                assert set(body["ids"]) <= set(noaa.item_ids)
+                continue
+            assert body["collections"] == [noaa.id]
+            if "bbox" in body:
+                west, south, east, north = body["bbox"]
+                assert noaa.bbox[0] <= west < east <= noaa.bbox[2] + 1e-6
+                assert noaa.bbox[1] <= south < north <= noaa.bbox[3] + 1e-6
+            if "datetime" in body:
+                for bound in body["datetime"].split("/"):
+                    if bound != "..":
+                        datetime.strptime(bound, "%Y-%m-%dT%H:%M:%SZ")
+            if "filter" in body:
+                assert body["filter-lang"] == "cql2-json"
+                assert ops(body["filter"]) <= CQL2_OPS
+        assert kinds == set(DEFAULT_SEARCH_MIX)
+
+    def test_invalid_mix(self, space):
+        with pytest.raises(ValueError):
+            SearchQueryGenerator(space, random.Random(), {"fulltext": 1})
+
+    def test_query_params(self):
+        params = to_query_params(
+            {
+                "collections": ["a", "b"],
+                "bbox": [1, 2, 3, 4],
+                "limit": 10,
+                "sortby": [
+                    {"field": "datetime", "direction": "desc"},
+                    {"field": "id", "direction": "asc"},
+                ],
+                "filter": {"op": "=", "args": [{"property": "event"}, "x"]},
+            }
+        )
+        assert params["collections"] == "a,b"
+        assert params["bbox"] == "1,2,3,4"
+        assert params["limit"] == "10"
+        assert params["sortby"] == "-datetime,+id"
+        assert json.loads(params["filter"])["op"] == "="
+
+    @pytest.mark.parametrize(
+        "page,label", [(2, "2"), (3, "3-5"), (5, "3-5"), (10, "6-10"), (40, "11+")]
+    )
+    def test_page_buckets(self, page, label):
+        assert page_bucket(page) == label
+
+
+class FakeResponse:
+    def __init__(self, document):
+        self.status_code = 200
+        self._document = document
+
+    def json(self):
+        return self._document
+
+
+class PagingEngine:
+    """Engine stand-in serving `pages` search pages linked by POST next links"""
+
+    histogram_digits = 3
+
+    def __init__(self, pages: int):
+        self.pages = pages
+        self.requests: list = []
+
+    async def request(self, shard, method, url, json=None, params=None):
+        self.requests.append((method, json))
+        page = (json or {}).get("page", 1)
+        links = []
+        if page < self.pages:
+            links.append(
+                {
+                    "rel": "next",
+                    "method": "POST",
+                    "href": url,
+                    "body": {"page": page + 1},
+                    "merge": True,
+                }
+            )
+        return FakeResponse({"features": [], "links": links}), 1.0
+
+
+class TestPageWalking:
+    """Next links are followed up to max_pages with merged POST bodies"""
+
+    @pytest.mark.parametrize("pages,max_pages,expected", [(4, 10, 4), (30, 12, 12)])
+    def test_walk(self, space, pages, max_pages, expected):
+        engine = PagingEngine(pages)
+        runner = SearchLoadRunner(
+            space,
+            engine,
+            "http://eoapi",
+            page_walk_share=1.0,
+            max_pages=max_pages,
+            seed=1,
+        )
+        generator = SearchQueryGenerator(space, random.Random(2))
+        result = ScenarioResult()
+        body = {"collections": ["noaa-emergency-response"], "limit": 10}
+
+        # Draws above GET_SHARE send the first page as POST
+        generator.rng.random = lambda: 0.99  # type: ignore[method-assign]
+        ok = asyncio.run(runner._walk(None, "collection", body, generator, result))
+
+        assert ok
+        assert len(engine.requests) == expected
+        assert all(method == "POST" for method, _ in engine.requests)
+        # Merged next bodies keep the original search
+        assert engine.requests[-1][1]["collections"] == ["noaa-emergency-response"]
+        assert result.overall.total_requests == expected
+        assert result.steps["search/collection"].total_requests == 1
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the map-viewer tile workload
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import asyncio
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from .scenario import ScenarioResult  # noqa: E402
+from .tiles import (  # noqa: E402
+    EMPTY_STEP,
+    MapViewer,
+    TileLoadRunner,
+    TileWorkload,
+    Viewport,
+    empty_share,
+    hot_viewports,
+    lonlat_to_world,
+    parse_bbox,
+    parse_viewport,
+    parse_zoom_weights,
+)
+
+
+def viewport_at(lon: float, lat: float, zoom: int) -> Viewport:
+    return Viewport(zoom, *lonlat_to_world(lon, lat))
+
+
+class TestViewport:
+    """Viewports cover a contiguous block of tiles, centre first"""
+
+    def test_known_tile_is_at_centre(self):
+        # test_raster.py fetches 15/8589/12849 from the sample mosaic
+        viewport = Viewport(15, (8589 + 0.5) / 2**15, (12849 + 0.5) / 2**15)
+        tiles = viewport.tiles(1280, 800)
+        assert tiles[0] == (15, 8589, 12849)
+        xs = {x for _, x, _ in tiles}
+        ys = {y for _, _, y in tiles}
+        assert len(tiles) == len(xs) * len(ys)
+        # 1280x800 centred mid-tile spans 5 whole-or-partial tiles each way
+        assert max(xs) - min(xs) + 1 == len(xs) == 5
+        assert max(ys) - min(ys) + 1 == len(ys) == 5
+
+    def test_wraps_antimeridian_and_clips_poles(self):
+        tiles = Viewport(2, 0.0, 0.0).tiles(512, 256)
+        assert sorted(tiles) == [(2, 0, 0), (2, 3, 0)]
+
+    def test_no_duplicates_when_wider_than_world(self):
+        tiles = Viewport(1, 0.5, 0.5).tiles(2048, 2048)
+        assert sorted(tiles) == [(1, 0, 0), (1, 0, 1), (1, 1, 0), (1, 1, 1)]
+
+
+class TestMapViewer:
+    """Users stay in the workload's area and zoom range"""
+
+    def test_moves_stay_in_bbox_and_zooms(self):
+        workload = TileWorkload(zoom_weights={14: 1, 15: 3, 16: 1})
+        west, south, east, north = workload.bbox
+        u_min, v_max = lonlat_to_world(west, south)
+        u_max, v_min = lonlat_to_world(east, north)
+
+        viewer = MapViewer(workload, random.Random(7), hot_viewports(workload))
+        moves: Counter = Counter()
+        for _ in range(2000):
+            move, viewport = viewer.next_viewport()
+            moves[move] += 1
+            assert viewport.zoom in (14, 15, 16)
+            assert u_min <= viewport.u <= u_max
+            assert v_min <= viewport.v <= v_max
+
+        assert set(moves) == {"jump", "pan", "zoom", "repeat"}
+        assert moves["repeat"] / 2000 == pytest.approx(workload.repeat_share, abs=0.04)
+
+    def test_repeats_are_shared(self):
+        """Hot viewports are identical for every user and process"""
+        workload = TileWorkload(repeat_share=1.0, seed=3)
+        assert hot_viewports(workload) == hot_viewports(workload)
+
+        hot = hot_viewports(workload)
+        viewer = MapViewer(workload, random.Random(1), hot)
+        viewer.next_viewport()
+        assert all(viewer.next_viewport()[1] in hot for _ in range(100))
+
+    def test_no_repeats(self):
+        workload = TileWorkload(repeat_share=0.0)
+        viewer = MapViewer(workload, random.Random(1), [])
+        assert all(viewer.next_viewport()[0] != "repeat" for _ in range(500))
+
+    @pytest.mark.parametrize(
+        "options",
+        [
+            {"collections": []},
+            {"bbox": (10.0, 0.0, -10.0, 5.0)},
+            {"zoom_weights": {}},
+            {"zoom_weights": {14: 0}},
+            {"repeat_share": 1.5},
+            {"viewport": (0, 800)},
+        ],
+    )
+    def test_invalid_workload(self, options):
+        with pytest.raises(ValueError):
+            TileWorkload(**options)
+
+
+class TestParsers:
+    """CLI values for the tile workload"""
+
+    def test_zoom_weights(self):
+        assert parse_zoom_weights("12-14") == {12: 1.0, 13: 1.0, 14: 1.0}
+        assert parse_zoom_weights("13:2,14:4,15") == {13: 2.0, 14: 4.0, 15: 1.0}
+
+    def test_bbox_and_viewport(self):
+        assert parse_bbox("-87,36,-85.5,36.3") == (-87.0, 36.0, -85.5, 36.3)
+        assert parse_viewport("1920x1080") == (1920, 1080)
+        with pytest.raises(ValueError):
+            parse_bbox("1,2,3")
+        with pytest.raises(ValueError):
+            parse_viewport("1920")
+
+
+class StatusEngine:
+    """Answers every tile with the next status of a fixed list"""
+
+    def __init__(self, statuses):
+        self.statuses = iter(statuses)
+
+    async def request(self, shard, method, url, **kwargs):
+        return SimpleNamespace(status_code=next(self.statuses)), 10.0
+
+
+class TestTileOutcomes:
+    """Only 200/204 succeed; 404s are empty tiles outside the latencies"""
+
+    def test_statuses(self):
+        runner = TileLoadRunner(
+            TileWorkload(repeat_share=0), StatusEngine([200, 204, 404, 500]), "x"
+        )
+        result = ScenarioResult()
+        loaded = [
+            asyncio.run(runner._fetch_tile(None, (14, 1, 1), result)) for _ in range(4)
+        ]
+
+        assert loaded == [True, True, True, False]
+        assert result.overall.total_requests == 3
+        assert result.overall.success_count == 2
+        assert result.steps["tiles/z14"].total_requests == 3
+        assert result.steps[EMPTY_STEP].total_requests == 1
+
+    def test_empty_share(self):
+        assert empty_share(1, 3) == 0.25
+        assert empty_share(0, 0) == 0.0
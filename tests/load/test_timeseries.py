@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-second timelines and time series export
+
+These run offline and do not need an eoAPI deployment.
+"""
+
+import csv
+import json
+
+import pytest
+
+from .recorder import NO_RESPONSE, RequestRecorder
+from .timeseries import (
+    align_samples,
+    export_timeseries,
+    timeseries_format,
+    timeseries_rows,
+)
+
+START = 1_790_856_000
+
+
+def recorder_with_errors() -> RequestRecorder:
+    recorder = RequestRecorder()
+    for i in range(100):
+        recorder.record(True, 10.0 + i, timestamp=START, status=200)
+    recorder.record(False, 5.0, timestamp=START, status=404)
+    recorder.record(False, 30000.0, timestamp=START + 1, status=NO_RESPONSE)
+    recorder.record(False, 900.0, timestamp=START + 1, status=503)
+    recorder.record(False, 900.0, timestamp=START + 1)
+    return recorder
+
+
+class TestTimeline:
+    """Per-second buckets keep error classes and latency quantiles"""
+
+    def test_error_classes_and_quantiles(self):
+        first, second = recorder_with_errors().timeline()
+        assert first["requests"] == 101
+        assert first["successes"] == 100
+        assert first["errors_4xx"] == 1
+        assert first["latency_p50"] == pytest.approx(59.0, rel=0.01)
+        assert first["latency_max"] == 109.0
+        assert second["errors_network"] == 1
+        assert second["errors_5xx"] == 1
+        assert second["errors_other"] == 1
+        assert second["latency_max"] == 30000.0
+
+    def test_merge_matches_single_recorder(self):
+        merged = recorder_with_errors().merge(recorder_with_errors())
+        first, _ = merged.timeline()
+        assert first["requests"] == 202
+        assert first["errors_4xx"] == 2
+        assert (
+            first["latency_p50"] == recorder_with_errors().timeline()[0]["latency_p50"]
+        )
+
+
+def prometheus_matrix(*series):
+    return {
+        "resultType": "matrix",
+        "result": [
+            {"metric": labels, "values": [[t, str(v)] for t, v in values]}
+            for labels, values in series
+        ],
+    }
+
+
+def sample_report() -> dict:
+    timeline = RequestRecorder()
+    for offset in range(40):
+        timeline.record(True, 20.0, timestamp=START + offset, status=200)
+    return {
+        "overall": {
+            "timeline": timeline.timeline(),
+            "infrastructure": {
+                "hpa_metrics": {
+                    "current_replicas": prometheus_matrix(
+                        ({"deployment": "raster"}, [(START, 1), (START + 15, 3)])
+                    )
+                },
+                "pod_metrics": {
+                    "cpu": prometheus_matrix(
+                        ({"pod": "a"}, [(START + 15, 0.5)]),
+                        ({"pod": "b"}, [(START + 15, 0.7)]),
+                    )
+                },
+            },
+            "kill_events": [{"timestamp": START + 20.4, "pod": "raster-1"}],
+        },
+        "steps": {"tiles/z15": {"timeline": timeline.timeline()[:2]}},
+    }
+
+
+class TestTimeseriesRows:
+    """Report timelines flatten into rows aligned with Prometheus samples"""
+
+    def test_rows(self):
+        rows = timeseries_rows(sample_report())
+        assert len(rows) == 42
+        overall = [row for row in rows if row["series"] == "overall"]
+        assert [row["pods_killed"] for row in overall].count(1) == 1
+        assert overall[20]["pods_killed"] == 1
+
+        replicas = [row["current_replicas"] for row in overall]
+        # Each sample holds for one 15s step, then the series ends
+        assert replicas[:15] == [1.0] * 15
+        assert replicas[15:31] == [3.0] * 16
+        assert replicas[31:] == [None] * 9
+        assert overall[15]["cpu{pod=a}"] == 0.5
+        assert overall[15]["cpu{pod=b}"] == 0.7
+
+        steps = [row for row in rows if row["series"] == "steps/tiles/z15"]
+        assert len(steps) == 2
+        assert "current_replicas" not in steps[0]
+
+    def test_stress_levels_share_run_infrastructure(self):
+        report = sample_report()
+        stress = {
+            "metrics": {5: {"timeline": report["overall"]["timeline"][:20]}},
+            "infrastructure": report["overall"]["infrastructure"],
+        }
+        rows = timeseries_rows(stress)
+        assert rows[0]["series"] == "metrics/5"
+        assert rows[15]["current_replicas"] == 3.0
+
+    def test_align_before_first_sample(self):
+        assert align_samples([(10.0, 1.0), (20.0, 2.0)], [5, 10, 25, 31]) == [
+            None,
+            1.0,
+            2.0,
+            None,
+        ]
+
+
+class TestExport:
+    """Rows are written in the format named by the file extension"""
+
+    def test_csv(self, tmp_path):
+        path = tmp_path / "run.csv"
+        assert export_timeseries(sample_report(), str(path)) == 42
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert rows[0]["series"] == "overall"
+        assert int(rows[0]["timestamp"]) == START
+        # Step rows have no Prometheus columns
+        assert rows[-1]["current_replicas"] == ""
+
+    def test_ndjson(self, tmp_path):
+        path = tmp_path / "run.ndjson"
+        export_timeseries(sample_report(), str(path))
+        rows = [json.loads(line) for line in path.read_text().splitlines()]
+        assert rows[0]["requests"] == 1
+        assert rows[0]["current_replicas"] == 1.0
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            timeseries_format("run.xlsx")
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Map-Viewer Tile Workload
+
+Simulates people browsing a titiler-pgstac mosaic in a web map. The runner
+registers one mosaic search up front, then virtual users pan, zoom, jump to
+new places or revisit popular views. Every move requests all WebMercatorQuad
+tiles covering the user's viewport at once, the way map clients do, so the
+service sees realistic bursts of neighbouring z/x/y tiles rather than one URL
+in a loop.
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .async_engine import AsyncLoadEngine, ClientShard, status_of
+from .scenario import ScenarioResult, ThinkTime, pause
+
+logger = logging.getLogger(__name__)
+
+TILE_SIZE = 256
+TILE_MATRIX_SET = "WebMercatorQuad"
+# Web Mercator is undefined at the poles
+MAX_LATITUDE = 85.05112878
+DEFAULT_COLLECTIONS = ["noaa-emergency-response"]
+# Extent of the sample items in charts/eoapi/data/initdb/samples
+DEFAULT_BBOX = (-87.0251, 36.0999, -85.4249, 36.2251)
+DEFAULT_ZOOM_WEIGHTS = {12: 1.0, 13: 2.0, 14: 4.0, 15: 6.0, 16: 4.0, 17: 2.0, 18: 1.0}
+DEFAULT_VIEWPORT = (1280, 800)
+DEFAULT_REPEAT_SHARE = 0.2
+DEFAULT_THINK_TIME = ThinkTime(1.0, 3.0)
+# Number of popular viewports shared by all users for cache-friendly repeats
+HOT_VIEWPORTS = 20
+# Relative odds of each move when a user is not repeating a popular view
+MOVE_WEIGHTS = {"pan": 6.0, "zoom": 3.0, "jump": 1.0}
+TILE_OK_STATUSES = (200, 204)
+# titiler-pgstac answers tiles with no assets with 404. They are recorded
+# under EMPTY_STEP, outside the tile latencies, since they skip all rendering
+TILE_EMPTY_STATUS = 404
+EMPTY_STEP = "empty"
+# Above this share of empty tiles, the run mostly measured 404s
+DEFAULT_MAX_EMPTY_SHARE = 0.2
+
+
+def lonlat_to_world(lon: float, lat: float) -> Tuple[float, float]:
+    """Project lon/lat to normalized Web Mercator coordinates in [0, 1)"""
+    lat = min(max(lat, -MAX_LATITUDE), MAX_LATITUDE)
+    u = (lon + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    v = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return u, v
+
+
+@dataclass(frozen=True)
+class Viewport:
+    """Map view centred on normalized Web Mercator coordinates at a zoom"""
+
+    zoom: int
+    u: float
+    v: float
+
+    def tiles(self, width: int, height: int) -> List[Tuple[int, int, int]]:
+        """
+        Tiles covering a width x height pixel map centred on this view
+
+        Returns:
+            (z, x, y) tuples ordered from the centre outwards, the order map
+            clients request them in
+        """
+        n = 1 << self.zoom
+        center_x = self.u * n * TILE_SIZE
+        center_y = self.v * n * TILE_SIZE
+        min_col = math.floor((center_x - width / 2) / TILE_SIZE)
+        max_col = math.floor((center_x + width / 2 - 1) / TILE_SIZE)
+        min_row = max(math.floor((center_y - height / 2) / TILE_SIZE), 0)
+        max_row = min(math.floor((center_y + height / 2 - 1) / TILE_SIZE), n - 1)
+
+        tiles = []
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                distance = math.hypot(
+                    (col + 0.5) * TILE_SIZE - center_x,
+                    (row + 0.5) * TILE_SIZE - center_y,
+                )
+                # Columns wrap around the antimeridian
+                tiles.append((distance, (self.zoom, col % n, row)))
+        tiles.sort()
+        # A viewport wider than the world at low zoom wraps onto itself
+        return list(dict.fromkeys(tile for _, tile in tiles))
+
+
+@dataclass(frozen=True)
+class TileWorkload:
+    """What users browse and how they move around the map"""
+
+    collections: List[str] = field(default_factory=lambda: list(DEFAULT_COLLECTIONS))
+    bbox: Tuple[float, float, float, float] = DEFAULT_BBOX
+    zoom_weights: Dict[int, float] = field(
+        default_factory=lambda: dict(DEFAULT_ZOOM_WEIGHTS)
+    )
+    viewport: Tuple[int, int] = DEFAULT_VIEWPORT
+    repeat_share: float = DEFAULT_REPEAT_SHARE
+    think_time: ThinkTime = DEFAULT_THINK_TIME
+    params: Dict[str, str] = field(default_factory=lambda: {"assets": "cog"})
+    seed: int = 0
+
+    def __post_init__(self):
+        if not self.collections:
+            raise ValueError("at least one collection is required")
+        west, south, east, north = self.bbox
+        if not (-180 <= west < east <= 180 and -90 <= south < north <= 90):
+            raise ValueError(f"Invalid bbox: {self.bbox}")
+        if not self.zoom_weights or any(
+            z < 0 or z > 30 or w < 0 for z, w in self.zoom_weights.items()
+        ):
+            raise ValueError(f"Invalid zoom weights: {self.zoom_weights}")
+        if sum(self.zoom_weights.values()) <= 0:
+            raise ValueError("zoom weights must not all be zero")
+        if min(self.viewport) <= 0:
+            raise ValueError(f"viewport must be positive: {self.viewport}")
+        if not 0 <= self.repeat_share <= 1:
+            raise ValueError(
+                f"repeat_share must be between 0 and 1: {self.repeat_share}"
+            )
+
+    @property
+    def search(self) -> Dict:
+        """Body for /searches/register covering the workload's mosaic"""
+        return {"collections": list(self.collections), "filter-lang": "cql2-json"}
+
+
+class MapViewer:
+    """Generates one user's sequence of viewports"""
+
+    def __init__(
+        self,
+        workload: TileWorkload,
+        rng: random.Random,
+        hot_viewports: List[Viewport],
+    ):
+        """
+        Initialize a viewer
+
+        Args:
+            workload: Workload configuration
+            rng: Random source for this user
+            hot_viewports: Popular views shared by every user, most popular
+                first; revisiting them is what makes tiles cacheable
+        """
+        self.workload = workload
+        self.rng = rng
+        self.hot_viewports = hot_viewports
+        west, south, east, north = workload.bbox
+        self._u_range = (lonlat_to_world(west, 0)[0], lonlat_to_world(east, 0)[0])
+        self._v_range = (lonlat_to_world(0, north)[1], lonlat_to_world(0, south)[1])
+        self._zooms = sorted(workload.zoom_weights)
+        self._hot_weights = [1 / (rank + 1) for rank in range(len(hot_viewports))]
+        self.current: Optional[Viewport] = None
+
+    def random_viewport(self) -> Viewport:
+        """A view somewhere in the bbox at a zoom drawn from the distribution"""
+        zoom = self.rng.choices(
+            self._zooms, [self.workload.zoom_weights[z] for z in self._zooms]
+        )[0]
+        return Viewport(
+            zoom, self.rng.uniform(*self._u_range), self.rng.uniform(*self._v_range)
+        )
+
+    def _clamp(self, zoom: int, u: float, v: float) -> Viewport:
+        zoom = min(max(zoom, self._zooms[0]), self._zooms[-1])
+        return Viewport(
+            zoom,
+            min(max(u, self._u_range[0]), self._u_range[1]),
+            min(max(v, self._v_range[0]), self._v_range[1]),
+        )
+
+    def next_viewport(self) -> Tuple[str, Viewport]:
+        """
+        Move to the next view
+
+        Returns:
+            Tuple of (move, viewport) where move is one of "repeat", "pan",
+            "zoom" or "jump"
+        """
+        if self.current is None:
+            move = "jump"
+        elif self.hot_viewports and self.rng.random() < self.workload.repeat_share:
+            move = "repeat"
+        else:
+            move = self.rng.choices(list(MOVE_WEIGHTS), list(MOVE_WEIGHTS.values()))[0]
+
+        if move == "repeat":
+            viewport = self.rng.choices(self.hot_viewports, self._hot_weights)[0]
+        elif move == "jump" or self.current is None:
+            viewport = self.random_viewport()
+        elif move == "pan":
+            # Drag by up to half a screen in each direction
+            world_px = TILE_SIZE * (1 << self.current.zoom)
+            width, height = self.workload.viewport
+            viewport = self._clamp(
+                self.current.zoom,
+                self.current.u + self.rng.uniform(-0.5, 0.5) * width / world_px,
+                self.current.v + self.rng.uniform(-0.5, 0.5) * height / world_px,
+            )
+        else:
+            step = self.rng.choice((-1, 1))
+            viewport = self._clamp(
+                self.current.zoom + step, self.current.u, self.current.v
+            )
+        self.current = viewport
+        return move, viewport
+
+
+def hot_viewports(workload: TileWorkload, count: int = HOT_VIEWPORTS) -> List[Viewport]:
+    """
+    Popular views derived from the workload seed
+
+    Every user and every generator process draws the same list, so repeats
+    hit the same tiles and exercise caches in front of the raster service.
+    """
+    rng = random.Random(workload.seed)
+    viewer = MapViewer(workload, rng, [])
+    return [viewer.random_viewport() for _ in range(count)]
+
+
+class TileLoadRunner:
+    """Drives map-viewer users against a registered mosaic on an AsyncLoadEngine"""
+
+    def __init__(
+        self,
+        workload: TileWorkload,
+        engine: AsyncLoadEngine,
+        base_url: str,
+        raster_path: str = "/raster",
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize the runner
+
+        Args:
+            workload: Workload configuration
+            engine: Async engine whose client shards carry the requests
+            base_url: Base URL for eoAPI services
+            raster_path: Path of the raster service below base_url
+            seed: Optional seed for user movement (defaults to random)
+        """
+        self.workload = workload
+        self.engine = engine
+        self.raster_url = f"{base_url.rstrip('/')}/{raster_path.strip('/')}"
+        self.rng = random.Random(seed)
+        self.hot_viewports = hot_viewports(workload) if workload.repeat_share else []
+        self.search_id: Optional[str] = None
+
+    async def register_search(self, shard: ClientShard) -> str:
+        """
+        Register the workload's mosaic search
+
+        Returns:
+            Search id used in tile URLs
+
+        Raises:
+            RuntimeError: If the search cannot be registered
+        """
+        response, _ = await self.engine.request(
+            shard,
+            "POST",
+            f"{self.raster_url}/searches/register",
+            json=self.workload.search,
+        )
+        if response is None or response.status_code != 200:
+            status = response.status_code if response is not None else "no response"
+            raise RuntimeError(f"Failed to register mosaic search: {status}")
+        return response.json()["id"]
+
+    def tile_url(self, z: int, x: int, y: int) -> str:
+        return (
+            f"{self.raster_url}/searches/{self.search_id}/tiles/"
+            f"{TILE_MATRIX_SET}/{z}/{x}/{y}"
+        )
+
+    async def _fetch_tile(
+        self, shard: ClientShard, tile: Tuple[int, int, int], result: ScenarioResult
+    ) -> bool:
+        response, latency_ms = await self.engine.request(
+            shard, "GET", self.tile_url(*tile), params=self.workload.params
+        )
+        status = status_of(response)
+        if status == TILE_EMPTY_STATUS:
+            # Nothing to draw, but the map is complete
+            result.record(EMPTY_STEP, True, latency_ms, time.time(), overall=False)
+            return True
+        success = status in TILE_OK_STATUSES
+        result.record(
+            f"tiles/z{tile[0]}", success, latency_ms, time.time(), status=status
+        )
+        return success
+
+    async def _user(
+        self,
+        shard: ClientShard,
+        start_delay: float,
+        deadline: float,
+        result: ScenarioResult,
+    ) -> None:
+        """One map user moving around and loading full viewports until deadline"""
+        await asyncio.sleep(start_delay)
+        viewer = MapViewer(
+            self.workload, random.Random(self.rng.random()), self.hot_viewports
+        )
+        width, height = self.workload.viewport
+        while time.perf_counter() < deadline:
+            move, viewport = viewer.next_viewport()
+            tiles = viewport.tiles(width, height)
+            start = time.perf_counter()
+            loaded = await asyncio.gather(
+                *(self._fetch_tile(shard, tile, result) for tile in tiles)
+            )
+            # Time until the whole map is drawn, which is what users notice
+            result.record(
+                "viewport",
+                all(loaded),
+                (time.perf_counter() - start) * 1000,
+                time.time(),
+                overall=False,
+            )
+            result.record_iteration(move, all(loaded))
+            await pause(self.workload.think_time.sample(viewer.rng), deadline)
+
+    async def _run(self, users: int, duration: float, ramp_up: float) -> ScenarioResult:
+        result = ScenarioResult(self.engine.histogram_digits)
+        async with AsyncExitStack() as stack:
+            shards = await self.engine.open_shards(stack, self.raster_url)
+            if self.search_id is None:
+                self.search_id = await self.register_search(shards[0])
+                logger.info(f"Registered mosaic search {self.search_id}")
+            start_time = time.perf_counter()
+            deadline = start_time + duration
+            stagger = ramp_up / users
+            await asyncio.gather(
+                *(
+                    self._user(shards[i % len(shards)], i * stagger, deadline, result)
+                    for i in range(users)
+                )
+            )
+        result.duration = time.perf_counter() - start_time
+        return result
+
+    def run(self, users: int, duration: float, ramp_up: float = 0.0) -> ScenarioResult:
+        """
+        Run `users` map users for duration seconds
+
+        Args:
+            users: Number of concurrent map users
+            duration: Run duration in seconds
+            ramp_up: Seconds over which users start
+
+        Returns:
+            ScenarioResult with per-zoom tile recorders under "tiles/z<zoom>",
+            empty (404) tiles under EMPTY_STEP, viewport load times under
+            "viewport" and completed moves per move type
+
+        Raises:
+            ValueError: If users or duration is not positive
+            RuntimeError: If the mosaic search cannot be registered
+        """
+        if users <= 0 or duration <= 0:
+            raise ValueError(
+                f"users and duration must be positive: {users}, {duration}"
+            )
+        return asyncio.run(self._run(users, duration, ramp_up))
+
+
+def empty_share(empty: int, tiles: int) -> float:
+    """
+    Share of all tile requests that found no assets
+
+    Args:
+        empty: Tiles answered with TILE_EMPTY_STATUS
+        tiles: All other tile requests
+
+    Returns:
+        Share between 0 and 1, 0 if nothing was requested
+    """
+    total = empty + tiles
+    return empty / total if total else 0.0
+
+
+def parse_zoom_weights(value: str) -> Dict[int, float]:
+    """
+    Parse a zoom distribution such as "12-16" or "13:2,14:4,15:6"
+
+    Args:
+        value: Zoom range (uniform) or comma-separated zoom:weight pairs
+
+    Returns:
+        Dict of zoom level to relative weight
+
+    Raises:
+        ValueError: If the value is malformed
+    """
+    value = value.strip()
+    if ":" not in value and "-" in value:
+        low, _, high = value.partition("-")
+        return {z: 1.0 for z in range(int(low), int(high) + 1)}
+    weights = {}
+    for part in value.split(","):
+        zoom, _, weight = part.partition(":")
+        weights[int(zoom)] = float(weight) if weight else 1.0
+    return weights
+
+
+def parse_bbox(value: str) -> Tuple[float, float, float, float]:
+    """
+    Parse "west,south,east,north" into a bbox tuple
+
+    Raises:
+        ValueError: If the value does not have four numbers
+    """
+    parts = [float(p) for p in value.split(",")]
+    if len(parts) != 4:
+        raise ValueError(f"bbox needs west,south,east,north: {value!r}")
+    return parts[0], parts[1], parts[2], parts[3]
+
+
+def parse_viewport(value: str) -> Tuple[int, int]:
+    """
+    Parse a viewport size such as "1280x800"
+
+    Raises:
+        ValueError: If the value is not WIDTHxHEIGHT
+    """
+    width, sep, height = value.lower().partition("x")
+    if not sep:
+        raise ValueError(f"viewport needs WIDTHxHEIGHT: {value!r}")
+    return int(width), int(height)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Per-Second Time Series Export
+
+Flattens the per-second timelines in a load test report into rows and writes
+them as CSV, Parquet or NDJSON. Every row is keyed by Unix second and labelled
+with the report section it came from (a stress level, an endpoint, a scenario
+step). Prometheus range data collected for the same section is joined in as
+extra columns, sampled at each second, so client-side latency and errors line
+up with pod CPU, replica counts and database metrics on one time axis.
+"""
+
+import bisect
+import csv
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+TIMESERIES_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+# Label for timelines at the top level of a report (e.g. chaos tests)
+ROOT_SERIES = "overall"
+
+
+def timeseries_format(filename: str) -> str:
+    """
+    Output format for a time series file, from its extension
+
+    Args:
+        filename: Output filename
+
+    Returns:
+        "csv", "parquet" or "ndjson"
+
+    Raises:
+        ValueError: If the extension is unknown or Parquet support is missing
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in TIMESERIES_FORMATS:
+        raise ValueError(
+            f"Unknown time series format '{extension}', expected one of "
+            f"{', '.join(TIMESERIES_FORMATS)}"
+        )
+    fmt = TIMESERIES_FORMATS[extension]
+    if fmt == "parquet" and not PYARROW_AVAILABLE:
+        raise ValueError("Parquet time series require pyarrow to be installed")
+    return fmt
+
+
+def _series_name(name: str, labels: Dict[str, str], shared: int) -> str:
+    """Column name for one Prometheus series, with labels when ambiguous"""
+    if shared == 1 or not labels:
+        return name
+    label_text = ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+    return f"{name}{{{label_text}}}"
+
+
+def prometheus_columns(
+    infrastructure: Dict,
+) -> Dict[str, List[Tuple[float, float]]]:
+    """
+    Flatten collected Prometheus range data into named sample lists
+
+    Args:
+        infrastructure: "infrastructure" section from collect_test_metrics
+
+    Returns:
+        Dict of column name -> [(unix time, value)] ordered by time
+    """
+    columns: Dict[str, List[Tuple[float, float]]] = {}
+    for group in infrastructure.values():
+        if not isinstance(group, dict):
+            continue
+        for name, data in group.items():
+            if not isinstance(data, dict):
+                continue
+            series = data.get("result") or []
+            for entry in series:
+                values = entry.get("values") or []
+                if not values:
+                    continue
+                column = _series_name(name, entry.get("metric", {}), len(series))
+                columns[column] = sorted(
+                    (float(timestamp), float(value)) for timestamp, value in values
+                )
+    return columns
+
+
+def align_samples(
+    samples: List[Tuple[float, float]], seconds: List[int]
+) -> List[Optional[float]]:
+    """
+    Sample a Prometheus series at each timeline second
+
+    Prometheus evaluates range queries every `step` seconds, so each sample
+    stands for the step that follows it: a second takes the latest sample at
+    or before it, and seconds more than one step past the last sample (or
+    before the first) get None.
+
+    Args:
+        samples: (unix time, value) pairs ordered by time
+        seconds: Timeline seconds
+
+    Returns:
+        One value (or None) per second
+    """
+    times = [timestamp for timestamp, _ in samples]
+    step = min((b - a for a, b in zip(times, times[1:]) if b > a), default=0.0)
+    aligned: List[Optional[float]] = []
+    for second in seconds:
+        index = bisect.bisect_right(times, second) - 1
+        if index < 0 or (index == len(times) - 1 and second - times[index] > step):
+            aligned.append(None)
+        else:
+            aligned.append(samples[index][1])
+    return aligned
+
+
+def timeseries_rows(report: Dict) -> List[Dict[str, Any]]:
+    """
+    Collect every per-second timeline in a report into labelled rows
+
+    Args:
+        report: Metrics dict as exported with --report-json
+
+    Returns:
+        Rows ordered by series then timestamp, each with "series",
+        "timestamp", the timeline counters and quantiles, any Prometheus
+        columns collected for that series (or, for stress levels, for the
+        whole run) and "pods_killed" for chaos tests
+    """
+    rows: List[Dict[str, Any]] = []
+
+    def walk(node: Any, path: List[str], inherited: Dict) -> None:
+        if not isinstance(node, dict):
+            return
+        timeline = node.get("timeline")
+        if isinstance(timeline, list):
+            series = "/".join(path) or ROOT_SERIES
+            infra = prometheus_columns(node.get("infrastructure") or inherited)
+            kills: Dict[int, int] = {}
+            for event in node.get("kill_events") or []:
+                second = int(event["timestamp"])
+                kills[second] = kills.get(second, 0) + 1
+            seconds = [entry["timestamp"] for entry in timeline]
+            aligned = {
+                column: align_samples(samples, seconds)
+                for column, samples in infra.items()
+            }
+            for i, entry in enumerate(timeline):
+                row = {"series": series, **entry}
+                for column, values in aligned.items():
+                    row[column] = values[i]
+                if kills:
+                    row["pods_killed"] = kills.get(entry["timestamp"], 0)
+                rows.append(row)
+        elif node.get("infrastructure"):
+            # Collected over a run of several timelines, e.g. stress levels
+            inherited = node["infrastructure"]
+        for key, value in node.items():
+            if key not in ("timeline", "infrastructure"):
+                walk(value, path + [str(key)], inherited)
+
+    walk(report, [], {})
+    return rows
+
+
+def _columns(rows: List[Dict[str, Any]]) -> List[str]:
+    """Union of row keys in first-seen order"""
+    return list(dict.fromkeys(key for row in rows for key in row))
+
+
+def export_timeseries(report: Dict, filename: str) -> int:
+    """
+    Write the per-second time series of a report to a file
+
+    Args:
+        report: Metrics dict as exported with --report-json
+        filename: Output file; .csv, .parquet, .ndjson or .jsonl
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ValueError: If the format is unknown or unavailable
+    """
+    fmt = timeseries_format(filename)
+    rows = timeseries_rows(report)
+    columns = _columns(rows)
+
+    if fmt == "csv":
+        with open(filename, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    elif fmt == "ndjson":
+        with open(filename, "w") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+    else:
+        table = pa.table(
+            {column: [row.get(column) for row in rows] for column in columns}
+        )
+        pq.write_table(table, filename)
+
+    logger.info(f"Time series ({len(rows)} rows) exported to {filename}")
+    return len(rows)
@@ -353,3 +353,97 @@ def test_bulk_operations_notification(
         )
 
     assert found_count >= 2, f"Expected at least 2 notifications, found {found_count}"
+
+
+# Runs in a raster pod: LISTENs on one connection while the other inserts (and
+# then deletes) items in a single statement each, and prints the payloads.
+BULK_NOTIFY_SCRIPT = """
+import json, os, sys
+import psycopg
+
+prefix, count = sys.argv[1], int(sys.argv[2])
+items = [
+    {
+        "id": f"{prefix}-{i:06d}",
+        "type": "Feature",
+        "stac_version": "1.0.0",
+        "collection": "noaa-emergency-response",
+        "geometry": {"type": "Point", "coordinates": [0, 0]},
+        "bbox": [0, 0, 0, 0],
+        "properties": {"datetime": "2020-01-01T00:00:00Z"},
+        "assets": {},
+        "links": [],
+    }
+    for i in range(count)
+]
+dsn = os.environ["PGADMIN_URI"]
+with psycopg.connect(dsn, autocommit=True) as listener, psycopg.connect(
+    dsn, autocommit=True
+) as writer:
+    listener.execute("LISTEN pgstac_items_change")
+    writer.execute("SELECT pgstac.create_items(%s::jsonb)", (json.dumps(items),))
+    writer.execute("DELETE FROM pgstac.items WHERE id LIKE %s", (prefix + "-%",))
+    payloads = [n.payload for n in listener.notifies(timeout=10)]
+print(json.dumps([p for p in payloads if prefix in p]))
+"""
+
+
+def test_bulk_insert_notifications_fit_payload_limit() -> None:
+    """A bulk insert is split into numbered notifications under 8000 bytes."""
+    namespace = os.getenv("NAMESPACE", "eoapi")
+    pod = subprocess.run(
+        [
+            "kubectl",
+            "get",
+            "pods",
+            "-n",
+            namespace,
+            "-l",
+            "app.kubernetes.io/component=raster",
+            "-o",
+            "jsonpath={.items[0].metadata.name}",
+        ],
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+    if not pod:
+        pytest.skip("raster pod not found")
+
+    prefix = f"notification-bulk-{int(time.time())}"
+    count = 2000
+    result = subprocess.run(
+        [
+            "kubectl",
+            "exec",
+            "-n",
+            namespace,
+            pod,
+            "--",
+            "python3",
+            "-c",
+            BULK_NOTIFY_SCRIPT,
+            prefix,
+            str(count),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, f"Bulk insert failed: {result.stderr}"
+
+    payloads = json.loads(result.stdout.strip().splitlines()[-1])
+    assert all(len(p.encode()) < 8000 for p in payloads)
+
+    for operation in ("INSERT", "DELETE"):
+        messages = [json.loads(p) for p in payloads]
+        messages = [m for m in messages if m["operation"] == operation]
+        assert messages, f"No {operation} notifications"
+        batch = messages[0]["batch"]
+        assert len(messages) == batch["total"] > 1
+        assert sorted(m["batch"]["seq"] for m in messages) == list(
+            range(1, batch["total"] + 1)
+        )
+        assert {m["batch"]["id"] for m in messages} == {batch["id"]}
+        if "items" in messages[0]:
+            ids = {item["id"] for m in messages for item in m["items"]}
+            assert len(ids) == count